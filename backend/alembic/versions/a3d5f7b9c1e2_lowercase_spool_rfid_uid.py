@@ -0,0 +1,73 @@
+"""lowercase_spool_rfid_uid
+
+Revision ID: a3d5f7b9c1e2
+Revises: f1c3e5a7b9d0
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3d5f7b9c1e2"
+down_revision: Union[str, Sequence[str], None] = "f1c3e5a7b9d0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Dialects with expression indexes that Alembic can create portably
+_EXPRESSION_INDEX_DIALECTS = ("postgresql", "sqlite")
+
+
+def upgrade() -> None:
+    """Store spools.rfid_uid lowercase so lookups can use the unique index."""
+    conn = op.get_bind()
+
+    rows = conn.execute(
+        sa.text(
+            "SELECT id, rfid_uid FROM spools WHERE rfid_uid IS NOT NULL ORDER BY id"
+        )
+    ).fetchall()
+
+    # UIDs that only differed in case were already ambiguous for the
+    # case-insensitive lookup; the oldest spool keeps the tag.
+    seen: set[str] = set()
+    updates: list[dict] = []
+    for spool_id, rfid_uid in rows:
+        normalized = rfid_uid.strip().lower() or None
+        if normalized in seen:
+            normalized = None
+        elif normalized is not None:
+            seen.add(normalized)
+        if normalized != rfid_uid:
+            updates.append({"uid": normalized, "pk": spool_id})
+
+    # Clear first, then set, so intermediate states never collide
+    if updates:
+        conn.execute(
+            sa.text("UPDATE spools SET rfid_uid = NULL WHERE id = :pk"), updates
+        )
+    renamed = [u for u in updates if u["uid"] is not None]
+    if renamed:
+        conn.execute(
+            sa.text("UPDATE spools SET rfid_uid = :uid WHERE id = :pk"), renamed
+        )
+
+    if conn.dialect.name in _EXPRESSION_INDEX_DIALECTS:
+        # Guards case-insensitive uniqueness against writes that bypass the
+        # ORM normalization (raw SQL, bulk statements)
+        op.create_index(
+            "ix_spools_rfid_uid_lower",
+            "spools",
+            [sa.text("lower(rfid_uid)")],
+            unique=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop the expression index; the lowercase values are kept."""
+    if op.get_bind().dialect.name in _EXPRESSION_INDEX_DIALECTS:
+        op.drop_index("ix_spools_rfid_uid_lower", table_name="spools")
@@ -0,0 +1,112 @@
+"""add_spool_counters
+
+Revision ID: b4e6a8c0d2f3
+Revises: a3d5f7b9c1e2
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e6a8c0d2f3"
+down_revision: Union[str, Sequence[str], None] = "a3d5f7b9c1e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COUNT_COLUMNS = ("spool_count", "archived_spool_count")
+_SUM_COLUMNS = ("total_remaining_weight_g", "total_price_available", "total_price_all")
+
+# Spools of the filament being updated, with their status key
+_SPOOLS = (
+    "FROM spools s JOIN spool_statuses st ON st.id = s.status_id "
+    "WHERE s.filament_id = filaments.id"
+)
+
+
+def _counter_columns() -> list[sa.Column]:
+    return [
+        *(
+            sa.Column(name, sa.Integer(), nullable=False, server_default="0")
+            for name in _COUNT_COLUMNS
+        ),
+        *(
+            sa.Column(name, sa.Float(), nullable=False, server_default="0")
+            for name in _SUM_COLUMNS
+        ),
+    ]
+
+
+def upgrade() -> None:
+    """Store spool counters on filaments and manufacturers and fill them."""
+    for column in _counter_columns():
+        op.add_column("filaments", column)
+    op.create_index("ix_filaments_spool_count", "filaments", ["spool_count"])
+
+    op.add_column(
+        "manufacturers",
+        sa.Column("filament_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    for column in _counter_columns():
+        op.add_column("manufacturers", column)
+    op.add_column("manufacturers", sa.Column("materials", sa.JSON(), nullable=True))
+
+    conn = op.get_bind()
+    conn.execute(
+        sa.text(
+            "UPDATE filaments SET "
+            f"spool_count = (SELECT COUNT(*) {_SPOOLS} AND st.key <> 'archived'), "
+            f"archived_spool_count = (SELECT COUNT(*) {_SPOOLS} AND st.key = 'archived'), "
+            "total_remaining_weight_g = "
+            f"(SELECT COALESCE(SUM(COALESCE(s.remaining_weight_g, 0)), 0) {_SPOOLS} AND st.key <> 'archived'), "
+            "total_price_available = "
+            f"(SELECT COALESCE(SUM(COALESCE(s.purchase_price, 0)), 0) {_SPOOLS} AND st.key <> 'archived'), "
+            f"total_price_all = (SELECT COALESCE(SUM(COALESCE(s.purchase_price, 0)), 0) {_SPOOLS})"
+        )
+    )
+
+    sums = ", ".join(
+        f"{name} = (SELECT COALESCE(SUM(f.{name}), 0) FROM filaments f "
+        "WHERE f.manufacturer_id = manufacturers.id)"
+        for name in (*_COUNT_COLUMNS, *_SUM_COLUMNS)
+    )
+    conn.execute(
+        sa.text(
+            "UPDATE manufacturers SET filament_count = (SELECT COUNT(*) FROM filaments f "
+            f"WHERE f.manufacturer_id = manufacturers.id), {sums}"
+        )
+    )
+
+    materials: dict[int, list[str]] = {
+        mfr_id: [] for (mfr_id,) in conn.execute(sa.text("SELECT id FROM manufacturers"))
+    }
+    for mfr_id, material in conn.execute(
+        sa.text("SELECT DISTINCT manufacturer_id, type FROM filaments")
+    ):
+        if mfr_id in materials and material:
+            materials[mfr_id].append(material)
+    if materials:
+        conn.execute(
+            sa.text("UPDATE manufacturers SET materials = :materials WHERE id = :pk"),
+            [
+                {"materials": json.dumps(sorted(values)), "pk": mfr_id}
+                for mfr_id, values in materials.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    """Drop the spool counters."""
+    op.drop_column("manufacturers", "materials")
+    for name in reversed((*_COUNT_COLUMNS, *_SUM_COLUMNS)):
+        op.drop_column("manufacturers", name)
+    op.drop_column("manufacturers", "filament_count")
+
+    op.drop_index("ix_filaments_spool_count", table_name="filaments")
+    for name in reversed((*_COUNT_COLUMNS, *_SUM_COLUMNS)):
+        op.drop_column("filaments", name)
@@ -0,0 +1,75 @@
+"""add_inventory_aggregates
+
+Revision ID: c5f7a9b1d3e4
+Revises: b4e6a8c0d2f3
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5f7a9b1d3e4"
+down_revision: Union[str, Sequence[str], None] = "b4e6a8c0d2f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same buckets as app/services/inventory_aggregates.fill_bucket_expression()
+_BUCKET = (
+    "CASE "
+    "WHEN s.remaining_weight_g IS NULL THEN 'unknown' "
+    "WHEN s.remaining_weight_g <= 0 THEN 'empty' "
+    "WHEN s.remaining_weight_g <= s.low_weight_threshold_g / 2.0 THEN 'critical' "
+    "WHEN s.remaining_weight_g <= s.low_weight_threshold_g THEN 'low' "
+    "WHEN s.initial_total_weight_g > 0 "
+    "AND s.remaining_weight_g / s.initial_total_weight_g * 100 > 75 THEN 'full' "
+    "ELSE 'normal' END"
+)
+
+
+def upgrade() -> None:
+    """Create the dashboard inventory aggregate and fill it from the spools."""
+    op.create_table(
+        "inventory_aggregates",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("filament_id", sa.Integer(), nullable=False),
+        sa.Column("location_id", sa.Integer(), nullable=True),
+        sa.Column("fill_bucket", sa.String(length=10), nullable=False),
+        sa.Column("spool_count", sa.Integer(), nullable=False),
+        sa.Column("remaining_weight_g", sa.Float(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["filament_id"], ["filaments.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["location_id"], ["locations.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_inventory_aggregates_filament_location",
+        "inventory_aggregates",
+        ["filament_id", "location_id"],
+    )
+    op.create_index(
+        "ix_inventory_aggregates_location_id", "inventory_aggregates", ["location_id"]
+    )
+
+    op.get_bind().execute(
+        sa.text(
+            "INSERT INTO inventory_aggregates "
+            "(filament_id, location_id, fill_bucket, spool_count, remaining_weight_g, value) "
+            f"SELECT s.filament_id, s.location_id, {_BUCKET}, COUNT(s.id), "
+            "COALESCE(SUM(s.remaining_weight_g), 0), COALESCE(SUM(s.purchase_price), 0) "
+            "FROM spools s JOIN spool_statuses st ON st.id = s.status_id "
+            "WHERE st.key <> 'archived' "
+            f"GROUP BY s.filament_id, s.location_id, {_BUCKET}"
+        )
+    )
+
+
+def downgrade() -> None:
+    """Drop the inventory aggregate."""
+    op.drop_index("ix_inventory_aggregates_location_id", table_name="inventory_aggregates")
+    op.drop_index("ix_inventory_aggregates_filament_location", table_name="inventory_aggregates")
+    op.drop_table("inventory_aggregates")
@@ -0,0 +1,52 @@
+"""add_spool_weight_checkpoints
+
+Revision ID: c9e1f3a5b7d2
+Revises: b8d4e0f2c3a5
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c9e1f3a5b7d2"
+down_revision: Union[str, Sequence[str], None] = "b8d4e0f2c3a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "spool_weight_checkpoints",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("spool_id", sa.Integer(), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("event_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("remaining_weight_g", sa.Float(), nullable=False),
+        sa.Column("tara_g", sa.Float(), nullable=False),
+        sa.Column("initial_total_weight_g", sa.Float(), nullable=True),
+        sa.Column("empty_spool_weight_g", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["spool_id"], ["spools.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["event_id"], ["spool_events.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_spool_weight_checkpoints_spool_event_at",
+        "spool_weight_checkpoints",
+        ["spool_id", "event_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_spool_weight_checkpoints_spool_event_at",
+        table_name="spool_weight_checkpoints",
+    )
+    op.drop_table("spool_weight_checkpoints")
@@ -0,0 +1,91 @@
+"""add_event_retention
+
+Revision ID: d2a6b8c4e1f7
+Revises: c9e1f3a5b7d2
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a6b8c4e1f7"
+down_revision: Union[str, Sequence[str], None] = "c9e1f3a5b7d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "app_settings",
+        sa.Column("event_rollup_after_days", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "app_settings",
+        sa.Column("event_archive_after_months", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    op.create_table(
+        "spool_events_archive",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("spool_id", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(length=50), nullable=False),
+        sa.Column("event_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("device_id", sa.Integer(), nullable=True),
+        sa.Column("source", sa.String(length=50), nullable=True),
+        sa.Column("delta_weight_g", sa.Float(), nullable=True),
+        sa.Column("measured_weight_g", sa.Float(), nullable=True),
+        sa.Column("from_status_id", sa.Integer(), nullable=True),
+        sa.Column("to_status_id", sa.Integer(), nullable=True),
+        sa.Column("from_location_id", sa.Integer(), nullable=True),
+        sa.Column("to_location_id", sa.Integer(), nullable=True),
+        sa.Column("note", sa.Text(), nullable=True),
+        sa.Column("meta", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_spool_events_archive_spool_id", "spool_events_archive", ["spool_id"])
+    op.create_index("ix_spool_events_archive_event_at", "spool_events_archive", ["event_at"])
+
+    op.create_table(
+        "printer_slot_events_archive",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("printer_id", sa.Integer(), nullable=False),
+        sa.Column("slot_id", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(length=50), nullable=False),
+        sa.Column("event_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("spool_id", sa.Integer(), nullable=True),
+        sa.Column("rfid_uid", sa.String(length=100), nullable=True),
+        sa.Column("external_id", sa.String(length=100), nullable=True),
+        sa.Column("meta", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_printer_slot_events_archive_printer_id", "printer_slot_events_archive", ["printer_id"]
+    )
+    op.create_index(
+        "ix_printer_slot_events_archive_event_at", "printer_slot_events_archive", ["event_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_printer_slot_events_archive_event_at", table_name="printer_slot_events_archive")
+    op.drop_index("ix_printer_slot_events_archive_printer_id", table_name="printer_slot_events_archive")
+    op.drop_table("printer_slot_events_archive")
+    op.drop_index("ix_spool_events_archive_event_at", table_name="spool_events_archive")
+    op.drop_index("ix_spool_events_archive_spool_id", table_name="spool_events_archive")
+    op.drop_table("spool_events_archive")
+    op.drop_column("app_settings", "event_archive_after_months")
+    op.drop_column("app_settings", "event_rollup_after_days")
@@ -0,0 +1,42 @@
+"""add_inventory_snapshots
+
+Revision ID: d6a8b0c2e4f5
+Revises: c5f7a9b1d3e4
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d6a8b0c2e4f5"
+down_revision: Union[str, Sequence[str], None] = "c5f7a9b1d3e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the daily inventory snapshot table."""
+    op.create_table(
+        "inventory_snapshots",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("material_type", sa.String(length=50), nullable=True),
+        sa.Column("manufacturer_id", sa.Integer(), nullable=False),
+        sa.Column("location_id", sa.Integer(), nullable=True),
+        sa.Column("spool_count", sa.Integer(), nullable=False),
+        sa.Column("remaining_weight_g", sa.Float(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_inventory_snapshots_day", "inventory_snapshots", ["day"])
+
+
+def downgrade() -> None:
+    """Drop the daily inventory snapshot table."""
+    op.drop_index("ix_inventory_snapshots_day", table_name="inventory_snapshots")
+    op.drop_table("inventory_snapshots")
@@ -0,0 +1,47 @@
+"""add_consumption_daily
+
+Revision ID: e4b7c9d1f3a8
+Revises: d2a6b8c4e1f7
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b7c9d1f3a8"
+down_revision: Union[str, Sequence[str], None] = "d2a6b8c4e1f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "consumption_daily",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("spool_id", sa.Integer(), nullable=False),
+        sa.Column("filament_id", sa.Integer(), nullable=False),
+        sa.Column("manufacturer_id", sa.Integer(), nullable=False),
+        sa.Column("material_type", sa.String(length=50), nullable=False),
+        sa.Column("location_id", sa.Integer(), nullable=True),
+        sa.Column("printer_id", sa.Integer(), nullable=True),
+        sa.Column("consumed_g", sa.Float(), nullable=False),
+        sa.Column("event_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("day", "spool_id", name="uq_consumption_daily_day_spool"),
+    )
+    op.create_index("ix_consumption_daily_day", "consumption_daily", ["day"])
+    op.create_index("ix_consumption_daily_spool_id", "consumption_daily", ["spool_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_consumption_daily_spool_id", table_name="consumption_daily")
+    op.drop_index("ix_consumption_daily_day", table_name="consumption_daily")
+    op.drop_table("consumption_daily")
@@ -0,0 +1,57 @@
+"""add_consumption_forecasts
+
+Revision ID: f1c3e5a7b9d0
+Revises: e4b7c9d1f3a8
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1c3e5a7b9d0"
+down_revision: Union[str, Sequence[str], None] = "e4b7c9d1f3a8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "spool_forecasts",
+        sa.Column("spool_id", sa.Integer(), nullable=False),
+        sa.Column("decayed_g", sa.Float(), nullable=False),
+        sa.Column("rate_g_per_day", sa.Float(), nullable=False),
+        sa.Column("last_event_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("low_stock", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.ForeignKeyConstraint(["spool_id"], ["spools.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("spool_id"),
+    )
+    op.create_index(
+        "ix_spool_forecasts_rate_g_per_day", "spool_forecasts", ["rate_g_per_day"]
+    )
+    op.create_table(
+        "filament_forecasts",
+        sa.Column("filament_id", sa.Integer(), nullable=False),
+        sa.Column("decayed_g", sa.Float(), nullable=False),
+        sa.Column("rate_g_per_day", sa.Float(), nullable=False),
+        sa.Column("last_event_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("low_stock", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.ForeignKeyConstraint(["filament_id"], ["filaments.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("filament_id"),
+    )
+    op.create_index(
+        "ix_filament_forecasts_rate_g_per_day", "filament_forecasts", ["rate_g_per_day"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_filament_forecasts_rate_g_per_day", table_name="filament_forecasts")
+    op.drop_table("filament_forecasts")
+    op.drop_index("ix_spool_forecasts_rate_g_per_day", table_name="spool_forecasts")
+    op.drop_table("spool_forecasts")
@@ -7,6 +7,7 @@ from sqlalchemy.orm import selectinload
 
 from app.api.deps import DBSession, PrincipalDep, RequirePermission
 from app.api.v1.schemas import PaginatedResponse
+from app.core.device_presence import device_presence
 from app.core.security import generate_token_secret, hash_password_async, hash_token, generate_device_code
 from app.models import Device, Permission, Role, User, UserRole, RolePermission
 
@@ -100,6 +101,15 @@ class DeviceResponse(BaseModel):
         from_attributes = True
 
 
+def _device_response(device: Device) -> DeviceResponse:
+    """DeviceResponse with presence taken from the heartbeat registry."""
+    response = DeviceResponse.model_validate(device)
+    response.last_seen_at = device_presence.last_seen(device)
+    response.ip_address = device_presence.ip_address(device)
+    response.is_online = device_presence.is_online(device)
+    return response
+
+
 class DeviceCreate(BaseModel):
     name: str
     device_type: str = "scale"
@@ -496,7 +506,9 @@ async def list_devices(
     count_result = await db.execute(count_query)
     total = count_result.scalar() or 0
 
-    return PaginatedResponse(items=items, page=page, page_size=page_size, total=total)
+    return PaginatedResponse(
+        items=[_device_response(d) for d in items], page=page, page_size=page_size, total=total
+    )
 
 
 @router.post("/devices", response_model=dict, status_code=status.HTTP_201_CREATED)
@@ -554,6 +566,7 @@ async def delete_device(
         )
 
     device.deleted_at = datetime.now(timezone.utc)
+    device_presence.forget(device.id)
     await db.commit()
 
 
@@ -581,7 +594,7 @@ async def update_device(
 
     await db.commit()
     await db.refresh(device)
-    return device
+    return _device_response(device)
 
 @router.post("/devices/{device_id}/rotate", response_model=dict)
 async def rotate_device_token(
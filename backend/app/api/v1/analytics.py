@@ -0,0 +1,173 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, status
+from pydantic import BaseModel
+
+from app.api.deps import DBSession, RequirePermission
+from app.services.consumption_analytics_service import ConsumptionAnalyticsService
+from app.services.forecast_service import ForecastService
+from app.services.inventory_snapshot_service import InventorySnapshotService
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# Upper bound for a single query, keeps responses small even with bucket=day
+MAX_RANGE_DAYS = 3660
+
+
+class ConsumptionPoint(BaseModel):
+    period: date
+    key: int | str | None
+    label: str | None
+    consumed_g: float
+    event_count: int
+
+
+class ConsumptionSeriesResponse(BaseModel):
+    start: date
+    end: date
+    bucket: str
+    group_by: str | None
+    total_consumed_g: float
+    items: list[ConsumptionPoint]
+
+
+class InventoryPoint(BaseModel):
+    period: date
+    day: date
+    key: int | str | None
+    label: str | None
+    spool_count: int
+    remaining_weight_g: float
+    value: float
+
+
+class InventorySeriesResponse(BaseModel):
+    start: date
+    end: date
+    bucket: str
+    group_by: str | None
+    items: list[InventoryPoint]
+
+
+class ForecastFields(BaseModel):
+    manufacturer_name: str
+    filament_designation: str
+    rate_g_per_day: float
+    days_until_empty: float
+    empty_on: date
+    reorder_by: date
+
+
+class SpoolForecastResponse(ForecastFields):
+    spool_id: int
+    filament_id: int
+    remaining_weight_g: float
+
+
+class FilamentForecastResponse(ForecastFields):
+    filament_id: int
+    stock_g: float
+    spool_count: int
+
+
+def _date_range(start: date | None, end: date | None, default_days: int) -> tuple[date, date]:
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=default_days - 1)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "invalid_range", "message": "start must not be after end"},
+        )
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "invalid_range", "message": "Range is too large"},
+        )
+    return start, end
+
+
+@router.get("/consumption", response_model=ConsumptionSeriesResponse)
+async def get_consumption(
+    db: DBSession,
+    principal=RequirePermission("spool_events:read"),
+    start: date | None = Query(None, description="First day (UTC), default: 30 days ago"),
+    end: date | None = Query(None, description="Last day (UTC), default: today"),
+    bucket: Literal["day", "week", "month"] = Query("day"),
+    group_by: Literal[
+        "spool", "filament", "material_type", "manufacturer", "printer", "location"
+    ]
+    | None = Query(None),
+):
+    start, end = _date_range(start, end, default_days=30)
+
+    items = await ConsumptionAnalyticsService(db).query(
+        start, end, group_by=group_by, bucket=bucket
+    )
+    return ConsumptionSeriesResponse(
+        start=start,
+        end=end,
+        bucket=bucket,
+        group_by=group_by,
+        total_consumed_g=round(sum(item["consumed_g"] for item in items), 3),
+        items=items,
+    )
+
+
+@router.post("/consumption/backfill", status_code=status.HTTP_200_OK)
+async def backfill_consumption(
+    db: DBSession,
+    principal=RequirePermission("spools:adjust_weight"),
+):
+    stats = await ConsumptionAnalyticsService(db).backfill()
+    return {"success": True, **stats}
+
+
+@router.get("/inventory", response_model=InventorySeriesResponse)
+async def get_inventory_history(
+    db: DBSession,
+    principal=RequirePermission("spools:read"),
+    start: date | None = Query(None, description="First day (UTC), default: 180 days ago"),
+    end: date | None = Query(None, description="Last day (UTC), default: today"),
+    bucket: Literal["day", "week", "month"] = Query("week"),
+    group_by: Literal["material_type", "manufacturer", "location"] | None = Query(None),
+):
+    # Served from the daily snapshots (app/services/inventory_snapshot_service.py)
+    start, end = _date_range(start, end, default_days=180)
+    items = await InventorySnapshotService(db).query(
+        start, end, group_by=group_by, bucket=bucket
+    )
+    return InventorySeriesResponse(
+        start=start, end=end, bucket=bucket, group_by=group_by, items=items
+    )
+
+
+@router.get("/forecasts/spools", response_model=list[SpoolForecastResponse])
+async def get_spool_forecasts(
+    db: DBSession,
+    principal=RequirePermission("spools:read"),
+    limit: int = Query(50, ge=1, le=500),
+    within_days: float | None = Query(None, ge=0),
+):
+    return await ForecastService(db).spool_forecasts(limit=limit, within_days=within_days)
+
+
+@router.get("/forecasts/filaments", response_model=list[FilamentForecastResponse])
+async def get_filament_forecasts(
+    db: DBSession,
+    principal=RequirePermission("filaments:read"),
+    limit: int = Query(50, ge=1, le=500),
+    within_days: float | None = Query(None, ge=0),
+):
+    return await ForecastService(db).filament_forecasts(
+        limit=limit, within_days=within_days
+    )
+
+
+@router.post("/forecasts/rebuild", status_code=status.HTTP_200_OK)
+async def rebuild_forecasts(
+    db: DBSession,
+    principal=RequirePermission("spools:adjust_weight"),
+):
+    stats = await ForecastService(db).rebuild()
+    return {"success": True, **stats}
@@ -1,7 +1,7 @@
 from typing import Literal
 
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy import select
 
 from app.api.deps import DBSession, RequirePermission
@@ -16,6 +16,11 @@ class AppSettingsResponse(BaseModel):
     currency: str
 
 
+class AdminAppSettingsResponse(AppSettingsResponse):
+    event_rollup_after_days: int = 0
+    event_archive_after_months: int = 0
+
+
 class AppSettingsUpdate(BaseModel):
     login_disabled: bool | None = None
     currency: (
@@ -35,9 +40,20 @@ class AppSettingsUpdate(BaseModel):
         ]
         | None
     ) = None
+    event_rollup_after_days: int | None = Field(default=None, ge=0, le=3650)
+    event_archive_after_months: int | None = Field(default=None, ge=0, le=1200)
 
 
-@router.get("/", response_model=AppSettingsResponse)
+def _admin_response(settings_row: AppSettings) -> AdminAppSettingsResponse:
+    return AdminAppSettingsResponse(
+        login_disabled=settings_row.login_disabled,
+        currency=settings_row.currency,
+        event_rollup_after_days=settings_row.event_rollup_after_days,
+        event_archive_after_months=settings_row.event_archive_after_months,
+    )
+
+
+@router.get("/", response_model=AdminAppSettingsResponse)
 async def get_app_settings(
     db: DBSession,
     principal=RequirePermission("admin:users_manage"),
@@ -45,14 +61,12 @@ async def get_app_settings(
     result = await db.execute(select(AppSettings).where(AppSettings.id == 1))
     settings_row = result.scalar_one_or_none()
     if settings_row is None:
-        return AppSettingsResponse(login_disabled=False, currency="EUR")
+        return AdminAppSettingsResponse(login_disabled=False, currency="EUR")
 
-    return AppSettingsResponse(
-        login_disabled=settings_row.login_disabled, currency=settings_row.currency
-    )
+    return _admin_response(settings_row)
 
 
-@router.put("/", response_model=AppSettingsResponse)
+@router.put("/", response_model=AdminAppSettingsResponse)
 async def update_app_settings(
     data: AppSettingsUpdate,
     db: DBSession,
@@ -74,9 +88,7 @@ async def update_app_settings(
 
     response_cache.delete("app_settings_public")
 
-    return AppSettingsResponse(
-        login_disabled=settings_row.login_disabled, currency=settings_row.currency
-    )
+    return _admin_response(settings_row)
 
 
 public_router = APIRouter(prefix="/app-settings", tags=["app-settings"])
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Query
-from sqlalchemy import func, select, case
 from pydantic import BaseModel
 
-from app.api.deps import DBSession, PrincipalDep
-from app.models import Filament, Location, Manufacturer, Spool, SpoolStatus
+from app.api.deps import PrincipalDep
+from app.core import database
+from app.services.dashboard_stats import dashboard_stats, run_dashboard_queries
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
@@ -59,213 +59,11 @@ class DashboardStatsResponse(BaseModel):
     filament_types: list[FilamentTypeCount]
 
 
-@router.get("/stats", response_model=DashboardStatsResponse)
-async def get_dashboard_stats(
-    db: DBSession,
-    principal: PrincipalDep,
-    limit: int = Query(20, ge=1, le=50),
-):
-    # Spulen-Verteilung berechnen (Optimiert: DB-seitige Aggregation)
-    spool_distribution_stmt = (
-        select(
-            func.sum(case((Spool.remaining_weight_g <= 0, 1), else_=0)).label("empty"),
-            func.sum(
-                case(
-                    (
-                        (Spool.remaining_weight_g > 0)
-                        & (Spool.remaining_weight_g > Spool.low_weight_threshold_g)
-                        & (Spool.initial_total_weight_g > 0)
-                        & (
-                            (Spool.remaining_weight_g / Spool.initial_total_weight_g)
-                            * 100
-                            > 75
-                        ),
-                        1,
-                    ),
-                    else_=0,
-                )
-            ).label("full"),
-            func.sum(
-                case(
-                    (
-                        (Spool.remaining_weight_g > 0)
-                        & (Spool.remaining_weight_g > Spool.low_weight_threshold_g)
-                        & (
-                            (Spool.initial_total_weight_g.is_(None))
-                            | (Spool.initial_total_weight_g <= 0)
-                            | (
-                                (
-                                    Spool.remaining_weight_g
-                                    / Spool.initial_total_weight_g
-                                )
-                                * 100
-                                <= 75
-                            )
-                        ),
-                        1,
-                    ),
-                    else_=0,
-                )
-            ).label("normal"),
-            func.sum(
-                case(
-                    (
-                        (Spool.remaining_weight_g > 0)
-                        & (Spool.remaining_weight_g <= Spool.low_weight_threshold_g)
-                        & (Spool.remaining_weight_g > Spool.low_weight_threshold_g / 2),
-                        1,
-                    ),
-                    else_=0,
-                )
-            ).label("low"),
-            func.sum(
-                case(
-                    (
-                        (Spool.remaining_weight_g > 0)
-                        & (
-                            Spool.remaining_weight_g <= Spool.low_weight_threshold_g / 2
-                        ),
-                        1,
-                    ),
-                    else_=0,
-                )
-            ).label("critical"),
-        )
-        .join(SpoolStatus)
-        .where(SpoolStatus.key != "archived")
-        .where(Spool.remaining_weight_g.isnot(None))
-    )
-
-    # Filament-Statistik nach Typ
-    filament_stats_stmt = (
-        select(
-            Filament.material_type,
-            func.count(Spool.id).label("spool_count"),
-            func.coalesce(func.sum(Spool.remaining_weight_g), 0).label("total_weight"),
-        )
-        .join(Spool, Spool.filament_id == Filament.id)
-        .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
-        .where(SpoolStatus.key != "archived")
-        .where(Spool.remaining_weight_g.isnot(None))
-        .where(Spool.remaining_weight_g > 0)
-        .where(Filament.material_type.isnot(None))
-        .where(Filament.material_type != "")
-        .group_by(Filament.material_type)
-        .order_by(func.sum(Spool.remaining_weight_g).desc())
-    )
-
-    # Hersteller mit nicht-leeren Spulen (remaining_weight_g > 0)
-    non_empty_stmt = (
-        select(
-            Manufacturer.id,
-            Manufacturer.name,
-            func.count(Spool.id).label("spool_count"),
-        )
-        .join(Filament, Filament.manufacturer_id == Manufacturer.id)
-        .join(Spool, Spool.filament_id == Filament.id)
-        .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
-        .where(SpoolStatus.key != "archived")
-        .where(Spool.remaining_weight_g.isnot(None))
-        .where(Spool.remaining_weight_g > 0)
-        .group_by(Manufacturer.id, Manufacturer.name)
-        .order_by(func.count(Spool.id).desc())
-        .limit(limit)
-    )
-
-    # Spulen mit fast-leeren Restgewicht
-    low_stock_stmt = (
-        select(
-            Spool.id.label("spool_id"),
-            Filament.designation.label("filament_designation"),
-            Filament.material_type.label("filament_type"),
-            Manufacturer.name.label("manufacturer_name"),
-            Spool.remaining_weight_g,
-            Spool.low_weight_threshold_g,
-        )
-        .join(Filament, Spool.filament_id == Filament.id)
-        .join(Manufacturer, Filament.manufacturer_id == Manufacturer.id)
-        .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
-        .where(SpoolStatus.key != "archived")
-        .where(Spool.remaining_weight_g.isnot(None))
-        .where(Spool.remaining_weight_g > 0)
-        .where(Spool.remaining_weight_g <= Spool.low_weight_threshold_g)
-        .order_by(Spool.remaining_weight_g.asc())
-        .limit(limit)
-    )
-
-    # Leere Spulen (remaining_weight_g <= 0)
-    empty_stmt = (
-        select(
-            Spool.id.label("spool_id"),
-            Filament.designation.label("filament_designation"),
-            Filament.material_type.label("filament_type"),
-            Manufacturer.name.label("manufacturer_name"),
-        )
-        .join(Filament, Spool.filament_id == Filament.id)
-        .join(Manufacturer, Filament.manufacturer_id == Manufacturer.id)
-        .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
-        .where(SpoolStatus.key != "archived")
-        .where(Spool.remaining_weight_g.isnot(None))
-        .where(Spool.remaining_weight_g <= 0)
-        .order_by(Spool.remaining_weight_g.asc())
-        .limit(limit)
-    )
-
-    # Filament-Typen mit Anzahl
-    types_stmt = (
-        select(Filament.material_type, func.count(Filament.id).label("filament_count"))
-        .join(Spool, Spool.filament_id == Filament.id)
-        .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
-        .where(SpoolStatus.key != "archived")
-        .where(Filament.material_type.isnot(None))
-        .where(Filament.material_type != "")
-        .group_by(Filament.material_type)
-        .order_by(func.count(Filament.id).desc())
-    )
-
-    # Lagerorte-Statistik
-    location_stats_stmt = (
-        select(
-            Location.id.label("location_id"),
-            Location.name.label("location_name"),
-            func.count(Spool.id).label("spool_count"),
-            func.coalesce(func.sum(Spool.remaining_weight_g), 0).label("total_weight"),
-        )
-        .outerjoin(
-            Spool,
-            (Spool.location_id == Location.id)
-            & (
-                Spool.status_id
-                != select(SpoolStatus.id)
-                .where(SpoolStatus.key == "archived")
-                .scalar_subquery()
-            ),
-        )
-        .where(Location.name.isnot(None))
-        .group_by(Location.id, Location.name)
-        .order_by(func.count(Spool.id).desc())
-    )
+def _build_stats(rows: dict[str, list]) -> DashboardStatsResponse:
+    total_value_rows = rows["total_value"]
+    total_value_available = float((total_value_rows[0][0] if total_value_rows else 0) or 0.0)
 
-    # Gesamtwert verfügbarer Spulen
-    total_value_stmt = (
-        select(func.coalesce(func.sum(Spool.purchase_price), 0))
-        .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
-        .where(SpoolStatus.key != "archived")
-    )
-
-    # Execute all queries sequentially (async sessions do not support concurrent operations)
-    dist_res = await db.execute(spool_distribution_stmt)
-    fil_stats_res = await db.execute(filament_stats_stmt)
-    mfg_res = await db.execute(non_empty_stmt)
-    low_stock_res = await db.execute(low_stock_stmt)
-    empty_res = await db.execute(empty_stmt)
-    types_res = await db.execute(types_stmt)
-    loc_res = await db.execute(location_stats_stmt)
-    total_val_res = await db.execute(total_value_stmt)
-
-    total_value_available = float(total_val_res.scalar() or 0.0)
-
-    dist_row = dist_res.first()
+    dist_row = rows["spool_distribution"][0] if rows["spool_distribution"] else None
     spool_distribution = {
         "empty": int(dist_row[0] or 0) if dist_row else 0,
         "full": int(dist_row[1] or 0) if dist_row else 0,
@@ -280,12 +78,12 @@ async def get_dashboard_stats(
             spool_count=row[1],
             total_weight_g=float(row[2]),
         )
-        for row in fil_stats_res.all()
+        for row in rows["filament_stats"]
     ]
 
     manufacturers_with_spools = [
         ManufacturerSpoolCount(id=row[0], name=row[1], spool_count=row[2])
-        for row in mfg_res.all()
+        for row in rows["manufacturers"]
     ]
 
     low_stock_spools = [
@@ -297,7 +95,7 @@ async def get_dashboard_stats(
             remaining_weight_g=float(row[4]),
             low_weight_threshold_g=int(row[5]),
         )
-        for row in low_stock_res.all()
+        for row in rows["low_stock"]
     ]
 
     empty_spools = [
@@ -307,11 +105,11 @@ async def get_dashboard_stats(
             filament_type=row[2],
             manufacturer_name=row[3],
         )
-        for row in empty_res.all()
+        for row in rows["empty_spools"]
     ]
 
     filament_types = [
-        FilamentTypeCount(material_type=row[0], count=row[1]) for row in types_res.all()
+        FilamentTypeCount(material_type=row[0], count=row[1]) for row in rows["filament_types"]
     ]
 
     location_stats = [
@@ -321,7 +119,7 @@ async def get_dashboard_stats(
             spool_count=int(row[2] or 0),
             total_weight_g=float(row[3]),
         )
-        for row in loc_res.all()
+        for row in rows["location_stats"]
     ]
 
     return DashboardStatsResponse(
@@ -334,3 +132,22 @@ async def get_dashboard_stats(
         empty_spools=empty_spools,
         filament_types=filament_types,
     )
+
+
+async def _compute_stats(limit: int) -> DashboardStatsResponse:
+    # Own pooled sessions, independent of the request that triggered it
+    rows = await run_dashboard_queries(lambda: database.async_session_maker(), limit)
+    return _build_stats(rows)
+
+
+dashboard_stats.register(_compute_stats)
+
+
+@router.get("/stats", response_model=DashboardStatsResponse)
+async def get_dashboard_stats(
+    principal: PrincipalDep,
+    limit: int = Query(20, ge=1, le=50),
+):
+    # Cached per limit, recomputed after spool/filament/location changes
+    # (app/services/dashboard_stats.py)
+    return await dashboard_stats.get(limit)
@@ -1,21 +1,27 @@
 import logging
+import asyncio
 
-import httpx
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Header, status
-from sqlalchemy import select
+from sqlalchemy import or_, select
 
 from app.api.deps import DBSession
 
 logger = logging.getLogger(__name__)
 from app.api.v1.schemas_device import HeartbeatRequest, LocateRequest, LocateResponse, WeighRequest, WeighResponse, WriteTagRequest, WriteTagResponse, RfidResultRequest, RfidResultResponse, WriteStatusResponse
+from app.core.device_commands import DeviceCommand, DispatchQueueFull, device_commands
+from app.core.device_presence import ONLINE_WINDOW, device_presence
 from app.core.security import Principal, generate_token_secret, hash_token
 from app.models import Device, Location, Spool, SpoolStatus
+from app.models.spool import normalize_rfid_uid
 from app.services.spool_service import SpoolService
 
 router = APIRouter(prefix="/devices", tags=["devices"])
 
+# Granularity of Device.last_used_at
+DEVICE_LAST_USED_RESOLUTION = timedelta(seconds=60)
+
 
 async def get_current_device(
     db: DBSession,
@@ -50,9 +56,12 @@ async def get_current_device(
             detail={"code": "unauthenticated", "message": "Device not found or inactive"},
         )
     
-    # Update last_used_at
-    device.last_used_at = datetime.now(timezone.utc)
-    await db.commit()
+    # Update last_used_at (at most once per resolution interval, so frequent
+    # device calls such as weighings do not each pay for an extra commit)
+    now = datetime.now(timezone.utc)
+    if device.last_used_at is None or now - device.last_used_at >= DEVICE_LAST_USED_RESOLUTION:
+        device.last_used_at = now
+        await db.commit()
     
     return device
 
@@ -94,9 +103,8 @@ async def device_heartbeat(
     db: DBSession,
     device: Device = Depends(get_current_device),
 ):
-    device.ip_address = data.ip_address
-    device.last_seen_at = datetime.now(timezone.utc)
-    await db.commit()
+    # Collected in memory and flushed in batches (see app/core/device_presence.py)
+    device_presence.touch(device.id, data.ip_address)
     return {"status": "ok"}
 
 
@@ -104,27 +112,26 @@ async def device_heartbeat(
 async def list_active_devices(
     db: DBSession,
 ):
-    # Find active devices (last seen < 3 min)
+    # Devices seen within the online window, either according to the
+    # stored last_seen_at or to heartbeats not yet flushed by this worker
     now = datetime.now(timezone.utc)
-    # We filter in Python because of the 3 min logic, or we can do it in SQL
-    # select * from devices where last_seen_at > now - 3min
-    from datetime import timedelta
-    threshold = now - timedelta(minutes=3)
-    
+    threshold = now - ONLINE_WINDOW
+    seen_here = device_presence.recently_seen_ids(now)
+
     result = await db.execute(
         select(Device).where(
-            Device.last_seen_at >= threshold,
+            or_(Device.last_seen_at >= threshold, Device.id.in_(seen_here)),
             Device.deleted_at.is_(None),
             Device.is_active.is_(True)
         )
     )
-    devices = result.scalars().all()
+    devices = [d for d in result.scalars().all() if device_presence.is_online(d, now)]
     
     return [
         {
             "id": d.id,
             "name": d.name,
-            "ip_address": d.ip_address,
+            "ip_address": device_presence.ip_address(d),
         }
         for d in devices
     ]
@@ -139,15 +146,16 @@ async def write_rfid_tag(
     # Find Device
     result = await db.execute(select(Device).where(Device.id == device_id))
     device = result.scalar_one_or_none()
+    ip_address = device_presence.ip_address(device) if device else None
     
-    if not device or not device.is_active or device.deleted_at or not device.ip_address:
+    if not device or not device.is_active or device.deleted_at or not ip_address:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={"code": "not_found", "message": "Device not found, inactive or has no IP address"},
         )
 
     # Prepare request to device
-    device_url = f"http://{device.ip_address}/api/v1/rfid/write"
+    device_url = f"http://{ip_address}/api/v1/rfid/write"
     payload = {}
     if data.spool_id:
         payload["spool_id"] = data.spool_id
@@ -163,39 +171,16 @@ async def write_rfid_tag(
     logger.info(f"Triggering RFID write on device {device_id} at {device_url}")
     logger.debug(f"Payload: {payload}")
 
-    # Initialize status in custom_fields
-    if device.custom_fields is None:
-        device.custom_fields = {}
-    
-    # We use a copy to ensure SQLAlchemy detects the change in the dict
-    new_custom_fields = dict(device.custom_fields)
-    new_custom_fields["last_write_result"] = {
-        "status": "pending",
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }
-    device.custom_fields = new_custom_fields
-    await db.commit()
-
-    # Fire & Forget: Send request to device but don't wait for RFID result
-    # The device will send the result back via /rfid-result endpoint
+    # Fire & Forget: the dispatcher sends the request to the device, which
+    # sends the result back via /rfid-result (pushed to the UI over SSE)
     try:
-        headers = {
-            "User-Agent": "FilaMan-Backend/1.0",
-            "Accept": "application/json",
-        }
-        
-        async with httpx.AsyncClient(
-            timeout=5.0,  # Short timeout just to trigger the device
-            http2=False,
-            headers=headers,
-            follow_redirects=True,
-        ) as client:
-            # Fire and forget - we don't wait for the RFID result
-            await client.post(device_url, json=payload)
-            
-    except Exception as e:
-        # Log but don't fail - the device might still process the request
-        logger.warning(f"Could not reach device {device_id} for trigger: {e}")
+        device_commands.submit(DeviceCommand(device_id=device.id, url=device_url, payload=payload))
+    except DispatchQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"code": "device_queue_full", "message": "Too many device commands pending, try again"},
+        )
+    await device_commands.report_write_status(device.id, {"status": "pending"})
 
     # Return immediately - device will send result via /rfid-result
     return WriteTagResponse(
@@ -211,21 +196,21 @@ async def get_write_status(
 ):
     """
     Fragt den Status des letzten Schreibvorgangs für ein Gerät ab.
+
+    Fallback für Clients ohne SSE; der Status kommt aus dem Speicher
+    (device_write_status-Events), die DB wird nur für unbekannte Geräte gelesen.
     """
-    result = await db.execute(select(Device).where(Device.id == device_id))
-    device = result.scalar_one_or_none()
-    
-    if not device:
+    last_result = device_commands.write_status.get(device_id)
+    if last_result:
+        return WriteStatusResponse(**last_result)
+
+    result = await db.execute(select(Device.id).where(Device.id == device_id))
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={"code": "not_found", "message": "Device not found"},
         )
-        
-    last_result = (device.custom_fields or {}).get("last_write_result")
-    if not last_result:
-        return WriteStatusResponse(status="none")
-        
-    return WriteStatusResponse(**last_result)
+    return WriteStatusResponse(status="none")
 
 
 @router.post("/rfid-result", response_model=RfidResultResponse)
@@ -250,32 +235,25 @@ async def device_rfid_result(
     
     if not data.success:
         logger.warning(f"RFID write failed on device {device.id}: {data.error_message}")
-        if device.custom_fields is None: device.custom_fields = {}
-        new_cf = dict(device.custom_fields)
-        new_cf["last_write_result"] = write_result
-        device.custom_fields = new_cf
-        await db.commit()
+        await device_commands.report_write_status(device.id, write_result)
         return RfidResultResponse(status="ok", message="Failure noted")
     
     if not data.tag_uuid:
         logger.warning(f"RFID result missing tag_uuid from device {device.id}")
         write_result["status"] = "error"
         write_result["error_message"] = "No tag_uuid provided"
-        if device.custom_fields is None: device.custom_fields = {}
-        new_cf = dict(device.custom_fields)
-        new_cf["last_write_result"] = write_result
-        device.custom_fields = new_cf
-        await db.commit()
+        await device_commands.report_write_status(device.id, write_result)
         return RfidResultResponse(status="error", message="No tag_uuid provided")
 
     # Duplicate check and cleanup - clear rfid_uid from ALL spools (incl. archived)
     # to prevent UNIQUE constraint violation on spools.rfid_uid
     removed_info = []
     
-    # Check spools - all spools regardless of status
+    # Check spools - all spools regardless of status (UIDs are stored lowercase)
+    spool_uid = normalize_rfid_uid(data.tag_uuid)
     spool_query = (
         select(Spool)
-        .where(Spool.rfid_uid == data.tag_uuid)
+        .where(Spool.rfid_uid == spool_uid)
     )
     if data.spool_id:
         spool_query = spool_query.where(Spool.id != data.spool_id)
@@ -316,7 +294,7 @@ async def device_rfid_result(
             write_result["error_message"] = "Target spool not found"
     elif data.tag_uuid:
         # No spool_id provided, try to find spool by tag_uuid
-        spool_res = await db.execute(select(Spool).where(Spool.rfid_uid == data.tag_uuid))
+        spool_res = await db.execute(select(Spool).where(Spool.rfid_uid == spool_uid))
         target_spool = spool_res.scalar_one_or_none()
         if target_spool:
             logger.info(f"Found spool {target_spool.id} by tag_uuid {data.tag_uuid}")
@@ -345,7 +323,7 @@ async def device_rfid_result(
         elif data.tag_uuid:
             # Try to find spool by tag_uuid (might have been assigned above or already existed)
             spool_res = await db.execute(
-                select(Spool).where(Spool.rfid_uid == data.tag_uuid)
+                select(Spool).where(Spool.rfid_uid == spool_uid)
             )
             spool_to_update = spool_res.scalar_one_or_none()
         
@@ -361,13 +339,9 @@ async def device_rfid_result(
         else:
             logger.warning(f"Could not find spool to update weight for tag_uuid {data.tag_uuid}, spool_id {data.spool_id}")
 
-    # Save result to device status
-    if device.custom_fields is None: device.custom_fields = {}
-    new_cf = dict(device.custom_fields)
-    new_cf["last_write_result"] = write_result
-    device.custom_fields = new_cf
-    
     await db.commit()
+    # Push the result to the UI (SSE) once the changes are committed
+    await device_commands.report_write_status(device.id, write_result)
     return RfidResultResponse(status="ok", message="Processed successfully")
 
 
@@ -378,103 +352,92 @@ async def weigh_spool(
     device: Device = Depends(get_current_device),
 ):
     service = SpoolService(db)
-    
-    # Find Spool: UUID has priority over ID (backward compatible)
-    spool = None
-    
-    if data.tag_uuid:
-        # Normalize UUID to lowercase for case-insensitive comparison
-        normalized_uuid = data.tag_uuid.lower()
-        logger.info(f"Searching for spool with tag_uuid: '{data.tag_uuid}' (normalized: '{normalized_uuid}')")
-        spool = await service.get_spool_by_identifier(rfid_uid=normalized_uuid, external_id=None)
-        logger.info(f"Found spool: {spool.id if spool else 'NONE'}")
-    
-    if not spool and data.spool_id:
-        spool = await service.get_spool(data.spool_id)
-        
-    if not spool:
+
+    # Spool, tara, status and color in one query; UUID has priority over ID
+    target = await service.get_weigh_target(data.tag_uuid, data.spool_id)
+    if target is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={"code": "not_found", "message": "Spool not found"},
         )
+    logger.debug(f"Weighing spool {target.spool_id} (tag_uuid: '{data.tag_uuid}')")
 
-    # Cache filament data BEFORE record_measurement() commits the session
-    # (after commit, lazy-loaded relationships are expired in async SQLAlchemy)
-    filament = spool.filament
-    filament_material_type = filament.material_type if filament else "PLA"
-    filament_designation = filament.designation if filament else None
-    base_color = "FFFFFF"
-    if filament:
-        # Direct query to avoid async lazy-load issues with filament.colors relationship
-        from app.models.filament import FilamentColor, Color
-        fc_result = await db.execute(
-            select(Color.hex_code)
-            .join(FilamentColor, FilamentColor.color_id == Color.id)
-            .where(FilamentColor.filament_id == filament.id)
-            .order_by(FilamentColor.position)
-            .limit(1)
-        )
-        hex_code = fc_result.scalar_one_or_none()
-        if hex_code:
-            base_color = hex_code.replace("#", "")[:6]
-    # Record Measurement
     principal = Principal(auth_type="device", device_id=device.id, scopes=device.scopes)
-    
-    event, remaining = await service.record_measurement(
-        spool=spool,
+    event, remaining = await service.record_weighing(
+        target,
         measured_weight_g=data.measured_weight_g,
         event_at=datetime.now(timezone.utc),
         principal=principal,
         source="device",
         note=f"Recorded by device {device.name}",
     )
+
     # Auto-assign: if device has auto_assign_enabled, notify all running drivers
-    logger.debug(f"Auto-assign check: device={device.name} (id={device.id}), auto_assign_enabled={device.auto_assign_enabled}")
     if device.auto_assign_enabled:
-        try:
-            from app.plugins.manager import plugin_manager
-            logger.debug(f"Auto-assign: plugin_manager has {len(plugin_manager.drivers)} active drivers: {list(plugin_manager.drivers.keys())}")
-
-            base_filament_data = {
+        base_color = (target.color_hex or "").replace("#", "")[:6] or "FFFFFF"
+        await _auto_assign_pending_spool(
+            spool_id=target.spool_id,
+            base_filament_data={
                 "tray_info_idx": "GFL99",
                 "nozzle_temp_min": 190,
                 "nozzle_temp_max": 230,
-                "material_type": filament_material_type,
+                "material_type": target.material_type or "PLA",
                 "color": base_color,
-            }
-
-            timeout = device.auto_assign_timeout or 60
-
-            for printer_id, driver in plugin_manager.drivers.items():
-                if not hasattr(driver, "assign_pending_spool"):
-                    continue
-                try:
-                    # Enrich filament data with printer-specific params
-                    enriched_data = await plugin_manager.enrich_filament_data(
-                        spool_id=spool.id,
-                        printer_id=printer_id,
-                        filament_data={**base_filament_data},
-                    )
-                    await driver.assign_pending_spool(
-                        spool_id=spool.id,
-                        filament_data=enriched_data,
-                        timeout_seconds=timeout,
-                    )
-                    logger.info(f"Auto-assign: pending spool {spool.id} on printer {printer_id} (timeout: {timeout}s)")
-                except Exception as e:
-                    logger.error(f"Auto-assign failed for printer {printer_id}: {e}")
-        except Exception as e:
-            logger.error(f"Auto-assign error: {e}")
+            },
+            timeout=device.auto_assign_timeout or 60,
+        )
     else:
         logger.debug(f"Auto-assign SKIPPED: device '{device.name}' (id={device.id}) has auto_assign_enabled=False")
 
     return WeighResponse(
         remaining_weight_g=remaining if remaining is not None else 0.0,
-        spool_id=spool.id,
-        filament_name=filament_designation
+        spool_id=target.spool_id,
+        filament_name=target.filament_designation
     )
 
 
+async def _auto_assign_pending_spool(
+    spool_id: int, base_filament_data: dict, timeout: int
+) -> None:
+    """Offer the weighed spool to every running driver, concurrently."""
+    try:
+        from app.plugins.manager import plugin_manager
+    except Exception as e:
+        logger.error(f"Auto-assign error: {e}")
+        return
+
+    async def assign(printer_id, driver) -> None:
+        try:
+            # Enrich filament data with printer-specific params
+            enriched_data = await plugin_manager.enrich_filament_data(
+                spool_id=spool_id,
+                printer_id=printer_id,
+                filament_data={**base_filament_data},
+            )
+            await driver.assign_pending_spool(
+                spool_id=spool_id,
+                filament_data=enriched_data,
+                timeout_seconds=timeout,
+            )
+            logger.info(f"Auto-assign: pending spool {spool_id} on printer {printer_id} (timeout: {timeout}s)")
+        except Exception as e:
+            logger.error(f"Auto-assign failed for printer {printer_id}: {e}")
+
+    targets = [
+        (printer_id, driver)
+        for printer_id, driver in list(plugin_manager.drivers.items())
+        if hasattr(driver, "assign_pending_spool")
+    ]
+    try:
+        # One batch for all printers instead of one lookup per driver
+        await plugin_manager.prefetch_filament_params(
+            spool_id, [printer_id for printer_id, _ in targets]
+        )
+    except Exception as e:
+        logger.warning(f"Auto-assign: prefetching printer params failed: {e}")
+    await asyncio.gather(*(assign(printer_id, driver) for printer_id, driver in targets))
+
+
 @router.post("/scale/locate", response_model=LocateResponse)
 async def locate_spool(
     data: LocateRequest,
@@ -18,6 +18,7 @@ from app.api.deps import DBSession, PrincipalDep
 from app.core.config import settings, MANUFACTURER_LOGO_DIR
 from app.models import Color, FilamentColor, Manufacturer
 from app.models.plugin import InstalledPlugin
+from app.services.logo_assets import store_logo
 
 logger = logging.getLogger(__name__)
 
@@ -285,9 +286,7 @@ async def prepare_filament(
                     )
                     resp = await client.get(logo_url)
                     resp.raise_for_status()
-                logo_path = MANUFACTURER_LOGO_DIR / f"{manufacturer.id}.png"
-                logo_path.write_bytes(resp.content)
-                manufacturer.logo_file = f"{manufacturer.id}.png"
+                manufacturer.logo_file = store_logo(manufacturer.id, "web", resp.content)
                 logger.info(
                     "Downloaded logo for auto-created manufacturer '%s' (id=%s, slug=%s)",
                     manufacturer.name,
@@ -309,9 +308,9 @@ async def prepare_filament(
                         label_url = f"{base_url}/uploads/logos/label/{data.manufacturer_slug}.png"
                         label_resp = await client.get(label_url)
                         label_resp.raise_for_status()
-                    label_path = MANUFACTURER_LOGO_DIR / f"{manufacturer.id}_label.png"
-                    label_path.write_bytes(label_resp.content)
-                    manufacturer.label_logo_file = f"{manufacturer.id}_label.png"
+                    manufacturer.label_logo_file = store_logo(
+                        manufacturer.id, "label", label_resp.content
+                    )
                     logger.info(
                         "Downloaded label logo for auto-created manufacturer '%s' (id=%s, slug=%s)",
                         manufacturer.name,
@@ -2,7 +2,7 @@ import logging
 from typing import Any
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from sqlalchemy import delete, func, or_, select, literal_column
@@ -11,15 +11,17 @@ from sqlalchemy.orm import selectinload
 
 from app.api.deps import DBSession, PrincipalDep, RequirePermission
 from app.core.cache import response_cache
-from app.core.db_utils import get_next_available_id
+from app.core.db_utils import add_with_next_ids
 from app.api.v1.schemas import PaginatedResponse
 from app.api.v1.schemas_filament import (
     BulkFilamentDeleteRequest,
     BulkFilamentUpdateRequest,
     ColorCreate,
+    ColorMatchResponse,
     ColorResponse,
     ColorUpdate,
     FilamentColorEntry,
+    FilamentColorMatchResponse,
     FilamentColorResponse,
     FilamentColorsReplace,
     FilamentCreate,
@@ -32,10 +34,23 @@ from app.api.v1.schemas_filament import (
 )
 from app.core.config import settings, MANUFACTURER_LOGO_DIR
 from app.core.event_bus import event_bus
-from app.models import Color, Filament, FilamentColor, Manufacturer, Spool, SpoolStatus
+from app.models import Color, Filament, FilamentColor, Manufacturer, Spool
+from app.services.cascade_delete import delete_manufacturer_cascade
+from app.services.color_index import color_index, hex_to_lab
+from app.services.logo_assets import (
+    accel_redirect_uri,
+    file_etag,
+    remove_logos,
+    resolve_logo,
+    store_logo,
+)
+from app.services.printer_details import note_printer_detail_changes
+from app.services.spool_counters import refresh_spool_counters
 
 logger = logging.getLogger(__name__)
 
+HEX_COLOR_PATTERN = "^#?[0-9a-fA-F]{6}$"
+
 router = APIRouter(prefix="/manufacturers", tags=["manufacturers"])
 
 
@@ -46,88 +61,12 @@ async def list_manufacturers(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
 ):
-    # Base query for manufacturers
+    # Counts, sums and materials are maintained on the rows
+    # (app/services/spool_counters.py), so one query serves the page
     query = select(Manufacturer).order_by(Manufacturer.name)
-
-    # Executing the pagination slice
     result = await db.execute(query.offset((page - 1) * page_size).limit(page_size))
-    items = list(result.scalars().all())
-
-    mfr_ids = [m.id for m in items]
-    fil_counts: dict[int, int] = {}
-    active_spool_counts: dict[int, int] = {}
-    archived_spool_counts: dict[int, int] = {}
-    total_price_available: dict[int, float] = {}
-    total_price_all: dict[int, float] = {}
-    materials_map: dict[int, list[str]] = {m.id: [] for m in items}
-
-    if mfr_ids:
-        # Run the count queries sequentially (same AsyncSession cannot run concurrent queries)
-
-        fc_stmt = (
-            select(Filament.manufacturer_id, func.count(Filament.id))
-            .where(Filament.manufacturer_id.in_(mfr_ids))
-            .group_by(Filament.manufacturer_id)
-        )
-        types_stmt = (
-            select(Filament.manufacturer_id, Filament.material_type)
-            .where(Filament.manufacturer_id.in_(mfr_ids))
-            .distinct()
-        )
-
-        # Comprehensive spool stats query
-        # We need sum of prices and counts for both active and archived
-        spool_stats_stmt = (
-            select(
-                Filament.manufacturer_id,
-                func.count(Spool.id)
-                .filter(SpoolStatus.key != "archived")
-                .label("active_count"),
-                func.count(Spool.id)
-                .filter(SpoolStatus.key == "archived")
-                .label("archived_count"),
-                func.sum(Spool.purchase_price)
-                .filter(SpoolStatus.key != "archived")
-                .label("active_price"),
-                func.sum(Spool.purchase_price).label("total_price"),
-            )
-            .join(Spool, Spool.filament_id == Filament.id)
-            .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
-            .where(Filament.manufacturer_id.in_(mfr_ids))
-            .group_by(Filament.manufacturer_id)
-        )
-
-        fc_result = await db.execute(fc_stmt)
-        types_result = await db.execute(types_stmt)
-        spool_stats_result = await db.execute(spool_stats_stmt)
-
-        fil_counts = {row[0]: row[1] for row in fc_result.all()}
-
-        for row in types_result.all():
-            mfr_id, mat_type = row[0], row[1]
-            if mfr_id in materials_map and mat_type:
-                materials_map[mfr_id].append(mat_type)
-
-        for row in spool_stats_result.all():
-            mfr_id, active_c, archived_c, active_p, total_p = row
-            active_spool_counts[mfr_id] = active_c or 0
-            archived_spool_counts[mfr_id] = archived_c or 0
-            total_price_available[mfr_id] = active_p or 0.0
-            total_price_all[mfr_id] = total_p or 0.0
-
     items_out = [
-        ManufacturerResponse.model_validate(
-            {
-                **m.__dict__,
-                "filament_count": fil_counts.get(m.id, 0),
-                "spool_count": active_spool_counts.get(m.id, 0),
-                "archived_spool_count": archived_spool_counts.get(m.id, 0),
-                "total_price_available": total_price_available.get(m.id, 0.0),
-                "total_price_all": total_price_all.get(m.id, 0.0),
-                "materials": sorted(materials_map.get(m.id, [])),
-            }
-        )
-        for m in items
+        ManufacturerResponse.model_validate(m) for m in result.scalars().all()
     ]
 
     count_result = await db.execute(select(func.count()).select_from(Manufacturer))
@@ -158,9 +97,8 @@ async def create_manufacturer(
             },
         )
 
-    next_id = await get_next_available_id(db, Manufacturer)
-    manufacturer = Manufacturer(id=next_id, **data.model_dump())
-    db.add(manufacturer)
+    manufacturer = Manufacturer(**data.model_dump())
+    await add_with_next_ids(db, [manufacturer])
     await db.commit()
     await db.refresh(manufacturer)
     await event_bus.publish({"event": "manufacturers_changed"})
@@ -186,36 +124,70 @@ async def get_manufacturer(
 # ── Logo endpoints ─────────────────────────────────────────────────
 
 
-@router.get("/{manufacturer_id}/logo")
-async def get_manufacturer_logo(manufacturer_id: int, _principal: PrincipalDep):
-    """Serve the manufacturer's brand logo from persistent storage."""
-    logo_path = MANUFACTURER_LOGO_DIR / f"{manufacturer_id}.png"
-    if not logo_path.is_file():
+# Versioned logo URLs carry the content hash and never change their bytes
+_IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+_DEFAULT_CACHE = "public, max-age=86400"
+
+
+def _logo_response(
+    request: Request,
+    manufacturer_id: int,
+    kind: str,
+    version: str | None,
+    size: str | None,
+    not_found_message: str,
+) -> Response:
+    path, tag = resolve_logo(manufacturer_id, kind, version, size)
+    if not path.is_file():
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "not_found", "message": "Logo not found"},
+            detail={"code": "not_found", "message": not_found_message},
         )
-    return FileResponse(
-        logo_path,
-        media_type="image/png",
-        headers={"Cache-Control": "public, max-age=86400"},
-    )
+    if tag is not None:
+        etag = f'"{tag}"'
+        cache_control = _IMMUTABLE_CACHE
+    else:
+        etag = f'"{file_etag(path)}"'
+        cache_control = _DEFAULT_CACHE
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    # If-None-Match uses the weak comparison
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if settings.logo_accel_redirect:
+        # nginx sends the file from its internal location
+        headers["X-Accel-Redirect"] = accel_redirect_uri(path)
+        return Response(media_type="image/png", headers=headers)
+    return FileResponse(path, media_type="image/png", headers=headers)
+
+
+@router.get("/{manufacturer_id}/logo")
+async def get_manufacturer_logo(
+    manufacturer_id: int,
+    request: Request,
+    _principal: PrincipalDep,
+    v: str | None = Query(None, description="Content hash from logo_url"),
+    size: str | None = Query(None, description="Size variant, e.g. 'thumb'"),
+):
+    """Serve the manufacturer's brand logo from persistent storage."""
+    return _logo_response(request, manufacturer_id, "web", v, size, "Logo not found")
 
 
 @router.get("/{manufacturer_id}/label-logo")
-async def get_manufacturer_label_logo(manufacturer_id: int, _principal: PrincipalDep):
+async def get_manufacturer_label_logo(
+    manufacturer_id: int,
+    request: Request,
+    _principal: PrincipalDep,
+    v: str | None = Query(None, description="Content hash from label_logo_url"),
+    size: str | None = Query(None, description="Size variant, e.g. 'label'"),
+):
     """Serve the manufacturer's label-optimised logo (grayscale) from persistent storage."""
-    logo_path = MANUFACTURER_LOGO_DIR / f"{manufacturer_id}_label.png"
-    if not logo_path.is_file():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "not_found", "message": "Label logo not found"},
-        )
-    return FileResponse(
-        logo_path,
-        media_type="image/png",
-        headers={"Cache-Control": "public, max-age=86400"},
-    )
+    return _logo_response(request, manufacturer_id, "label", v, size, "Label logo not found")
 
 
 class DownloadLogoRequest(BaseModel):
@@ -265,10 +237,8 @@ async def download_manufacturer_logo(
             },
         )
 
-    # Save web logo to persistent storage
-    logo_path = MANUFACTURER_LOGO_DIR / f"{manufacturer_id}.png"
-    logo_path.write_bytes(resp.content)
-    manufacturer.logo_file = f"{manufacturer_id}.png"
+    # Save web logo and its variants to persistent storage
+    manufacturer.logo_file = store_logo(manufacturer_id, "web", resp.content)
 
     # Download label logo (grayscale, for label printing) — non-critical
     if data.has_label_logo:
@@ -277,9 +247,9 @@ async def download_manufacturer_logo(
             async with httpx.AsyncClient(timeout=15.0) as client:
                 label_resp = await client.get(label_logo_url)
                 label_resp.raise_for_status()
-            label_path = MANUFACTURER_LOGO_DIR / f"{manufacturer_id}_label.png"
-            label_path.write_bytes(label_resp.content)
-            manufacturer.label_logo_file = f"{manufacturer_id}_label.png"
+            manufacturer.label_logo_file = store_logo(
+                manufacturer_id, "label", label_resp.content
+            )
             logger.info(
                 "Downloaded label logo for manufacturer '%s' (id=%s, slug=%s)",
                 manufacturer.name,
@@ -305,7 +275,10 @@ async def download_manufacturer_logo(
         data.slug,
     )
 
-    return {"ok": True, "logo_url": f"/api/v1/manufacturers/{manufacturer_id}/logo"}
+    return {
+        "ok": True,
+        "logo_url": ManufacturerResponse.model_validate(manufacturer).logo_url,
+    }
 
 
 @router.patch("/{manufacturer_id}", response_model=ManufacturerResponse)
@@ -367,59 +340,40 @@ async def delete_manufacturer(
         )
 
     result = await db.execute(
-        select(Filament).where(Filament.manufacturer_id == manufacturer_id).limit(1)
+        select(Filament.id).where(Filament.manufacturer_id == manufacturer_id).limit(1)
     )
-    if result.scalar_one_or_none():
-        if not force:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail={
-                    "code": "conflict",
-                    "message": "Manufacturer has filaments, cannot delete without force flag",
-                },
-            )
-        else:
-            # If force is true, we delete the spools first
-            # The filament deletion is handled by cascade delete in the DB if configured,
-            # or we do it explicitly. SQLAlchemy often handles relationships, but let's be safe:
-            filaments_result = await db.execute(
-                select(Filament).where(Filament.manufacturer_id == manufacturer_id)
-            )
-            filaments_to_delete = filaments_result.scalars().all()
-            for f in filaments_to_delete:
-                # Delete associated spools first
-                from app.models import Spool
-
-                spools_result = await db.execute(
-                    select(Spool).where(Spool.filament_id == f.id)
-                )
-                spools_to_delete = spools_result.scalars().all()
-                for s in spools_to_delete:
-                    await db.delete(s)
-                await db.delete(f)
-
-    await db.delete(manufacturer)
+    if result.scalar_one_or_none() is not None and not force:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "code": "conflict",
+                "message": "Manufacturer has filaments, cannot delete without force flag",
+            },
+        )
+
+    # Filaments, spools and their dependent rows go with set-based deletes
+    counts = await delete_manufacturer_cascade(db, manufacturer_id)
     await db.commit()
-    await event_bus.publish({"event": "manufacturers_changed"})
+    logger.info(
+        "Deleted manufacturer '%s' (id=%s): %s",
+        manufacturer.name,
+        manufacturer_id,
+        ", ".join(f"{table}={count}" for table, count in counts.items() if count),
+    )
+    # One event for the whole cascade; pages showing spools or filaments
+    # reload when "deleted" reports rows of theirs
+    await event_bus.publish(
+        {
+            "event": "manufacturers_changed",
+            "manufacturer_id": manufacturer_id,
+            "deleted": {table: count for table, count in counts.items() if count},
+        }
+    )
+    if counts.get(Filament.__tablename__):
+        response_cache.delete("filament_types")
 
     # Clean up logo files from persistent storage
-    for logo_filename in (f"{manufacturer_id}.png", f"{manufacturer_id}_label.png"):
-        logo_path = MANUFACTURER_LOGO_DIR / logo_filename
-        if logo_path.is_file():
-            try:
-                logo_path.unlink()
-                logger.info(
-                    "Deleted logo file %s for manufacturer %s",
-                    logo_filename,
-                    manufacturer_id,
-                )
-            except OSError as exc:
-                logger.warning(
-                    "Could not delete logo file %s for manufacturer %s: %s",
-                    logo_filename,
-                    manufacturer_id,
-                    exc,
-                )
+    remove_logos(manufacturer_id)
 
 
 router_colors = APIRouter(prefix="/colors", tags=["colors"])
@@ -471,10 +425,45 @@ async def create_color(
     db.add(color)
     await db.commit()
     await db.refresh(color)
-    await event_bus.publish({"event": "colors_changed"})
+    await event_bus.publish(
+        {"event": "colors_changed", "color_id": color.id, "hex_code": color.hex_code}
+    )
     return color
 
 
+@router_colors.get("/similar", response_model=list[ColorMatchResponse])
+async def list_similar_colors(
+    db: DBSession,
+    principal: PrincipalDep,
+    hex: str = Query(..., pattern=HEX_COLOR_PATTERN),
+    limit: int = Query(10, ge=1, le=100),
+    max_delta_e: float | None = Query(None, gt=0),
+):
+    """Colors closest to *hex* by perceptual distance (CIE76 Delta-E)."""
+    await color_index.ensure_loaded(db)
+    matches = color_index.nearest(hex_to_lab(hex), limit, max_delta_e)
+    if not matches:
+        return []
+
+    result = await db.execute(
+        select(Color, func.count(FilamentColor.id).label("usage_count"))
+        .outerjoin(FilamentColor, Color.id == FilamentColor.color_id)
+        .where(Color.id.in_([color_id for color_id, _ in matches]))
+        .group_by(Color.id)
+    )
+    colors = {color.id: (color, usage_count) for color, usage_count in result.all()}
+    return [
+        ColorMatchResponse(
+            color=ColorResponse.model_validate(
+                {**colors[color_id][0].__dict__, "usage_count": colors[color_id][1]}
+            ),
+            delta_e=round(delta_e, 3),
+        )
+        for color_id, delta_e in matches
+        if color_id in colors
+    ]
+
+
 @router_colors.get("/{color_id}", response_model=ColorResponse)
 async def get_color(color_id: int, db: DBSession, principal: PrincipalDep):
     result = await db.execute(select(Color).where(Color.id == color_id))
@@ -507,7 +496,9 @@ async def update_color(
 
     await db.commit()
     await db.refresh(color)
-    await event_bus.publish({"event": "colors_changed"})
+    await event_bus.publish(
+        {"event": "colors_changed", "color_id": color.id, "hex_code": color.hex_code}
+    )
     return color
 
 
@@ -539,7 +530,9 @@ async def delete_color(
 
     await db.delete(color)
     await db.commit()
-    await event_bus.publish({"event": "colors_changed"})
+    await event_bus.publish(
+        {"event": "colors_changed", "color_id": color_id, "deleted": True}
+    )
 
 
 router_filaments = APIRouter(prefix="/filaments", tags=["filaments"])
@@ -581,8 +574,6 @@ async def list_filaments(
     # -- Build filter conditions (shared between data query and count query) --
     conditions = []
     needs_manufacturer_join = False
-    needs_spool_count_join = False
-    spool_count_subquery = None
 
     if type:
         conditions.append(Filament.material_type == type)
@@ -605,19 +596,6 @@ async def list_filaments(
     if sort_by == "manufacturer":
         sort_column = Manufacturer.name
         needs_manufacturer_join = True
-    elif sort_by == "spool_count":
-        spool_count_subquery = (
-            select(
-                Spool.filament_id.label("filament_id"),
-                func.count(Spool.id).label("spool_count"),
-            )
-            .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
-            .where(SpoolStatus.key != "archived")
-            .group_by(Spool.filament_id)
-            .subquery()
-        )
-        sort_column = func.coalesce(spool_count_subquery.c.spool_count, 0)
-        needs_spool_count_join = True
     else:
         sort_column = getattr(Filament, sort_by, Filament.designation)
     order = sort_column.asc() if sort_order == "asc" else sort_column.desc()
@@ -632,10 +610,6 @@ async def list_filaments(
         query = query.join(
             Manufacturer, Filament.manufacturer_id == Manufacturer.id, isouter=True
         )
-    if needs_spool_count_join:
-        query = query.outerjoin(
-            spool_count_subquery, spool_count_subquery.c.filament_id == Filament.id
-        )
 
     for cond in conditions:
         query = query.where(cond)
@@ -662,26 +636,12 @@ async def list_filaments(
     items = result.scalars().unique().all()
     total = count_result.scalar() or 0
 
-    # Compute spool counts for the fetched filaments (excluding archived spools)
-    filament_ids = [f.id for f in items]
-    spool_counts: dict[int, int] = {}
-    if filament_ids:
-        spool_count_query = (
-            select(Spool.filament_id, func.count(Spool.id))
-            .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
-            .where(Spool.filament_id.in_(filament_ids))
-            .where(SpoolStatus.key != "archived")
-            .group_by(Spool.filament_id)
-        )
-        spool_result = await db.execute(spool_count_query)
-        spool_counts = {row[0]: row[1] for row in spool_result.all()}
-
+    # spool_count is maintained on the row (app/services/spool_counters.py)
     items_with_count = [
         FilamentDetailResponse.model_validate(
             {
                 **f.__dict__,
                 "manufacturer": f.manufacturer,
-                "spool_count": spool_counts.get(f.id, 0),
                 "colors": sorted(f.filament_colors, key=lambda fc: fc.position),
             }
         )
@@ -719,10 +679,8 @@ async def create_filament(
     # Separate colors from the filament data
     color_entries = data.colors or []
     filament_data = data.model_dump(exclude={"colors"})
-    next_id = await get_next_available_id(db, Filament)
-    filament = Filament(id=next_id, **filament_data)
-    db.add(filament)
-    await db.flush()  # get filament.id
+    filament = Filament(**filament_data)
+    await add_with_next_ids(db, [filament])
 
     # Create filament_colors
     for entry in color_entries:
@@ -753,12 +711,89 @@ async def create_filament(
         {
             **filament.__dict__,
             "manufacturer": filament.manufacturer,
-            "spool_count": 0,
             "colors": sorted(filament.filament_colors, key=lambda fc: fc.position),
         }
     )
 
 
+@router_filaments.get(
+    "/similar-color", response_model=list[FilamentColorMatchResponse]
+)
+async def list_filaments_by_color(
+    db: DBSession,
+    principal: PrincipalDep,
+    hex: str = Query(..., pattern=HEX_COLOR_PATTERN),
+    limit: int = Query(10, ge=1, le=100),
+    in_stock: bool = False,
+    max_delta_e: float | None = Query(None, gt=0),
+):
+    """Filaments whose closest color (any position) is nearest to *hex*.
+
+    With in_stock only filaments with material left on their non-archived
+    spools are returned.
+    """
+    lab = hex_to_lab(hex)
+    await color_index.ensure_loaded(db)
+
+    # Widen the color neighbourhood until it covers enough filaments; the
+    # colors come closest first, so the filaments found are the closest ones
+    best: dict[int, tuple[float, int, int]] = {}
+    color_limit = limit * 4
+    while True:
+        matches = color_index.nearest(lab, color_limit, max_delta_e)
+        if not matches:
+            break
+        delta_by_color = dict(matches)
+        query = select(
+            FilamentColor.filament_id, FilamentColor.color_id, FilamentColor.position
+        ).where(FilamentColor.color_id.in_(delta_by_color))
+        if in_stock:
+            query = query.join(Filament, Filament.id == FilamentColor.filament_id).where(
+                # spool_count also counts empty spools
+                Filament.total_remaining_weight_g > 0
+            )
+        best.clear()
+        for filament_id, color_id, position in (await db.execute(query)).all():
+            candidate = (delta_by_color[color_id], color_id, position)
+            if filament_id not in best or candidate < best[filament_id]:
+                best[filament_id] = candidate
+        if len(best) >= limit or len(matches) < color_limit:
+            break
+        color_limit *= 4
+
+    ranked = sorted(best.items(), key=lambda item: (item[1][0], item[0]))[:limit]
+    if not ranked:
+        return []
+
+    result = await db.execute(
+        select(Filament)
+        .where(Filament.id.in_([filament_id for filament_id, _ in ranked]))
+        .options(
+            selectinload(Filament.manufacturer),
+            selectinload(Filament.filament_colors).selectinload(FilamentColor.color),
+        )
+    )
+    filaments = {f.id: f for f in result.scalars().all()}
+    return [
+        FilamentColorMatchResponse(
+            filament=FilamentDetailResponse.model_validate(
+                {
+                    **filaments[filament_id].__dict__,
+                    "manufacturer": filaments[filament_id].manufacturer,
+                    "colors": sorted(
+                        filaments[filament_id].filament_colors, key=lambda fc: fc.position
+                    ),
+                }
+            ),
+            color_id=color_id,
+            position=position,
+            delta_e=round(delta_e, 3),
+        )
+        for filament_id, (delta_e, color_id, position) in ranked
+        if filament_id in filaments
+    ]
+
+
 @router_filaments.get("/{filament_id}", response_model=FilamentDetailResponse)
 async def get_filament(filament_id: int, db: DBSession, principal: PrincipalDep):
     result = await db.execute(
@@ -776,20 +811,10 @@ async def get_filament(filament_id: int, db: DBSession, principal: PrincipalDep)
             detail={"code": "not_found", "message": "Filament not found"},
         )
 
-    # Compute spool count (excluding archived spools)
-    spool_count_result = await db.execute(
-        select(func.count(Spool.id))
-        .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
-        .where(Spool.filament_id == filament_id)
-        .where(SpoolStatus.key != "archived")
-    )
-    spool_count = spool_count_result.scalar() or 0
-
     return FilamentDetailResponse.model_validate(
         {
             **filament.__dict__,
             "manufacturer": filament.manufacturer,
-            "spool_count": spool_count,
             "colors": sorted(filament.filament_colors, key=lambda fc: fc.position),
         }
     )
@@ -833,6 +858,10 @@ async def delete_filaments_bulk(
 ):
     """Bulk delete multiple filaments. Use force=true to cascade-delete associated spools."""
     filament_ids = list(data.filament_ids)
+    manufacturer_result = await db.execute(
+        select(Filament.manufacturer_id).where(Filament.id.in_(filament_ids)).distinct()
+    )
+    manufacturer_ids = list(manufacturer_result.scalars().all())
 
     # Find which filaments have associated spools
     spool_check = await db.execute(
@@ -848,6 +877,7 @@ async def delete_filaments_bulk(
             )
         result = await db.execute(delete(Filament).where(Filament.id.in_(filament_ids)))
         count = result.rowcount
+        note_printer_detail_changes(db, filaments=filament_ids)
     else:
         # Skip filaments that have spools
         ids_to_delete = [
@@ -861,6 +891,9 @@ async def delete_filaments_bulk(
         else:
             count = 0
 
+    await refresh_spool_counters(
+        db, filament_ids=filament_ids_with_spools, manufacturer_ids=manufacturer_ids
+    )
     await db.commit()
     await event_bus.publish({"event": "filaments_changed"})
     response_cache.delete("filament_types")
@@ -918,6 +951,7 @@ async def replace_filament_colors(
     await db.execute(
         delete(FilamentColor).where(FilamentColor.filament_id == filament_id)
     )
+    note_printer_detail_changes(db, filaments=[filament_id])
 
     await db.flush()
 
@@ -3,6 +3,7 @@ from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.event_bus import event_bus
 from app.api.deps import PrincipalDep, RequirePermission
 from app.models import Printer
 from app.models.printer_params import FilamentPrinterParam, SpoolPrinterParam
@@ -113,6 +114,9 @@ async def upsert_filament_printer_params(
             results.append(new_param)
 
     await db.commit()
+    await event_bus.publish(
+        {"event": "printer_params_changed", "filament_id": filament_id, "printer_id": printer_id}
+    )
     for r in results:
         await db.refresh(r)
     return results
@@ -138,6 +142,9 @@ async def delete_filament_printer_params(
         query = query.where(FilamentPrinterParam.param_key == param_key)
     await db.execute(query)
     await db.commit()
+    await event_bus.publish(
+        {"event": "printer_params_changed", "filament_id": filament_id, "printer_id": printer_id}
+    )
 
 
 # ─── Spool Printer Params ────────────────────────────────────────────────────
@@ -211,6 +218,9 @@ async def upsert_spool_printer_params(
             results.append(new_param)
 
     await db.commit()
+    await event_bus.publish(
+        {"event": "printer_params_changed", "spool_id": spool_id, "printer_id": printer_id}
+    )
     for r in results:
         await db.refresh(r)
     return results
@@ -236,3 +246,6 @@ async def delete_spool_printer_params(
         query = query.where(SpoolPrinterParam.param_key == param_key)
     await db.execute(query)
     await db.commit()
+    await event_bus.publish(
+        {"event": "printer_params_changed", "spool_id": spool_id, "printer_id": printer_id}
+    )
@@ -1,7 +1,14 @@
+import asyncio
+import inspect
+import json
 import logging
+import secrets
+import time
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Response, status
 from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
 from sqlalchemy import delete as sa_delete, func, select
 from sqlalchemy.orm import selectinload
 
@@ -16,12 +23,21 @@ from app.models import (
     Filament,
     FilamentColor,
 )
+from app.core import database
+from app.core.event_bus import event_bus
 from app.core.shared_health import shared_health_store
-from app.plugins.manager import plugin_manager
+from app.plugins.manager import DEBUG_LEASE_TTL, plugin_manager
+from app.services.printer_details import printer_details
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/printers", tags=["printers"])
 
+# Debug entries waiting per console stream before new ones are dropped
+DEBUG_STREAM_QUEUE_SIZE = 200
+
+# Seconds between keepalive comments of an idle console stream
+DEBUG_STREAM_KEEPALIVE = 15.0
+
 
 class PrinterCreate(BaseModel):
     name: str
@@ -131,49 +147,45 @@ async def create_printer(
     await db.commit()
     await db.refresh(printer)
 
-    # Auto-start driver if printer is active (default)
-    if printer.is_active and printer.driver_key:
-        started = await plugin_manager.start_printer(printer)
-        if not started:
-            logger.warning(
-                f"Driver {printer.driver_key} could not be started for new printer {printer.id}"
-            )
+    # The process that owns the drivers (primary worker / driver host)
+    # starts the driver of an active printer (PluginManager.reconcile_printer)
+    await event_bus.publish({"event": "printer_changed", "printer_id": printer.id})
 
     return printer
 
 
-@router.get("/{printer_id}", response_model=PrinterDetailResponse)
-async def get_printer(
-    printer_id: int,
-    db: DBSession,
-    principal: PrincipalDep,
-):
-    result = await db.execute(
-        select(Printer)
-        .where(Printer.id == printer_id, Printer.deleted_at.is_(None))
-        .options(
-            selectinload(Printer.slots)
-            .selectinload(PrinterSlot.assignment)
-            .selectinload(PrinterSlotAssignment.spool)
-            .selectinload(Spool.filament)
+async def _load_printer_detail(printer_id: int) -> tuple[bytes, dict] | None:
+    """Serialized detail of *printer_id* and the ids of the rows it shows."""
+    async with database.async_session_maker() as db:
+        result = await db.execute(
+            select(Printer)
+            .where(Printer.id == printer_id, Printer.deleted_at.is_(None))
             .options(
-                selectinload(Filament.manufacturer),
-                selectinload(Filament.filament_colors).selectinload(
-                    FilamentColor.color
-                ),
+                selectinload(Printer.slots)
+                .selectinload(PrinterSlot.assignment)
+                .selectinload(PrinterSlotAssignment.spool)
+                .selectinload(Spool.filament)
+                .options(
+                    selectinload(Filament.manufacturer),
+                    selectinload(Filament.filament_colors).selectinload(
+                        FilamentColor.color
+                    ),
+                )
             )
         )
-    )
-    printer = result.scalar_one_or_none()
+        printer = result.scalar_one_or_none()
 
     if not printer:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "not_found", "message": "Printer not found"},
-        )
+        return None
 
     # Build slot responses with flattened assignment info
     slot_responses = []
+    refs: dict[str, set[int]] = {
+        "spools": set(),
+        "filaments": set(),
+        "manufacturers": set(),
+        "colors": set(),
+    }
     for slot in sorted(printer.slots, key=lambda s: s.slot_no):
         assignment_data = None
         if slot.assignment:
@@ -186,12 +198,15 @@ async def get_printer(
             color_hex = None
             color_name = None
             if spool:
+                refs["spools"].add(spool.id)
                 filament = spool.filament
                 spool_name = f"#{spool.id}"
                 if filament:
+                    refs["filaments"].add(filament.id)
                     filament_name = filament.designation
                     material_type = filament.material_type
                     if filament.manufacturer:
+                        refs["manufacturers"].add(filament.manufacturer.id)
                         manufacturer_name = filament.manufacturer.name
                         spool_name = (
                             f"{filament.manufacturer.name} {filament.designation}"
@@ -200,6 +215,7 @@ async def get_printer(
                         spool_name = filament.designation
                     if filament.filament_colors:
                         first_color = filament.filament_colors[0].color
+                        refs["colors"].add(first_color.id)
                         color_hex = first_color.hex_code
                         color_name = first_color.name
             meta = a.meta or {}
@@ -238,7 +254,7 @@ async def get_printer(
             )
         )
 
-    return PrinterDetailResponse(
+    detail = PrinterDetailResponse(
         id=printer.id,
         name=printer.name,
         location_id=printer.location_id,
@@ -248,6 +264,28 @@ async def get_printer(
         driver_config=printer.driver_config,
         slots=slot_responses,
     )
+    return detail.model_dump_json().encode(), {
+        kind: frozenset(ids) for kind, ids in refs.items()
+    }
+
+
+printer_details.register(_load_printer_detail)
+
+
+@router.get("/{printer_id}", response_model=PrinterDetailResponse)
+async def get_printer(
+    printer_id: int,
+    principal: PrincipalDep,
+):
+    # Cached per printer; repeated loads of the detail page (on every
+    # slots_update event) cost no database work
+    body = await printer_details.get(printer_id)
+    if body is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"code": "not_found", "message": "Printer not found"},
+        )
+    return Response(content=body, media_type="application/json")
 
 
 @router.patch("/{printer_id}", response_model=PrinterResponse)
@@ -280,18 +318,9 @@ async def update_printer(
     await db.commit()
     await db.refresh(printer)
 
-    # Handle driver lifecycle on relevant changes
-    if active_changed and not printer.is_active:
-        # Deactivated → stop driver
-        await plugin_manager.stop_printer(printer_id)
-    elif active_changed and printer.is_active:
-        # Activated → start driver
-        await plugin_manager.start_printer(printer)
-    elif driver_changed and printer.is_active:
-        # Config/key changed while active → restart
-        await plugin_manager.stop_printer(printer_id)
-        await plugin_manager.start_printer(printer)
-
+    # The process that owns the drivers starts, stops or restarts the driver
+    if driver_changed or active_changed:
+        await event_bus.publish({"event": "printer_changed", "printer_id": printer_id})
     return printer
 
 
@@ -319,9 +348,6 @@ async def delete_printer(
             detail={"code": "not_found", "message": "Printer not found"},
         )
 
-    # Stop driver before soft-delete
-    await plugin_manager.stop_printer(printer_id)
-
     # Optionally hard-delete calibration data
     if delete_params:
         await db.execute(
@@ -338,6 +364,12 @@ async def delete_printer(
 
     printer.deleted_at = datetime.now(timezone.utc)
     await db.commit()
+    # The process that owns the drivers stops the driver of the deleted printer
+    await event_bus.publish({"event": "printer_changed", "printer_id": printer_id})
+    if delete_params:
+        await event_bus.publish(
+            {"event": "printer_params_changed", "printer_id": printer_id}
+        )
 
 
 @router.get("/{printer_id}/slots", response_model=list[SlotResponse])
@@ -445,9 +477,12 @@ async def driver_health(
     db: DBSession,
     principal: PrincipalDep,
 ):
-    driver = plugin_manager.drivers.get(printer_id)
-    if driver:
-        health = driver.health()
+    health = await plugin_manager.printer_health(printer_id)
+    if plugin_manager.hosted:
+        # Driver host answers for every worker
+        return health or {"running": False, "connected": False}
+
+    if health is not None:
         # Primary worker: update shared memory so secondaries stay in sync
         shared_health_store.publish({printer_id: health})
         return health
@@ -474,6 +509,7 @@ async def reconnect_all_printers(
 async def driver_debug_log(
     printer_id: int,
     since: str | None = Query(None),
+    since_seq: int | None = Query(None),
     db: DBSession = None,
     principal: PrincipalDep = None,
 ):
@@ -486,7 +522,109 @@ async def driver_debug_log(
                 "message": "Driver is not running for this printer",
             },
         )
-    return driver.get_debug_log(since_ts=since)
+    if since_seq is not None:
+        entries = driver.get_debug_log(since_seq=since_seq)
+    else:
+        entries = driver.get_debug_log(since_ts=since)
+    if inspect.isawaitable(entries):  # driver runs in the driver host
+        entries = await entries
+    return entries
+
+
+async def _debug_backlog(printer_id: int, since_seq: int | None) -> list[dict]:
+    # Entries the driver buffered before the console connected; only the
+    # process running the driver (or proxying it) has them
+    driver = plugin_manager.drivers.get(printer_id)
+    if driver is None:
+        return []
+    try:
+        entries = driver.get_debug_log(since_seq=since_seq)
+        if inspect.isawaitable(entries):
+            entries = await entries
+    except Exception as e:
+        logger.warning(f"Debug backlog of printer {printer_id} unavailable: {e}")
+        return []
+    return list(entries or [])
+
+
+@router.get("/{printer_id}/driver/debug/stream")
+async def driver_debug_stream(
+    printer_id: int,
+    request: Request,
+    principal: PrincipalDep,
+) -> StreamingResponse:
+    """Server-Sent Events with the debug log entries of the printer's driver.
+
+    While connected, the console holds a lease that keeps the driver's debug
+    log enabled in whichever process runs it; the entries reach this worker
+    as ``driver_debug`` events through the event bus relay.  Each message
+    carries the entry's ``seq`` as its id, so a reconnecting EventSource
+    (Last-Event-ID) resumes after the last entry it received.
+    """
+    subscriber = secrets.token_hex(8)
+    queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=DEBUG_STREAM_QUEUE_SIZE)
+
+    def on_event(event: dict) -> None:
+        if event.get("event") == "driver_debug" and event.get("printer_id") == printer_id:
+            try:
+                queue.put_nowait(event["entry"])
+            except asyncio.QueueFull:
+                pass  # slow client; the gap shows in the sequence numbers
+
+    async def lease(active: bool) -> None:
+        await event_bus.publish(
+            {
+                "event": "driver_debug_lease",
+                "printer_id": printer_id,
+                "subscriber": subscriber,
+                "active": active,
+            }
+        )
+
+    try:
+        last_seq: int | None = int(request.headers["last-event-id"])
+    except (KeyError, ValueError):
+        last_seq = None
+
+    def message(entry: dict) -> str:
+        return f"id: {entry['seq']}\ndata: {json.dumps(entry, default=str)}\n\n"
+
+    async def generate():
+        event_bus.add_listener(on_event)
+        try:
+            await lease(True)
+            yield ": connected\n\n"
+            last = last_seq
+            for entry in await _debug_backlog(printer_id, last_seq):
+                yield message(entry)
+                last = entry["seq"]
+            renew_at = time.monotonic() + DEBUG_LEASE_TTL / 3
+            while not await request.is_disconnected():
+                try:
+                    entry = await asyncio.wait_for(queue.get(), DEBUG_STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                else:
+                    # Skip entries already sent with the backlog
+                    if last is None or entry["seq"] > last:
+                        yield message(entry)
+                        last = entry["seq"]
+                if time.monotonic() >= renew_at:
+                    await lease(True)
+                    renew_at = time.monotonic() + DEBUG_LEASE_TTL / 3
+        finally:
+            event_bus.remove_listener(on_event)
+            await lease(False)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering
+        },
+    )
 
 
 @router.post("/{printer_id}/driver/start", response_model=DriverActionResponse)
@@ -517,9 +655,10 @@ async def start_driver(
         )
 
     # Publish health immediately so all workers see the new state
-    driver = plugin_manager.drivers.get(printer_id)
-    if driver:
-        shared_health_store.publish({printer_id: driver.health()})
+    if not plugin_manager.hosted:
+        health = await plugin_manager.printer_health(printer_id)
+        if health is not None:
+            shared_health_store.publish({printer_id: health})
 
     return DriverActionResponse(success=True, message="Driver started")
 
@@ -547,7 +686,8 @@ async def stop_driver(
     await plugin_manager.stop_printer(printer_id)
 
     # Clear shared health so secondaries immediately see running=False
-    shared_health_store.clear(printer_id)
+    if not plugin_manager.hosted:
+        shared_health_store.clear(printer_id)
 
     return DriverActionResponse(success=True, message="Driver stopped")
 
@@ -696,6 +836,7 @@ async def import_printer_params(
             imported_count += 1
 
     await db.commit()
+    await event_bus.publish({"event": "printer_params_changed", "printer_id": printer_id})
     return {
         "imported": imported_count,
         "message": f"Imported {imported_count} params for printer {printer.name}",
@@ -2,6 +2,13 @@ from typing import Any
 
 from pydantic import BaseModel, Field, computed_field
 
+from app.services.logo_assets import logo_digest
+
+
+def _logo_url(path: str, asset_name: str, size: str) -> str:
+    digest = logo_digest(asset_name)
+    return f"{path}?v={digest}&size={size}" if digest else path
+
 
 class ManufacturerCreate(BaseModel):
     name: str
@@ -41,15 +48,18 @@ class ManufacturerSummaryResponse(BaseModel):
     @computed_field
     @property
     def logo_url(self) -> str | None:
+        # List thumbnail; versioned by content hash (immutable caching)
         if self.logo_file:
-            return f"/api/v1/manufacturers/{self.id}/logo"
+            return _logo_url(f"/api/v1/manufacturers/{self.id}/logo", self.logo_file, "thumb")
         return None
 
     @computed_field
     @property
     def label_logo_url(self) -> str | None:
         if self.label_logo_file:
-            return f"/api/v1/manufacturers/{self.id}/label-logo"
+            return _logo_url(
+                f"/api/v1/manufacturers/{self.id}/label-logo", self.label_logo_file, "label"
+            )
         return None
 
     class Config:
@@ -60,6 +70,7 @@ class ManufacturerResponse(ManufacturerSummaryResponse):
     filament_count: int = 0
     spool_count: int = 0
     archived_spool_count: int = 0
+    total_remaining_weight_g: float = 0.0
     total_price_available: float = 0.0
     total_price_all: float = 0.0
     materials: list[str] = []
@@ -88,6 +99,13 @@ class ColorResponse(BaseModel):
         from_attributes = True
 
 
+class ColorMatchResponse(BaseModel):
+    """A color found by similarity search, with its CIE76 Delta-E."""
+
+    color: ColorResponse
+    delta_e: float
+
+
 class FilamentColorEntry(BaseModel):
     """A single color assignment for a filament (used in create/replace)."""
 
@@ -188,9 +206,19 @@ class FilamentResponse(BaseModel):
 class FilamentDetailResponse(FilamentResponse):
     manufacturer: ManufacturerSummaryResponse | None = None
     spool_count: int = 0
+    total_remaining_weight_g: float = 0.0
     colors: list[FilamentColorResponse] = []
 
 
+class FilamentColorMatchResponse(BaseModel):
+    """A filament found by color similarity; the closest of its colors matched."""
+
+    filament: FilamentDetailResponse
+    color_id: int
+    position: int
+    delta_e: float
+
+
 class BulkFilamentUpdateRequest(BaseModel):
     filament_ids: list[int] = Field(..., min_length=1)
     price: float | None = None
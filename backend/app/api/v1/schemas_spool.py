@@ -1,7 +1,9 @@
 from datetime import datetime
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from app.models.spool import normalize_rfid_uid
 from .schemas_filament import FilamentDetailResponse
 
 
@@ -58,6 +60,11 @@ class SpoolCreate(BaseModel):
     low_weight_threshold_g: int = 100
     custom_fields: dict[str, Any] | None = None
 
+    @field_validator("rfid_uid")
+    @classmethod
+    def lowercase_rfid_uid(cls, value: str | None) -> str | None:
+        return normalize_rfid_uid(value)
+
 
 class SpoolBulkCreate(SpoolCreate):
     quantity: int = Field(1, ge=1, le=100)
@@ -79,6 +86,11 @@ class SpoolUpdate(BaseModel):
     low_weight_threshold_g: int | None = None
     custom_fields: dict[str, Any] | None = None
 
+    @field_validator("rfid_uid")
+    @classmethod
+    def lowercase_rfid_uid(cls, value: str | None) -> str | None:
+        return normalize_rfid_uid(value)
+
 
 class SpoolResponse(BaseModel):
     id: int
@@ -154,6 +166,11 @@ class BulkSpoolDeleteRequest(BaseModel):
     spool_ids: list[int] = Field(..., min_length=1)
     permanent: bool = False
 
+
+class RebuildRemainingRequest(BaseModel):
+    spool_ids: list[int] | None = None
+
+
 class MoveLocationRequest(BaseModel):
     location_id: int | None
     event_at: datetime | None = None
@@ -1,13 +1,13 @@
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy import delete, func, literal, or_, select, union_all, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload
 
 from app.api.deps import DBSession, PrincipalDep, RequirePermission
 from app.core.cache import response_cache
-from app.core.db_utils import get_next_available_id, get_next_available_ids
+from app.core.db_utils import add_with_next_ids, insert_with_next_ids
 from app.api.v1.schemas import PaginatedResponse
 from app.api.v1.schemas_spool import (
     AdjustmentRequest,
@@ -21,6 +21,7 @@ from app.api.v1.schemas_spool import (
     LocationUpdate,
     MeasurementRequest,
     MoveLocationRequest,
+    RebuildRemainingRequest,
     SpoolBulkCreate,
     SpoolCreate,
     SpoolEventResponse,
@@ -37,8 +38,15 @@ from app.models import (
     Manufacturer,
     Spool,
     SpoolEvent,
+    SpoolEventArchive,
     SpoolStatus,
 )
+from app.services.spool_counters import (
+    SPOOL_COUNTER_INPUTS,
+    filament_ids_of_spools,
+    refresh_spool_counters,
+)
+from app.services.printer_details import note_printer_detail_changes
 from app.services.spool_service import SpoolService
 
 router_locations = APIRouter(prefix="/locations", tags=["locations"])
@@ -394,9 +402,8 @@ async def create_spool(
         for dup in dup_result.scalars().all():
             dup.rfid_uid = None
 
-    next_id = await get_next_available_id(db, Spool)
-    spool = Spool(id=next_id, **spool_data)
-    db.add(spool)
+    spool = Spool(**spool_data)
+    await add_with_next_ids(db, [spool])
     await db.commit()
     await event_bus.publish({"event": "spools_changed"})
 
@@ -422,7 +429,16 @@ async def create_spools_bulk(
     db: DBSession,
     principal=RequirePermission("spools:create"),
 ):
-    result = await db.execute(select(Filament).where(Filament.id == data.filament_id))
+    # Loaded once with everything SpoolResponse needs; the created rows are
+    # answered from the input values plus this filament
+    result = await db.execute(
+        select(Filament)
+        .where(Filament.id == data.filament_id)
+        .options(
+            selectinload(Filament.manufacturer),
+            selectinload(Filament.filament_colors).selectinload(FilamentColor.color),
+        )
+    )
     filament = result.scalar_one_or_none()
     if not filament:
         raise HTTPException(
@@ -488,15 +504,13 @@ async def create_spools_bulk(
         for dup in dup_result.scalars().all():
             dup.rfid_uid = None
 
-    next_ids = await get_next_available_ids(db, Spool, data.quantity)
-    spool_ids = []
+    now = datetime.now(timezone.utc)
+    spool_data.update(created_at=now, updated_at=now, last_used_at=None)
     try:
-        for i in range(data.quantity):
-            spool = Spool(id=next_ids[i], **spool_data.copy())
-            db.add(spool)
-            spool_ids.append(next_ids[i])
-
-        await db.flush()
+        spool_ids = await insert_with_next_ids(
+            db, Spool, [spool_data] * data.quantity
+        )
+        await refresh_spool_counters(db, filament_ids=[filament.id])
         await db.commit()
     except Exception as e:
         await db.rollback()
@@ -506,18 +520,10 @@ async def create_spools_bulk(
         )
     await event_bus.publish({"event": "spools_changed"})
 
-    # Reload all spools with relationships
-    result = await db.execute(
-        select(Spool)
-        .where(Spool.id.in_(spool_ids))
-        .options(
-            selectinload(Spool.filament).selectinload(Filament.manufacturer),
-            selectinload(Spool.filament)
-            .selectinload(Filament.filament_colors)
-            .selectinload(FilamentColor.color),
-        )
-    )
-    return result.scalars().all()
+    return [
+        SpoolResponse.model_validate({**spool_data, "id": spool_id, "filament": filament})
+        for spool_id in spool_ids
+    ]
 
 
 @router_spools.patch("/bulk", status_code=status.HTTP_200_OK)
@@ -527,24 +533,35 @@ async def update_spools_bulk(
     principal=RequirePermission("spools:update"),
 ):
     """Bulk update fields on multiple spools (location, threshold, empty weight, price)."""
-    result = await db.execute(select(Spool).where(Spool.id.in_(data.spool_ids)))
-    spools = result.scalars().all()
-
-    count = 0
-    for spool in spools:
-        if data.clear_location:
-            spool.location_id = None
-        elif data.location_id is not None:
-            spool.location_id = data.location_id
-        if data.status_id is not None:
-            spool.status_id = data.status_id
-        if data.low_weight_threshold_g is not None:
-            spool.low_weight_threshold_g = data.low_weight_threshold_g
-        if data.empty_spool_weight_g is not None:
-            spool.empty_spool_weight_g = data.empty_spool_weight_g
-        if data.purchase_price is not None:
-            spool.purchase_price = data.purchase_price
-        count += 1
+    values: dict = {}
+    if data.clear_location:
+        values["location_id"] = None
+    elif data.location_id is not None:
+        values["location_id"] = data.location_id
+    for field in (
+        "status_id",
+        "low_weight_threshold_g",
+        "empty_spool_weight_g",
+        "purchase_price",
+    ):
+        if getattr(data, field) is not None:
+            values[field] = getattr(data, field)
+
+    # One UPDATE ... WHERE id IN (...) for all spools instead of per-row ORM writes
+    if values:
+        result = await db.execute(
+            update(Spool).where(Spool.id.in_(data.spool_ids)).values(**values)
+        )
+        count = result.rowcount
+        if any(column in values for column in SPOOL_COUNTER_INPUTS):
+            await refresh_spool_counters(
+                db, filament_ids=await filament_ids_of_spools(db, data.spool_ids)
+            )
+    else:
+        result = await db.execute(
+            select(func.count()).select_from(Spool).where(Spool.id.in_(data.spool_ids))
+        )
+        count = result.scalar() or 0
 
     await db.commit()
     await event_bus.publish({"event": "spools_changed"})
@@ -558,9 +575,11 @@ async def delete_spools_bulk(
     principal=RequirePermission("spools:delete"),
 ):
     """Bulk archive or permanently delete multiple spools."""
+    filament_ids = await filament_ids_of_spools(db, data.spool_ids)
     if data.permanent:
         result = await db.execute(delete(Spool).where(Spool.id.in_(data.spool_ids)))
         count = result.rowcount
+        note_printer_detail_changes(db, spools=data.spool_ids)
     else:
         archived_result = await db.execute(
             select(SpoolStatus).where(SpoolStatus.key == "archived")
@@ -578,30 +597,34 @@ async def delete_spools_bulk(
         )
         count = result.rowcount
 
+    await refresh_spool_counters(db, filament_ids=filament_ids)
     await db.commit()
     await event_bus.publish({"event": "spools_changed"})
     return {"success": True, "count": count}
 
 
+@router_spools.post("/rebuild-remaining", status_code=status.HTTP_200_OK)
+async def rebuild_remaining_weights(
+    data: RebuildRemainingRequest,
+    db: DBSession,
+    principal=RequirePermission("spools:adjust_weight"),
+):
+    """Recompute remaining weights from the event history (all or selected spools)."""
+    service = SpoolService(db)
+    counts = await service.rebuild_all_remaining_weights(spool_ids=data.spool_ids)
+    await event_bus.publish({"event": "spools_changed"})
+    return {"success": True, **counts}
+
+
 @router_spools.get("/all-events", response_model=PaginatedResponse[SpoolEventResponse])
 async def list_all_spool_events(
     db: DBSession,
     principal=RequirePermission("spool_events:read"),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
+    include_archive: bool = Query(False),
 ):
-    result = await db.execute(
-        select(SpoolEvent)
-        .order_by(SpoolEvent.event_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-    )
-    items = list(result.scalars().all())
-
-    count_result = await db.execute(select(func.count()).select_from(SpoolEvent))
-    total = count_result.scalar() or 0
-
-    return PaginatedResponse(items=items, page=page, page_size=page_size, total=total)
+    return await _list_events(db, None, page, page_size, include_archive)
 
 
 @router_spools.get("/{spool_id}", response_model=SpoolResponse)
@@ -940,23 +963,70 @@ async def list_spool_events(
     principal=RequirePermission("spool_events:read"),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
+    include_archive: bool = Query(False),
 ):
+    return await _list_events(db, spool_id, page, page_size, include_archive)
+
+
+_EVENT_RESPONSE_COLUMNS = tuple(
+    name for name in SpoolEventResponse.model_fields if name != "id"
+)
+
+
+async def _list_events(
+    db: AsyncSession,
+    spool_id: int | None,
+    page: int,
+    page_size: int,
+    include_archive: bool,
+) -> PaginatedResponse:
+    """Page through spool events, newest first.
+
+    With ``include_archive`` the archived history (see EventRetentionService)
+    is merged in; archived rows report their original event id.
+    """
+    if not include_archive:
+        query = select(SpoolEvent)
+        count_query = select(func.count()).select_from(SpoolEvent)
+        if spool_id is not None:
+            query = query.where(SpoolEvent.spool_id == spool_id)
+            count_query = count_query.where(SpoolEvent.spool_id == spool_id)
+        result = await db.execute(
+            query.order_by(SpoolEvent.event_at.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        items = list(result.scalars().all())
+        total = (await db.execute(count_query)).scalar() or 0
+        return PaginatedResponse(
+            items=items, page=page, page_size=page_size, total=total
+        )
+
+    live = select(
+        SpoolEvent.id.label("id"),
+        *(getattr(SpoolEvent, name) for name in _EVENT_RESPONSE_COLUMNS),
+        literal(0).label("archived"),
+    )
+    archived = select(
+        SpoolEventArchive.event_id.label("id"),
+        *(getattr(SpoolEventArchive, name) for name in _EVENT_RESPONSE_COLUMNS),
+        literal(1).label("archived"),
+    )
+    if spool_id is not None:
+        live = live.where(SpoolEvent.spool_id == spool_id)
+        archived = archived.where(SpoolEventArchive.spool_id == spool_id)
+    combined = union_all(live, archived).subquery("events")
+
     result = await db.execute(
-        select(SpoolEvent)
-        .where(SpoolEvent.spool_id == spool_id)
-        .order_by(SpoolEvent.event_at.desc())
+        select(combined)
+        .order_by(combined.c.event_at.desc(), combined.c.archived)
         .offset((page - 1) * page_size)
         .limit(page_size)
     )
-    items = list(result.scalars().all())
-
-    count_result = await db.execute(
-        select(func.count())
-        .select_from(SpoolEvent)
-        .where(SpoolEvent.spool_id == spool_id)
-    )
-    total = count_result.scalar() or 0
-
+    items = [SpoolEventResponse.model_validate(row) for row in result.mappings().all()]
+    total = (
+        await db.execute(select(func.count()).select_from(combined))
+    ).scalar() or 0
     return PaginatedResponse(items=items, page=page, page_size=page_size, total=total)
 
 
@@ -21,12 +21,15 @@ import httpx
 from app.api.deps import DBSession, PrincipalDep, RequirePermission
 from app.core.cache import response_cache
 from app.core.config import settings
+from app.core.event_bus import event_bus
 from app.models import (
     AppSettings,
     Color,
+    ConsumptionDaily,
     Device,
     Filament,
     FilamentColor,
+    FilamentForecast,
     FilamentPrinterProfile,
     FilamentPrinterParam,
     FilamentRating,
@@ -41,12 +44,16 @@ from app.models import (
     PrinterSlot,
     PrinterSlotAssignment,
     PrinterSlotEvent,
+    PrinterSlotEventArchive,
     Role,
     RolePermission,
     Spool,
     SpoolEvent,
+    SpoolEventArchive,
+    SpoolForecast,
     SpoolPrinterParam,
     SpoolStatus,
+    SpoolWeightCheckpoint,
     SystemExtraField,
     User,
     UserApiKey,
@@ -475,14 +482,7 @@ async def install_from_registry(
 
     async def stop_drivers_for_upgrade(driver_key: str) -> None:
         """Laufende Treiber stoppen und Module-Cache bereinigen."""
-        for pid, drv in list(plugin_manager.drivers.items()):
-            if drv.driver_key == driver_key:
-                await plugin_manager.stop_printer(pid)
-        prefix = f"app.plugins.{driver_key}"
-        for mod_name in list(sys.modules.keys()):
-            if mod_name.startswith(prefix):
-                del sys.modules[mod_name]
-        importlib.invalidate_caches()
+        await plugin_manager.unload_driver(driver_key)
 
     service = PluginInstallService(db)
     try:
@@ -521,6 +521,7 @@ async def install_from_registry(
     # Caches invalidieren (Plugin-Status hat sich geaendert)
     _invalidate_version_cache()
     response_cache.delete("plugin_nav")
+    await event_bus.publish({"event": "plugins_changed", "plugin_key": plugin.plugin_key})
 
     action = "aktualisiert" if is_upgrade else "installiert"
     return PluginInstallResponse(
@@ -580,15 +581,7 @@ async def install_plugin(
 
     async def stop_drivers_for_upgrade(driver_key: str) -> None:
         """Laufende Treiber stoppen und Module-Cache bereinigen."""
-        for pid, drv in list(plugin_manager.drivers.items()):
-            if drv.driver_key == driver_key:
-                await plugin_manager.stop_printer(pid)
-        # Module-Cache invalidieren fuer Neuimport
-        prefix = f"app.plugins.{driver_key}"
-        for mod_name in list(sys.modules.keys()):
-            if mod_name.startswith(prefix):
-                del sys.modules[mod_name]
-        importlib.invalidate_caches()
+        await plugin_manager.unload_driver(driver_key)
 
     # Installation durchfuehren
     service = PluginInstallService(db)
@@ -628,6 +621,7 @@ async def install_plugin(
     # Caches invalidieren (Plugin-Status hat sich geaendert)
     _invalidate_version_cache()
     response_cache.delete("plugin_nav")
+    await event_bus.publish({"event": "plugins_changed", "plugin_key": plugin.plugin_key})
 
     action = "aktualisiert" if is_upgrade else "installiert"
     return PluginInstallResponse(
@@ -696,6 +690,7 @@ async def uninstall_plugin(
             )
 
         await db.commit()
+        await event_bus.publish({"event": "printer_params_changed"})
         logger.info(
             f"Deleted plugin data (SystemExtraFields + printer_params) for driver '{driver_key}'"
         )
@@ -714,6 +709,7 @@ async def uninstall_plugin(
     # Caches invalidieren (Plugin entfernt)
     _invalidate_version_cache()
     response_cache.delete("plugin_nav")
+    await event_bus.publish({"event": "plugins_changed", "plugin_key": plugin_key})
 
 
 class PluginToggleResponse(BaseModel):
@@ -803,6 +799,7 @@ async def toggle_plugin_active(
                         affected += 1
 
     response_cache.delete("plugin_nav")
+    await event_bus.publish({"event": "plugins_changed", "plugin_key": plugin_key})
     return PluginToggleResponse(
         plugin=PluginResponse.model_validate(plugin),
         affected_printers=affected,
@@ -1285,6 +1282,8 @@ async def killswitch(
 
     # Reihenfolge beachten: abhaengige Tabellen zuerst loeschen
     tables_in_order: list[tuple[str, type]] = [
+        ("printer_slot_events_archive", PrinterSlotEventArchive),
+        ("spool_events_archive", SpoolEventArchive),
         ("printer_slot_events", PrinterSlotEvent),
         ("printer_slot_assignments", PrinterSlotAssignment),
         ("printer_slots", PrinterSlot),
@@ -1292,6 +1291,10 @@ async def killswitch(
         ("filament_printer_params", FilamentPrinterParam),
         ("spool_printer_params", SpoolPrinterParam),
         ("printers", Printer),
+        ("spool_weight_checkpoints", SpoolWeightCheckpoint),
+        ("consumption_daily", ConsumptionDaily),
+        ("spool_forecasts", SpoolForecast),
+        ("filament_forecasts", FilamentForecast),
         ("spool_events", SpoolEvent),
         ("spools", Spool),
         ("filament_ratings", FilamentRating),
@@ -1325,6 +1328,8 @@ async def killswitch(
     )
 
     response_cache.clear()
+    # Cached printer details of all workers
+    await event_bus.publish({"event": "printer_details_changed"})
 
     return KillswitchResponse(
         message=f"Killswitch executed. {total} rows deleted.",
@@ -1421,6 +1426,8 @@ async def _export_all_data(db: DBSession) -> dict[str, list[dict[str, Any]]]:
         ("printer_slots", PrinterSlot),
         ("printer_slot_assignments", PrinterSlotAssignment),
         ("printer_slot_events", PrinterSlotEvent),
+        ("spool_events_archive", SpoolEventArchive),
+        ("printer_slot_events_archive", PrinterSlotEventArchive),
     ]
 
     for table_name, model in tables_order:
@@ -1456,6 +1463,8 @@ async def _export_inventory_data(db: DBSession) -> dict[str, list[dict[str, Any]
         ("printer_slots", PrinterSlot),
         ("printer_slot_assignments", PrinterSlotAssignment),
         ("printer_slot_events", PrinterSlotEvent),
+        ("spool_events_archive", SpoolEventArchive),
+        ("printer_slot_events_archive", PrinterSlotEventArchive),
     ]
 
     for table_name, model in tables_order:
@@ -1624,9 +1633,15 @@ async def _delete_all_data(db: DBSession) -> dict[str, int]:
 
     # Reverse order: dependent tables first, then independent tables
     tables_order = [
+        ("printer_slot_events_archive", PrinterSlotEventArchive),
+        ("spool_events_archive", SpoolEventArchive),
         ("printer_slot_events", PrinterSlotEvent),
         ("printer_slot_assignments", PrinterSlotAssignment),
         ("printer_slots", PrinterSlot),
+        ("spool_weight_checkpoints", SpoolWeightCheckpoint),
+        ("consumption_daily", ConsumptionDaily),
+        ("spool_forecasts", SpoolForecast),
+        ("filament_forecasts", FilamentForecast),
         ("spool_events", SpoolEvent),
         ("spool_printer_params", SpoolPrinterParam),
         ("spools", Spool),
@@ -1675,9 +1690,15 @@ async def _delete_inventory_data(db: DBSession) -> dict[str, int]:
 
     # Reverse order: dependent tables first
     tables_order = [
+        ("printer_slot_events_archive", PrinterSlotEventArchive),
+        ("spool_events_archive", SpoolEventArchive),
         ("printer_slot_events", PrinterSlotEvent),
         ("printer_slot_assignments", PrinterSlotAssignment),
         ("printer_slots", PrinterSlot),
+        ("spool_weight_checkpoints", SpoolWeightCheckpoint),
+        ("consumption_daily", ConsumptionDaily),
+        ("spool_forecasts", SpoolForecast),
+        ("filament_forecasts", FilamentForecast),
         ("spool_events", SpoolEvent),
         ("spool_printer_params", SpoolPrinterParam),
         ("spools", Spool),
@@ -1725,6 +1746,8 @@ async def _import_inventory_data(
         ("printer_slots", PrinterSlot),
         ("printer_slot_assignments", PrinterSlotAssignment),
         ("printer_slot_events", PrinterSlotEvent),
+        ("spool_events_archive", SpoolEventArchive),
+        ("printer_slot_events_archive", PrinterSlotEventArchive),
     ]
 
     for table_name, model in tables_order:
@@ -1801,6 +1824,8 @@ async def _import_all_data(
         ("printer_slots", PrinterSlot),
         ("printer_slot_assignments", PrinterSlotAssignment),
         ("printer_slot_events", PrinterSlotEvent),
+        ("spool_events_archive", SpoolEventArchive),
+        ("printer_slot_events_archive", PrinterSlotEventArchive),
     ]
 
     for table_name, model in tables_order:
@@ -2023,6 +2048,8 @@ async def import_backup(
         logger.info(f"Backup import completed successfully by user {principal.user_id}")
 
         response_cache.clear()
+        # Cached printer details of all workers
+        await event_bus.publish({"event": "printer_details_changed"})
 
         # Step 4: Reinstall user-installed plugins from backup
         plugins_installed = None
@@ -2142,6 +2169,8 @@ async def import_inventory_backup(
         )
 
         response_cache.clear()
+        # Cached printer details of all workers
+        await event_bus.publish({"event": "printer_details_changed"})
 
         return BackupImportResponse(
             message=f"Inventory backup imported successfully. Auto-backup created at: {auto_backup_path.name}",
@@ -2322,6 +2351,8 @@ async def restore_sqlite_backup(
         )
 
     response_cache.clear()
+    # Cached printer details of all workers
+    await event_bus.publish({"event": "printer_details_changed"})
 
     return SqliteRestoreResponse(
         message=f"Database restored from '{body.filename}'. Please reload the application.",
@@ -9,6 +9,12 @@ from sqlalchemy import select
 from app.core.database import async_session_maker
 from app.core.security import hash_password_async
 from app.models.user import User
+from app.services.consumption_analytics_service import ConsumptionAnalyticsService
+from app.services.event_retention_service import EventRetentionService
+from app.services.inventory_aggregates import check_inventory, rebuild_inventory
+from app.services.logo_assets import rebuild_logo_assets
+from app.services.spool_counters import rebuild_spool_counters
+from app.services.spool_service import SpoolService
 
 
 async def reset_password_core(email: str, new_password: str, session) -> str:
@@ -40,6 +46,182 @@ async def reset_password_core(email: str, new_password: str, session) -> str:
     return f"Password reset successfully for user: {user.email}"
 
 
+async def rebuild_remaining_core(session, spool_ids: list[int] | None = None) -> str:
+    """
+    Rebuild remaining weights from the spool event history.
+
+    Args:
+        session: AsyncSession for database access
+        spool_ids: Restrict the rebuild to these spools (default: all)
+
+    Returns:
+        Summary string with the number of rebuilt and changed spools
+    """
+    counts = await SpoolService(session).rebuild_all_remaining_weights(
+        spool_ids=spool_ids
+    )
+    return (
+        f"Rebuilt {counts['spools']} spools: {counts['updated']} updated, "
+        f"{counts['emptied']} marked empty, {counts['blocked']} blocked (tara missing)"
+    )
+
+
+async def _run_rebuild_remaining(spool_ids: list[int] | None) -> int:
+    try:
+        async with async_session_maker() as session:
+            print(await rebuild_remaining_core(session, spool_ids))
+            return 0
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        return 1
+
+
+async def event_retention_core(session) -> str:
+    """
+    Apply the event retention policy configured in the app settings.
+
+    Args:
+        session: AsyncSession for database access
+
+    Returns:
+        Summary string with the number of rolled up and archived events
+    """
+    stats = await EventRetentionService(session).run()
+    return (
+        f"Rolled up {stats['consumption_events_rolled_up']} consumption events, "
+        f"archived {stats['spool_events_archived']} spool events and "
+        f"{stats['printer_slot_events_archived']} printer slot events"
+    )
+
+
+async def _run_event_retention() -> int:
+    try:
+        async with async_session_maker() as session:
+            print(await event_retention_core(session))
+            return 0
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        return 1
+
+
+async def backfill_consumption_core(session) -> str:
+    """
+    Rebuild the daily consumption rollup from the event history.
+
+    Args:
+        session: AsyncSession for database access
+
+    Returns:
+        Summary string with the number of events and rollup rows
+    """
+    stats = await ConsumptionAnalyticsService(session).backfill()
+    return (
+        f"Backfilled consumption rollup: {stats['events']} events "
+        f"into {stats['rows']} daily rows"
+    )
+
+
+async def _run_backfill_consumption() -> int:
+    try:
+        async with async_session_maker() as session:
+            print(await backfill_consumption_core(session))
+            return 0
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        return 1
+
+
+async def rebuild_counters_core(session) -> str:
+    """
+    Recount the spool counters stored on filaments and manufacturers.
+
+    Args:
+        session: AsyncSession for database access
+
+    Returns:
+        Summary string with the number of recounted rows
+    """
+    counts = await rebuild_spool_counters(session)
+    return (
+        f"Recounted spool counters of {counts['filaments']} filaments "
+        f"and {counts['manufacturers']} manufacturers"
+    )
+
+
+async def _run_rebuild_counters() -> int:
+    try:
+        async with async_session_maker() as session:
+            print(await rebuild_counters_core(session))
+            return 0
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        return 1
+
+
+async def rebuild_logos_core(session) -> str:
+    """
+    Create the content-hashed logo assets and size variants for all
+    manufacturer logos.
+
+    Args:
+        session: AsyncSession for database access
+
+    Returns:
+        Summary string with the number of updated manufacturers
+    """
+    changed = await rebuild_logo_assets(session)
+    return f"Rebuilt logo assets, {changed} manufacturers updated"
+
+
+async def _run_rebuild_logos() -> int:
+    try:
+        async with async_session_maker() as session:
+            print(await rebuild_logos_core(session))
+            return 0
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        return 1
+
+
+async def check_inventory_core(session, rebuild: bool = False) -> tuple[int, str]:
+    """
+    Compare the dashboard inventory aggregate with a recount of the spools.
+
+    Args:
+        session: AsyncSession for database access
+        rebuild: Rewrite the aggregate from the spools instead of checking
+
+    Returns:
+        Tuple of (exit code, summary string); exit code 1 if rows differ
+    """
+    if rebuild:
+        rows = await rebuild_inventory(session)
+        return 0, f"Rebuilt inventory aggregate, {rows} rows"
+
+    differences = await check_inventory(session)
+    if not differences:
+        return 0, "Inventory aggregate is consistent"
+    lines = [f"{len(differences)} inventory aggregate rows differ:"]
+    for diff in differences:
+        lines.append(
+            f"  filament {diff['filament_id']}, location {diff['location_id']}, "
+            f"{diff['fill_bucket']}: stored {diff['stored']}, expected {diff['expected']}"
+        )
+    lines.append("Run with --rebuild to repair")
+    return 1, "\n".join(lines)
+
+
+async def _run_check_inventory(rebuild: bool) -> int:
+    try:
+        async with async_session_maker() as session:
+            code, summary = await check_inventory_core(session, rebuild)
+            print(summary)
+            return code
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        return 1
+
+
 async def main_async() -> int:
     """
     CLI entry point for password reset.
@@ -68,8 +250,70 @@ async def main_async() -> int:
         default=None,
         help="New password (if not provided, will prompt interactively)"
     )
+
+    # rebuild-remaining subcommand
+    rebuild_parser = subparsers.add_parser(
+        "rebuild-remaining",
+        description="Recompute remaining weights of all spools from their events"
+    )
+    rebuild_parser.add_argument(
+        "--spool-id",
+        dest="spool_ids",
+        type=int,
+        action="append",
+        default=None,
+        help="Only rebuild this spool (can be given multiple times)"
+    )
+
+    # event-retention subcommand
+    subparsers.add_parser(
+        "event-retention",
+        description="Roll up and archive old events according to the app settings"
+    )
+
+    # backfill-consumption subcommand
+    subparsers.add_parser(
+        "backfill-consumption",
+        description="Rebuild the daily consumption rollup from spool events"
+    )
+
+    # rebuild-counters subcommand
+    subparsers.add_parser(
+        "rebuild-counters",
+        description="Recount the spool counters stored on filaments and manufacturers"
+    )
+
+    # rebuild-logos subcommand
+    subparsers.add_parser(
+        "rebuild-logos",
+        description="Create the content-hashed manufacturer logo assets and size variants"
+    )
+
+    # check-inventory subcommand
+    inventory_parser = subparsers.add_parser(
+        "check-inventory",
+        description="Compare the dashboard inventory aggregate with the spools"
+    )
+    inventory_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rewrite the aggregate from the spools"
+    )
     
     args = parser.parse_args()
+
+    if args.command == "rebuild-remaining":
+        return await _run_rebuild_remaining(args.spool_ids)
+    if args.command == "event-retention":
+        return await _run_event_retention()
+    if args.command == "backfill-consumption":
+        return await _run_backfill_consumption()
+    if args.command == "rebuild-counters":
+        return await _run_rebuild_counters()
+    if args.command == "rebuild-logos":
+        return await _run_rebuild_logos()
+    if args.command == "check-inventory":
+        return await _run_check_inventory(args.rebuild)
     
     # Get password - interactive or from argument
     if args.password:
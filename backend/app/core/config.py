@@ -55,6 +55,25 @@ class Settings(BaseSettings):
     # FilamentDB community database URL for lookup/autocomplete
     filamentdb_url: str = "https://db.filaman.app"
 
+    # nginx internal location aliasing MANUFACTURER_LOGO_DIR (e.g.
+    # "/_logos/"); logo responses are then sent via X-Accel-Redirect
+    logo_accel_redirect: str = ""
+
+    # Recompute cached dashboard statistics right after a change event
+    dashboard_background_refresh: bool = True
+
+    # Unix socket of the driver host process (python -m app.plugins.driver_host);
+    # empty runs the printer drivers inside the primary Gunicorn worker
+    driver_host_socket: str = ""
+    # Driver host processes; printers are split by printer_id % shards
+    driver_host_shards: int = 1
+
+    # Driver debug console: entries kept per driver, and characters of a
+    # payload before it is cut (streamed entries are cut further until they
+    # fit a 4 KB relay slot)
+    driver_debug_buffer_size: int = 200
+    driver_debug_max_payload: int = 2000
+
 
 settings = Settings()
 
@@ -1,25 +1,153 @@
-from sqlalchemy import select
+from sqlalchemy import func, insert, or_, select, union
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+# Neue Versuche, wenn ein paralleler Worker dieselbe freie ID belegt hat
+ID_ALLOCATION_ATTEMPTS = 5
+
+# Model -> Spalten von Verlaufstabellen, die IDs geloeschter Zeilen behalten
+_RETAINED_IDS: dict[type, list] = {}
+
+
+def retain_ids(Model, *columns) -> None:
+    """IDs von `Model`, die noch in `columns` stehen, nicht wieder vergeben.
+
+    Fuer Verlaufstabellen mit einfachen IDs ohne Fremdschluessel (z.B. die
+    Verbrauchs-Rollup-Tabelle): eine neu angelegte Zeile mit der ID einer
+    geloeschten wuerde deren Verlauf uebernehmen.
+    """
+    _RETAINED_IDS.setdefault(Model, []).extend(columns)
+
+
+def _taken_id_column(Model):
+    """Belegte IDs: die Zeilen von `Model` plus die der Verlaufstabellen."""
+    columns = _RETAINED_IDS.get(Model)
+    if not columns:
+        return Model.id
+    taken = union(
+        select(Model.id.label("id")),
+        *(select(column.label("id")) for column in columns),
+    ).subquery("taken")
+    return taken.c.id
 
 
 async def get_next_available_id(db: AsyncSession, Model) -> int:
-    """Findet die kleinste positive freie ID (Gap-Filling)."""
-    result = await db.execute(select(Model.id).order_by(Model.id))
-    existing_ids = set(result.scalars().all())
-    i = 1
-    while i in existing_ids:
-        i += 1
-    return i
+    """Findet die kleinste positive freie ID (Gap-Filling).
+
+    Die Lueckensuche laeuft als Anti-Join auf dem Primaerschluessel-Index in
+    der Datenbank; nur die gefundene ID wird uebertragen.
+    """
+    if Model in _RETAINED_IDS:
+        return (await get_next_available_ids(db, Model, 1))[0]
+
+    result = await db.execute(select(Model.id).where(Model.id == 1))
+    if result.scalar_one_or_none() is None:
+        return 1
+
+    successor = aliased(Model)
+    result = await db.execute(
+        select(Model.id + 1)
+        .where(
+            ~select(successor.id)
+            .where(successor.id == Model.id + 1)
+            .exists()
+        )
+        .order_by(Model.id)
+        .limit(1)
+    )
+    return result.scalar_one()
 
 
 async def get_next_available_ids(db: AsyncSession, Model, count: int) -> list[int]:
-    """Findet die `count` kleinsten freien IDs (Gap-Filling für Bulk-Operationen)."""
-    result = await db.execute(select(Model.id).order_by(Model.id))
-    existing_ids = set(result.scalars().all())
-    ids: list[int] = []
-    i = 1
-    while len(ids) < count:
-        if i not in existing_ids:
-            ids.append(i)
-        i += 1
-    return ids
+    """Findet die `count` kleinsten freien IDs (Gap-Filling für Bulk-Operationen).
+
+    Die Luecken werden per ``LEAD()`` als Bereiche (erste/letzte freie ID)
+    ermittelt; es werden hoechstens `count` Bereiche gelesen.  IDs, die noch
+    in Verlaufstabellen stehen (retain_ids), gelten als belegt.
+    """
+    taken_id = _taken_id_column(Model)
+    ordered = select(
+        taken_id.label("id"),
+        func.lead(taken_id).over(order_by=taken_id).label("next_id"),
+    ).subquery("ordered")
+    result = await db.execute(
+        select(ordered.c.id, ordered.c.next_id)
+        .where(
+            or_(ordered.c.next_id.is_(None), ordered.c.next_id > ordered.c.id + 1)
+        )
+        .order_by(ordered.c.id)
+        .limit(count)
+    )
+    gaps = result.all()
+
+    first_id = (await db.execute(select(func.min(_taken_id_column(Model))))).scalar()
+    ids: list[int] = list(range(1, min(first_id or count + 1, count + 1)))
+    for current, following in gaps:
+        if len(ids) >= count:
+            break
+        last_free = following - 1 if following is not None else current + count
+        ids.extend(range(current + 1, min(last_free, current + count) + 1))
+    return ids[:count]
+
+
+async def _ids_taken(db: AsyncSession, Model, ids: list[int]) -> bool:
+    result = await db.execute(select(Model.id).where(Model.id.in_(ids)).limit(1))
+    return result.first() is not None
+
+
+async def add_with_next_ids(db: AsyncSession, objects: list) -> None:
+    """Fuegt `objects` (gleiches Model) mit den kleinsten freien IDs ein.
+
+    Die IDs werden per Flush in einem Savepoint belegt.  Hat ein paralleler
+    Worker (Gunicorn) eine der IDs inzwischen vergeben, schlaegt der Insert
+    mit IntegrityError fehl und die Vergabe wird mit frisch gesuchten IDs
+    wiederholt.  Committet nicht.
+    """
+    Model = type(objects[0])
+    # Offene Aenderungen zuerst flushen, damit ein Rollback des Savepoints
+    # nur die neuen Objekte betrifft
+    await db.flush()
+
+    for attempt in range(ID_ALLOCATION_ATTEMPTS):
+        if len(objects) == 1:
+            ids = [await get_next_available_id(db, Model)]
+        else:
+            ids = await get_next_available_ids(db, Model, len(objects))
+        for obj, new_id in zip(objects, ids):
+            obj.id = new_id
+        try:
+            async with db.begin_nested():
+                db.add_all(objects)
+                await db.flush()
+            return
+        except IntegrityError:
+            if attempt == ID_ALLOCATION_ATTEMPTS - 1 or not await _ids_taken(
+                db, Model, ids
+            ):
+                raise
+
+
+async def insert_with_next_ids(db: AsyncSession, Model, rows: list[dict]) -> list[int]:
+    """Set-basierter INSERT von `rows` mit den kleinsten freien IDs.
+
+    Wie add_with_next_ids, aber als ein mehrzeiliger INSERT ohne ORM-Objekte
+    (keine Mapper-Events).  Gibt die vergebenen IDs in Reihenfolge von `rows`
+    zurueck.  Committet nicht.
+    """
+    await db.flush()
+
+    for attempt in range(ID_ALLOCATION_ATTEMPTS):
+        ids = await get_next_available_ids(db, Model, len(rows))
+        try:
+            async with db.begin_nested():
+                await db.execute(
+                    insert(Model),
+                    [{**row, "id": new_id} for row, new_id in zip(rows, ids)],
+                )
+            return ids
+        except IntegrityError:
+            if attempt == ID_ALLOCATION_ATTEMPTS - 1 or not await _ids_taken(
+                db, Model, ids
+            ):
+                raise
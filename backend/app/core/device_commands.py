@@ -0,0 +1,183 @@
+"""Dispatch of HTTP commands to devices (scales, RFID writers).
+
+Usage:
+    from app.core.device_commands import DeviceCommand, device_commands
+
+    device_commands.submit(DeviceCommand(device_id, url, payload))
+    await device_commands.report_write_status(device_id, {"status": "pending"})
+
+Commands are queued (bounded) and sent by a small pool of workers through
+one shared HTTP client.  Commands for the same device are sent one after
+another, commands for different devices concurrently.  A command is retried
+only if the device could not be connected; after a timeout the device may
+already be processing it, so it is not sent again.
+
+RFID write results are kept per device and published as
+``device_write_status`` events, so the UI is notified over SSE as soon as the
+device reports to /devices/rfid-result.  The status map is maintained from the
+events themselves and therefore also reflects results handled by other
+workers (see the relay in app/core/event_bus.py).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+
+from app.core.event_bus import event_bus
+
+logger = logging.getLogger(__name__)
+
+# Commands sent at the same time (to different devices)
+DISPATCH_CONCURRENCY = 8
+
+# Commands waiting to be sent; submit() fails beyond this
+DISPATCH_QUEUE_SIZE = 64
+
+# Connection attempts per command and the delay before the n-th retry
+DISPATCH_ATTEMPTS = 3
+DISPATCH_RETRY_DELAY = 0.5
+
+# Short timeout, the device only has to accept the command
+DEVICE_REQUEST_TIMEOUT = 5.0
+
+
+class DispatchQueueFull(Exception):
+    """Raised by submit() when too many commands are waiting."""
+
+
+@dataclass
+class DeviceCommand:
+    device_id: int
+    url: str
+    payload: dict[str, Any]
+    # Write status reported if the device cannot be reached at all
+    report_unreachable: bool = True
+
+
+class DeviceCommandDispatcher:
+    def __init__(
+        self,
+        concurrency: int = DISPATCH_CONCURRENCY,
+        queue_size: int = DISPATCH_QUEUE_SIZE,
+    ) -> None:
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self._queue: asyncio.Queue[DeviceCommand] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._device_locks: dict[int, asyncio.Lock] = {}
+        self._client: httpx.AsyncClient | None = None
+        self.write_status: dict[int, dict[str, Any]] = {}
+
+    # -- dispatch -----------------------------------------------------------
+
+    def submit(self, command: DeviceCommand) -> None:
+        """Queue *command*; returns immediately."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(command)
+        except asyncio.QueueFull:
+            raise DispatchQueueFull(f"{self.queue_size} device commands are already waiting")
+
+    def _ensure_started(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self.concurrency:
+            self._workers.append(asyncio.create_task(self._run_worker()))
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=DEVICE_REQUEST_TIMEOUT,
+                http2=False,
+                headers={
+                    "User-Agent": "FilaMan-Backend/1.0",
+                    "Accept": "application/json",
+                },
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                ),
+            )
+        return self._client
+
+    async def _run_worker(self) -> None:
+        while True:
+            command = await self._queue.get()
+            try:
+                lock = self._device_locks.setdefault(command.device_id, asyncio.Lock())
+                async with lock:
+                    await self._send(command)
+            except Exception:
+                logger.exception(f"Device command for device {command.device_id} failed")
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, command: DeviceCommand) -> None:
+        for attempt in range(DISPATCH_ATTEMPTS):
+            try:
+                await self._http().post(command.url, json=command.payload)
+                return
+            except httpx.ConnectError as e:
+                if attempt < DISPATCH_ATTEMPTS - 1:
+                    await asyncio.sleep(DISPATCH_RETRY_DELAY * (attempt + 1))
+                    continue
+                logger.warning(f"Could not reach device {command.device_id}: {e}")
+                if command.report_unreachable:
+                    await self.report_write_status(
+                        command.device_id,
+                        {"status": "error", "error_message": "Device not reachable"},
+                    )
+            except Exception as e:
+                # Log but don't fail - the device might still process the request
+                logger.warning(f"Could not reach device {command.device_id} for trigger: {e}")
+                return
+
+    async def join(self) -> None:
+        """Wait until all queued commands were sent (tests, shutdown)."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        for task in self._workers:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+        self._queue = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # -- write status ------------------------------------------------------
+
+    async def report_write_status(self, device_id: int, result: dict[str, Any]) -> None:
+        """Publish the RFID write status of *device_id* to all workers and UIs."""
+        await event_bus.publish(
+            {
+                "event": "device_write_status",
+                "device_id": device_id,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                **result,
+            }
+        )
+
+    def _on_event(self, event: dict[str, Any]) -> None:
+        if event.get("event") == "device_write_status":
+            status = {k: v for k, v in event.items() if k not in ("event", "device_id")}
+            self.write_status[event["device_id"]] = status
+
+
+# Singleton – one dispatcher per worker process
+device_commands = DeviceCommandDispatcher()
+event_bus.add_listener(device_commands._on_event)
@@ -0,0 +1,127 @@
+"""In-memory device presence with batched flushes to the devices table.
+
+Heartbeats only touch this registry.  Every worker flushes the presence it
+collected since the last flush as one executemany UPDATE
+(``_device_presence_loop`` in app/main.py), instead of one write
+transaction per heartbeat.
+
+Readers merge the registry with ``Device.last_seen_at``: heartbeats that
+reached this worker are seen immediately, heartbeats that reached another
+worker at most ``PRESENCE_FLUSH_INTERVAL`` seconds late, which is well
+inside the ``ONLINE_WINDOW``.
+
+Usage:
+    from app.core.device_presence import device_presence
+
+    device_presence.touch(device.id, ip_address)
+    device_presence.is_online(device)
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Device
+
+logger = logging.getLogger(__name__)
+
+# Seconds between batched flushes of collected heartbeats
+PRESENCE_FLUSH_INTERVAL = 30
+
+# A device counts as online if it was seen within this window
+ONLINE_WINDOW = timedelta(minutes=3)
+
+
+class DevicePresenceRegistry:
+    """Last heartbeat per device id, plus the set not yet flushed."""
+
+    def __init__(self) -> None:
+        self._seen: dict[int, tuple[datetime, str | None]] = {}
+        self._dirty: set[int] = set()
+
+    def touch(
+        self, device_id: int, ip_address: str | None, at: datetime | None = None
+    ) -> None:
+        self._seen[device_id] = (at or datetime.now(timezone.utc), ip_address)
+        self._dirty.add(device_id)
+
+    def last_seen(self, device: Device) -> datetime | None:
+        """Newest of the in-memory heartbeat and the stored last_seen_at."""
+        entry = self._seen.get(device.id)
+        if entry is None:
+            return device.last_seen_at
+        if device.last_seen_at is None or entry[0] > device.last_seen_at:
+            return entry[0]
+        return device.last_seen_at
+
+    def ip_address(self, device: Device) -> str | None:
+        entry = self._seen.get(device.id)
+        if entry is None or (
+            device.last_seen_at is not None and device.last_seen_at > entry[0]
+        ):
+            return device.ip_address
+        return entry[1]
+
+    def is_online(self, device: Device, now: datetime | None = None) -> bool:
+        seen = self.last_seen(device)
+        if seen is None:
+            return False
+        return (now or datetime.now(timezone.utc)) - seen < ONLINE_WINDOW
+
+    def recently_seen_ids(self, now: datetime | None = None) -> list[int]:
+        threshold = (now or datetime.now(timezone.utc)) - ONLINE_WINDOW
+        return [device_id for device_id, (at, _) in self._seen.items() if at >= threshold]
+
+    def forget(self, device_id: int) -> None:
+        self._seen.pop(device_id, None)
+        self._dirty.discard(device_id)
+
+    def clear(self) -> None:
+        self._seen.clear()
+        self._dirty.clear()
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Write pending heartbeats in one statement and commit.
+
+        Rows are only moved forward in time, so a late flush from one worker
+        never overwrites a newer heartbeat flushed by another.  Returns the
+        number of devices written.
+        """
+        if not self._dirty:
+            return 0
+        pending = self._dirty
+        self._dirty = set()
+        rows = [
+            {"b_id": device_id, "b_seen": self._seen[device_id][0], "b_ip": self._seen[device_id][1]}
+            for device_id in pending
+            if device_id in self._seen
+        ]
+        if not rows:
+            return 0
+
+        table = Device.__table__
+        stmt = (
+            update(table)
+            .where(
+                table.c.id == bindparam("b_id"),
+                or_(table.c.last_seen_at.is_(None), table.c.last_seen_at < bindparam("b_seen")),
+            )
+            .values(last_seen_at=bindparam("b_seen"), ip_address=bindparam("b_ip"))
+        )
+        try:
+            await db.execute(stmt, rows)
+            await db.commit()
+        except Exception:
+            # Keep the heartbeats for the next attempt
+            self._dirty |= pending
+            raise
+        logger.debug("Flushed presence of %d device(s)", len(rows))
+        return len(rows)
+
+
+# Singleton – one registry per worker process
+device_presence = DevicePresenceRegistry()
@@ -14,20 +14,54 @@ Usage:
 import asyncio
 import json
 import logging
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, Callable
+
+from app.core.shared_events import SharedEventRing
 
 logger = logging.getLogger(__name__)
 
+# Seconds between polls of the cross-worker relay
+RELAY_POLL_INTERVAL = 0.2
+
+# Events for listeners (and the other workers) only, not for the SSE stream
+# of every frontend; e.g. driver debug entries go to their own stream
+LISTENER_ONLY_EVENTS = frozenset({"driver_debug", "driver_debug_lease"})
+
 
 class EventBus:
-    """Simple in-process pub/sub using asyncio.Queue per subscriber."""
+    """Simple in-process pub/sub using asyncio.Queue per subscriber.
+
+    With start_relay() events are also exchanged with the other Gunicorn
+    workers through a SharedEventRing, so SSE clients see events no matter
+    which worker handled the originating request.
+    """
 
     def __init__(self) -> None:
         self._subscribers: list[asyncio.Queue[str]] = []
+        self._listeners: list[Callable[[dict[str, Any]], None]] = []
+        self._relay: SharedEventRing | None = None
+        self._relay_task: asyncio.Task | None = None
 
     async def publish(self, event: dict[str, Any]) -> None:
         """Broadcast event to all connected SSE clients."""
+        self.publish_nowait(event)
+
+    def publish_nowait(self, event: dict[str, Any]) -> None:
+        """Synchronous publish, e.g. from an ORM session listener."""
         data = json.dumps(event)
+        self._deliver(data, event)
+        if self._relay is not None:
+            self._relay.append(data)
+
+    def _deliver(self, data: str, event: dict[str, Any]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Event listener failed")
+        if event.get("event") in LISTENER_ONLY_EVENTS:
+            return
+
         dead: list[asyncio.Queue[str]] = []
         for queue in self._subscribers:
             try:
@@ -39,6 +73,13 @@ class EventBus:
             self._subscribers.remove(q)
             logger.warning("Dropped slow SSE subscriber")
 
+    def add_listener(self, listener: Callable[[dict[str, Any]], None]) -> None:
+        """Call *listener* synchronously for every event, including relayed ones."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[dict[str, Any]], None]) -> None:
+        self._listeners.remove(listener)
+
     async def subscribe(self) -> AsyncGenerator[str, None]:
         """Yield SSE-formatted messages for one client connection."""
         queue: asyncio.Queue[str] = asyncio.Queue(maxsize=64)
@@ -50,5 +91,39 @@ class EventBus:
         finally:
             self._subscribers.remove(queue)
 
+    # -- cross-worker relay ------------------------------------------------
+
+    def start_relay(self, ring: SharedEventRing | None = None) -> None:
+        """Attach to the shared ring and start delivering foreign events."""
+        ring = ring or SharedEventRing()
+        try:
+            ring.attach()
+        except Exception as exc:
+            logger.warning(f"Event relay unavailable, events stay in this worker: {exc}")
+            return
+        self._relay = ring
+        self._relay_task = asyncio.create_task(self._pump_relay())
+
+    async def stop_relay(self) -> None:
+        if self._relay_task is not None:
+            self._relay_task.cancel()
+            try:
+                await self._relay_task
+            except asyncio.CancelledError:
+                pass
+            self._relay_task = None
+        if self._relay is not None:
+            self._relay.close()
+            self._relay = None
+
+    async def _pump_relay(self) -> None:
+        while True:
+            await asyncio.sleep(RELAY_POLL_INTERVAL)
+            try:
+                for data in self._relay.read_new():
+                    self._deliver(data, json.loads(data))
+            except Exception:
+                logger.exception("Event relay read failed")
+
 
 event_bus = EventBus()
@@ -0,0 +1,150 @@
+"""Cross-worker relay for event bus messages via multiprocessing.shared_memory.
+
+Every Gunicorn worker has its own in-process EventBus, so an event published
+in one worker (e.g. a device reporting to /rfid-result) would only reach the
+SSE clients connected to that worker.  Published events are therefore also
+appended to a shared ring buffer; each worker polls the ring and delivers
+the events of the other workers to its local subscribers.
+
+Memory layout:
+  [8 bytes uint64 LE — sequence number of the next event]
+  SLOT_COUNT slots of SLOT_SIZE bytes:
+    [8 bytes uint64 LE — sequence, 0 while being written]
+    [4 bytes uint32 LE — pid of the publishing worker]
+    [4 bytes uint32 LE — payload length]
+    [N bytes — JSON payload]
+
+Writers serialize via an flock on a lock file; readers detect slots that
+were overwritten while reading by comparing the slot sequence before and
+after the copy.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import logging
+import os
+import struct
+import tempfile
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_SHM_NAME = "filaman_events"
+SLOT_COUNT = 256
+SLOT_SIZE = 4096
+_HEADER_FMT = "<Q"  # uint64 LE (next sequence)
+_HEADER_SIZE = struct.calcsize(_HEADER_FMT)
+_SLOT_HEADER_FMT = "<QII"  # sequence, pid, payload length
+_SLOT_HEADER_SIZE = struct.calcsize(_SLOT_HEADER_FMT)
+MAX_PAYLOAD = SLOT_SIZE - _SLOT_HEADER_SIZE
+_SHM_SIZE = _HEADER_SIZE + SLOT_COUNT * SLOT_SIZE
+
+
+class SharedEventRing:
+    """Fixed-size ring of JSON events shared by all workers."""
+
+    def __init__(self, name: str = _SHM_NAME, origin: int | None = None) -> None:
+        self.name = name
+        self.origin = origin if origin is not None else os.getpid()
+        self._shm: shared_memory.SharedMemory | None = None
+        self._lock_path = Path(tempfile.gettempdir()) / f"{name}.lock"
+        self._lock_fd = None
+        self._last_seq = 0
+
+    def attach(self) -> None:
+        """Create or attach to the block; only events from now on are read."""
+        if self._shm is not None:
+            return
+        try:
+            self._shm = shared_memory.SharedMemory(name=self.name, create=True, size=_SHM_SIZE)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=self.name, create=False)
+        # The block outlives single workers (restarts, takeover); keep the
+        # resource tracker from unlinking it when this process exits
+        try:
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        except Exception:
+            pass
+        self._lock_fd = open(self._lock_path, "w")
+        self._last_seq = self._next_seq() - 1
+
+    def _next_seq(self) -> int:
+        (seq,) = struct.unpack_from(_HEADER_FMT, self._shm.buf, 0)
+        # Sequence 0 marks a slot being written, so numbering starts at 1
+        return max(seq, 1)
+
+    def append(self, data: str) -> bool:
+        """Append one event; returns False if it does not fit into a slot."""
+        if self._shm is None:
+            return False
+        payload = data.encode()
+        if len(payload) > MAX_PAYLOAD:
+            logger.warning("SharedEventRing: event too large (%d bytes), not relayed", len(payload))
+            return False
+
+        buf = self._shm.buf
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            seq = self._next_seq()
+            offset = _HEADER_SIZE + (seq % SLOT_COUNT) * SLOT_SIZE
+            struct.pack_into(_SLOT_HEADER_FMT, buf, offset, 0, self.origin, len(payload))
+            start = offset + _SLOT_HEADER_SIZE
+            buf[start : start + len(payload)] = payload
+            struct.pack_into("<Q", buf, offset, seq)
+            struct.pack_into(_HEADER_FMT, buf, 0, seq + 1)
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        return True
+
+    def read_new(self) -> list[str]:
+        """Events appended by other workers since the previous call.
+
+        Own events are skipped, the publisher delivers them locally.
+        """
+        if self._shm is None:
+            return []
+        buf = self._shm.buf
+        next_seq = self._next_seq()
+        first = self._last_seq + 1
+        if next_seq - first > SLOT_COUNT:
+            logger.warning(
+                "SharedEventRing: %d event(s) overwritten before they were read",
+                next_seq - first - SLOT_COUNT,
+            )
+            first = next_seq - SLOT_COUNT
+
+        events: list[str] = []
+        for seq in range(first, next_seq):
+            offset = _HEADER_SIZE + (seq % SLOT_COUNT) * SLOT_SIZE
+            slot_seq, origin, length = struct.unpack_from(_SLOT_HEADER_FMT, buf, offset)
+            if slot_seq != seq or length > MAX_PAYLOAD:
+                continue
+            start = offset + _SLOT_HEADER_SIZE
+            payload = bytes(buf[start : start + length])
+            (check_seq,) = struct.unpack_from("<Q", buf, offset)
+            if check_seq != seq or origin == self.origin:
+                continue
+            events.append(payload.decode())
+        self._last_seq = max(self._last_seq, next_seq - 1)
+        return events
+
+    def close(self) -> None:
+        """Close the handles; the block stays for the other workers."""
+        if self._shm is not None:
+            try:
+                self._shm.close()
+            except Exception:
+                pass
+            self._shm = None
+        if self._lock_fd is not None:
+            self._lock_fd.close()
+            self._lock_fd = None
+
+    def unlink(self) -> None:
+        """Remove the block (tests and tooling only)."""
+        try:
+            shared_memory.SharedMemory(name=self.name, create=False).unlink()
+        except FileNotFoundError:
+            pass
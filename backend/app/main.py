@@ -5,6 +5,7 @@ import json as _json
 import os
 from pathlib import Path
 import tempfile
+import threading
 import time
 
 from fastapi import FastAPI
@@ -18,11 +19,17 @@ from app.api.auth_oidc import router as auth_oidc_router
 from app.api.v1.router import api_router, mount_deferred_plugin_routers
 from app.core.config import settings, MANUFACTURER_LOGO_DIR
 from app.core.database import async_session_maker
+from app.core.device_commands import device_commands
+from app.core.device_presence import PRESENCE_FLUSH_INTERVAL, device_presence
+from app.core.event_bus import event_bus
 from app.core.logging_config import setup_logging
 from app.core.middleware import AuthMiddleware, CsrfMiddleware, RequestIdMiddleware
 from app.core.seeds import run_all_seeds
 from app.core.shared_health import shared_health_store
-from app.plugins.manager import plugin_manager
+from app.plugins.host_client import DriverHostClient
+from app.plugins.manager import RECONCILE_INTERVAL, plugin_manager
+from app.services.event_retention_service import EventRetentionService
+from app.services.inventory_snapshot_service import InventorySnapshotService
 from app.services.plugin_service import PLUGINS_DIR
 
 setup_logging()
@@ -36,7 +43,9 @@ logger = __import__("logging").getLogger(__name__)
 _STARTUP_LOCK_PATH = Path(tempfile.gettempdir()) / "filaman-startup.lock"
 _is_primary = False
 _lock_fd = None
-_WATCHDOG_INTERVAL = 60  # seconds
+_HEALTH_PUBLISH_INTERVAL = 30  # seconds
+_RETENTION_INTERVAL = 24 * 60 * 60  # seconds
+_SNAPSHOT_INTERVAL = 60 * 60  # seconds
 
 
 def run_migrations() -> None:
@@ -62,131 +71,142 @@ def run_migrations() -> None:
 # ---------------------------------------------------------------------------
 # Driver watchdog – runs in every Gunicorn worker as a background task.
 #
-# Primary worker:  periodically checks driver health and restarts dead
-#                  drivers or starts missing ones.
-# Secondary workers: periodically try to acquire the startup lock.  If they
-#                    succeed the previous primary is gone and they take over
-#                    driver management.
+# Dead drivers are restarted by the plugin manager as soon as they report it
+# (liveness callback, with backoff) and printer/plugin changes arrive as
+# invalidation events, so the primary worker only publishes driver health
+# for the secondaries here and runs a full reconcile against the DB every
+# RECONCILE_INTERVAL as a safety net.
+# With a driver host (DRIVER_HOST_SOCKET) the host supervises the drivers;
+# the workers only refresh their driver proxies.
 # ---------------------------------------------------------------------------
 async def _driver_watchdog() -> None:
-    """Background task: monitors driver health and handles primary failover."""
-    global _is_primary, _lock_fd
-
-    # Give the primary worker time to finish initial startup.
-    await asyncio.sleep(30)
+    """Background task: publishes driver health and reconciles the drivers."""
+    last_reconcile = time.monotonic()
 
     while True:
+        await asyncio.sleep(_HEALTH_PUBLISH_INTERVAL)
         try:
-            if _is_primary:
-                await _watchdog_health_check()
-            else:
-                await _watchdog_try_takeover()
+            reconcile = time.monotonic() - last_reconcile >= RECONCILE_INTERVAL
+            if reconcile:
+                last_reconcile = time.monotonic()
+            if plugin_manager.hosted:
+                if reconcile:
+                    await plugin_manager.refresh_remote_drivers()
+            elif _is_primary:
+                # Publish current health to shared memory so secondary
+                # workers can return accurate status to the frontend.
+                health = await plugin_manager.get_health()
+                if health:
+                    shared_health_store.publish(health)
+                if reconcile:
+                    await plugin_manager.check_drivers()
         except asyncio.CancelledError:
             raise
         except Exception:
             logger.exception("Driver watchdog error (will retry next cycle)")
 
-        await asyncio.sleep(_WATCHDOG_INTERVAL)
 
+# ---------------------------------------------------------------------------
+# Primary takeover – secondary workers wait on the startup lock with a
+# blocking flock.  The kernel releases the lock the moment the primary exits,
+# so the waiting worker takes over right away instead of at its next poll.
+# ---------------------------------------------------------------------------
+async def _await_primary_lock() -> None:
+    """Background task: promotes this worker once the startup lock is free."""
+    global _is_primary, _lock_fd
 
-async def _watchdog_health_check() -> None:
-    """Primary worker: restart dead drivers and start missing ones."""
-    from app.models.printer import Printer
-    from app.models.plugin import InstalledPlugin
-    from sqlalchemy import select
+    loop = asyncio.get_running_loop()
+    acquired: asyncio.Future = loop.create_future()
 
-    health = plugin_manager.get_health()
+    def hand_over(fd) -> None:
+        if acquired.done():  # task cancelled meanwhile, let the next worker have it
+            fd.close()
+        else:
+            acquired.set_result(fd)
 
-    # Publish current health to shared memory so secondary workers
-    # can return accurate status to the frontend.
-    if health:
-        shared_health_store.publish(health)
+    def wait_for_lock() -> None:
+        try:
+            fd = open(_STARTUP_LOCK_PATH, "w")
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except OSError as exc:
+            logger.warning(f"Waiting for the startup lock failed: {exc}")
+            return
+        try:
+            loop.call_soon_threadsafe(hand_over, fd)
+        except RuntimeError:  # worker already shut down
+            fd.close()
+
+    # Daemon thread: a flock still blocking must not hold up the worker exit
+    threading.Thread(target=wait_for_lock, name="startup-lock", daemon=True).start()
+    fd = await acquired
+
+    _lock_fd = fd
+    _is_primary = True
+    logger.info("Startup lock released by the primary – promoted to primary worker")
+    if not plugin_manager.hosted:
+        plugin_manager.enable_supervision()
+        await plugin_manager.start_all()
+        logger.info("Drivers started after takeover")
 
-    # Deaktivierte Plugins ermitteln
-    async with async_session_maker() as db:
-        disabled_result = await db.execute(
-            select(InstalledPlugin.driver_key).where(
-                InstalledPlugin.is_active.is_(False),
-                InstalledPlugin.driver_key.isnot(None),
-            )
-        )
-        disabled_drivers = {r for r in disabled_result.scalars().all()}
 
-    # 1. Restart drivers that report running=False
-    for printer_id, status in list(health.items()):
-        if not status.get("running", True):
-            logger.warning(
-                f"Watchdog: driver for printer {printer_id} not running, restarting"
-            )
-            await plugin_manager.stop_printer(printer_id)
-            # Reload printer from DB to get current config
-            async with async_session_maker() as db:
-                result = await db.execute(
-                    select(Printer).where(
-                        Printer.id == printer_id,
-                        Printer.is_active == True,
-                        Printer.deleted_at.is_(None),
-                    )
-                )
-                printer = result.scalar_one_or_none()
-            if printer:
-                if printer.driver_key in disabled_drivers:
-                    logger.info(
-                        f"Watchdog: skipping printer {printer_id}: plugin '{printer.driver_key}' is deactivated"
-                    )
-                    continue
-                started = await plugin_manager.start_printer(printer)
-                if started:
-                    logger.info(f"Watchdog: restarted driver for printer {printer_id}")
-                else:
-                    logger.error(
-                        f"Watchdog: failed to restart driver for printer {printer_id}"
-                    )
+# ---------------------------------------------------------------------------
+# Event retention – rolls up and archives old spool/slot events once a day.
+# Runs in every worker but only acts while the worker is primary, so it
+# follows a takeover.
+# ---------------------------------------------------------------------------
+async def _event_retention_loop() -> None:
+    """Background task: applies the event retention policy from AppSettings."""
+    await asyncio.sleep(300)
 
-    # 2. Start drivers for active printers that have no driver in memory
-    async with async_session_maker() as db:
-        result = await db.execute(
-            select(Printer).where(
-                Printer.is_active == True,
-                Printer.deleted_at.is_(None),
-            )
-        )
-        active_printers = result.scalars().all()
-
-    for printer in active_printers:
-        if printer.id not in plugin_manager.drivers:
-            if printer.driver_key in disabled_drivers:
-                continue
-            logger.info(
-                f"Watchdog: no driver for active printer {printer.id}, starting"
-            )
-            started = await plugin_manager.start_printer(printer)
-            if started:
-                logger.info(f"Watchdog: started driver for printer {printer.id}")
-            else:
-                logger.error(
-                    f"Watchdog: failed to start driver for printer {printer.id}"
-                )
+    while True:
+        try:
+            if _is_primary:
+                async with async_session_maker() as db:
+                    await EventRetentionService(db).run()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Event retention failed (will retry next cycle)")
 
+        await asyncio.sleep(_RETENTION_INTERVAL)
 
-async def _watchdog_try_takeover() -> None:
-    """Secondary worker: try to become primary if the lock is available."""
-    global _is_primary, _lock_fd
 
-    try:
-        fd = open(_STARTUP_LOCK_PATH, "w")
-        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
-        # Lock acquired – previous primary is gone.
-        _lock_fd = fd
-        _is_primary = True
-        logger.info("Watchdog: acquired lock – promoted to primary worker")
-        await plugin_manager.start_all()
-        logger.info("Watchdog: drivers started after takeover")
-    except OSError:
-        # Primary still holds the lock – nothing to do.
-        pass
-    except Exception:
-        logger.exception("Watchdog: takeover attempt failed")
+# ---------------------------------------------------------------------------
+# Inventory snapshots – the primary worker refreshes today's snapshot of the
+# inventory aggregate every hour and thins out old snapshots.
+# ---------------------------------------------------------------------------
+async def _inventory_snapshot_loop() -> None:
+    """Background task: records the daily inventory snapshots."""
+    await asyncio.sleep(120)
+
+    while True:
+        try:
+            if _is_primary:
+                async with async_session_maker() as db:
+                    await InventorySnapshotService(db).run()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Inventory snapshot failed (will retry next cycle)")
+
+        await asyncio.sleep(_SNAPSHOT_INTERVAL)
+
+
+# ---------------------------------------------------------------------------
+# Device presence – every worker flushes the heartbeats it received in one
+# batched UPDATE instead of committing each heartbeat.
+# ---------------------------------------------------------------------------
+async def _device_presence_loop() -> None:
+    """Background task: writes collected device heartbeats to the DB."""
+    while True:
+        await asyncio.sleep(PRESENCE_FLUSH_INTERVAL)
+        try:
+            async with async_session_maker() as db:
+                await device_presence.flush(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Device presence flush failed (will retry next cycle)")
 
 
 @asynccontextmanager
@@ -229,31 +249,61 @@ async def lifespan(app: FastAPI):
         logger.warning(f"Startup lock failed ({exc}), running seeds as fallback")
         _is_primary = True
 
+    if settings.driver_host_socket:
+        # Drivers run in the driver host process (app/plugins/driver_host.py)
+        plugin_manager.use_host(
+            DriverHostClient(settings.driver_host_socket, settings.driver_host_shards)
+        )
+        await plugin_manager.refresh_remote_drivers()
+
     if _is_primary:
         async with async_session_maker() as db:
             await run_all_seeds(db)
-        await plugin_manager.start_all()
-        # Publish initial health so secondary workers have data immediately
-        initial_health = plugin_manager.get_health()
-        if initial_health:
-            shared_health_store.publish(initial_health)
-
-    # Start the driver watchdog in every worker (handles health checks
-    # for the primary and automatic takeover for secondary workers).
+        if not plugin_manager.hosted:
+            plugin_manager.enable_supervision()
+            await plugin_manager.start_all()
+            # Publish initial health so secondary workers have data immediately
+            initial_health = await plugin_manager.get_health()
+            if initial_health:
+                shared_health_store.publish(initial_health)
+
+    # Exchange SSE events with the other workers
+    event_bus.start_relay()
+
+    # Start the driver watchdog in every worker; secondary workers also
+    # wait for the startup lock to take over when the primary exits.
     watchdog_task = asyncio.create_task(_driver_watchdog())
+    takeover_task = None if _is_primary else asyncio.create_task(_await_primary_lock())
+    retention_task = asyncio.create_task(_event_retention_loop())
+    presence_task = asyncio.create_task(_device_presence_loop())
+    snapshot_task = asyncio.create_task(_inventory_snapshot_loop())
 
     logger.info("FilaMan backend started")
     yield
     logger.info("Shutting down FilaMan backend...")
 
-    # Cancel the watchdog first
-    watchdog_task.cancel()
+    # Cancel the background tasks first
+    for task in (watchdog_task, takeover_task, retention_task, presence_task, snapshot_task):
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    await device_commands.close()
+    await event_bus.stop_relay()
+
+    # Persist heartbeats received since the last flush
     try:
-        await watchdog_task
-    except asyncio.CancelledError:
-        pass
+        async with async_session_maker() as db:
+            await device_presence.flush(db)
+    except Exception:
+        logger.exception("Final device presence flush failed")
 
     if _is_primary:
+        plugin_manager.disable_supervision()
         await plugin_manager.stop_all()
         # Clean up shared health memory (primary is the owner)
         shared_health_store.cleanup()
@@ -471,7 +521,7 @@ async def health_ready():
         logger.error(f"DB health check failed: {e}")
 
     plugins_ok = True
-    plugin_health = plugin_manager.get_health()
+    plugin_health = await plugin_manager.get_health()
     for printer_id, health in plugin_health.items():
         if health.get("status") == "error":
             plugins_ok = False
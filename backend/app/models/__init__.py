@@ -3,7 +3,7 @@ from app.models.filament import Color, Filament, FilamentColor, FilamentPrinterP
 from app.models.location import Location
 from app.models.printer import Printer, PrinterSlot, PrinterSlotAssignment, PrinterSlotEvent
 from app.models.rbac import Permission, Role, RolePermission, UserPermission, UserRole
-from app.models.spool import Spool, SpoolEvent, SpoolStatus
+from app.models.spool import Spool, SpoolEvent, SpoolStatus, SpoolWeightCheckpoint
 from app.models.user import OAuthIdentity, User, UserApiKey, UserSession
 from app.models.device import Device
 from app.models.plugin import InstalledPlugin
@@ -11,6 +11,10 @@ from app.models.system_extra_field import SystemExtraField
 from app.models.printer_params import FilamentPrinterParam, SpoolPrinterParam
 from app.models.oidc_settings import OIDCAuthState, OIDCSettings
 from app.models.app_settings import AppSettings
+from app.models.event_archive import PrinterSlotEventArchive, SpoolEventArchive
+from app.models.consumption import ConsumptionDaily
+from app.models.forecast import FilamentForecast, SpoolForecast
+from app.models.inventory import InventoryAggregate, InventorySnapshot
 
 __all__ = [
     "Base",
@@ -33,6 +37,7 @@ __all__ = [
     "Spool",
     "SpoolEvent",
     "SpoolStatus",
+    "SpoolWeightCheckpoint",
     "OAuthIdentity",
     "User",
     "UserApiKey",
@@ -45,4 +50,11 @@ __all__ = [
     "OIDCSettings",
     "OIDCAuthState",
     "AppSettings",
+    "SpoolEventArchive",
+    "PrinterSlotEventArchive",
+    "ConsumptionDaily",
+    "SpoolForecast",
+    "FilamentForecast",
+    "InventoryAggregate",
+    "InventorySnapshot",
 ]
@@ -1,6 +1,6 @@
 """AppSettings model for global application configuration."""
 
-from sqlalchemy import Boolean, String
+from sqlalchemy import Boolean, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base, TimestampMixin
@@ -18,3 +18,11 @@ class AppSettings(Base, TimestampMixin):
     id: Mapped[int] = mapped_column(autoincrement=True, primary_key=True)
     login_disabled: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     currency: Mapped[str] = mapped_column(String(3), default="EUR", nullable=False)
+
+    # Event retention policy (0 = disabled), applied by the retention job
+    event_rollup_after_days: Mapped[int] = mapped_column(
+        Integer, default=0, nullable=False
+    )
+    event_archive_after_months: Mapped[int] = mapped_column(
+        Integer, default=0, nullable=False
+    )
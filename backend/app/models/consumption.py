@@ -0,0 +1,170 @@
+"""Daily consumption rollups maintained from print_consumption events.
+
+One row per spool and UTC day.  The row keeps the filament, manufacturer,
+material, location and printer the spool had when the day's first
+consumption was written, so analytics reflect where filament was used at
+the time rather than where the spool is now.  All references are plain
+ids without foreign keys, so the usage of deleted spools stays in the
+analytics; deleting a spool's events along with the spool leaves its rows
+alone.  Spool, filament and manufacturer ids still referenced here are not
+given to new rows (``retain_ids``), so history is never merged into a new
+spool.
+"""
+
+from datetime import date, datetime, timezone
+
+from sqlalchemy import (
+    Date,
+    Float,
+    Integer,
+    String,
+    UniqueConstraint,
+    event,
+    inspect,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.orm import Mapped, mapped_column, object_session
+from sqlalchemy.orm.util import identity_key
+
+from app.core.db_utils import retain_ids
+from app.models.base import Base
+from app.models.event_archive import SpoolEventArchive
+from app.models.filament import Filament, Manufacturer
+from app.models.printer import PrinterSlot, PrinterSlotAssignment
+from app.models.spool import Spool, SpoolEvent
+
+
+class ConsumptionDaily(Base):
+    __tablename__ = "consumption_daily"
+    __table_args__ = (
+        UniqueConstraint("day", "spool_id", name="uq_consumption_daily_day_spool"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    spool_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+
+    filament_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    manufacturer_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    material_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    location_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    printer_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    consumed_g: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+retain_ids(Spool, ConsumptionDaily.spool_id, SpoolEventArchive.spool_id)
+retain_ids(Filament, ConsumptionDaily.filament_id)
+retain_ids(Manufacturer, ConsumptionDaily.manufacturer_id)
+
+
+def consumption_day(moment: datetime) -> date:
+    """UTC calendar day an event is accounted to."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).date()
+
+
+def spool_dimensions_query(spool_ids):
+    """Current filament/manufacturer/material/location/printer per spool."""
+    printer_id = (
+        select(PrinterSlot.printer_id)
+        .join(PrinterSlotAssignment, PrinterSlotAssignment.slot_id == PrinterSlot.id)
+        .where(PrinterSlotAssignment.spool_id == Spool.id)
+        .order_by(PrinterSlotAssignment.present.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Spool.id.label("spool_id"),
+            Spool.filament_id,
+            Filament.manufacturer_id,
+            Filament.material_type.label("material_type"),
+            Spool.location_id,
+            printer_id.label("printer_id"),
+        )
+        .join(Filament, Filament.id == Spool.filament_id)
+        .where(Spool.id.in_(spool_ids))
+    )
+
+
+def _apply_consumption(
+    connection, spool_id: int, event_at: datetime, consumed_g: float, events: int
+) -> None:
+    table = ConsumptionDaily.__table__
+    day = consumption_day(event_at)
+    result = connection.execute(
+        update(table)
+        .where(table.c.day == day, table.c.spool_id == spool_id)
+        .values(
+            consumed_g=table.c.consumed_g + consumed_g,
+            event_count=table.c.event_count + events,
+        )
+    )
+    if result.rowcount or events <= 0:
+        return
+
+    dims = connection.execute(spool_dimensions_query([spool_id])).mappings().one_or_none()
+    if dims is None:
+        return
+    connection.execute(
+        insert(table).values(
+            day=day, consumed_g=consumed_g, event_count=events, **dims
+        )
+    )
+
+
+def _consumed_g(event_type: str | None, delta_weight_g: float | None) -> float | None:
+    if event_type != "print_consumption":
+        return None
+    return -(delta_weight_g or 0.0)
+
+
+@event.listens_for(SpoolEvent, "after_insert")
+def _consumption_event_inserted(mapper, connection, target: SpoolEvent) -> None:
+    consumed = _consumed_g(target.event_type, target.delta_weight_g)
+    if consumed is not None:
+        _apply_consumption(connection, target.spool_id, target.event_at, consumed, 1)
+
+
+def _spool_deleted(target: SpoolEvent) -> bool:
+    """True if *target* is deleted by the delete cascade of its spool."""
+    session = object_session(target)
+    if session is None:
+        return False
+    spool = session.identity_map.get(identity_key(Spool, target.spool_id))
+    return spool is not None and spool in session.deleted
+
+
+@event.listens_for(SpoolEvent, "after_delete")
+def _consumption_event_deleted(mapper, connection, target: SpoolEvent) -> None:
+    if _spool_deleted(target):
+        return
+    consumed = _consumed_g(target.event_type, target.delta_weight_g)
+    if consumed is not None:
+        _apply_consumption(connection, target.spool_id, target.event_at, -consumed, -1)
+
+
+@event.listens_for(SpoolEvent, "after_update")
+def _consumption_event_updated(mapper, connection, target: SpoolEvent) -> None:
+    attrs = inspect(target).attrs
+
+    def previous(name: str):
+        history = getattr(attrs, name).history
+        return history.deleted[0] if history.deleted else getattr(target, name)
+
+    old = (previous("event_type"), previous("delta_weight_g"), previous("event_at"))
+    new = (target.event_type, target.delta_weight_g, target.event_at)
+    if old == new:
+        return
+
+    old_consumed = _consumed_g(old[0], old[1])
+    if old_consumed is not None:
+        _apply_consumption(connection, target.spool_id, old[2], -old_consumed, -1)
+    new_consumed = _consumed_g(new[0], new[1])
+    if new_consumed is not None:
+        _apply_consumption(connection, target.spool_id, new[2], new_consumed, 1)
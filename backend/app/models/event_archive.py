@@ -0,0 +1,67 @@
+"""Cold storage for spool and printer slot events.
+
+Rows are moved here by the event retention job (see
+app/services/event_retention_service.py); ``event_id`` keeps the id the row
+had in the live table.  There are no foreign keys so archived history
+survives deleted spools, printers and slots.
+"""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Float, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, TZDateTime
+
+
+class SpoolEventArchive(Base):
+    __tablename__ = "spool_events_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    event_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    spool_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+
+    event_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    event_at: Mapped[datetime] = mapped_column(TZDateTime(), nullable=False, index=True)
+
+    user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    device_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    source: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    delta_weight_g: Mapped[float | None] = mapped_column(Float, nullable=True)
+    measured_weight_g: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    from_status_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    to_status_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    from_location_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    to_location_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    note: Mapped[str | None] = mapped_column(Text, nullable=True)
+    meta: Mapped[dict[str, Any] | None] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(TZDateTime(), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        TZDateTime(), default=func.now(), nullable=False
+    )
+
+
+class PrinterSlotEventArchive(Base):
+    __tablename__ = "printer_slot_events_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    event_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    printer_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    slot_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    event_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    event_at: Mapped[datetime] = mapped_column(TZDateTime(), nullable=False, index=True)
+
+    spool_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    rfid_uid: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    external_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+
+    meta: Mapped[dict[str, Any] | None] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(TZDateTime(), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        TZDateTime(), default=func.now(), nullable=False
+    )
@@ -26,6 +26,28 @@ class Manufacturer(Base, TimestampMixin):
 
     custom_fields: Mapped[dict[str, Any] | None] = mapped_column(nullable=True)
 
+    # Aggregates of the filaments and their spools, kept current by
+    # app/services/spool_counters.py
+    filament_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    spool_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    archived_spool_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    total_remaining_weight_g: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0, server_default="0"
+    )
+    total_price_available: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0, server_default="0"
+    )
+    total_price_all: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0, server_default="0"
+    )
+    materials: Mapped[list[str] | None] = mapped_column(nullable=True, default=list)
+
     filaments: Mapped[list["Filament"]] = relationship(back_populates="manufacturer")
 
 
@@ -83,6 +105,23 @@ class Filament(Base, TimestampMixin):
 
     custom_fields: Mapped[dict[str, Any] | None] = mapped_column(nullable=True)
 
+    # Aggregates of the spools, kept current by app/services/spool_counters.py
+    spool_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0", index=True
+    )
+    archived_spool_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    total_remaining_weight_g: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0, server_default="0"
+    )
+    total_price_available: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0, server_default="0"
+    )
+    total_price_all: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0, server_default="0"
+    )
+
     manufacturer: Mapped["Manufacturer"] = relationship(back_populates="filaments")
     filament_colors: Mapped[list["FilamentColor"]] = relationship(
         back_populates="filament", cascade="all, delete-orphan"
@@ -0,0 +1,42 @@
+"""Exponentially weighted consumption rates for days-until-empty forecasts.
+
+``decayed_g`` is a decaying sum of consumed grams: every new consumption
+first decays the previous value by ``exp(-dt / tau)`` and then adds its
+grams.  ``rate_g_per_day`` (``decayed_g / tau``) is the smoothed usage rate
+as of ``last_event_at``.  Rows are maintained by ForecastService.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, Float, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, TZDateTime
+
+
+class SpoolForecast(Base):
+    __tablename__ = "spool_forecasts"
+
+    spool_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("spools.id", ondelete="CASCADE"), primary_key=True
+    )
+    decayed_g: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    rate_g_per_day: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0, index=True
+    )
+    last_event_at: Mapped[datetime] = mapped_column(TZDateTime(), nullable=False)
+    low_stock: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+
+class FilamentForecast(Base):
+    __tablename__ = "filament_forecasts"
+
+    filament_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("filaments.id", ondelete="CASCADE"), primary_key=True
+    )
+    decayed_g: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    rate_g_per_day: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0, index=True
+    )
+    last_event_at: Mapped[datetime] = mapped_column(TZDateTime(), nullable=False)
+    low_stock: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
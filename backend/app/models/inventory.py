@@ -0,0 +1,67 @@
+"""Inventory aggregate of the non-archived spools and its daily snapshots.
+
+``InventoryAggregate`` holds one row per filament, location and fill bucket
+with the number of spools, their remaining grams and their purchase value.
+Material type and manufacturer come from the filament at query time, so
+editing a filament needs no maintenance here.  The rows are recounted per
+filament together with the spool counters
+(app/services/inventory_aggregates.py).
+
+``InventorySnapshot`` keeps the stock per UTC day, material, manufacturer
+and location for trend charts (app/services/inventory_snapshot_service.py).
+Like the consumption rollup it stores plain ids, so history survives
+deleted manufacturers and locations.  Manufacturer ids still referenced
+here are not given to new manufacturers (``retain_ids``); location ids are
+never reused.
+"""
+
+from datetime import date
+
+from sqlalchemy import Date, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db_utils import retain_ids
+from app.models.base import Base
+from app.models.filament import Manufacturer
+
+# Fill buckets of the dashboard distribution; "unknown" holds spools
+# without remaining weight
+FILL_BUCKETS = ("empty", "critical", "low", "normal", "full", "unknown")
+
+
+class InventoryAggregate(Base):
+    __tablename__ = "inventory_aggregates"
+    __table_args__ = (
+        Index("ix_inventory_aggregates_filament_location", "filament_id", "location_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    filament_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("filaments.id", ondelete="CASCADE"), nullable=False
+    )
+    location_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("locations.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    fill_bucket: Mapped[str] = mapped_column(String(10), nullable=False)
+
+    spool_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    remaining_weight_g: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    value: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+
+class InventorySnapshot(Base):
+    __tablename__ = "inventory_snapshots"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+
+    material_type: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    manufacturer_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    location_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    spool_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    remaining_weight_g: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    value: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+
+retain_ids(Manufacturer, InventorySnapshot.manufacturer_id)
@@ -1,12 +1,19 @@
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import Float, ForeignKey, Index, Integer, String, Text, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Float, ForeignKey, Index, Integer, String, Text, delete, event, func, inspect
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from app.models.base import Base, TimestampMixin, TZDateTime
 
 
+def normalize_rfid_uid(uid: str | None) -> str | None:
+    """Canonical form of an RFID UID: trimmed and lowercase, empty -> None."""
+    if uid is None:
+        return None
+    return uid.strip().lower() or None
+
+
 class SpoolStatus(Base, TimestampMixin):
     __tablename__ = "spool_statuses"
 
@@ -89,6 +96,14 @@ class Spool(Base, TimestampMixin):
     printer_params: Mapped[list["SpoolPrinterParam"]] = relationship(
         back_populates="spool", cascade="all, delete-orphan"
     )
+    weight_checkpoints: Mapped[list["SpoolWeightCheckpoint"]] = relationship(
+        back_populates="spool", cascade="all, delete-orphan"
+    )
+
+    @validates("rfid_uid")
+    def _normalize_rfid_uid(self, key: str, value: str | None) -> str | None:
+        # Stored lowercase so tag lookups can use the plain unique index
+        return normalize_rfid_uid(value)
 
 
 class SpoolEvent(Base):
@@ -149,6 +164,65 @@ class SpoolEvent(Base):
     )
 
 
+class SpoolWeightCheckpoint(Base):
+    """Replay state of a spool's remaining weight after a given event.
+
+    rebuild_remaining_weight() resumes from the latest checkpoint whose tara
+    and weight inputs still match the spool instead of replaying the full
+    history.  Checkpoints at or after a changed event are deleted by the
+    SpoolEvent mapper listeners below.
+    """
+
+    __tablename__ = "spool_weight_checkpoints"
+    __table_args__ = (
+        Index("ix_spool_weight_checkpoints_spool_event_at", "spool_id", "event_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    spool_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("spools.id", ondelete="CASCADE"), nullable=False
+    )
+    event_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("spool_events.id", ondelete="CASCADE"), nullable=False
+    )
+    event_at: Mapped[datetime] = mapped_column(TZDateTime(), nullable=False)
+
+    remaining_weight_g: Mapped[float] = mapped_column(Float, nullable=False)
+    tara_g: Mapped[float] = mapped_column(Float, nullable=False)
+    initial_total_weight_g: Mapped[float | None] = mapped_column(Float, nullable=True)
+    empty_spool_weight_g: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        TZDateTime(), default=func.now(), nullable=False
+    )
+
+    spool: Mapped["Spool"] = relationship(back_populates="weight_checkpoints")
+
+
+def _invalidate_weight_checkpoints(connection, spool_id: int, since: datetime) -> None:
+    connection.execute(
+        delete(SpoolWeightCheckpoint.__table__).where(
+            SpoolWeightCheckpoint.spool_id == spool_id,
+            SpoolWeightCheckpoint.event_at >= since,
+        )
+    )
+
+
+@event.listens_for(SpoolEvent, "after_insert")
+@event.listens_for(SpoolEvent, "after_delete")
+def _spool_event_written(mapper, connection, target: SpoolEvent) -> None:
+    _invalidate_weight_checkpoints(connection, target.spool_id, target.event_at)
+
+
+@event.listens_for(SpoolEvent, "after_update")
+def _spool_event_updated(mapper, connection, target: SpoolEvent) -> None:
+    # An edited event may also have moved in time; invalidate from the
+    # earlier of its old and new position.
+    moved_from = inspect(target).attrs.event_at.history.deleted or ()
+    since = min([target.event_at, *[at for at in moved_from if at is not None]])
+    _invalidate_weight_checkpoints(connection, target.spool_id, since)
+
+
 from app.models.filament import Filament
 from app.models.user import User
 from app.models.device import Device
@@ -1,12 +1,29 @@
+import itertools
+import json
+import time
 from abc import ABC, abstractmethod
 from collections import deque
 from datetime import datetime, timezone
 from typing import Any, Callable
 
+# Sequence numbers of debug entries: increasing across all drivers of the
+# process and, starting at the current time in microseconds, across restarts
+_debug_seq = itertools.count(time.time_ns() // 1000)
+
 
 class BaseDriver(ABC):
     driver_key: str = ""
 
+    # Liveness callback, set by the plugin manager: called with the driver
+    # when _running drops from True to False (may run on a driver thread)
+    on_stopped: Callable[["BaseDriver"], None] | None = None
+
+    # Debug console, configured by the plugin manager: on_debug is called
+    # with the driver and every new entry (may run on a driver thread)
+    on_debug: Callable[["BaseDriver", dict[str, Any]], None] | None = None
+    debug_buffer_size: int = 200
+    debug_max_payload: int = 2000
+
     def __init__(
         self,
         printer_id: int,
@@ -17,9 +34,20 @@ class BaseDriver(ABC):
         self.config = config
         self.emit = emitter
         self._running = False
-        self._debug_log: deque[dict[str, Any]] = deque(maxlen=50)
+        self._debug_log: deque[dict[str, Any]] = deque(maxlen=self.debug_buffer_size)
         self._debug_enabled = False
 
+    @property
+    def _running(self) -> bool:
+        return self.__dict__.get("_running_state", False)
+
+    @_running.setter
+    def _running(self, value: bool) -> None:
+        was_running = self.__dict__.get("_running_state", False)
+        self.__dict__["_running_state"] = value
+        if was_running and not value and self.on_stopped is not None:
+            self.on_stopped(self)
+
     @abstractmethod
     async def start(self) -> None:
         pass
@@ -47,15 +75,42 @@ class BaseDriver(ABC):
         """Add a message to the debug ring buffer (only when debug console is open)."""
         if not self._debug_enabled:
             return
-        self._debug_log.append({
+        entry = {
+            "seq": next(_debug_seq),
             "ts": datetime.now(timezone.utc).isoformat(),
             "dir": direction,
             "topic": topic,
             "payload": payload,
-        })
+        }
+        # Entries are streamed as JSON: cut long payloads, stringify the rest
+        if isinstance(payload, (bytes, bytearray)):
+            payload = entry["payload"] = payload.decode("utf-8", "replace")
+        if isinstance(payload, str):
+            text = payload
+        else:
+            try:
+                text = json.dumps(payload)
+            except (TypeError, ValueError):
+                text = json.dumps(payload, default=str)
+                entry["payload"] = json.loads(text)
+        if len(text) > self.debug_max_payload:
+            entry["payload"] = text[: self.debug_max_payload]
+            entry["truncated"] = len(text)
+        self._debug_log.append(entry)
+        if self.on_debug is not None:
+            self.on_debug(self, entry)
 
-    def get_debug_log(self, since_ts: str | None = None) -> list[dict[str, Any]]:
-        """Return debug log entries, optionally filtered by timestamp."""
+    def get_debug_log(
+        self, since_ts: str | None = None, since_seq: int | None = None
+    ) -> list[dict[str, Any]]:
+        """Return debug log entries, optionally only those after *since_seq*."""
+        if since_seq is not None:
+            newer: list[dict[str, Any]] = []
+            for entry in reversed(self._debug_log):
+                if entry["seq"] <= since_seq:
+                    break
+                newer.append(entry)
+            return newer[::-1]
         if since_ts:
             return [e for e in self._debug_log if e["ts"] > since_ts]
         return list(self._debug_log)
@@ -67,6 +122,8 @@ class BaseDriver(ABC):
 
     def enable_debug_log(self) -> None:
         """Enable debug logging (called when console is opened)."""
+        if self._debug_log.maxlen != self.debug_buffer_size:
+            self._debug_log = deque(self._debug_log, maxlen=self.debug_buffer_size)
         self._debug_enabled = True
 
     def disable_debug_log(self) -> None:
@@ -0,0 +1,329 @@
+"""Out-of-process host for the printer drivers.
+
+By default the drivers run inside the primary Gunicorn worker, on the same
+event loop that serves HTTP requests, and a dead primary means a watchdog
+takeover by another worker.  With ``DRIVER_HOST_SOCKET`` set the drivers
+run in this separate process instead::
+
+    python -m app.plugins.driver_host [--socket PATH] [--shards N]
+
+* The host runs its own PluginManager: it writes slot changes to the DB and
+  publishes events through the shared event ring, where the API workers pick
+  them up like the events of any other worker.
+* Commands and health go over a Unix socket, one JSON line per request and
+  reply (client side: app/plugins/host_client.py).  After every change of
+  the running drivers the host publishes ``drivers_changed`` so the workers
+  refresh their RemoteDriver proxies.
+* The host supervises its drivers like the primary worker does without a
+  host: liveness callbacks, ``printer_changed`` / ``plugins_changed``
+  events and a full reconcile every ``RECONCILE_INTERVAL`` seconds.
+  With ``--shards N`` a supervisor runs one child host per shard
+  (printer ``n`` belongs to shard ``n % N``, listening on ``PATH.<shard>``)
+  and restarts children that exit.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from app.core.config import settings
+from app.core.event_bus import event_bus
+from app.models import Printer
+from app.plugins.host_client import (
+    MAX_MESSAGE,
+    DriverHostError,
+    shard_for,
+    socket_path,
+)
+from app.plugins.manager import RECONCILE_INTERVAL, PluginManager
+
+logger = logging.getLogger(__name__)
+
+# Seconds a crashed shard process waits before it is started again
+RESTART_DELAY = 5
+
+
+def public_methods(driver: Any) -> list[str]:
+    """Driver methods the API workers may call through the host."""
+    return sorted(
+        name
+        for name in dir(driver)
+        if not name.startswith("_") and callable(getattr(driver, name, None))
+    )
+
+
+class DriverHostServer:
+    def __init__(self, manager: PluginManager, path: str) -> None:
+        self.manager = manager
+        self.path = path
+        self._server: asyncio.AbstractServer | None = None
+        self._ops: dict[str, Callable[[dict[str, Any]], Awaitable[Any]]] = {
+            "ping": self._op_ping,
+            "drivers": self._op_drivers,
+            "health": self._op_health,
+            "start": self._op_start,
+            "stop": self._op_stop,
+            "reconnect_all": self._op_reconnect_all,
+            "unload": self._op_unload,
+            "call": self._op_call,
+        }
+
+    async def start(self) -> None:
+        # A socket file left behind by a crashed host blocks the bind
+        Path(self.path).unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(
+            self._serve, path=self.path, limit=MAX_MESSAGE
+        )
+        logger.info(f"Driver host listening on {self.path}")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        Path(self.path).unlink(missing_ok=True)
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            line = await reader.readline()
+            if line:
+                reply = await self.handle(json.loads(line))
+                writer.write(json.dumps(reply, default=str).encode() + b"\n")
+                await writer.drain()
+        except Exception:
+            logger.exception("Driver host request failed")
+        finally:
+            writer.close()
+
+    async def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        op = self._ops.get(request.get("op"))
+        if op is None:
+            return {
+                "ok": False,
+                "code": "unknown_op",
+                "message": f"Unknown operation '{request.get('op')}'",
+            }
+        try:
+            result = await op(request)
+        except DriverHostError as e:
+            return {"ok": False, "code": e.code, "message": str(e)}
+        except Exception as e:
+            logger.exception(f"Driver host operation '{request.get('op')}' failed")
+            return {"ok": False, "code": "host_error", "message": str(e)}
+        return {"ok": True, "result": result}
+
+    async def publish_changed(self) -> None:
+        await event_bus.publish(
+            {"event": "drivers_changed", "printers": sorted(self.manager.drivers)}
+        )
+
+    # -- operations -----------------------------------------------------
+
+    async def _op_ping(self, request: dict[str, Any]) -> dict[str, Any]:
+        return {"pid": os.getpid(), "printers": sorted(self.manager.drivers)}
+
+    async def _op_drivers(self, request: dict[str, Any]) -> dict[int, Any]:
+        return {
+            printer_id: {
+                "driver_key": driver.driver_key,
+                "methods": public_methods(driver),
+                "health": await self.manager.printer_health(printer_id),
+            }
+            for printer_id, driver in list(self.manager.drivers.items())
+        }
+
+    async def _op_health(self, request: dict[str, Any]) -> Any:
+        if "printer_id" in request:
+            return await self.manager.printer_health(request["printer_id"])
+        return await self.manager.get_health()
+
+    async def _op_start(self, request: dict[str, Any]) -> dict[str, Any]:
+        printer_id = request["printer_id"]
+        # Transient instance with the fields the driver needs; the worker
+        # sends them so the host does not depend on its commit being visible
+        printer = Printer(
+            id=printer_id,
+            driver_key=request["driver_key"],
+            driver_config=request.get("driver_config") or {},
+        )
+        started = await self.manager.start_printer(printer)
+        await self.publish_changed()
+        return {
+            "started": started,
+            "health": self.manager.health_status.get(printer_id),
+        }
+
+    async def _op_stop(self, request: dict[str, Any]) -> None:
+        await self.manager.stop_printer(request["printer_id"])
+        await self.publish_changed()
+
+    async def _op_reconnect_all(self, request: dict[str, Any]) -> dict[int, str]:
+        results = await self.manager.reconnect_all()
+        await self.publish_changed()
+        return results
+
+    async def _op_unload(self, request: dict[str, Any]) -> None:
+        await self.manager.unload_driver(request["driver_key"])
+        await self.publish_changed()
+
+    async def _op_call(self, request: dict[str, Any]) -> Any:
+        driver = self.manager.drivers.get(request["printer_id"])
+        if driver is None:
+            raise DriverHostError(
+                "driver_not_running", "Driver is not running for this printer"
+            )
+        name = request.get("method") or ""
+        method = getattr(driver, name, None)
+        if name.startswith("_") or not callable(method):
+            raise DriverHostError("invalid_action", f"Action '{name}' not available")
+        try:
+            result = method(**(request.get("params") or {}))
+            if inspect.isawaitable(result):
+                result = await result
+        except TypeError as e:
+            raise DriverHostError("invalid_params", str(e)) from e
+        except Exception as e:
+            raise DriverHostError("action_failed", str(e)) from e
+        return result
+
+    # -- supervision ----------------------------------------------------
+
+    async def supervise(self) -> None:
+        """Full reconcile of the drivers as a safety net for missed events."""
+        while True:
+            await asyncio.sleep(RECONCILE_INTERVAL)
+            try:
+                before = set(self.manager.drivers)
+                await self.manager.check_drivers()
+                if set(self.manager.drivers) != before:
+                    await self.publish_changed()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Driver host supervision failed (will retry next cycle)")
+
+
+async def run_host(path: str, shard: int = 0, shards: int = 1) -> None:
+    """Run the drivers of one shard until SIGTERM/SIGINT."""
+    from app.plugins.manager import plugin_manager
+
+    if shards > 1:
+        plugin_manager.printer_filter = lambda printer_id: (
+            shard_for(printer_id, shards) == shard
+        )
+    event_bus.start_relay()
+    server = DriverHostServer(plugin_manager, path)
+    await server.start()
+    plugin_manager.enable_supervision()
+    await plugin_manager.start_all()
+    await server.publish_changed()
+    supervise_task = asyncio.create_task(server.supervise())
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    logger.info(f"Driver host {path} shutting down")
+    supervise_task.cancel()
+    try:
+        await supervise_task
+    except asyncio.CancelledError:
+        pass
+    await server.close()
+    plugin_manager.disable_supervision()
+    await plugin_manager.stop_all()
+    await event_bus.stop_relay()
+
+
+def supervise_shards(path: str, shards: int) -> None:
+    """Run one host process per shard and restart the ones that exit."""
+    stopping = False
+
+    def stop(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    def spawn(shard: int) -> subprocess.Popen:
+        logger.info(f"Starting driver host shard {shard}/{shards}")
+        return subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "app.plugins.driver_host",
+                "--socket",
+                path,
+                "--shards",
+                str(shards),
+                "--shard",
+                str(shard),
+            ]
+        )
+
+    children = {shard: spawn(shard) for shard in range(shards)}
+    exited: dict[int, float] = {}
+    while not stopping:
+        time.sleep(1)
+        for shard, child in list(children.items()):
+            if child.poll() is None:
+                continue
+            now = time.monotonic()
+            if shard not in exited:
+                logger.error(
+                    f"Driver host shard {shard} exited with code {child.returncode}"
+                )
+                exited[shard] = now
+            elif now - exited[shard] >= RESTART_DELAY and not stopping:
+                del exited[shard]
+                children[shard] = spawn(shard)
+
+    for child in children.values():
+        if child.poll() is None:
+            child.terminate()
+    for child in children.values():
+        try:
+            child.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            child.kill()
+
+
+def main(argv: list[str] | None = None) -> None:
+    from app.core.logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="FilaMan printer driver host")
+    parser.add_argument("--socket", default=settings.driver_host_socket)
+    parser.add_argument("--shards", type=int, default=settings.driver_host_shards)
+    parser.add_argument("--shard", type=int, default=None)
+    args = parser.parse_args(argv)
+    if not args.socket:
+        parser.error("no socket: pass --socket or set DRIVER_HOST_SOCKET")
+
+    setup_logging()
+    if args.shards > 1 and args.shard is None:
+        supervise_shards(args.socket, args.shards)
+    else:
+        shard = args.shard or 0
+        asyncio.run(
+            run_host(socket_path(args.socket, shard, args.shards), shard, args.shards)
+        )
+
+
+if __name__ == "__main__":
+    main()
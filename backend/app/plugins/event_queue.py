@@ -0,0 +1,162 @@
+"""Bounded per-printer queue for driver events.
+
+Drivers emit events synchronously (from the event loop or from a client
+thread such as an MQTT callback).  Each printer gets one queue with a single
+consumer task, so its events are handled one at a time and in order, and a
+chatty or misbehaving driver cannot flood the primary worker with
+concurrent DB-writing tasks.
+
+* State snapshots (``COALESCED_EVENTS``, e.g. ``slots_update``) are
+  latest-wins: while one is waiting, a newer snapshot of the same type
+  replaces it in place.
+* Other events are dropped when ``max_size`` events are waiting; drops are
+  counted and logged at most every ``DROP_LOG_INTERVAL`` seconds.
+* ``close()`` stops accepting events and drains the waiting ones (bounded by
+  ``DRAIN_TIMEOUT``) before the consumer is cancelled.
+
+``stats()`` reports the counters; the plugin manager adds them to the
+driver health as ``event_queue``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Events waiting per printer before new events are dropped
+EVENT_QUEUE_SIZE = 100
+
+# Event types that describe a full state; only the newest waiting one counts
+COALESCED_EVENTS = frozenset({"slots_update", "printer_status"})
+
+# Seconds close() waits for waiting events to be handled
+DRAIN_TIMEOUT = 5.0
+
+# Minimum seconds between two "events dropped" warnings of one printer
+DROP_LOG_INTERVAL = 60.0
+
+
+class PrinterEventQueue:
+    def __init__(
+        self,
+        printer_id: int,
+        handler: Callable[[dict[str, Any]], Awaitable[None]],
+        max_size: int = EVENT_QUEUE_SIZE,
+    ) -> None:
+        self.printer_id = printer_id
+        self.max_size = max_size
+        self._handler = handler
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        # Waiting entries: event dicts, or the type of a coalesced event
+        # whose newest payload is kept in _latest
+        self._pending: deque[dict[str, Any] | str] = deque()
+        self._latest: dict[str, dict[str, Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._closed = False
+        self._last_drop_log = 0.0
+        self._counters = {"received": 0, "handled": 0, "coalesced": 0, "dropped": 0, "failed": 0}
+        self._max_depth = 0
+        self._task = self._loop.create_task(self._consume())
+
+    # -- producer -------------------------------------------------------
+
+    def put(self, event: dict[str, Any]) -> None:
+        """Queue *event*; safe to call from any thread, never blocks."""
+        if threading.get_ident() == self._thread_id:
+            self._put(event)
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._put, event)
+            except RuntimeError:  # loop closed during shutdown
+                pass
+
+    def _put(self, event: dict[str, Any]) -> None:
+        if self._closed:
+            return
+        self._counters["received"] += 1
+        event_type = event.get("event_type")
+
+        if event_type in COALESCED_EVENTS:
+            if event_type in self._latest:
+                self._latest[event_type] = event
+                self._counters["coalesced"] += 1
+                return
+            if len(self._pending) < self.max_size:
+                self._latest[event_type] = event
+                self._pending.append(event_type)
+            else:
+                self._drop(event_type)
+                return
+        elif len(self._pending) < self.max_size:
+            self._pending.append(event)
+        else:
+            self._drop(event_type)
+            return
+
+        self._max_depth = max(self._max_depth, len(self._pending))
+        self._idle.clear()
+        self._wakeup.set()
+
+    def _drop(self, event_type: str | None) -> None:
+        self._counters["dropped"] += 1
+        now = time.monotonic()
+        if now - self._last_drop_log >= DROP_LOG_INTERVAL:
+            self._last_drop_log = now
+            logger.warning(
+                f"Event queue of printer {self.printer_id} is full ({self.max_size}), "
+                f"dropping {event_type} ({self._counters['dropped']} dropped so far)"
+            )
+
+    # -- consumer -------------------------------------------------------
+
+    async def _consume(self) -> None:
+        while True:
+            if not self._pending:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            entry = self._pending.popleft()
+            event = self._latest.pop(entry) if isinstance(entry, str) else entry
+            try:
+                await self._handler(event)
+                self._counters["handled"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._counters["failed"] += 1
+                logger.error(
+                    f"Error handling event {event.get('event_type')} "
+                    f"for printer {self.printer_id}: {e}",
+                    exc_info=True,
+                )
+
+    async def close(self, timeout: float = DRAIN_TIMEOUT) -> None:
+        """Stop accepting events, handle the waiting ones, stop the consumer."""
+        self._closed = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Event queue of printer {self.printer_id}: "
+                f"{len(self._pending)} events not handled before shutdown"
+            )
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def stats(self) -> dict[str, int]:
+        return {**self._counters, "depth": len(self._pending), "max_depth": self._max_depth}
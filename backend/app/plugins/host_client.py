@@ -0,0 +1,165 @@
+"""API-worker side of the driver host (see app/plugins/driver_host.py).
+
+``DriverHostClient`` sends one newline-delimited JSON request per Unix
+socket connection and returns the ``result`` of the reply; failed requests
+raise ``DriverHostError`` with the ``code`` the host reported, or
+``host_unavailable`` if the host could not be reached.
+
+``RemoteDriver`` stands in for a driver running in the host, so code that
+works with ``plugin_manager.drivers`` does not need to know where the
+driver runs: ``health()`` returns the health of the last refresh and every
+public driver method becomes a coroutine function executed by the host.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Coroutine
+
+logger = logging.getLogger(__name__)
+
+# Seconds a request may take (connect + reply) unless the caller says otherwise
+REQUEST_TIMEOUT = 10.0
+
+# Driver actions and reconnects talk to the printer and may take longer
+ACTION_TIMEOUT = 30.0
+RECONNECT_TIMEOUT = 120.0
+
+# Largest request/reply line (debug logs can be large)
+MAX_MESSAGE = 4 * 1024 * 1024
+
+
+def shard_for(printer_id: int, shards: int) -> int:
+    """Driver host shard that runs the drivers of *printer_id*."""
+    return printer_id % max(shards, 1)
+
+
+def socket_path(base: str, shard: int, shards: int) -> str:
+    """Socket of *shard*; a single host listens on *base* itself."""
+    return base if shards <= 1 else f"{base}.{shard}"
+
+
+class DriverHostError(Exception):
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class DriverHostClient:
+    def __init__(self, base_path: str, shards: int = 1) -> None:
+        self.base_path = base_path
+        self.shards = max(shards, 1)
+
+    async def request(
+        self, shard: int, op: str, timeout: float = REQUEST_TIMEOUT, **params: Any
+    ) -> Any:
+        path = socket_path(self.base_path, shard, self.shards)
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_unix_connection(path, limit=MAX_MESSAGE), timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise DriverHostError(
+                "host_unavailable", f"Driver host {path} not reachable: {e!r}"
+            ) from e
+
+        try:
+            writer.write(json.dumps({"op": op, **params}).encode() + b"\n")
+            await writer.drain()
+            line = await asyncio.wait_for(reader.readline(), timeout)
+        except (OSError, ValueError, asyncio.TimeoutError) as e:
+            raise DriverHostError(
+                "host_unavailable", f"No reply from driver host {path} to '{op}': {e!r}"
+            ) from e
+        finally:
+            writer.close()
+
+        if not line:
+            raise DriverHostError(
+                "host_unavailable", f"Driver host {path} closed the connection"
+            )
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise DriverHostError(
+                reply.get("code", "host_error"), reply.get("message", "")
+            )
+        return reply.get("result")
+
+    async def printer_request(
+        self, printer_id: int, op: str, timeout: float = REQUEST_TIMEOUT, **params: Any
+    ) -> Any:
+        """Send *op* to the shard that runs *printer_id*."""
+        return await self.request(
+            shard_for(printer_id, self.shards),
+            op,
+            timeout=timeout,
+            printer_id=printer_id,
+            **params,
+        )
+
+    async def broadcast(
+        self, op: str, timeout: float = REQUEST_TIMEOUT, **params: Any
+    ) -> dict[int, Any]:
+        """Send *op* to every shard; returns {shard: result}.
+
+        Unreachable or failing shards are logged and left out.
+        """
+        results = await asyncio.gather(
+            *(
+                self.request(shard, op, timeout=timeout, **params)
+                for shard in range(self.shards)
+            ),
+            return_exceptions=True,
+        )
+        replies: dict[int, Any] = {}
+        for shard, result in enumerate(results):
+            if isinstance(result, DriverHostError):
+                logger.warning(f"Driver host shard {shard}: '{op}' failed: {result}")
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                replies[shard] = result
+        return replies
+
+
+class RemoteDriver:
+    def __init__(
+        self,
+        client: DriverHostClient,
+        printer_id: int,
+        driver_key: str,
+        methods: list[str],
+        health: dict[str, Any] | None = None,
+    ) -> None:
+        self._client = client
+        self.printer_id = printer_id
+        self.driver_key = driver_key
+        self.methods = frozenset(methods)
+        self._health = health or {}
+
+    def health(self) -> dict[str, Any]:
+        return self._health
+
+    def __getattr__(self, name: str) -> Callable[..., Coroutine[Any, Any, Any]]:
+        if name.startswith("_") or name not in self.__dict__.get("methods", ()):
+            raise AttributeError(name)
+
+        async def call(**params: Any) -> Any:
+            try:
+                return await self._client.printer_request(
+                    self.printer_id,
+                    "call",
+                    timeout=ACTION_TIMEOUT,
+                    method=name,
+                    params=params,
+                )
+            except DriverHostError as e:
+                # Same exception the endpoints get from a local driver
+                if e.code == "invalid_params":
+                    raise TypeError(str(e)) from e
+                raise
+
+        call.__name__ = name
+        return call
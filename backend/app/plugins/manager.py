@@ -4,14 +4,15 @@ import json
 import logging
 import shutil
 import sys
+import time
 from pathlib import Path
 from typing import Any, Callable
 
-from sqlalchemy import select, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm.attributes import flag_modified
 
 from app.core.cache import response_cache
+from app.core.config import settings
 from app.core.database import async_session_maker
 from app.models import Printer
 from app.models.plugin import InstalledPlugin
@@ -21,8 +22,17 @@ from app.models.printer import PrinterSlot, PrinterSlotAssignment
 from app.models.system_extra_field import SystemExtraField
 from app.models.printer_params import FilamentPrinterParam, SpoolPrinterParam
 from app.plugins.base import BaseDriver
+from app.plugins.event_queue import PrinterEventQueue
+from app.plugins.host_client import (
+    RECONNECT_TIMEOUT,
+    DriverHostClient,
+    DriverHostError,
+    RemoteDriver,
+)
 from app.core.event_bus import event_bus
+from app.core.shared_events import MAX_PAYLOAD
 from app.services.plugin_service import PLUGINS_DIR as USER_PLUGINS_DIR
+from app.services.printer_param_cache import printer_param_cache
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +51,39 @@ if USER_PLUGINS_DIR != BUILTIN_PLUGINS_DIR:
         _plugins_pkg.__path__.insert(0, str(USER_PLUGINS_DIR))
 
 
+# Driver slot fields stored in PrinterSlotAssignment.meta
+SLOT_META_KEYS = (
+    "tray_type",
+    "tray_color",
+    "tray_info_idx",
+    "nozzle_temp_min",
+    "nozzle_temp_max",
+    "setting_id",
+    "cali_idx",
+)
+
+# Seconds a remembered slot state suppresses DB reads for identical reports;
+# afterwards the next report is diffed against the DB again (picks up slot
+# rows changed elsewhere, e.g. by a backup restore)
+SLOT_FINGERPRINT_TTL = 300
+
+# Restart delays after a driver died or failed to start: immediately, then
+# 1, 2, 4 ... seconds up to RESTART_BACKOFF_MAX
+RESTART_BACKOFF_MIN = 1.0
+RESTART_BACKOFF_MAX = 300.0
+
+# A driver that ran this long restarts immediately again after it dies
+RESTART_BACKOFF_RESET = 600.0
+
+# Seconds between full reconciles against the DB; a safety net for missed
+# liveness callbacks and invalidation events
+RECONCILE_INTERVAL = 15 * 60
+
+# Seconds a debug console keeps the debug log of a driver enabled; open
+# consoles renew their lease (``driver_debug_lease`` events) well before
+DEBUG_LEASE_TTL = 60.0
+
+
 class EventEmitter:
     def __init__(self, printer_id: int, handler: Callable[[dict], None]):
         self.printer_id = printer_id
@@ -54,24 +97,317 @@ class EventEmitter:
             logger.error(f"Error handling event for printer {self.printer_id}: {e}")
 
 
+def _debug_event(printer_id: int, entry: dict[str, Any]) -> dict[str, Any]:
+    """``driver_debug`` event of *entry*, its payload cut to fit a relay slot."""
+    event = {"event": "driver_debug", "printer_id": printer_id, "entry": entry}
+    if len(json.dumps(event).encode()) <= MAX_PAYLOAD:
+        return event
+    payload = entry["payload"]
+    text = payload if isinstance(payload, str) else json.dumps(payload)
+    trimmed = {**entry, "truncated": entry.get("truncated", len(text))}
+    event["entry"] = trimmed
+    # Quotes, backslashes and non-ASCII text (\uXXXX) take several bytes
+    # per character once encoded: search the longest prefix that fits
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        trimmed["payload"] = text[:mid]
+        if len(json.dumps(event).encode()) <= MAX_PAYLOAD:
+            low = mid
+        else:
+            high = mid - 1
+    trimmed["payload"] = text[:low]
+    return event
+
+
 class PluginManager:
     def __init__(self):
-        self.drivers: dict[int, BaseDriver] = {}
+        self.drivers: dict[int, BaseDriver | RemoteDriver] = {}
         self.health_status: dict[int, dict[str, Any]] = {}
+        # Set when the drivers run in the driver host process
+        self._host: DriverHostClient | None = None
+        self._refresh_task: asyncio.Task | None = None
+        # Driver host shard: only printers passing the filter are managed
+        self.printer_filter: Callable[[int], bool] | None = None
+        # printer_id -> (monotonic time, {slot_no: fingerprint}) of the last write
+        self._slot_fingerprints: dict[int, tuple[float, dict[int, str]]] = {}
+        self._summary_fingerprints: dict[int, tuple[float, str]] = {}
+        self._event_queues: dict[int, PrinterEventQueue] = {}
+        # Set on the process that owns the drivers (enable_supervision)
+        self.supervising = False
+        # printer_id -> (driver_key, driver_config) the driver was started with
+        self._printer_configs: dict[int, tuple[str, dict[str, Any]]] = {}
+        self._disabled_drivers: set[str] | None = None
+        self._started_at: dict[int, float] = {}
+        self._backoff: dict[int, float] = {}
+        self._restarts: dict[int, asyncio.Task] = {}
+        self._reconnecting: set[int] = set()
+        self._printer_locks: dict[int, asyncio.Lock] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # printer_id -> {console subscriber: monotonic lease expiry}
+        self._debug_leases: dict[int, dict[str, float]] = {}
+        # Printers whose debug log was enabled by a lease (not by an action)
+        self._debug_streamed: set[int] = set()
+
+    # -- Driver host ------------------------------------------------------
+
+    @property
+    def hosted(self) -> bool:
+        """True if the drivers run in the driver host, not in this process."""
+        return self._host is not None
+
+    def use_host(self, client: DriverHostClient) -> None:
+        """Leave the drivers to the driver host (app/plugins/driver_host.py).
+
+        Starting, stopping and health go to the host from now on;
+        ``drivers`` holds RemoteDriver proxies, refreshed whenever the host
+        reports a change.
+        """
+        self._host = client
+        event_bus.add_listener(self._on_host_event)
 
-    def _create_event_handler(self, printer_id: int) -> Callable[[dict], None]:
-        def handler(event: dict) -> None:
-            import asyncio
+    def _on_host_event(self, event: dict[str, Any]) -> None:
+        if event.get("event") != "drivers_changed":
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.get_running_loop().create_task(
+            self.refresh_remote_drivers()
+        )
+
+    async def refresh_remote_drivers(self) -> None:
+        """Rebuild the RemoteDriver proxies from the drivers the host runs."""
+        replies = await self._host.broadcast("drivers")
+        drivers: dict[int, BaseDriver | RemoteDriver] = {}
+        for reply in replies.values():
+            for printer_id, info in reply.items():
+                drivers[int(printer_id)] = RemoteDriver(
+                    self._host,
+                    int(printer_id),
+                    info["driver_key"],
+                    info["methods"],
+                    info["health"],
+                )
+        self.drivers = drivers
+
+    def _owns(self, printer_id: int) -> bool:
+        return self.printer_filter is None or self.printer_filter(printer_id)
+
+    # -- Supervision --------------------------------------------------------
+
+    def enable_supervision(self) -> None:
+        """Make this process keep its drivers running.
+
+        Drivers that stop on their own are restarted right away with
+        exponential backoff (liveness callback ``BaseDriver.on_stopped``),
+        and ``printer_changed`` / ``plugins_changed`` events published by
+        the endpoints are applied to the running drivers.  Debug consoles
+        lease the debug log of a driver with ``driver_debug_lease`` events,
+        and its entries are published as ``driver_debug``.
+        """
+        if self.supervising:
+            return
+        self.supervising = True
+        self._loop = asyncio.get_running_loop()
+        event_bus.add_listener(self._on_config_event)
+
+    def disable_supervision(self) -> None:
+        if not self.supervising:
+            return
+        self.supervising = False
+        event_bus.remove_listener(self._on_config_event)
+        for task in self._restarts.values():
+            task.cancel()
+        self._restarts.clear()
+
+    def _driver_stopped(self, driver: BaseDriver) -> None:
+        """Liveness callback; may be called from a driver thread."""
+        if self._loop is None or driver.printer_id in self._reconnecting:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._on_driver_stopped, driver)
+        except RuntimeError:  # loop closed during shutdown
+            pass
+
+    def _on_driver_stopped(self, driver: BaseDriver) -> None:
+        printer_id = driver.printer_id
+        # stop_printer() removes the driver before stopping it
+        if not self.supervising or self.drivers.get(printer_id) is not driver:
+            return
+        if driver._running:  # back up again before the callback ran
+            return
+        started_at = self._started_at.get(printer_id, 0.0)
+        if time.monotonic() - started_at >= RESTART_BACKOFF_RESET:
+            self._backoff.pop(printer_id, None)
+        logger.warning(f"Driver for printer {printer_id} stopped running")
+        self._schedule_restart(printer_id)
+
+    def _schedule_restart(self, printer_id: int) -> None:
+        if printer_id in self._restarts or printer_id not in self._printer_configs:
+            return
+        delay = self._backoff.get(printer_id, 0.0)
+        self._backoff[printer_id] = min(
+            max(delay * 2, RESTART_BACKOFF_MIN), RESTART_BACKOFF_MAX
+        )
+        logger.info(f"Restarting driver for printer {printer_id} in {delay:.0f}s")
+        self._restarts[printer_id] = asyncio.get_running_loop().create_task(
+            self._restart(printer_id, delay)
+        )
+
+    async def _restart(self, printer_id: int, delay: float) -> None:
+        await asyncio.sleep(delay)
+        if printer_id not in self._printer_configs:
+            return
+        driver_key, config = self._printer_configs[printer_id]
+        async with self._printer_lock(printer_id):
+            await self._stop_driver(printer_id)
+            if driver_key in await self._get_disabled_drivers():
+                self._restarts.pop(printer_id, None)
+                self._forget_printer(printer_id)
+                return
+            printer = Printer(id=printer_id, driver_key=driver_key, driver_config=config)
+            started = await self.start_printer(printer)
+        self._restarts.pop(printer_id, None)
+        if started:
+            logger.info(f"Restarted driver for printer {printer_id}")
+        else:
+            self._schedule_restart(printer_id)
+
+    # -- Debug console ----------------------------------------------------
+
+    def _debug_leased(self, printer_id: int) -> bool:
+        leases = self._debug_leases.get(printer_id)
+        if not leases:
+            return False
+        now = time.monotonic()
+        for subscriber, expires_at in list(leases.items()):
+            if expires_at <= now:
+                del leases[subscriber]
+        if not leases:
+            del self._debug_leases[printer_id]
+        return bool(leases)
+
+    def _apply_debug_lease(self, event: dict[str, Any]) -> None:
+        printer_id = event.get("printer_id")
+        subscriber = event.get("subscriber")
+        if printer_id is None or subscriber is None or not self._owns(printer_id):
+            return
+        if event.get("active"):
+            leases = self._debug_leases.setdefault(printer_id, {})
+            leases[subscriber] = time.monotonic() + DEBUG_LEASE_TTL
+        else:
+            self._debug_leases.get(printer_id, {}).pop(subscriber, None)
+        driver = self.drivers.get(printer_id)
+        if not isinstance(driver, BaseDriver):
+            return
+        if self._debug_leased(printer_id):
+            if not driver._debug_enabled:
+                driver.enable_debug_log()
+            self._debug_streamed.add(printer_id)
+        elif printer_id in self._debug_streamed:
+            self._debug_streamed.discard(printer_id)
+            driver.disable_debug_log()
+
+    def _driver_debug(self, driver: BaseDriver, entry: dict[str, Any]) -> None:
+        """Debug callback; may be called from a driver thread."""
+        if self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._publish_debug, driver, entry)
+        except RuntimeError:  # loop closed during shutdown
+            pass
+
+    def _publish_debug(self, driver: BaseDriver, entry: dict[str, Any]) -> None:
+        # Consoles that went away without a goodbye (worker crash) time out
+        printer_id = driver.printer_id
+        if printer_id in self._debug_streamed and not self._debug_leased(printer_id):
+            self._debug_streamed.discard(printer_id)
+            driver.disable_debug_log()
+            return
+        event_bus.publish_nowait(_debug_event(printer_id, entry))
+
+    def _printer_lock(self, printer_id: int) -> asyncio.Lock:
+        return self._printer_locks.setdefault(printer_id, asyncio.Lock())
+
+    def _forget_printer(self, printer_id: int) -> None:
+        task = self._restarts.pop(printer_id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        self._printer_configs.pop(printer_id, None)
+        self._started_at.pop(printer_id, None)
+        self._backoff.pop(printer_id, None)
 
-            logger.debug(
-                f"Event handler called for printer {printer_id}: {event.get('event_type')}"
+    async def _get_disabled_drivers(self) -> set[str]:
+        if self._disabled_drivers is None:
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    select(InstalledPlugin.driver_key).where(
+                        InstalledPlugin.is_active.is_(False),
+                        InstalledPlugin.driver_key.isnot(None),
+                    )
+                )
+                self._disabled_drivers = set(result.scalars().all())
+        return self._disabled_drivers
+
+    def _on_config_event(self, event: dict[str, Any]) -> None:
+        name = event.get("event")
+        if name == "printer_changed":
+            coro = self.reconcile_printer(event["printer_id"])
+        elif name == "plugins_changed":
+            self._disabled_drivers = None
+            coro = self.check_drivers()
+        elif name == "driver_debug_lease":
+            self._apply_debug_lease(event)
+            return
+        else:
+            return
+        task = asyncio.get_running_loop().create_task(coro)
+        task.add_done_callback(self._log_task_error)
+
+    @staticmethod
+    def _log_task_error(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Driver reconcile failed", exc_info=task.exception())
+
+    async def reconcile_printer(self, printer_id: int) -> None:
+        """Start, stop or restart the driver of *printer_id* to match the DB."""
+        if not self._owns(printer_id):
+            return
+        async with self._printer_lock(printer_id):
+            async with async_session_maker() as db:
+                printer = await db.get(Printer, printer_id)
+            wanted = (
+                printer is not None
+                and printer.is_active
+                and printer.deleted_at is None
+                and bool(printer.driver_key)
+                and printer.driver_key not in await self._get_disabled_drivers()
             )
-            try:
-                asyncio.create_task(self._handle_event(printer_id, event))
-            except Exception as e:
-                logger.error(f"Failed to create task for event: {e}", exc_info=True)
+            if not wanted:
+                if printer_id in self.drivers or printer_id in self._printer_configs:
+                    await self.stop_printer(printer_id)
+                return
+            config = (printer.driver_key, printer.driver_config or {})
+            if printer_id in self.drivers:
+                if self._printer_configs.get(printer_id) == config:
+                    return
+            # Also replaces a pending restart with the new config
+            await self.stop_printer(printer_id)
+            await self.start_printer(printer)
+
+    def _create_event_handler(self, printer_id: int) -> Callable[[dict], None]:
+        # One bounded queue with a single consumer per printer
+        # (app/plugins/event_queue.py)
+        queue = PrinterEventQueue(
+            printer_id, lambda event: self._handle_event(printer_id, event)
+        )
+        self._event_queues[printer_id] = queue
+        return queue.put
 
-        return handler
+    async def _close_event_queue(self, printer_id: int) -> None:
+        queue = self._event_queues.pop(printer_id, None)
+        if queue is not None:
+            await queue.close()
 
     async def _handle_event(self, printer_id: int, event: dict) -> None:
         event_type = event.get("event_type")
@@ -109,113 +445,196 @@ class PluginManager:
                 pass
         return hash(slot_index) % 10000
 
+    @staticmethod
+    def _slot_state(slot_data: dict) -> tuple[int, dict[str, Any]]:
+        """Target state of one slot from a driver slot event: (slot_no, state)."""
+        slot_index = slot_data.get("slot_index", "")
+        slot_no = PluginManager._slot_index_to_no(slot_index)
+        # Build meta dict from driver-specific fields
+        meta = {key: slot_data[key] for key in SLOT_META_KEYS if key in slot_data}
+        return slot_no, {
+            "name": slot_data.get("slot_name", f"Slot {slot_no}"),
+            "slot_index": slot_index,
+            "present": slot_data.get("present", False),
+            "meta": meta,
+        }
+
+    @staticmethod
+    def _fingerprint(value: Any) -> str:
+        return json.dumps(value, sort_keys=True, default=str)
+
+    def _known_unchanged(self, printer_id: int, fingerprints: dict[int, str]) -> bool:
+        known = self._slot_fingerprints.get(printer_id)
+        if known is None or time.monotonic() - known[0] > SLOT_FINGERPRINT_TTL:
+            return False
+        return all(known[1].get(slot_no) == fp for slot_no, fp in fingerprints.items())
+
+    def _remember_slots(self, printer_id: int, fingerprints: dict[int, str]) -> None:
+        known = self._slot_fingerprints.get(printer_id)
+        merged = {**(known[1] if known else {}), **fingerprints}
+        self._slot_fingerprints[printer_id] = (time.monotonic(), merged)
+
+    def forget_slot_state(self, printer_id: int | None = None) -> None:
+        """Drop the remembered slot state so the next report is diffed against the DB."""
+        if printer_id is None:
+            self._slot_fingerprints.clear()
+            self._summary_fingerprints.clear()
+        else:
+            self._slot_fingerprints.pop(printer_id, None)
+            self._summary_fingerprints.pop(printer_id, None)
+
     async def _handle_slots_update(
         self, printer_id: int, slots_data: list[dict], ams_info: dict | None = None
     ) -> None:
-        """Upsert PrinterSlot and PrinterSlotAssignment from driver slot events."""
+        """Upsert PrinterSlot and PrinterSlotAssignment from driver slot events.
+
+        Periodic reports mostly repeat the last state.  A fingerprint per
+        slot (kept for SLOT_FINGERPRINT_TTL) skips those without touching
+        the DB; otherwise all slots of the printer are loaded in one query
+        and only the rows that differ are written, in one statement per
+        kind.  ``slots_update`` / ``printer_update`` are only published
+        when something was written.  The printer's event queue runs this
+        for one event at a time.
+        """
         try:
-            async with async_session_maker() as db:
-                # Upsert slots if any
-                if slots_data:
-                    for slot_data in slots_data:
-                        slot_index = slot_data.get("slot_index", "")
-                        slot_no = self._slot_index_to_no(slot_index)
-                        slot_name = slot_data.get("slot_name", f"Slot {slot_no}")
-                        present = slot_data.get("present", False)
-
-                        # Upsert PrinterSlot — eager-load assignment to avoid MissingGreenlet
-                        result = await db.execute(
-                            select(PrinterSlot)
-                            .options(selectinload(PrinterSlot.assignment))
-                            .where(
-                                PrinterSlot.printer_id == printer_id,
-                                PrinterSlot.slot_no == slot_no,
-                            )
-                        )
-                        printer_slot = result.scalar_one_or_none()
-
-                        is_new = False
-                        if not printer_slot:
-                            printer_slot = PrinterSlot(
-                                printer_id=printer_id,
-                                slot_no=slot_no,
-                                name=slot_name,
-                                is_active=True,
-                                custom_fields={"slot_index": slot_index},
-                            )
-                            db.add(printer_slot)
-                            await db.flush()
-                            is_new = True
-                        else:
-                            printer_slot.name = slot_name
-                            printer_slot.custom_fields = {
-                                **(printer_slot.custom_fields or {}),
-                                "slot_index": slot_index,
-                            }
-
-                        # Build meta dict from driver-specific fields
-                        meta = {}
-                        for key in (
-                            "tray_type",
-                            "tray_color",
-                            "tray_info_idx",
-                            "nozzle_temp_min",
-                            "nozzle_temp_max",
-                            "setting_id",
-                            "cali_idx",
-                        ):
-                            if key in slot_data:
-                                meta[key] = slot_data[key]
-
-                        # Upsert PrinterSlotAssignment
-                        # For new slots, always create assignment (no lazy-load risk)
-                        # For existing slots, assignment is eager-loaded via selectinload
-                        if is_new:
-                            assignment = PrinterSlotAssignment(
-                                slot_id=printer_slot.id,
-                                present=present,
-                                meta=meta,
-                            )
-                            db.add(assignment)
-                        elif printer_slot.assignment:
-                            printer_slot.assignment.present = present
-                            printer_slot.assignment.meta = meta
-                        else:
-                            assignment = PrinterSlotAssignment(
-                                slot_id=printer_slot.id,
-                                present=present,
-                                meta=meta,
-                            )
-                            db.add(assignment)
-                    await db.commit()
-                    logger.info(
-                        f"Updated {len(slots_data)} slots for printer {printer_id}"
-                    )
-                    # Broadcast to SSE clients
-                    await event_bus.publish(
-                        {"event": "slots_update", "printer_id": printer_id}
-                    )
-
-                # Persist AMS/slot summary to Printer.custom_fields
-                if ams_info:
-                    printer = await db.get(Printer, printer_id)
-                    if printer:
-                        printer.custom_fields = {
-                            **(printer.custom_fields or {}),
-                            "slot_summary": ams_info,
-                        }
-                        flag_modified(printer, "custom_fields")
-                        await db.commit()
-                        logger.info(f"Persisted slot_summary for printer {printer_id}")
-                        await event_bus.publish(
-                            {"event": "printer_update", "printer_id": printer_id}
-                        )
+            if slots_data:
+                await self._apply_slots(printer_id, slots_data)
+            if ams_info:
+                await self._apply_slot_summary(printer_id, ams_info)
         except Exception as e:
+            self.forget_slot_state(printer_id)
             logger.error(
                 f"Error in _handle_slots_update for printer {printer_id}: {e}",
                 exc_info=True,
             )
 
+    async def _apply_slots(self, printer_id: int, slots_data: list[dict]) -> None:
+        targets = dict(self._slot_state(slot_data) for slot_data in slots_data)
+        fingerprints = {no: self._fingerprint(state) for no, state in targets.items()}
+        if self._known_unchanged(printer_id, fingerprints):
+            return
+
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(
+                    PrinterSlot.id,
+                    PrinterSlot.slot_no,
+                    PrinterSlot.name,
+                    PrinterSlot.custom_fields,
+                    PrinterSlotAssignment.slot_id.label("assignment_slot_id"),
+                    PrinterSlotAssignment.present,
+                    PrinterSlotAssignment.meta,
+                )
+                .outerjoin(
+                    PrinterSlotAssignment, PrinterSlotAssignment.slot_id == PrinterSlot.id
+                )
+                .where(PrinterSlot.printer_id == printer_id)
+            )
+            existing = {row.slot_no: row for row in result.all()}
+
+            new_slots: list[PrinterSlot] = []
+            slot_updates: list[dict[str, Any]] = []
+            assignment_inserts: list[dict[str, Any]] = []
+            assignment_updates: list[dict[str, Any]] = []
+            for slot_no, state in targets.items():
+                row = existing.get(slot_no)
+                if row is None:
+                    new_slots.append(
+                        PrinterSlot(
+                            printer_id=printer_id,
+                            slot_no=slot_no,
+                            name=state["name"],
+                            is_active=True,
+                            custom_fields={"slot_index": state["slot_index"]},
+                        )
+                    )
+                    continue
+
+                custom_fields = row.custom_fields or {}
+                if (
+                    row.name != state["name"]
+                    or custom_fields.get("slot_index") != state["slot_index"]
+                ):
+                    slot_updates.append(
+                        {
+                            "id": row.id,
+                            "name": state["name"],
+                            "custom_fields": {**custom_fields, "slot_index": state["slot_index"]},
+                        }
+                    )
+                assignment = {"slot_id": row.id, "present": state["present"], "meta": state["meta"]}
+                if row.assignment_slot_id is None:
+                    assignment_inserts.append(assignment)
+                elif row.present != state["present"] or (row.meta or {}) != state["meta"]:
+                    assignment_updates.append(assignment)
+
+            if new_slots:
+                db.add_all(new_slots)
+                await db.flush()
+                assignment_inserts.extend(
+                    {
+                        "slot_id": slot.id,
+                        "present": targets[slot.slot_no]["present"],
+                        "meta": targets[slot.slot_no]["meta"],
+                    }
+                    for slot in new_slots
+                )
+            if slot_updates:
+                await db.execute(update(PrinterSlot), slot_updates)
+            if assignment_inserts:
+                await db.execute(insert(PrinterSlotAssignment), assignment_inserts)
+            if assignment_updates:
+                await db.execute(update(PrinterSlotAssignment), assignment_updates)
+
+            changed = (
+                len(new_slots)
+                + len(slot_updates)
+                + len(assignment_inserts)
+                + len(assignment_updates)
+            )
+            if changed:
+                await db.commit()
+
+        self._remember_slots(printer_id, fingerprints)
+        if changed:
+            logger.info(f"Updated {changed} slot rows for printer {printer_id}")
+            # Broadcast to SSE clients
+            await event_bus.publish({"event": "slots_update", "printer_id": printer_id})
+        else:
+            logger.debug(f"Slots of printer {printer_id} unchanged")
+
+    async def _apply_slot_summary(self, printer_id: int, ams_info: dict) -> None:
+        # Persist AMS/slot summary to Printer.custom_fields
+        fingerprint = self._fingerprint(ams_info)
+        known = self._summary_fingerprints.get(printer_id)
+        if (
+            known is not None
+            and known[1] == fingerprint
+            and time.monotonic() - known[0] <= SLOT_FINGERPRINT_TTL
+        ):
+            return
+
+        async with async_session_maker() as db:
+            printer = await db.get(Printer, printer_id)
+            if not printer:
+                return
+            changed = (
+                self._fingerprint((printer.custom_fields or {}).get("slot_summary"))
+                != fingerprint
+            )
+            if changed:
+                printer.custom_fields = {
+                    **(printer.custom_fields or {}),
+                    "slot_summary": ams_info,
+                }
+                flag_modified(printer, "custom_fields")
+                await db.commit()
+
+        self._summary_fingerprints[printer_id] = (time.monotonic(), fingerprint)
+        if changed:
+            logger.info(f"Persisted slot_summary for printer {printer_id}")
+            await event_bus.publish({"event": "printer_update", "printer_id": printer_id})
+
     def load_driver(self, driver_key: str) -> type[BaseDriver] | None:
         # app.plugins.__path__ includes both USER_PLUGINS_DIR and BUILTIN_PLUGINS_DIR,
         # so a single import covers user-installed and built-in plugins.
@@ -229,6 +648,8 @@ class PluginManager:
         return None
 
     async def start_printer(self, printer: Printer) -> bool:
+        if self._host is not None:
+            return await self._start_remote(printer)
         if printer.id in self.drivers:
             return True
 
@@ -256,20 +677,60 @@ class PluginManager:
                 emitter=emitter.emit,
             )
             driver.validate_config()
+            driver.on_stopped = self._driver_stopped
+            driver.on_debug = self._driver_debug
+            driver.debug_buffer_size = settings.driver_debug_buffer_size
+            driver.debug_max_payload = settings.driver_debug_max_payload
+            if self._debug_leased(printer.id):
+                driver.enable_debug_log()
+                self._debug_streamed.add(printer.id)
             await driver.start()
             self.drivers[printer.id] = driver
+            self._printer_configs[printer.id] = (printer.driver_key, config)
+            self._started_at[printer.id] = time.monotonic()
             self.health_status[printer.id] = driver.health()
             logger.info(f"Started driver {printer.driver_key} for printer {printer.id}")
             return True
         except Exception as e:
             logger.error(f"Error starting driver for printer {printer.id}: {e}")
+            await self._close_event_queue(printer.id)
             self.health_status[printer.id] = {
                 "status": "error",
                 "message": str(e),
             }
+            if self.supervising:
+                self._printer_configs[printer.id] = (printer.driver_key, config)
+                self._schedule_restart(printer.id)
             return False
 
+    async def _start_remote(self, printer: Printer) -> bool:
+        try:
+            result = await self._host.printer_request(
+                printer.id,
+                "start",
+                driver_key=printer.driver_key,
+                driver_config=printer.driver_config or {},
+            )
+        except DriverHostError as e:
+            logger.error(f"Driver host could not start printer {printer.id}: {e}")
+            self.health_status[printer.id] = {"status": "error", "message": str(e)}
+            return False
+        await self.refresh_remote_drivers()
+        return bool(result["started"])
+
     async def stop_printer(self, printer_id: int) -> None:
+        if self._host is not None:
+            self.drivers.pop(printer_id, None)
+            try:
+                await self._host.printer_request(printer_id, "stop")
+            except DriverHostError as e:
+                logger.error(f"Driver host could not stop printer {printer_id}: {e}")
+            return
+        # A stopped printer is not restarted
+        self._forget_printer(printer_id)
+        await self._stop_driver(printer_id)
+
+    async def _stop_driver(self, printer_id: int) -> None:
         driver = self.drivers.pop(printer_id, None)
         if driver:
             try:
@@ -277,6 +738,9 @@ class PluginManager:
                 logger.info(f"Stopped driver for printer {printer_id}")
             except Exception as e:
                 logger.error(f"Error stopping driver for printer {printer_id}: {e}")
+        # Handle the events the driver emitted before it stopped
+        await self._close_event_queue(printer_id)
+        self.forget_slot_state(printer_id)
 
     async def _ensure_all_plugin_dependencies(self) -> None:
         """Install missing Python dependencies for all user-installed plugins.
@@ -352,6 +816,8 @@ class PluginManager:
         )
 
     async def start_all(self) -> None:
+        if self._host is not None:
+            return  # the driver host starts its printers itself
         await self._ensure_all_plugin_dependencies()
         async with async_session_maker() as db:
             # Deaktivierte Plugins ermitteln (driver_key)
@@ -362,6 +828,7 @@ class PluginManager:
                 )
             )
             disabled_drivers = {r for r in disabled_result.scalars().all()}
+            self._disabled_drivers = disabled_drivers
 
             result = await db.execute(
                 select(Printer).where(
@@ -372,6 +839,8 @@ class PluginManager:
             printers = result.scalars().all()
 
             for printer in printers:
+                if not self._owns(printer.id):
+                    continue
                 if printer.driver_key in disabled_drivers:
                     logger.info(
                         f"Skipping printer {printer.id}: plugin '{printer.driver_key}' is deactivated"
@@ -380,12 +849,24 @@ class PluginManager:
                 await self.start_printer(printer)
 
     async def stop_all(self) -> None:
+        if self._host is not None:
+            self.drivers.clear()  # the drivers keep running in the host
+            return
         for printer_id in list(self.drivers.keys()):
             await self.stop_printer(printer_id)
 
     async def reconnect_all(self) -> dict[int, str]:
         """Reconnect all active printers. Returns {printer_id: status} map."""
         results: dict[int, str] = {}
+        if self._host is not None:
+            replies = await self._host.broadcast(
+                "reconnect_all", timeout=RECONNECT_TIMEOUT
+            )
+            for reply in replies.values():
+                results.update({int(pid): status for pid, status in reply.items()})
+            await self.refresh_remote_drivers()
+            return results
+
         async with async_session_maker() as db:
             result = await db.execute(
                 select(Printer).where(
@@ -396,24 +877,151 @@ class PluginManager:
             printers = result.scalars().all()
 
         for printer in printers:
+            if not self._owns(printer.id):
+                continue
             driver = self.drivers.get(printer.id)
             if driver:
+                # Stopping for the reconnect is not a dead driver
+                self._reconnecting.add(printer.id)
                 try:
                     await driver.reconnect()
                     results[printer.id] = "reconnected"
                 except Exception as e:
                     logger.error(f"Reconnect failed for printer {printer.id}: {e}")
                     results[printer.id] = f"error: {e}"
+                finally:
+                    self._reconnecting.discard(printer.id)
             else:
                 started = await self.start_printer(printer)
                 results[printer.id] = "started" if started else "start_failed"
         return results
 
-    def get_health(self) -> dict[int, dict[str, Any]]:
-        for printer_id, driver in self.drivers.items():
-            self.health_status[printer_id] = driver.health()
+    async def printer_health(self, printer_id: int) -> dict[str, Any] | None:
+        """Driver health plus the counters of the printer's event queue."""
+        if self._host is not None:
+            try:
+                return await self._host.printer_request(printer_id, "health")
+            except DriverHostError as e:
+                logger.warning(f"Driver health of printer {printer_id} unavailable: {e}")
+                return None
+        return self._local_health(printer_id)
+
+    def _local_health(self, printer_id: int) -> dict[str, Any] | None:
+        driver = self.drivers.get(printer_id)
+        if driver is None:
+            return None
+        health = driver.health()
+        queue = self._event_queues.get(printer_id)
+        if queue is not None:
+            health = {**health, "event_queue": queue.stats()}
+        return health
+
+    async def get_health(self) -> dict[int, dict[str, Any]]:
+        if self._host is not None:
+            health: dict[int, dict[str, Any]] = {}
+            for reply in (await self._host.broadcast("health")).values():
+                health.update({int(pid): status for pid, status in reply.items()})
+            return health
+        for printer_id in self.drivers:
+            self.health_status[printer_id] = self._local_health(printer_id)
         return self.health_status
 
+    async def check_drivers(self) -> None:
+        """Restart dead drivers and start missing ones (watchdog pass)."""
+        health = await self.get_health()
+
+        # Deaktivierte Plugins ermitteln
+        async with async_session_maker() as db:
+            disabled_result = await db.execute(
+                select(InstalledPlugin.driver_key).where(
+                    InstalledPlugin.is_active.is_(False),
+                    InstalledPlugin.driver_key.isnot(None),
+                )
+            )
+            disabled_drivers = {r for r in disabled_result.scalars().all()}
+        self._disabled_drivers = disabled_drivers
+
+        # 0. Stop drivers of deactivated plugins
+        for printer_id, driver in list(self.drivers.items()):
+            if driver.driver_key in disabled_drivers:
+                logger.info(
+                    f"Watchdog: stopping printer {printer_id}: plugin '{driver.driver_key}' is deactivated"
+                )
+                await self.stop_printer(printer_id)
+                health.pop(printer_id, None)
+
+        # 1. Restart drivers that report running=False
+        for printer_id, status in list(health.items()):
+            if not status.get("running", True):
+                logger.warning(
+                    f"Watchdog: driver for printer {printer_id} not running, restarting"
+                )
+                await self.stop_printer(printer_id)
+                # Reload printer from DB to get current config
+                async with async_session_maker() as db:
+                    result = await db.execute(
+                        select(Printer).where(
+                            Printer.id == printer_id,
+                            Printer.is_active == True,
+                            Printer.deleted_at.is_(None),
+                        )
+                    )
+                    printer = result.scalar_one_or_none()
+                if printer:
+                    if printer.driver_key in disabled_drivers:
+                        logger.info(
+                            f"Watchdog: skipping printer {printer_id}: plugin '{printer.driver_key}' is deactivated"
+                        )
+                        continue
+                    started = await self.start_printer(printer)
+                    if started:
+                        logger.info(f"Watchdog: restarted driver for printer {printer_id}")
+                    else:
+                        logger.error(
+                            f"Watchdog: failed to restart driver for printer {printer_id}"
+                        )
+
+        # 2. Start drivers for active printers that have no driver in memory
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(Printer).where(
+                    Printer.is_active == True,
+                    Printer.deleted_at.is_(None),
+                )
+            )
+            active_printers = result.scalars().all()
+
+        for printer in active_printers:
+            if printer.id not in self.drivers and self._owns(printer.id):
+                if printer.driver_key in disabled_drivers or printer.id in self._restarts:
+                    continue
+                logger.info(
+                    f"Watchdog: no driver for active printer {printer.id}, starting"
+                )
+                started = await self.start_printer(printer)
+                if started:
+                    logger.info(f"Watchdog: started driver for printer {printer.id}")
+                else:
+                    logger.error(
+                        f"Watchdog: failed to start driver for printer {printer.id}"
+                    )
+
+    async def unload_driver(self, driver_key: str) -> None:
+        """Stop all printers using *driver_key* and drop its cached modules,
+        so the next start imports the plugin code anew (plugin upgrade)."""
+        if self._host is not None:
+            await self._host.broadcast("unload", driver_key=driver_key)
+            await self.refresh_remote_drivers()
+        else:
+            for printer_id, driver in list(self.drivers.items()):
+                if driver.driver_key == driver_key:
+                    await self.stop_printer(printer_id)
+        prefix = f"app.plugins.{driver_key}"
+        for mod_name in list(sys.modules.keys()):
+            if mod_name.startswith(prefix):
+                del sys.modules[mod_name]
+        importlib.invalidate_caches()
+
     # -- Plugin Extra-Field Management ----------------------------------------
 
     @staticmethod
@@ -744,6 +1352,8 @@ class PluginManager:
                 migrated_spools += 1
 
             await db.commit()
+            if legacy_renames or migrated_filaments or migrated_spools:
+                await event_bus.publish({"event": "printer_params_changed"})
             if migrated_filaments or migrated_spools:
                 logger.info(
                     f"Migrated Spoolman fields to printer_params: "
@@ -961,6 +1571,9 @@ class PluginManager:
 
             if copied_filament or copied_spool:
                 await db.commit()
+                await event_bus.publish(
+                    {"event": "printer_params_changed", "printer_id": printer_id}
+                )
                 logger.info(
                     f"Copied printer_params from printer {source_id} to {printer_id}: "
                     f"{copied_filament} filament params, {copied_spool} spool params"
@@ -968,6 +1581,14 @@ class PluginManager:
 
     # -- Filament Data Enrichment (Fallback Logic) ----------------------------
 
+    async def prefetch_filament_params(self, spool_id: int, printer_ids: list[int]) -> None:
+        """Resolve the params of *spool_id* for all *printer_ids* in one batch.
+
+        Subsequent enrich_filament_data() calls for these printers are
+        served from the cache.
+        """
+        await printer_param_cache.resolve(spool_id, printer_ids)
+
     async def enrich_filament_data(
         self,
         spool_id: int,
@@ -981,44 +1602,21 @@ class PluginManager:
         2. Filament-level printer_params for this printer
         3. Values already in filament_data (unchanged)
         """
-        async with async_session_maker() as db:
-            # 1. Get spool to find filament_id
-            spool = await db.get(Spool, spool_id)
-            if not spool:
-                return filament_data
-
-            filament_id = spool.filament_id
-
-            # 2. Load filament-level params for this printer
-            result = await db.execute(
-                select(FilamentPrinterParam).where(
-                    FilamentPrinterParam.filament_id == filament_id,
-                    FilamentPrinterParam.printer_id == printer_id,
-                )
-            )
-            filament_params = {
-                p.param_key: p.param_value for p in result.scalars().all()
-            }
-
-            # 3. Load spool-level params for this printer (overrides filament-level)
-            result = await db.execute(
-                select(SpoolPrinterParam).where(
-                    SpoolPrinterParam.spool_id == spool_id,
-                    SpoolPrinterParam.printer_id == printer_id,
-                )
-            )
-            spool_params = {p.param_key: p.param_value for p in result.scalars().all()}
-
-        # 4. Merge: spool_params override filament_params
-        merged_params = {**filament_params, **spool_params}
+        # Resolved per (spool, printer) and cached, see
+        # app/services/printer_param_cache.py
+        merged_params = (await printer_param_cache.resolve(spool_id, [printer_id])).get(
+            printer_id
+        )
+        if merged_params is None:
+            return filament_data
 
-        # 5. Only set non-empty values into filament_data
+        # Only set non-empty values into filament_data
         enriched = {**filament_data}
         for key, value in merged_params.items():
             if value is not None and value != "":
                 enriched[key] = value
 
-        # 6. Inject the FilaMan spool ID so plugin drivers can use it
+        # Inject the FilaMan spool ID so plugin drivers can use it
         enriched["id"] = spool_id
 
         return enriched
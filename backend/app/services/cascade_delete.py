@@ -0,0 +1,105 @@
+"""Set-based cascade delete of a manufacturer with its filaments and spools.
+
+Instead of loading every filament and spool and deleting them one by one
+through the ORM, the dependent rows are removed with one
+``DELETE ... WHERE ... IN (subquery)`` per table, children first, inside the
+caller's transaction.  The subqueries never select from the table being
+deleted from (MySQL rejects that).
+
+Core statements bypass the mapper listeners, which is fine here: the rows
+derived from spool events (weight checkpoints, forecasts) and the
+inventory aggregate rows are deleted along with the spools and filaments,
+the consumption rollup keeps the usage of the deleted spools, and the
+counters of the deleted manufacturer need no refresh.  Cached printer
+details showing one of the spools are dropped via the manufacturer (see
+app/services/printer_details.py).  History archives keep their rows, as
+for a single permanent spool delete.
+
+Usage:
+    from app.services.cascade_delete import delete_manufacturer_cascade
+
+    counts = await delete_manufacturer_cascade(db, manufacturer_id)
+    await db.commit()
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    Filament,
+    FilamentColor,
+    FilamentForecast,
+    FilamentPrinterParam,
+    FilamentPrinterProfile,
+    FilamentRating,
+    InventoryAggregate,
+    Manufacturer,
+    PrinterSlotAssignment,
+    PrinterSlotEvent,
+    Spool,
+    SpoolEvent,
+    SpoolForecast,
+    SpoolPrinterParam,
+    SpoolWeightCheckpoint,
+)
+from app.services.printer_details import note_printer_detail_changes
+
+# Rows referencing a spool, deleted before the spools (checkpoints reference
+# spool events as well, so they go first)
+SPOOL_CHILDREN = (
+    SpoolWeightCheckpoint,
+    SpoolEvent,
+    SpoolPrinterParam,
+    SpoolForecast,
+)
+
+# Rows keeping a nullable reference to a spool (ondelete="SET NULL")
+SPOOL_REFERENCES = (PrinterSlotAssignment, PrinterSlotEvent)
+
+# Rows referencing a filament, deleted before the filaments
+FILAMENT_CHILDREN = (
+    FilamentColor,
+    FilamentPrinterProfile,
+    FilamentRating,
+    FilamentPrinterParam,
+    FilamentForecast,
+    InventoryAggregate,
+)
+
+
+async def delete_manufacturer_cascade(db: AsyncSession, manufacturer_id: int) -> dict[str, int]:
+    """Delete a manufacturer with everything below it; the caller commits.
+
+    Returns the number of affected rows per table.
+    """
+    filament_ids = select(Filament.id).where(Filament.manufacturer_id == manufacturer_id)
+    spool_ids = select(Spool.id).where(Spool.filament_id.in_(filament_ids))
+    counts: dict[str, int] = {}
+    note_printer_detail_changes(db, manufacturers=[manufacturer_id])
+
+    async def run(table_name: str, statement) -> None:
+        result = await db.execute(statement, execution_options={"synchronize_session": False})
+        counts[table_name] = result.rowcount or 0
+
+    for model in SPOOL_CHILDREN:
+        await run(model.__tablename__, delete(model).where(model.spool_id.in_(spool_ids)))
+    for model in SPOOL_REFERENCES:
+        await run(
+            model.__tablename__,
+            update(model).where(model.spool_id.in_(spool_ids)).values(spool_id=None),
+        )
+    await run(Spool.__tablename__, delete(Spool).where(Spool.filament_id.in_(filament_ids)))
+
+    for model in FILAMENT_CHILDREN:
+        await run(model.__tablename__, delete(model).where(model.filament_id.in_(filament_ids)))
+    await run(
+        Filament.__tablename__,
+        delete(Filament).where(Filament.manufacturer_id == manufacturer_id),
+    )
+    await run(
+        Manufacturer.__tablename__,
+        delete(Manufacturer).where(Manufacturer.id == manufacturer_id),
+    )
+    return counts
@@ -0,0 +1,283 @@
+"""Process-local CIELAB index of all colors for perceptual similarity search.
+
+Every ``Color`` is converted once from its hex code to CIELAB (D65) and kept
+in flat ``array('d')`` columns.  A coarse grid over the Lab space buckets
+the entries, so a nearest-neighbour query only computes Delta-E (CIE76, the
+euclidean distance in Lab) for the cells around the query color instead of
+for every color.
+
+The entries are maintained by the Color mapper listeners below on ORM writes
+in this process and by the ``colors_changed`` events (with ``color_id`` and
+``hex_code``) that the color endpoints publish, which the event bus relay
+also delivers to the other workers.  The index is loaded lazily on the first
+query; ``INDEX_MAX_AGE`` bounds the staleness for writes in other workers
+that publish no event (imports).
+
+Usage:
+    from app.services.color_index import color_index, hex_to_lab
+
+    await color_index.ensure_loaded(db)
+    color_index.nearest(hex_to_lab("#FF8800"), limit=10)  # [(color_id, delta_e)]
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+import time
+from array import array
+from collections.abc import Iterator
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.event_bus import event_bus
+from app.models import Color
+
+logger = logging.getLogger(__name__)
+
+# Edge length of a grid cell in Delta-E units
+GRID_CELL_SIZE = 8.0
+
+# Seconds after which the index is reloaded even without a change event
+INDEX_MAX_AGE = 300
+
+_HEX_RE = re.compile(r"^#?([0-9a-fA-F]{6})$")
+
+# D65 reference white
+_XN, _YN, _ZN = 0.95047, 1.0, 1.08883
+
+
+def parse_hex(hex_code: str) -> tuple[int, int, int] | None:
+    """``#RRGGBB`` (hash optional) -> (r, g, b), None if malformed."""
+    match = _HEX_RE.match(hex_code.strip())
+    if match is None:
+        return None
+    value = int(match.group(1), 16)
+    return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
+
+
+def _linear(channel: int) -> float:
+    c = channel / 255.0
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+
+def _f(t: float) -> float:
+    return t ** (1.0 / 3.0) if t > 216 / 24389 else (24389 / 27 * t + 16) / 116
+
+
+def hex_to_lab(hex_code: str) -> tuple[float, float, float] | None:
+    """sRGB hex code -> CIELAB (D65), None if the code is malformed."""
+    rgb = parse_hex(hex_code)
+    if rgb is None:
+        return None
+    r, g, b = (_linear(c) for c in rgb)
+    x = 0.4124564 * r + 0.3575761 * g + 0.1804375 * b
+    y = 0.2126729 * r + 0.7151522 * g + 0.0721750 * b
+    z = 0.0193339 * r + 0.1191920 * g + 0.9503041 * b
+    fx, fy, fz = _f(x / _XN), _f(y / _YN), _f(z / _ZN)
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def _cell(lab: tuple[float, float, float]) -> tuple[int, int, int]:
+    return (
+        math.floor(lab[0] / GRID_CELL_SIZE),
+        math.floor(lab[1] / GRID_CELL_SIZE),
+        math.floor(lab[2] / GRID_CELL_SIZE),
+    )
+
+
+def _shell(center: tuple[int, int, int], radius: int) -> Iterator[tuple[int, int, int]]:
+    """Cells at Chebyshev distance exactly *radius* from *center*."""
+    cl, ca, cb = center
+    if radius == 0:
+        yield center
+        return
+    for dl in range(-radius, radius + 1):
+        edge_l = abs(dl) == radius
+        for da in range(-radius, radius + 1):
+            if edge_l or abs(da) == radius:
+                for db in range(-radius, radius + 1):
+                    yield cl + dl, ca + da, cb + db
+            else:
+                yield cl + dl, ca + da, cb - radius
+                yield cl + dl, ca + da, cb + radius
+
+
+class ColorIndex:
+    """Lab coordinates of all colors, bucketed in a uniform grid."""
+
+    def __init__(self) -> None:
+        self._ids = array("q")
+        self._l = array("d")
+        self._a = array("d")
+        self._b = array("d")
+        self._slots: dict[int, int] = {}
+        self._grid: dict[tuple[int, int, int], list[int]] = {}
+        self._free: list[int] = []
+        self._loaded_at: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # -- maintenance ---------------------------------------------------------
+
+    def set(self, color_id: int, hex_code: str) -> None:
+        lab = hex_to_lab(hex_code)
+        self.discard(color_id)
+        if lab is None:
+            return
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = color_id
+            self._l[slot], self._a[slot], self._b[slot] = lab
+        else:
+            slot = len(self._ids)
+            self._ids.append(color_id)
+            self._l.append(lab[0])
+            self._a.append(lab[1])
+            self._b.append(lab[2])
+        self._slots[color_id] = slot
+        self._grid.setdefault(_cell(lab), []).append(slot)
+
+    def discard(self, color_id: int) -> None:
+        slot = self._slots.pop(color_id, None)
+        if slot is None:
+            return
+        cell = _cell((self._l[slot], self._a[slot], self._b[slot]))
+        bucket = self._grid.get(cell)
+        if bucket is not None:
+            bucket.remove(slot)
+            if not bucket:
+                del self._grid[cell]
+        self._ids[slot] = -1
+        self._free.append(slot)
+
+    def clear(self) -> None:
+        for column in (self._ids, self._l, self._a, self._b):
+            del column[:]
+        self._slots.clear()
+        self._grid.clear()
+        self._free.clear()
+        self._loaded_at = None
+
+    def invalidate(self) -> None:
+        """Reload from the database on the next ensure_loaded()."""
+        self._loaded_at = None
+
+    @property
+    def loaded(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < INDEX_MAX_AGE
+        )
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        if self.loaded:
+            return
+        rows = (await db.execute(select(Color.id, Color.hex_code))).all()
+        self.clear()
+        for color_id, hex_code in rows:
+            self.set(color_id, hex_code)
+        self._loaded_at = time.monotonic()
+        logger.debug("Color index loaded with %d colors", len(self))
+
+    # -- queries -------------------------------------------------------------
+
+    def nearest(
+        self,
+        lab: tuple[float, float, float],
+        limit: int = 10,
+        max_delta_e: float | None = None,
+    ) -> list[tuple[int, float]]:
+        """The *limit* closest colors as (color_id, delta_e), closest first.
+
+        Grid shells around the query cell are visited outward until the
+        *limit*-th distance found is no larger than the distance to any
+        unvisited cell.
+        """
+        if limit <= 0 or not self._slots:
+            return []
+        ql, qa, qb = lab
+        ids, ls, as_, bs = self._ids, self._l, self._a, self._b
+        grid = self._grid
+        center = _cell(lab)
+        total = len(self._slots)
+
+        found: list[tuple[float, int]] = []
+        seen = 0
+
+        def scan(bucket: list[int]) -> None:
+            for slot in bucket:
+                dl = ls[slot] - ql
+                da = as_[slot] - qa
+                db = bs[slot] - qb
+                found.append((dl * dl + da * da + db * db, ids[slot]))
+
+        radius = 0
+        while True:
+            if (2 * radius + 1) ** 3 > 4 * len(grid):
+                # Sparse surroundings: scanning the remaining occupied cells
+                # is cheaper than enumerating ever larger empty shells
+                for cell, bucket in grid.items():
+                    if max(abs(cell[i] - center[i]) for i in range(3)) >= radius:
+                        scan(bucket)
+                break
+            for cell in _shell(center, radius):
+                bucket = grid.get(cell)
+                if bucket:
+                    seen += len(bucket)
+                    scan(bucket)
+            if len(found) > limit:
+                found.sort()
+                del found[limit:]
+
+            # Any unvisited cell is at least this far from the query color
+            bound = radius * GRID_CELL_SIZE
+            if seen >= total:
+                break
+            if len(found) >= limit and found[-1][0] <= bound * bound:
+                break
+            if max_delta_e is not None and bound > max_delta_e:
+                break
+            radius += 1
+
+        found.sort()
+        result = [(color_id, math.sqrt(d2)) for d2, color_id in found[:limit]]
+        if max_delta_e is not None:
+            result = [(cid, de) for cid, de in result if de <= max_delta_e]
+        return result
+
+
+# Singleton – one index per worker process
+color_index = ColorIndex()
+
+
+def _on_event(event: dict) -> None:
+    # Also delivered for the color writes of other workers (relay); events
+    # without the color details only mark the index stale
+    if event.get("event") != "colors_changed":
+        return
+    color_id = event.get("color_id")
+    if color_id is None:
+        color_index.invalidate()
+    elif event.get("deleted"):
+        color_index.discard(color_id)
+    elif color_index.loaded and event.get("hex_code"):
+        color_index.set(color_id, event["hex_code"])
+
+
+event_bus.add_listener(_on_event)
+
+
+@event.listens_for(Color, "after_insert")
+@event.listens_for(Color, "after_update")
+def _color_written(mapper, connection, target: Color) -> None:
+    if color_index.loaded:
+        color_index.set(target.id, target.hex_code)
+
+
+@event.listens_for(Color, "after_delete")
+def _color_deleted(mapper, connection, target: Color) -> None:
+    color_index.discard(target.id)
@@ -0,0 +1,176 @@
+"""Consumption analytics on top of the consumption_daily rollup.
+
+Queries only touch the rollup rows of the requested range, so their cost
+depends on the number of spools and days involved, not on the size of the
+event history.  ``backfill`` recomputes the rollup from ``spool_events``
+(and the event archive) for databases that predate the rollup.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    ConsumptionDaily,
+    Filament,
+    Location,
+    Manufacturer,
+    Printer,
+    Spool,
+    SpoolEvent,
+    SpoolEventArchive,
+)
+from app.models.consumption import consumption_day, spool_dimensions_query
+
+logger = logging.getLogger(__name__)
+
+GROUP_BY_COLUMNS = {
+    "spool": ConsumptionDaily.spool_id,
+    "filament": ConsumptionDaily.filament_id,
+    "material_type": ConsumptionDaily.material_type,
+    "manufacturer": ConsumptionDaily.manufacturer_id,
+    "printer": ConsumptionDaily.printer_id,
+    "location": ConsumptionDaily.location_id,
+}
+
+# Rows per INSERT / spools per dimension lookup during backfill
+BACKFILL_BATCH = 1000
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """First day of the day/week (ISO, Monday)/month bucket containing *day*."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+async def group_labels(db: AsyncSession, group_by: str | None, keys: set[Any]) -> dict[Any, str]:
+    """Display names for the keys of a grouped analytics series."""
+    keys.discard(None)
+    if group_by == "material_type":
+        return {key: key for key in keys}
+    if group_by == "spool":
+        return {key: f"#{key}" for key in keys}
+
+    name_columns = {
+        "filament": (Filament.id, Filament.designation),
+        "manufacturer": (Manufacturer.id, Manufacturer.name),
+        "printer": (Printer.id, Printer.name),
+        "location": (Location.id, Location.name),
+    }
+    if group_by not in name_columns or not keys:
+        return {}
+    id_column, name_column = name_columns[group_by]
+    result = await db.execute(select(id_column, name_column).where(id_column.in_(keys)))
+    return {row[0]: row[1] for row in result.all()}
+
+
+class ConsumptionAnalyticsService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def query(
+        self,
+        start: date,
+        end: date,
+        group_by: str | None = None,
+        bucket: str = "day",
+    ) -> list[dict[str, Any]]:
+        """Consumed grams per bucket (and group) for ``start <= day <= end``.
+
+        Returns rows ordered by period and key with ``period``, ``key``,
+        ``label``, ``consumed_g`` and ``event_count``.
+        """
+        group_column = GROUP_BY_COLUMNS[group_by] if group_by else None
+        columns = [ConsumptionDaily.day]
+        if group_column is not None:
+            columns.append(group_column.label("key"))
+
+        result = await self.db.execute(
+            select(
+                *columns,
+                func.sum(ConsumptionDaily.consumed_g).label("consumed_g"),
+                func.sum(ConsumptionDaily.event_count).label("event_count"),
+            )
+            .where(ConsumptionDaily.day >= start, ConsumptionDaily.day <= end)
+            .group_by(*columns)
+        )
+
+        totals: dict[tuple[date, Any], list[float]] = defaultdict(lambda: [0.0, 0])
+        for row in result.all():
+            key = row.key if group_column is not None else None
+            entry = totals[(bucket_start(row.day, bucket), key)]
+            entry[0] += row.consumed_g or 0.0
+            entry[1] += row.event_count or 0
+
+        labels = await group_labels(self.db, group_by, {key for _, key in totals})
+        return [
+            {
+                "period": period,
+                "key": key,
+                "label": labels.get(key),
+                "consumed_g": round(consumed, 3),
+                "event_count": count,
+            }
+            for (period, key), (consumed, count) in sorted(
+                totals.items(), key=lambda item: (item[0][0], str(item[0][1]))
+            )
+        ]
+
+    async def backfill(self) -> dict[str, int]:
+        """Rebuild consumption_daily from the event history and commit.
+
+        Days are attributed to the spool's current filament, location and
+        printer, since the historical values are not recorded on events.
+        """
+        live = select(
+            SpoolEvent.spool_id, SpoolEvent.event_at, SpoolEvent.delta_weight_g
+        ).where(SpoolEvent.event_type == "print_consumption")
+        archived = select(
+            SpoolEventArchive.spool_id,
+            SpoolEventArchive.event_at,
+            SpoolEventArchive.delta_weight_g,
+        ).where(SpoolEventArchive.event_type == "print_consumption")
+
+        totals: dict[tuple[date, int], list[float]] = defaultdict(lambda: [0.0, 0])
+        events = 0
+        result = await self.db.stream(union_all(live, archived))
+        async for spool_id, event_at, delta in result:
+            entry = totals[(consumption_day(event_at), spool_id)]
+            entry[0] -= delta or 0.0
+            entry[1] += 1
+            events += 1
+
+        spool_ids = sorted({spool_id for _, spool_id in totals})
+        dimensions: dict[int, dict[str, Any]] = {}
+        for start in range(0, len(spool_ids), BACKFILL_BATCH):
+            batch = spool_ids[start : start + BACKFILL_BATCH]
+            rows = await self.db.execute(spool_dimensions_query(batch))
+            dimensions.update({row["spool_id"]: dict(row) for row in rows.mappings()})
+
+        rows = [
+            {"day": day, "consumed_g": consumed, "event_count": count, **dimensions[spool_id]}
+            for (day, spool_id), (consumed, count) in totals.items()
+            # Archived events of deleted spools have nothing to attribute to
+            if spool_id in dimensions
+        ]
+
+        # Rows of deleted spools have no events left to rebuild them from
+        await self.db.execute(
+            delete(ConsumptionDaily).where(ConsumptionDaily.spool_id.in_(select(Spool.id)))
+        )
+        for start in range(0, len(rows), BACKFILL_BATCH):
+            await self.db.execute(
+                insert(ConsumptionDaily), rows[start : start + BACKFILL_BATCH]
+            )
+        await self.db.commit()
+
+        stats = {"events": events, "rows": len(rows)}
+        logger.info("Consumption rollup backfilled: %s", stats)
+        return stats
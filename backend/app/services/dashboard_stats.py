@@ -0,0 +1,344 @@
+"""Dashboard statistics: concurrent aggregates behind a single-flight cache.
+
+The dashboard's counts, grams and values are summed up from the maintained
+inventory aggregate (app/services/inventory_aggregates.py) – a few hundred
+rows instead of every spool – next to the low-stock and empty spool lists.
+The queries are executed concurrently, each on its own pooled connection
+(at most ``MAX_PARALLEL_QUERIES`` at a time), and the assembled response is
+cached per ``limit``.  Concurrent requests for the same ``limit`` share one
+computation instead of each running the queries.
+
+The cache is invalidated by the change events the write paths already
+publish (``INVALIDATING_EVENTS``); the event bus relay delivers them to all
+workers.  With ``DASHBOARD_BACKGROUND_REFRESH`` enabled the previously
+requested limits are recomputed shortly after an invalidation, so the next
+dashboard load – usually triggered by that very event – finds them ready.
+``CACHE_TTL`` bounds the staleness for writes that publish no event.
+
+Usage:
+    from app.services.dashboard_stats import dashboard_stats
+
+    dashboard_stats.register(compute)  # async (limit) -> response
+    stats = await dashboard_stats.get(limit)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
+
+from app.core.config import settings
+from app.core.event_bus import event_bus
+from app.models import (
+    Filament,
+    InventoryAggregate,
+    Location,
+    Manufacturer,
+    Spool,
+    SpoolStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached result is served without a change event
+CACHE_TTL = 300
+
+# Delay before the background refresh, so bursts of writes recompute once
+REFRESH_DELAY = 0.5
+
+# Aggregates running at the same time for one computation
+MAX_PARALLEL_QUERIES = 4
+
+# Events after which the statistics are recomputed
+INVALIDATING_EVENTS = frozenset(
+    {"spools_changed", "filaments_changed", "locations_changed", "manufacturers_changed"}
+)
+
+
+# -- aggregates ---------------------------------------------------------------
+
+
+def _not_archived() -> Any:
+    return SpoolStatus.key != "archived"
+
+
+def inventory_query(limit: int) -> Select:
+    # Bestand je Materialtyp, Hersteller, Lagerort und Füllstand aus dem
+    # gepflegten Aggregat (app/services/inventory_aggregates.py)
+    return (
+        select(
+            Filament.material_type,
+            Manufacturer.id,
+            Manufacturer.name,
+            InventoryAggregate.location_id,
+            InventoryAggregate.fill_bucket,
+            func.sum(InventoryAggregate.spool_count),
+            func.sum(InventoryAggregate.remaining_weight_g),
+            func.sum(InventoryAggregate.value),
+        )
+        .join(Filament, InventoryAggregate.filament_id == Filament.id)
+        .join(Manufacturer, Filament.manufacturer_id == Manufacturer.id)
+        .group_by(
+            Filament.material_type,
+            Manufacturer.id,
+            Manufacturer.name,
+            InventoryAggregate.location_id,
+            InventoryAggregate.fill_bucket,
+        )
+    )
+
+
+def locations_query(limit: int) -> Select:
+    # Lagerorte (auch ohne Spulen)
+    return select(Location.id, Location.name).where(Location.name.isnot(None))
+
+
+def low_stock_query(limit: int) -> Select:
+    # Spulen mit fast-leeren Restgewicht
+    return (
+        select(
+            Spool.id.label("spool_id"),
+            Filament.designation.label("filament_designation"),
+            Filament.material_type.label("filament_type"),
+            Manufacturer.name.label("manufacturer_name"),
+            Spool.remaining_weight_g,
+            Spool.low_weight_threshold_g,
+        )
+        .join(Filament, Spool.filament_id == Filament.id)
+        .join(Manufacturer, Filament.manufacturer_id == Manufacturer.id)
+        .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
+        .where(_not_archived())
+        .where(Spool.remaining_weight_g.isnot(None))
+        .where(Spool.remaining_weight_g > 0)
+        .where(Spool.remaining_weight_g <= Spool.low_weight_threshold_g)
+        .order_by(Spool.remaining_weight_g.asc())
+        .limit(limit)
+    )
+
+
+def empty_spools_query(limit: int) -> Select:
+    # Leere Spulen (remaining_weight_g <= 0)
+    return (
+        select(
+            Spool.id.label("spool_id"),
+            Filament.designation.label("filament_designation"),
+            Filament.material_type.label("filament_type"),
+            Manufacturer.name.label("manufacturer_name"),
+        )
+        .join(Filament, Spool.filament_id == Filament.id)
+        .join(Manufacturer, Filament.manufacturer_id == Manufacturer.id)
+        .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
+        .where(_not_archived())
+        .where(Spool.remaining_weight_g.isnot(None))
+        .where(Spool.remaining_weight_g <= 0)
+        .order_by(Spool.remaining_weight_g.asc())
+        .limit(limit)
+    )
+
+
+# Independent queries of the dashboard: name -> statement builder(limit)
+DASHBOARD_QUERIES: dict[str, Callable[[int], Select]] = {
+    "inventory": inventory_query,
+    "locations": locations_query,
+    "low_stock": low_stock_query,
+    "empty_spools": empty_spools_query,
+}
+
+# Fill buckets of spools with filament left
+_STOCKED_BUCKETS = frozenset({"critical", "low", "normal", "full"})
+
+
+def summarize_inventory(inventory: list, locations: list, limit: int) -> dict[str, list]:
+    """Dashboard aggregates from the rows of inventory_query/locations_query.
+
+    Returns rows shaped like the former per-aggregate SQL queries:
+    spool_distribution, filament_stats, manufacturers, filament_types,
+    location_stats and total_value.
+    """
+    distribution = dict.fromkeys(("empty", "full", "normal", "low", "critical"), 0)
+    materials: dict[str, list] = {}
+    manufacturers: dict[int, list] = {}
+    material_counts: dict[str, int] = {}
+    location_totals: dict[int, list] = {}
+    total_value = 0.0
+
+    for material, mfr_id, mfr_name, location_id, bucket, count, grams, value in inventory:
+        count, grams = int(count or 0), float(grams or 0.0)
+        total_value += float(value or 0.0)
+        if bucket in distribution:
+            distribution[bucket] += count
+        if material:
+            material_counts[material] = material_counts.get(material, 0) + count
+        if location_id is not None:
+            totals = location_totals.setdefault(location_id, [0, 0.0])
+            totals[0] += count
+            totals[1] += grams
+        if bucket in _STOCKED_BUCKETS:
+            if material:
+                stats = materials.setdefault(material, [0, 0.0])
+                stats[0] += count
+                stats[1] += grams
+            manufacturers.setdefault(mfr_id, [mfr_name, 0])[1] += count
+
+    location_stats = [
+        (location_id, name, *location_totals.get(location_id, (0, 0.0)))
+        for location_id, name in locations
+    ]
+    return {
+        "spool_distribution": [tuple(distribution.values())],
+        "filament_stats": sorted(
+            ((m, c, g) for m, (c, g) in materials.items()), key=lambda r: (-r[2], r[0])
+        ),
+        "manufacturers": sorted(
+            ((i, n, c) for i, (n, c) in manufacturers.items()), key=lambda r: (-r[2], r[1], r[0])
+        )[:limit],
+        "filament_types": sorted(material_counts.items(), key=lambda r: (-r[1], r[0])),
+        "location_stats": sorted(location_stats, key=lambda r: (-r[2], r[0])),
+        "total_value": [(total_value,)],
+    }
+
+
+def _parallel_capable(engine: AsyncEngine | None) -> bool:
+    # In-memory SQLite shares a single connection between all sessions
+    if engine is None:
+        return False
+    return not isinstance(engine.pool, (StaticPool, SingletonThreadPool))
+
+
+async def _execute_all(
+    session_factory: Callable[[], Any], statements: dict[str, Select]
+) -> dict[str, list]:
+    async with session_factory() as db:
+        if not _parallel_capable(db.bind):
+            return {name: (await db.execute(stmt)).all() for name, stmt in statements.items()}
+
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_QUERIES)
+
+    async def run(stmt: Select) -> list:
+        async with semaphore, session_factory() as session:
+            return (await session.execute(stmt)).all()
+
+    rows = await asyncio.gather(*(run(stmt) for stmt in statements.values()))
+    return dict(zip(statements, rows))
+
+
+async def run_dashboard_queries(session_factory: Callable[[], Any], limit: int) -> dict[str, list]:
+    """Rows of the spool lists and of every aggregate of summarize_inventory().
+
+    *session_factory* returns an async session context manager; each
+    query gets its own session (and pooled connection) unless the engine
+    can only hand out one connection.
+    """
+    statements = {name: build(limit) for name, build in DASHBOARD_QUERIES.items()}
+    rows = await _execute_all(session_factory, statements)
+    return {
+        "low_stock": rows["low_stock"],
+        "empty_spools": rows["empty_spools"],
+        **summarize_inventory(rows["inventory"], rows["locations"], limit),
+    }
+
+
+# -- cache --------------------------------------------------------------------
+
+
+class DashboardStatsCache:
+    """Per-limit results with single-flight computation and invalidation."""
+
+    def __init__(self, ttl: float = CACHE_TTL) -> None:
+        self.ttl = ttl
+        self.background_refresh = settings.dashboard_background_refresh
+        self._compute: Callable[[int], Awaitable[Any]] | None = None
+        self._entries: dict[int, tuple[Any, float]] = {}
+        self._inflight: dict[int, tuple[int, asyncio.Future]] = {}
+        self._generation = 0
+        self._refresh_keys: set[int] = set()
+        self._refresh_handle: asyncio.TimerHandle | None = None
+
+    def register(self, compute: Callable[[int], Awaitable[Any]]) -> None:
+        """Set the coroutine function computing the result for a limit."""
+        self._compute = compute
+
+    async def get(self, key: int) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[1]:
+            return entry[0]
+        return await asyncio.shield(self._flight(key))
+
+    def _flight(self, key: int) -> asyncio.Future:
+        # Join a computation started after the last invalidation, if any
+        flight = self._inflight.get(key)
+        if flight is None or flight[0] != self._generation:
+            flight = (self._generation, asyncio.ensure_future(self._run(key, self._generation)))
+            self._inflight[key] = flight
+        return flight[1]
+
+    async def _run(self, key: int, generation: int) -> Any:
+        if self._compute is None:
+            raise RuntimeError("DashboardStatsCache: no compute function registered")
+        try:
+            value = await self._compute(key)
+            # A write during the computation may be missing from the result
+            if generation == self._generation:
+                self._entries[key] = (value, time.monotonic() + self.ttl)
+            return value
+        finally:
+            flight = self._inflight.get(key)
+            if flight is not None and flight[0] == generation:
+                del self._inflight[key]
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        keys = set(self._entries)
+        self._entries.clear()
+        if self.background_refresh and keys:
+            self._schedule_refresh(keys)
+
+    def _schedule_refresh(self, keys: set[int]) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._refresh_keys |= keys
+        if self._refresh_handle is not None:
+            self._refresh_handle.cancel()
+        self._refresh_handle = loop.call_later(REFRESH_DELAY, self._refresh)
+
+    def _refresh(self) -> None:
+        self._refresh_handle = None
+        keys, self._refresh_keys = self._refresh_keys, set()
+        for key in keys:
+            self._flight(key).add_done_callback(_log_refresh_error)
+
+    def clear(self) -> None:
+        if self._refresh_handle is not None:
+            self._refresh_handle.cancel()
+            self._refresh_handle = None
+        self._refresh_keys.clear()
+        self._entries.clear()
+        self._inflight.clear()
+        self._generation += 1
+
+
+def _log_refresh_error(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("Dashboard statistics refresh failed: %s", future.exception())
+
+
+# Singleton – one cache per worker process
+dashboard_stats = DashboardStatsCache()
+
+
+def _on_event(event: dict) -> None:
+    # Also delivered for the writes of other workers (relay)
+    if event.get("event") in INVALIDATING_EVENTS:
+        dashboard_stats.invalidate()
+
+
+event_bus.add_listener(_on_event)
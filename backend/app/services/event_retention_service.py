@@ -0,0 +1,362 @@
+"""Retention for spool_events and printer_slot_events.
+
+Two independent steps, both configured in AppSettings (0 = disabled):
+
+* Roll-up (``event_rollup_after_days``): runs of consecutive
+  ``print_consumption`` events of one spool on the same UTC day are merged
+  into a single summary event.  Consumption deltas are never positive, so
+  ``max(max(r + a, 0) + b, 0) == max(r + a + b, 0)`` and the merged event
+  replays to the same remaining weight.  A measurement, manual adjustment
+  or (imported) positive consumption ends the run.
+* Archival (``event_archive_after_months``): events older than the cutoff
+  are moved to the ``*_archive`` tables.  Spool events are only archived
+  when they precede an absolute weight event (measurement or absolute
+  adjustment) that stays in ``spool_events``, because rebuilds restart at
+  that event and never need the older history.
+"""
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import and_, bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    AppSettings,
+    ConsumptionDaily,
+    PrinterSlotEvent,
+    PrinterSlotEventArchive,
+    SpoolEvent,
+    SpoolEventArchive,
+    SpoolWeightCheckpoint,
+)
+from app.models.consumption import consumption_day
+from app.utils.db import json_extract_cast_string
+
+logger = logging.getLogger(__name__)
+
+# Spools processed per roll-up round trip
+ROLLUP_SPOOL_BATCH = 200
+
+# Event ids per IN (...) list when deleting or archiving
+ARCHIVE_BATCH = 1000
+
+# Event types that change the remaining weight and therefore end a roll-up run
+_WEIGHT_RESET_TYPES = ("measurement", "manual_adjust")
+
+_SPOOL_EVENT_COLUMNS = (
+    "spool_id",
+    "event_type",
+    "event_at",
+    "user_id",
+    "device_id",
+    "source",
+    "delta_weight_g",
+    "measured_weight_g",
+    "from_status_id",
+    "to_status_id",
+    "from_location_id",
+    "to_location_id",
+    "note",
+    "meta",
+    "created_at",
+)
+
+_SLOT_EVENT_COLUMNS = (
+    "printer_id",
+    "slot_id",
+    "event_type",
+    "event_at",
+    "spool_id",
+    "rfid_uid",
+    "external_id",
+    "meta",
+    "created_at",
+)
+
+
+def months_before(moment: datetime, months: int) -> datetime:
+    """Calendar-aware ``moment - months`` (day clamped to the target month)."""
+    month_index = moment.year * 12 + (moment.month - 1) - months
+    year, month = divmod(month_index, 12)
+    month += 1
+    next_month = date(year + (month == 12), month % 12 + 1, 1)
+    last_day = (next_month - timedelta(days=1)).day
+    return moment.replace(year=year, month=month, day=min(moment.day, last_day))
+
+
+def _utc_day(moment: datetime) -> date:
+    return moment.astimezone(timezone.utc).date()
+
+
+class EventRetentionService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_policy(self) -> tuple[int, int]:
+        """Return (rollup_after_days, archive_after_months) from AppSettings."""
+        result = await self.db.execute(
+            select(
+                AppSettings.event_rollup_after_days,
+                AppSettings.event_archive_after_months,
+            ).where(AppSettings.id == 1)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return 0, 0
+        return row.event_rollup_after_days or 0, row.event_archive_after_months or 0
+
+    async def run(self, now: datetime | None = None) -> dict[str, int]:
+        """Apply the configured policy and commit."""
+        now = now or datetime.now(timezone.utc)
+        rollup_days, archive_months = await self.get_policy()
+
+        stats = {
+            "consumption_events_rolled_up": 0,
+            "spool_events_archived": 0,
+            "printer_slot_events_archived": 0,
+        }
+        if rollup_days > 0:
+            stats["consumption_events_rolled_up"] = await self.rollup_consumption(
+                now - timedelta(days=rollup_days)
+            )
+        if archive_months > 0:
+            archived = await self.archive_events(months_before(now, archive_months))
+            stats.update(archived)
+
+        await self.db.commit()
+        logger.info("Event retention finished: %s", stats)
+        return stats
+
+    # ------------------------------------------------------------------ #
+    #  Roll-up
+    # ------------------------------------------------------------------ #
+
+    async def rollup_consumption(self, before: datetime) -> int:
+        """Merge same-day consumption runs older than *before*.
+
+        Returns the number of events removed by merging.  Does not commit.
+        """
+        candidates = await self.db.execute(
+            select(SpoolEvent.spool_id)
+            .where(
+                SpoolEvent.event_type == "print_consumption",
+                SpoolEvent.event_at < before,
+            )
+            .group_by(SpoolEvent.spool_id)
+            .having(func.count() > 1)
+            .order_by(SpoolEvent.spool_id)
+        )
+        spool_ids = list(candidates.scalars().all())
+
+        removed = 0
+        for start in range(0, len(spool_ids), ROLLUP_SPOOL_BATCH):
+            removed += await self._rollup_spools(
+                spool_ids[start : start + ROLLUP_SPOOL_BATCH], before
+            )
+        return removed
+
+    async def _rollup_spools(self, spool_ids: list[int], before: datetime) -> int:
+        result = await self.db.execute(
+            select(
+                SpoolEvent.id,
+                SpoolEvent.spool_id,
+                SpoolEvent.event_type,
+                SpoolEvent.event_at,
+                SpoolEvent.user_id,
+                SpoolEvent.device_id,
+                SpoolEvent.source,
+                SpoolEvent.delta_weight_g,
+                SpoolEvent.meta,
+            )
+            .where(
+                SpoolEvent.spool_id.in_(spool_ids),
+                SpoolEvent.event_at < before,
+                SpoolEvent.event_type.in_(("print_consumption", *_WEIGHT_RESET_TYPES)),
+            )
+            .order_by(SpoolEvent.spool_id, SpoolEvent.event_at, SpoolEvent.id)
+        )
+
+        runs: list[list[Any]] = []
+        current: list[Any] = []
+        for row in result.all():
+            starts_new_run = (
+                not current
+                or row.spool_id != current[-1].spool_id
+                or _utc_day(row.event_at) != _utc_day(current[-1].event_at)
+            )
+            if row.event_type != "print_consumption" or (row.delta_weight_g or 0) > 0:
+                if len(current) > 1:
+                    runs.append(current)
+                current = []
+                continue
+            if starts_new_run:
+                if len(current) > 1:
+                    runs.append(current)
+                current = []
+            current.append(row)
+        if len(current) > 1:
+            runs.append(current)
+
+        if not runs:
+            return 0
+
+        summaries: list[dict[str, Any]] = []
+        merged_ids: list[int] = []
+        for run in runs:
+            summaries.append(self._summarize_run(run))
+            merged_ids.extend(row.id for row in run[:-1])
+
+        # Core bulk statements on purpose: the mapper listeners would drop
+        # every checkpoint after the first merged event, although the merged
+        # history replays to identical values from the end of each run on.
+        # Checkpoints inside a run – also on events of other types between
+        # its consumptions – already include part of the run's delta, which
+        # now sits on its last event, so they go.
+        for start in range(0, len(runs), ROLLUP_SPOOL_BATCH):
+            await self.db.execute(
+                delete(SpoolWeightCheckpoint).where(
+                    or_(
+                        *(
+                            and_(
+                                SpoolWeightCheckpoint.spool_id == run[0].spool_id,
+                                SpoolWeightCheckpoint.event_at >= run[0].event_at,
+                                SpoolWeightCheckpoint.event_at <= run[-1].event_at,
+                                SpoolWeightCheckpoint.event_id != run[-1].id,
+                            )
+                            for run in runs[start : start + ROLLUP_SPOOL_BATCH]
+                        )
+                    )
+                )
+            )
+        await self.db.execute(update(SpoolEvent), summaries)
+        # The bulk statements skip the rollup listeners: grams are unchanged,
+        # but each run now counts as one event on its day
+        daily = ConsumptionDaily.__table__
+        await self.db.execute(
+            update(daily)
+            .where(
+                daily.c.day == bindparam("run_day"),
+                daily.c.spool_id == bindparam("run_spool_id"),
+            )
+            .values(event_count=daily.c.event_count - bindparam("merged")),
+            [
+                {
+                    "run_day": consumption_day(run[-1].event_at),
+                    "run_spool_id": run[-1].spool_id,
+                    "merged": len(run) - 1,
+                }
+                for run in runs
+            ],
+        )
+        for start in range(0, len(merged_ids), ARCHIVE_BATCH):
+            batch = merged_ids[start : start + ARCHIVE_BATCH]
+            await self.db.execute(delete(SpoolEvent).where(SpoolEvent.id.in_(batch)))
+        return len(merged_ids)
+
+    @staticmethod
+    def _summarize_run(run: list[Any]) -> dict[str, Any]:
+        """Summary values for the last event of a run, which absorbs the others."""
+        first, last = run[0], run[-1]
+        first_meta = first.meta or {}
+        aggregation_count = sum((row.meta or {}).get("aggregation_count", 1) for row in run)
+
+        meta: dict[str, Any] = {
+            "rollup": True,
+            "aggregation_count": aggregation_count,
+            "rolled_up_events": len(run),
+            "first_event_at": first_meta.get("first_event_at", first.event_at.isoformat()),
+        }
+        if any((row.meta or {}).get("clamped_to_zero") for row in run):
+            meta["clamped_to_zero"] = True
+
+        def uniform(attr: str, fallback: Any = None) -> Any:
+            values = {getattr(row, attr) for row in run}
+            return values.pop() if len(values) == 1 else fallback
+
+        return {
+            "id": last.id,
+            "delta_weight_g": sum(row.delta_weight_g or 0 for row in run),
+            "source": uniform("source", "system"),
+            "user_id": uniform("user_id"),
+            "device_id": uniform("device_id"),
+            "meta": meta,
+        }
+
+    # ------------------------------------------------------------------ #
+    #  Archival
+    # ------------------------------------------------------------------ #
+
+    async def archive_events(self, before: datetime) -> dict[str, int]:
+        """Move events older than *before* into the archive tables.
+
+        Does not commit.
+        """
+        return {
+            "spool_events_archived": await self._archive_spool_events(before),
+            "printer_slot_events_archived": await self._archive_slot_events(before),
+        }
+
+    async def _archive_spool_events(self, before: datetime) -> int:
+        adjustment_type = json_extract_cast_string(
+            SpoolEvent.meta, "$.adjustment_type", self.db.bind.dialect
+        )
+        anchors = (
+            select(
+                SpoolEvent.spool_id.label("spool_id"),
+                func.max(SpoolEvent.event_at).label("anchor_at"),
+            )
+            .where(
+                SpoolEvent.event_at < before,
+                or_(
+                    SpoolEvent.event_type == "measurement",
+                    and_(
+                        SpoolEvent.event_type == "manual_adjust",
+                        adjustment_type == "absolute",
+                    ),
+                ),
+            )
+            .group_by(SpoolEvent.spool_id)
+            .subquery("anchors")
+        )
+        archivable_ids = (
+            select(SpoolEvent.id)
+            .join(anchors, anchors.c.spool_id == SpoolEvent.spool_id)
+            .where(SpoolEvent.event_at < anchors.c.anchor_at)
+        )
+        ids = list((await self.db.execute(archivable_ids)).scalars().all())
+        if not ids:
+            return 0
+
+        for start in range(0, len(ids), ARCHIVE_BATCH):
+            batch = ids[start : start + ARCHIVE_BATCH]
+            columns = [getattr(SpoolEvent, name) for name in _SPOOL_EVENT_COLUMNS]
+            await self.db.execute(
+                insert(SpoolEventArchive).from_select(
+                    ["event_id", *_SPOOL_EVENT_COLUMNS],
+                    select(SpoolEvent.id, *columns).where(SpoolEvent.id.in_(batch)),
+                )
+            )
+            await self.db.execute(
+                delete(SpoolWeightCheckpoint).where(
+                    SpoolWeightCheckpoint.event_id.in_(batch)
+                )
+            )
+            await self.db.execute(delete(SpoolEvent).where(SpoolEvent.id.in_(batch)))
+        return len(ids)
+
+    async def _archive_slot_events(self, before: datetime) -> int:
+        columns = [getattr(PrinterSlotEvent, name) for name in _SLOT_EVENT_COLUMNS]
+        await self.db.execute(
+            insert(PrinterSlotEventArchive).from_select(
+                ["event_id", *_SLOT_EVENT_COLUMNS],
+                select(PrinterSlotEvent.id, *columns).where(
+                    PrinterSlotEvent.event_at < before
+                ),
+            )
+        )
+        result = await self.db.execute(
+            delete(PrinterSlotEvent).where(PrinterSlotEvent.event_at < before)
+        )
+        return result.rowcount or 0
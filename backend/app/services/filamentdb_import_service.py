@@ -15,6 +15,7 @@ from sqlalchemy.orm import selectinload
 
 from app.core.cache import response_cache
 from app.models.filament import Color, Filament, FilamentColor, Manufacturer
+from app.services.logo_assets import store_logo
 
 logger = logging.getLogger(__name__)
 
@@ -1580,7 +1581,9 @@ class FilamentDBImportService:
                         try:
                             resp = await client.get(logo_url)
                             if resp.status_code == 200:
-                                logo_path.write_bytes(resp.content)
+                                asset_name = store_logo(
+                                    filaman_mfr_id, "web", resp.content
+                                )
 
                                 # DB updaten
                                 mfr_result = await self.db.execute(
@@ -1590,7 +1593,7 @@ class FilamentDBImportService:
                                 )
                                 mfr = mfr_result.scalar_one_or_none()
                                 if mfr:
-                                    mfr.logo_file = logo_filename
+                                    mfr.logo_file = asset_name
                                 result.logos_downloaded += 1
                             else:
                                 result.logos_failed += 1
@@ -1615,7 +1618,9 @@ class FilamentDBImportService:
                         try:
                             resp = await client.get(label_url)
                             if resp.status_code == 200:
-                                label_path.write_bytes(resp.content)
+                                asset_name = store_logo(
+                                    filaman_mfr_id, "label", resp.content
+                                )
 
                                 # DB updaten
                                 mfr_result = await self.db.execute(
@@ -1625,7 +1630,7 @@ class FilamentDBImportService:
                                 )
                                 mfr = mfr_result.scalar_one_or_none()
                                 if mfr:
-                                    mfr.label_logo_file = label_filename
+                                    mfr.label_logo_file = asset_name
                                 result.logos_downloaded += 1
                             else:
                                 result.warnings.append(
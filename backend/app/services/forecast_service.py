@@ -0,0 +1,374 @@
+"""Days-until-empty forecasts from exponentially weighted consumption rates.
+
+Every recorded consumption updates the decaying rate of its spool and
+filament (see app/models/forecast.py).  Projections ``remaining / rate`` use
+the rate decayed to the current time, so idle spools drift out of the
+forecast.  SpoolService re-evaluates them in the transaction of every
+consumption, measurement and adjustment; when a projection drops to
+``LOW_STOCK_DAYS`` or below, a ``spool_low_stock`` / ``filament_low_stock``
+event is published once after the commit.  The flag resets when the
+projection recovers (e.g. after a measurement or when a new spool of the
+filament is stocked).
+"""
+
+import logging
+import math
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.event_bus import event_bus
+from app.models import (
+    Filament,
+    FilamentForecast,
+    Manufacturer,
+    Spool,
+    SpoolEvent,
+    SpoolForecast,
+    SpoolStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+# Time constant of the exponential weighting; older usage fades with exp(-t/tau)
+FORECAST_TAU_DAYS = 14.0
+
+# Projections at or below this many days raise a low-stock event
+LOW_STOCK_DAYS = 14
+
+# Reorder-by date = projected empty date minus this lead time
+REORDER_LEAD_DAYS = 7
+
+# Rates whose last consumption is older than this are not projected
+FORECAST_STALE_DAYS = 60
+
+# Spool statuses whose remaining weight does not count as stock
+_NO_STOCK_STATUSES = ("empty", "archived")
+
+
+def decay_add(
+    decayed_g: float, last_event_at: datetime, grams: float, event_at: datetime
+) -> tuple[float, datetime]:
+    """Add *grams* at *event_at* to a decaying sum last updated at *last_event_at*."""
+    dt_days = (event_at - last_event_at).total_seconds() / 86400
+    if dt_days >= 0:
+        return decayed_g * math.exp(-dt_days / FORECAST_TAU_DAYS) + grams, event_at
+    # Back-dated consumption: weight it as of the newer reference time
+    return decayed_g + grams * math.exp(dt_days / FORECAST_TAU_DAYS), last_event_at
+
+
+def current_rate(rate_g_per_day: float, last_event_at: datetime, now: datetime) -> float:
+    """*rate_g_per_day* as of *last_event_at*, decayed to *now*."""
+    idle_days = max((now - last_event_at).total_seconds() / 86400, 0.0)
+    return rate_g_per_day * math.exp(-idle_days / FORECAST_TAU_DAYS)
+
+
+def projection(remaining_g: float | None, rate_g_per_day: float) -> float | None:
+    """Days until *remaining_g* is used up at *rate_g_per_day*."""
+    if remaining_g is None or rate_g_per_day <= 0:
+        return None
+    return max(remaining_g, 0.0) / rate_g_per_day
+
+
+def _projected_dates(days: float, today: date) -> dict[str, Any]:
+    empty_on = today + timedelta(days=math.floor(days))
+    return {
+        "days_until_empty": round(days, 1),
+        "empty_on": empty_on,
+        "reorder_by": max(today, empty_on - timedelta(days=REORDER_LEAD_DAYS)),
+    }
+
+
+def _ranked(
+    rows: list[Any],
+    stock_key: str,
+    now: datetime,
+    limit: int,
+    within_days: float | None,
+) -> list[dict[str, Any]]:
+    """Forecast rows projected with their current rate, soonest empty first."""
+    today = now.date()
+    ranked: list[tuple[float, dict[str, Any]]] = []
+    for row in rows:
+        rate = current_rate(row["rate_g_per_day"], row["last_event_at"], now)
+        days = projection(row[stock_key], rate)
+        if days is None or (within_days is not None and days > within_days):
+            continue
+        item = {key: value for key, value in row.items() if key != "last_event_at"}
+        item["rate_g_per_day"] = round(rate, 2)
+        ranked.append((days, {**item, **_projected_dates(days, today)}))
+    ranked.sort(key=lambda entry: entry[0])
+    return [item for _, item in ranked[:limit]]
+
+
+async def publish_low_stock(events: list[dict[str, Any]]) -> None:
+    """Publish the crossings returned by ForecastService, after the commit."""
+    for payload in events:
+        await event_bus.publish(payload)
+
+
+class ForecastService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # ------------------------------------------------------------------ #
+    #  Incremental maintenance
+    # ------------------------------------------------------------------ #
+
+    async def observe_consumption(
+        self, spool_id: int, filament_id: int, grams: float, event_at: datetime
+    ) -> list[dict[str, Any]]:
+        """Fold a consumption into the rates and re-evaluate the projections.
+
+        Does not commit.  Returns the low-stock crossings to publish with
+        ``publish_low_stock()`` once the caller committed.
+        """
+        return await self._evaluate(
+            spool_id,
+            filament_id,
+            await self._fold(SpoolForecast, spool_id, grams, event_at),
+            await self._fold(FilamentForecast, filament_id, grams, event_at),
+        )
+
+    async def observe_stock(self, spool_id: int, filament_id: int) -> list[dict[str, Any]]:
+        """Re-evaluate the projections after the stock of a spool changed.
+
+        Does not commit.  Returns the low-stock crossings to publish with
+        ``publish_low_stock()`` once the caller committed.
+        """
+        return await self._evaluate(
+            spool_id,
+            filament_id,
+            await self.db.get(SpoolForecast, spool_id),
+            await self.db.get(FilamentForecast, filament_id),
+        )
+
+    async def _evaluate(
+        self,
+        spool_id: int,
+        filament_id: int,
+        spool_forecast: SpoolForecast | None,
+        filament_forecast: FilamentForecast | None,
+    ) -> list[dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        events: list[dict[str, Any]] = []
+        if spool_forecast is not None:
+            spool_days = projection(
+                await self._spool_stock(spool_id),
+                current_rate(
+                    spool_forecast.rate_g_per_day, spool_forecast.last_event_at, now
+                ),
+            )
+            if self._update_flag(spool_forecast, spool_days):
+                events.append(
+                    {
+                        "event": "spool_low_stock",
+                        "spool_id": spool_id,
+                        "filament_id": filament_id,
+                        "days_until_empty": round(spool_days, 1),
+                    }
+                )
+        if filament_forecast is not None:
+            filament_days = projection(
+                await self._filament_stock(filament_id),
+                current_rate(
+                    filament_forecast.rate_g_per_day, filament_forecast.last_event_at, now
+                ),
+            )
+            if self._update_flag(filament_forecast, filament_days):
+                events.append(
+                    {
+                        "event": "filament_low_stock",
+                        "filament_id": filament_id,
+                        "days_until_empty": round(filament_days, 1),
+                    }
+                )
+        return events
+
+    async def _fold(self, model, key: int, grams: float, event_at: datetime):
+        forecast = await self.db.get(model, key)
+        if forecast is None:
+            forecast = model(decayed_g=0.0, last_event_at=event_at, low_stock=False)
+            setattr(forecast, model.__mapper__.primary_key[0].key, key)
+            self.db.add(forecast)
+        forecast.decayed_g, forecast.last_event_at = decay_add(
+            forecast.decayed_g, forecast.last_event_at, grams, event_at
+        )
+        forecast.rate_g_per_day = forecast.decayed_g / FORECAST_TAU_DAYS
+        return forecast
+
+    @staticmethod
+    def _update_flag(forecast, days: float | None) -> bool:
+        """Set the low-stock flag; True when the projection just crossed."""
+        low = days is not None and days <= LOW_STOCK_DAYS
+        crossed = low and not forecast.low_stock
+        forecast.low_stock = low
+        return crossed
+
+    async def _spool_stock(self, spool_id: int) -> float | None:
+        result = await self.db.execute(
+            select(Spool.remaining_weight_g).where(Spool.id == spool_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def _filament_stock(self, filament_id: int) -> float:
+        result = await self.db.execute(
+            select(func.coalesce(func.sum(Spool.remaining_weight_g), 0.0))
+            .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
+            .where(
+                Spool.filament_id == filament_id,
+                Spool.remaining_weight_g > 0,
+                SpoolStatus.key.not_in(_NO_STOCK_STATUSES),
+            )
+        )
+        return result.scalar_one()
+
+    async def rebuild(self) -> dict[str, int]:
+        """Recompute all rates from the print_consumption history and commit.
+
+        Low-stock flags are set to the current state without publishing.
+        """
+        spools: dict[int, list[Any]] = {}
+        filaments: dict[int, list[Any]] = {}
+        result = await self.db.stream(
+            select(
+                SpoolEvent.spool_id,
+                Spool.filament_id,
+                SpoolEvent.event_at,
+                SpoolEvent.delta_weight_g,
+            )
+            .join(Spool, Spool.id == SpoolEvent.spool_id)
+            .where(SpoolEvent.event_type == "print_consumption")
+            .order_by(SpoolEvent.event_at, SpoolEvent.id)
+        )
+        async for spool_id, filament_id, event_at, delta in result:
+            grams = abs(delta or 0.0)
+            for states, key in ((spools, spool_id), (filaments, filament_id)):
+                state = states.get(key)
+                if state is None:
+                    states[key] = [grams, event_at]
+                else:
+                    state[0], state[1] = decay_add(state[0], state[1], grams, event_at)
+
+        spool_stock = dict(
+            (await self.db.execute(select(Spool.id, Spool.remaining_weight_g))).all()
+        )
+        filament_stock = dict(
+            (
+                await self.db.execute(
+                    select(Spool.filament_id, func.sum(Spool.remaining_weight_g))
+                    .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
+                    .where(
+                        Spool.remaining_weight_g > 0,
+                        SpoolStatus.key.not_in(_NO_STOCK_STATUSES),
+                    )
+                    .group_by(Spool.filament_id)
+                )
+            ).all()
+        )
+
+        now = datetime.now(timezone.utc)
+        await self.db.execute(SpoolForecast.__table__.delete())
+        await self.db.execute(FilamentForecast.__table__.delete())
+        for model, states, stock in (
+            (SpoolForecast, spools, spool_stock),
+            (FilamentForecast, filaments, filament_stock),
+        ):
+            key_name = model.__mapper__.primary_key[0].key
+            for key, (decayed, last_at) in states.items():
+                rate = decayed / FORECAST_TAU_DAYS
+                days = projection(stock.get(key, 0.0), current_rate(rate, last_at, now))
+                self.db.add(
+                    model(
+                        decayed_g=decayed,
+                        rate_g_per_day=rate,
+                        last_event_at=last_at,
+                        low_stock=days is not None and days <= LOW_STOCK_DAYS,
+                        **{key_name: key},
+                    )
+                )
+        await self.db.commit()
+
+        stats = {"spools": len(spools), "filaments": len(filaments)}
+        logger.info("Consumption forecasts rebuilt: %s", stats)
+        return stats
+
+    # ------------------------------------------------------------------ #
+    #  Queries
+    # ------------------------------------------------------------------ #
+
+    async def spool_forecasts(
+        self, limit: int = 50, within_days: float | None = None
+    ) -> list[dict[str, Any]]:
+        """Spools ordered by days until empty (soonest first)."""
+        now = datetime.now(timezone.utc)
+        # Ranked in Python: the rates decay with the time since last_event_at
+        query = (
+            select(
+                Spool.id.label("spool_id"),
+                Spool.filament_id,
+                Filament.designation.label("filament_designation"),
+                Manufacturer.name.label("manufacturer_name"),
+                Spool.remaining_weight_g,
+                SpoolForecast.rate_g_per_day,
+                SpoolForecast.last_event_at,
+            )
+            .join(Spool, Spool.id == SpoolForecast.spool_id)
+            .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
+            .join(Filament, Filament.id == Spool.filament_id)
+            .join(Manufacturer, Manufacturer.id == Filament.manufacturer_id)
+            .where(
+                SpoolForecast.rate_g_per_day > 0,
+                SpoolForecast.last_event_at >= now - timedelta(days=FORECAST_STALE_DAYS),
+                Spool.remaining_weight_g > 0,
+                SpoolStatus.key.not_in(_NO_STOCK_STATUSES),
+            )
+        )
+        result = await self.db.execute(query)
+        return _ranked(
+            result.mappings().all(), "remaining_weight_g", now, limit, within_days
+        )
+
+    async def filament_forecasts(
+        self, limit: int = 50, within_days: float | None = None
+    ) -> list[dict[str, Any]]:
+        """Filaments ordered by days until their stocked spools run out."""
+        now = datetime.now(timezone.utc)
+        stock = (
+            select(
+                Spool.filament_id.label("filament_id"),
+                func.sum(Spool.remaining_weight_g).label("stock_g"),
+                func.count(Spool.id).label("spool_count"),
+            )
+            .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
+            .where(
+                Spool.remaining_weight_g > 0,
+                SpoolStatus.key.not_in(_NO_STOCK_STATUSES),
+            )
+            .group_by(Spool.filament_id)
+            .subquery("stock")
+        )
+        stock_g = func.coalesce(stock.c.stock_g, 0.0)
+        query = (
+            select(
+                FilamentForecast.filament_id,
+                Filament.designation.label("filament_designation"),
+                Manufacturer.name.label("manufacturer_name"),
+                stock_g.label("stock_g"),
+                func.coalesce(stock.c.spool_count, 0).label("spool_count"),
+                FilamentForecast.rate_g_per_day,
+                FilamentForecast.last_event_at,
+            )
+            .join(Filament, Filament.id == FilamentForecast.filament_id)
+            .join(Manufacturer, Manufacturer.id == Filament.manufacturer_id)
+            .outerjoin(stock, stock.c.filament_id == FilamentForecast.filament_id)
+            .where(
+                FilamentForecast.rate_g_per_day > 0,
+                FilamentForecast.last_event_at
+                >= now - timedelta(days=FORECAST_STALE_DAYS),
+            )
+        )
+        result = await self.db.execute(query)
+        return _ranked(result.mappings().all(), "stock_g", now, limit, within_days)
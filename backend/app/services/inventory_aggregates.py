@@ -0,0 +1,138 @@
+"""Inventory aggregate per filament, location and fill bucket.
+
+The dashboard reads spool counts, grams and value from the
+``inventory_aggregates`` table instead of scanning all spools.  The rows of a
+filament are recounted from its spools whenever the spool counters of that
+filament are refreshed (``refresh_counters_sync`` in
+app/services/spool_counters.py), i.e. in the transaction of every write that
+changes a spool's weight, status, location, threshold or price – ORM writes
+through the mapper listeners, Core statements through their explicit
+``refresh_spool_counters()`` call.
+
+A recount replaces the filament's rows with one ``INSERT ... SELECT``, so it
+is idempotent; ``python -m app.cli check-inventory`` compares the table with
+a full recount and ``--rebuild`` rewrites it from scratch.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import Select, case, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import InventoryAggregate, Spool, SpoolStatus
+
+# Ids per IN (...) list
+REFRESH_CHUNK_SIZE = 500
+
+# Relative tolerance when comparing sums in check_inventory()
+SUM_TOLERANCE = 1e-6
+
+_COLUMNS = ("filament_id", "location_id", "fill_bucket", "spool_count", "remaining_weight_g", "value")
+
+
+def fill_bucket_expression() -> Any:
+    """Dashboard fill bucket of a spool as SQL expression."""
+    remaining = Spool.remaining_weight_g
+    threshold = Spool.low_weight_threshold_g
+    return case(
+        (remaining.is_(None), "unknown"),
+        (remaining <= 0, "empty"),
+        (remaining <= threshold / 2, "critical"),
+        (remaining <= threshold, "low"),
+        (
+            (Spool.initial_total_weight_g > 0)
+            & ((remaining / Spool.initial_total_weight_g) * 100 > 75),
+            "full",
+        ),
+        else_="normal",
+    )
+
+
+def _aggregate_select(filament_ids: list[int] | None = None) -> Select:
+    bucket = fill_bucket_expression()
+    stmt = (
+        select(
+            Spool.filament_id,
+            Spool.location_id,
+            bucket,
+            func.count(Spool.id),
+            func.coalesce(func.sum(Spool.remaining_weight_g), 0.0),
+            func.coalesce(func.sum(Spool.purchase_price), 0.0),
+        )
+        .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
+        .where(SpoolStatus.key != "archived")
+        .group_by(Spool.filament_id, Spool.location_id, bucket)
+    )
+    if filament_ids is not None:
+        stmt = stmt.where(Spool.filament_id.in_(filament_ids))
+    return stmt
+
+
+def refresh_inventory_sync(session: Session, filament_ids: Iterable[int]) -> None:
+    """Recount the aggregate rows of *filament_ids* in the current transaction."""
+    table = InventoryAggregate.__table__
+    ids = sorted({fid for fid in filament_ids if fid is not None})
+    for start in range(0, len(ids), REFRESH_CHUNK_SIZE):
+        chunk = ids[start : start + REFRESH_CHUNK_SIZE]
+        session.execute(delete(table).where(table.c.filament_id.in_(chunk)))
+        session.execute(
+            insert(table).from_select([table.c[c] for c in _COLUMNS], _aggregate_select(chunk))
+        )
+
+
+async def rebuild_inventory(db: AsyncSession) -> int:
+    """Rewrite the whole table from the spools and commit; returns the row count."""
+    table = InventoryAggregate.__table__
+    await db.execute(delete(table))
+    await db.execute(insert(table).from_select([table.c[c] for c in _COLUMNS], _aggregate_select()))
+    await db.commit()
+    count = await db.execute(select(func.count()).select_from(table))
+    return int(count.scalar() or 0)
+
+
+def _differs(stored: tuple, expected: tuple) -> bool:
+    if stored[0] != expected[0]:
+        return True
+    return any(
+        abs(a - b) > SUM_TOLERANCE * max(1.0, abs(a), abs(b))
+        for a, b in zip(stored[1:], expected[1:])
+    )
+
+
+async def check_inventory(db: AsyncSession) -> list[dict[str, Any]]:
+    """Differences between the table and a full recount (empty if consistent)."""
+    expected: dict[tuple, tuple] = {}
+    for fid, lid, bucket, count, grams, value in (await db.execute(_aggregate_select())).all():
+        expected[(fid, lid, bucket)] = (int(count), float(grams), float(value))
+
+    stored: dict[tuple, tuple] = {}
+    table = InventoryAggregate.__table__
+    rows = await db.execute(
+        select(
+            table.c.filament_id,
+            table.c.location_id,
+            table.c.fill_bucket,
+            func.sum(table.c.spool_count),
+            func.sum(table.c.remaining_weight_g),
+            func.sum(table.c.value),
+        ).group_by(table.c.filament_id, table.c.location_id, table.c.fill_bucket)
+    )
+    for fid, lid, bucket, count, grams, value in rows.all():
+        stored[(fid, lid, bucket)] = (int(count), float(grams), float(value))
+
+    zero = (0, 0.0, 0.0)
+    return [
+        {
+            "filament_id": key[0],
+            "location_id": key[1],
+            "fill_bucket": key[2],
+            "stored": stored.get(key, zero),
+            "expected": expected.get(key, zero),
+        }
+        for key in sorted(set(stored) | set(expected), key=lambda k: (k[0], k[1] or 0, k[2]))
+        if _differs(stored.get(key, zero), expected.get(key, zero))
+    ]
@@ -0,0 +1,194 @@
+"""Daily inventory snapshots for trend charts.
+
+The primary worker copies the dashboard inventory aggregate into
+``inventory_snapshots`` once an hour, summed up per material, manufacturer
+and location – a few dozen rows per day.  Today's rows are replaced on
+every run, so a finished day keeps the stock of its last run.
+
+Old snapshots are thinned out instead of being deleted: after
+``DAILY_SNAPSHOT_DAYS`` only the last snapshot of each ISO week is kept,
+after ``WEEKLY_SNAPSHOT_DAYS`` only the last one of each month.  Stock is a
+level, not a flow, so a week or month is represented by its last sample
+rather than a sum, both here and in ``query``.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Date, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Filament, InventoryAggregate, InventorySnapshot
+from app.services.consumption_analytics_service import bucket_start, group_labels
+
+logger = logging.getLogger(__name__)
+
+GROUP_BY_COLUMNS = {
+    "material_type": InventorySnapshot.material_type,
+    "manufacturer": InventorySnapshot.manufacturer_id,
+    "location": InventorySnapshot.location_id,
+}
+
+# Snapshots younger than this keep their daily resolution
+DAILY_SNAPSHOT_DAYS = 92
+
+# Then one per week up to this age, one per month beyond
+WEEKLY_SNAPSHOT_DAYS = 730
+
+# Days per DELETE ... WHERE day IN (...)
+DELETE_BATCH = 500
+
+
+class InventorySnapshotService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def run(self, now: datetime | None = None) -> dict[str, int]:
+        """Snapshot today's inventory, thin out old snapshots and commit."""
+        today = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).date()
+        stats = {
+            "rows": await self.take_snapshot(today),
+            "days_removed": await self.downsample(today),
+        }
+        await self.db.commit()
+        logger.debug("Inventory snapshot finished: %s", stats)
+        return stats
+
+    async def take_snapshot(self, day: date) -> int:
+        """Replace the snapshot of *day* with the current inventory.
+
+        Returns the number of rows written.  Does not commit.
+        """
+        table = InventorySnapshot.__table__
+        await self.db.execute(delete(table).where(table.c.day == day))
+        result = await self.db.execute(
+            insert(table).from_select(
+                [
+                    "day",
+                    "material_type",
+                    "manufacturer_id",
+                    "location_id",
+                    "spool_count",
+                    "remaining_weight_g",
+                    "value",
+                ],
+                select(
+                    literal(day, Date()),
+                    Filament.material_type,
+                    Filament.manufacturer_id,
+                    InventoryAggregate.location_id,
+                    func.sum(InventoryAggregate.spool_count),
+                    func.sum(InventoryAggregate.remaining_weight_g),
+                    func.sum(InventoryAggregate.value),
+                )
+                .join(Filament, InventoryAggregate.filament_id == Filament.id)
+                .group_by(
+                    Filament.material_type,
+                    Filament.manufacturer_id,
+                    InventoryAggregate.location_id,
+                ),
+            )
+        )
+        return max(result.rowcount or 0, 0)
+
+    async def downsample(self, today: date) -> int:
+        """Keep one snapshot per week/month for old days.
+
+        Returns the number of days removed.  Does not commit.
+        """
+        daily_cutoff = today - timedelta(days=DAILY_SNAPSHOT_DAYS)
+        weekly_cutoff = today - timedelta(days=WEEKLY_SNAPSHOT_DAYS)
+        result = await self.db.execute(
+            select(InventorySnapshot.day)
+            .where(InventorySnapshot.day < daily_cutoff)
+            .distinct()
+        )
+        days = set(result.scalars().all())
+
+        keep: dict[tuple[str, date], date] = {}
+        for day in days:
+            bucket = "week" if day >= weekly_cutoff else "month"
+            period = (bucket, bucket_start(day, bucket))
+            if keep.get(period, day) <= day:
+                keep[period] = day
+        removed = sorted(days - set(keep.values()))
+
+        for start in range(0, len(removed), DELETE_BATCH):
+            await self.db.execute(
+                delete(InventorySnapshot).where(
+                    InventorySnapshot.day.in_(removed[start : start + DELETE_BATCH])
+                )
+            )
+        return len(removed)
+
+    async def query(
+        self,
+        start: date,
+        end: date,
+        group_by: str | None = None,
+        bucket: str = "day",
+    ) -> list[dict[str, Any]]:
+        """Stock per bucket (and group) for ``start <= day <= end``.
+
+        Each bucket shows its last snapshot in the range.  Returns rows
+        ordered by period and key with ``period``, ``day``, ``key``,
+        ``label``, ``spool_count``, ``remaining_weight_g`` and ``value``.
+        """
+        in_range = (InventorySnapshot.day >= start, InventorySnapshot.day <= end)
+        result = await self.db.execute(
+            select(InventorySnapshot.day).where(*in_range).distinct()
+        )
+        sample_days: dict[date, date] = {}
+        for day in result.scalars().all():
+            period = bucket_start(day, bucket)
+            sample_days[period] = max(day, sample_days.get(period, day))
+        if not sample_days:
+            return []
+        periods = {day: period for period, day in sample_days.items()}
+
+        group_column = GROUP_BY_COLUMNS[group_by] if group_by else None
+        columns = [InventorySnapshot.day]
+        if group_column is not None:
+            columns.append(group_column.label("key"))
+        stmt = (
+            select(
+                *columns,
+                func.sum(InventorySnapshot.spool_count).label("spool_count"),
+                func.sum(InventorySnapshot.remaining_weight_g).label("remaining_weight_g"),
+                func.sum(InventorySnapshot.value).label("value"),
+            )
+            .where(*in_range)
+            .group_by(*columns)
+        )
+        if bucket != "day":
+            stmt = stmt.where(InventorySnapshot.day.in_(sorted(periods)))
+
+        totals: dict[tuple[date, Any], dict[str, Any]] = defaultdict(
+            lambda: {"spool_count": 0, "remaining_weight_g": 0.0, "value": 0.0}
+        )
+        days: dict[date, date] = {}
+        for row in (await self.db.execute(stmt)).all():
+            key = row.key if group_column is not None else None
+            entry = totals[(periods[row.day], key)]
+            entry["spool_count"] += row.spool_count or 0
+            entry["remaining_weight_g"] += row.remaining_weight_g or 0.0
+            entry["value"] += row.value or 0.0
+            days[periods[row.day]] = row.day
+
+        labels = await group_labels(self.db, group_by, {key for _, key in totals})
+        return [
+            {
+                "period": period,
+                "day": days[period],
+                "key": key,
+                "label": labels.get(key),
+                "spool_count": entry["spool_count"],
+                "remaining_weight_g": round(entry["remaining_weight_g"], 3),
+                "value": round(entry["value"], 2),
+            }
+            for (period, key), entry in sorted(
+                totals.items(), key=lambda item: (item[0][0], str(item[0][1]))
+            )
+        ]
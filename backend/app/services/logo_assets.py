@@ -0,0 +1,225 @@
+"""Content-addressed manufacturer logo assets.
+
+Every stored logo is kept in three forms:
+
+* ``{id}.png`` / ``{id}_label.png`` – the current original under its fixed
+  name, as before (unversioned URLs, FilamentDB import checks)
+* ``variants/{stem}.{digest}.png`` – the same bytes under their content hash
+* ``variants/{stem}.{digest}.{size}.png`` – size variants (list thumbnail,
+  label size), rendered with Pillow if it is installed; without Pillow the
+  hashed original stands in for every size
+
+``Manufacturer.logo_file`` / ``label_logo_file`` hold the hashed asset name
+(``12.3fa9c0d1e2b4a5c6.png``).  The URLs built from it carry the digest, so
+the logo endpoints can answer them with a strong ETag and an immutable
+``Cache-Control`` – a browser renders a list of logos without asking the
+backend again until a logo is replaced.  Legacy names without digest
+(``12.png``) keep working with a one-day cache until
+``python -m app.cli rebuild-logos`` creates their assets.
+
+With ``LOGO_ACCEL_REDIRECT`` set (nginx ``internal`` location aliasing the
+logo directory) the endpoints only check access and the cache validators
+and let nginx send the file via ``X-Accel-Redirect``.
+
+Usage:
+    from app.services.logo_assets import store_logo
+
+    manufacturer.logo_file = store_logo(manufacturer.id, "web", resp.content)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import re
+from pathlib import Path
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import MANUFACTURER_LOGO_DIR, settings
+from app.models import Manufacturer
+
+try:
+    from PIL import Image
+except ImportError:  # optional: variants fall back to the original
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Logo kinds -> file stem suffix
+LOGO_KINDS = {"web": "", "label": "_label"}
+
+# Size variants per kind: name -> bounding box (px, twice the CSS size)
+LOGO_VARIANTS: dict[str, dict[str, tuple[int, int]]] = {
+    "web": {"thumb": (192, 128)},
+    "label": {"label": (480, 120)},
+}
+
+# Hex characters of the content hash in asset names and URLs
+DIGEST_LENGTH = 16
+
+_ASSET_RE = re.compile(r"^(\d+(?:_label)?)\.([0-9a-f]{%d})\.png$" % DIGEST_LENGTH)
+_DIGEST_RE = re.compile(r"^[0-9a-f]{%d}$" % DIGEST_LENGTH)
+
+
+def variant_dir() -> Path:
+    return MANUFACTURER_LOGO_DIR / "variants"
+
+
+def logo_stem(manufacturer_id: int, kind: str) -> str:
+    return f"{manufacturer_id}{LOGO_KINDS[kind]}"
+
+
+def logo_digest(asset_name: str | None) -> str | None:
+    """Content hash from a stored asset name, None for legacy names."""
+    if not asset_name:
+        return None
+    match = _ASSET_RE.match(asset_name)
+    return match.group(2) if match else None
+
+
+def is_digest(value: str | None) -> bool:
+    return bool(value) and _DIGEST_RE.match(value) is not None
+
+
+def _render_variant(content: bytes, box: tuple[int, int]) -> bytes | None:
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(content)) as img:
+            img.load()
+            if img.width <= box[0] and img.height <= box[1]:
+                return None
+            img = img.convert("RGBA") if img.mode not in ("RGBA", "LA", "L") else img
+            img.thumbnail(box, Image.LANCZOS)
+            out = io.BytesIO()
+            img.save(out, format="PNG", optimize=True)
+            return out.getvalue()
+    except Exception as exc:
+        logger.warning("Could not render logo variant %sx%s: %s", box[0], box[1], exc)
+        return None
+
+
+def _remove_stale(stem: str, digest: str | None) -> None:
+    directory = variant_dir()
+    if not directory.is_dir():
+        return
+    for path in directory.glob(f"{stem}.*.png"):
+        if digest is None or path.name.split(".")[1] != digest:
+            try:
+                path.unlink()
+            except OSError as exc:
+                logger.warning("Could not delete logo asset %s: %s", path.name, exc)
+
+
+def store_logo(manufacturer_id: int, kind: str, content: bytes) -> str:
+    """Write a logo with its hashed copy and size variants.
+
+    Returns the asset name to store on the manufacturer.
+    """
+    stem = logo_stem(manufacturer_id, kind)
+    digest = hashlib.sha256(content).hexdigest()[:DIGEST_LENGTH]
+    directory = variant_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    (MANUFACTURER_LOGO_DIR / f"{stem}.png").write_bytes(content)
+    (directory / f"{stem}.{digest}.png").write_bytes(content)
+    for size, box in LOGO_VARIANTS[kind].items():
+        rendered = _render_variant(content, box)
+        if rendered is not None:
+            (directory / f"{stem}.{digest}.{size}.png").write_bytes(rendered)
+    _remove_stale(stem, digest)
+    return f"{stem}.{digest}.png"
+
+
+def remove_logos(manufacturer_id: int) -> None:
+    """Delete all originals and assets of a manufacturer."""
+    for kind in LOGO_KINDS:
+        stem = logo_stem(manufacturer_id, kind)
+        path = MANUFACTURER_LOGO_DIR / f"{stem}.png"
+        if path.is_file():
+            try:
+                path.unlink()
+                logger.info("Deleted logo file %s for manufacturer %s", path.name, manufacturer_id)
+            except OSError as exc:
+                logger.warning(
+                    "Could not delete logo file %s for manufacturer %s: %s",
+                    path.name,
+                    manufacturer_id,
+                    exc,
+                )
+        _remove_stale(stem, None)
+
+
+def resolve_logo(
+    manufacturer_id: int, kind: str, digest: str | None, size: str | None
+) -> tuple[Path, str | None]:
+    """File to serve and its immutable version tag.
+
+    The tag is ``{digest}`` for the hashed original and ``{digest}-{size}``
+    for a rendered variant.  It is None when the unversioned original is
+    served: no digest requested, or a digest that was replaced meanwhile.
+    """
+    stem = logo_stem(manufacturer_id, kind)
+    if is_digest(digest):
+        directory = variant_dir()
+        if size and size in LOGO_VARIANTS[kind]:
+            path = directory / f"{stem}.{digest}.{size}.png"
+            if path.is_file():
+                return path, f"{digest}-{size}"
+        path = directory / f"{stem}.{digest}.png"
+        if path.is_file():
+            return path, digest
+    return MANUFACTURER_LOGO_DIR / f"{stem}.png", None
+
+
+def accel_redirect_uri(path: Path) -> str:
+    """nginx internal URI of a file below MANUFACTURER_LOGO_DIR."""
+    relative = path.relative_to(MANUFACTURER_LOGO_DIR).as_posix()
+    return settings.logo_accel_redirect.rstrip("/") + "/" + relative
+
+
+_etag_cache: dict[tuple[str, int, int], str] = {}
+
+
+def file_etag(path: Path) -> str:
+    """Strong ETag from the file content (unversioned originals)."""
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    etag = _etag_cache.get(key)
+    if etag is None:
+        etag = hashlib.sha256(path.read_bytes()).hexdigest()[:DIGEST_LENGTH]
+        if len(_etag_cache) > 1024:
+            _etag_cache.clear()
+        _etag_cache[key] = etag
+    return etag
+
+
+async def rebuild_logo_assets(db: AsyncSession) -> int:
+    """Create the hashed assets for logos stored before the pipeline and commit.
+
+    Returns the number of manufacturers whose asset names changed.
+    """
+    manufacturers = (
+        await db.execute(
+            select(Manufacturer).where(
+                or_(Manufacturer.logo_file.is_not(None), Manufacturer.label_logo_file.is_not(None))
+            )
+        )
+    ).scalars().all()
+    changed = 0
+    for manufacturer in manufacturers:
+        updated = False
+        for kind, attr in (("web", "logo_file"), ("label", "label_logo_file")):
+            path = MANUFACTURER_LOGO_DIR / f"{logo_stem(manufacturer.id, kind)}.png"
+            if not getattr(manufacturer, attr) or not path.is_file():
+                continue
+            asset = store_logo(manufacturer.id, kind, path.read_bytes())
+            if asset != getattr(manufacturer, attr):
+                setattr(manufacturer, attr, asset)
+                updated = True
+        changed += updated
+    await db.commit()
+    return changed
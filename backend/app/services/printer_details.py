@@ -0,0 +1,264 @@
+"""Per-printer cache of the serialized ``GET /printers/{id}`` response.
+
+The detail response joins slots, assignments, spools, filaments,
+manufacturers and colors.  The printer page reloads it on every
+``slots_update`` event – several times a second per open tab during a
+print – so each printer's response is cached as ready-to-send JSON bytes
+together with the ids of the rows it was built from (``refs``).  Concurrent
+requests for the same printer share one load.
+
+Invalidation is per printer and per referenced row:
+
+* ``slots_update`` / ``printer_update`` (driver writes) and
+  ``printer_changed`` (printer endpoints) drop the entry of that printer.
+* ``printer_details_changed`` carries the ids of changed rows per kind
+  (``PRINTER_DETAIL_KINDS``) and drops the entries referencing one of them;
+  without ids it drops everything.  The mapper listeners below collect the
+  ids of relevant ORM writes and publish the event after the commit;
+  bulk statements that bypass the ORM report theirs with
+  ``note_printer_detail_changes()``.
+
+The event bus relay delivers the events to every worker.  ``DETAIL_MAX_AGE``
+bounds the staleness for writes that report nothing.
+
+Usage:
+    from app.services.printer_details import printer_details
+
+    printer_details.register(load)  # async (printer_id) -> (body, refs) | None
+    body = await printer_details.get(printer_id)  # None: printer not found
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.core.event_bus import event_bus
+from app.models import Color, Filament, FilamentColor, Manufacturer, Printer, Spool
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached response is served without a change event
+DETAIL_MAX_AGE = 300
+
+# Row kinds a detail response references
+PRINTER_DETAIL_KINDS = ("printers", "spools", "filaments", "manufacturers", "colors")
+
+# Ids per event at most; larger changes invalidate everything (relay slots are 4 KB)
+MAX_EVENT_IDS = 200
+
+# Events that change the detail of the printer named in "printer_id"
+PRINTER_EVENTS = frozenset({"slots_update", "printer_update", "printer_changed"})
+
+_PENDING_KEY = "printer_details_pending"
+
+Refs = dict[str, frozenset[int]]
+Loader = Callable[[int], Awaitable[tuple[bytes, Refs] | None]]
+
+
+class PrinterDetailCache:
+    """Serialized detail responses per printer with reference tracking."""
+
+    def __init__(self, max_age: float = DETAIL_MAX_AGE) -> None:
+        self.max_age = max_age
+        self._load: Loader | None = None
+        self._entries: dict[int, tuple[bytes, Refs, float]] = {}
+        self._inflight: dict[int, tuple[tuple[int, int], asyncio.Future]] = {}
+        # Bumped by reference invalidations, whose rows an unfinished load
+        # may already have read; per-printer versions for everything else
+        self._generation = 0
+        self._versions: dict[int, int] = {}
+
+    def register(self, load: Loader) -> None:
+        """Set the coroutine function loading (body, refs) of a printer."""
+        self._load = load
+
+    async def get(self, printer_id: int) -> bytes | None:
+        entry = self._entries.get(printer_id)
+        if entry is not None and time.monotonic() < entry[2]:
+            return entry[0]
+        return await asyncio.shield(self._flight(printer_id))
+
+    def _stamp(self, printer_id: int) -> tuple[int, int]:
+        return self._generation, self._versions.get(printer_id, 0)
+
+    def _flight(self, printer_id: int) -> asyncio.Future:
+        # Join a load started after the last invalidation, if any
+        stamp = self._stamp(printer_id)
+        flight = self._inflight.get(printer_id)
+        if flight is None or flight[0] != stamp:
+            flight = (stamp, asyncio.ensure_future(self._run(printer_id, stamp)))
+            self._inflight[printer_id] = flight
+        return flight[1]
+
+    async def _run(self, printer_id: int, stamp: tuple[int, int]) -> bytes | None:
+        if self._load is None:
+            raise RuntimeError("PrinterDetailCache: no loader registered")
+        try:
+            loaded = await self._load(printer_id)
+            if loaded is None:
+                return None
+            body, refs = loaded
+            # A write during the load may be missing from the result
+            if stamp == self._stamp(printer_id):
+                self._entries[printer_id] = (body, refs, time.monotonic() + self.max_age)
+            return body
+        finally:
+            flight = self._inflight.get(printer_id)
+            if flight is not None and flight[0] == stamp:
+                del self._inflight[printer_id]
+
+    def invalidate_printer(self, printer_id: int) -> None:
+        self._versions[printer_id] = self._versions.get(printer_id, 0) + 1
+        self._entries.pop(printer_id, None)
+
+    def invalidate_refs(self, kind: str, ids: Iterable[int]) -> None:
+        """Drop the entries built from one of the *kind* rows *ids*."""
+        ids = set(ids)
+        if not ids:
+            return
+        self._generation += 1
+        for printer_id, (_, refs, _) in list(self._entries.items()):
+            if not ids.isdisjoint(refs.get(kind, ())):
+                del self._entries[printer_id]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._inflight.clear()
+        self._versions.clear()
+        self._generation += 1
+
+
+# Singleton – one cache per worker process
+printer_details = PrinterDetailCache()
+
+
+def _on_event(event: dict) -> None:
+    # Also delivered for the writes of other workers (relay)
+    name = event.get("event")
+    if name in PRINTER_EVENTS:
+        printer_id = event.get("printer_id")
+        if printer_id is None:
+            printer_details.clear()
+        else:
+            printer_details.invalidate_printer(printer_id)
+    elif name == "printer_details_changed":
+        if not any(kind in event for kind in PRINTER_DETAIL_KINDS):
+            printer_details.clear()
+            return
+        for printer_id in event.get("printers", ()):
+            printer_details.invalidate_printer(printer_id)
+        for kind in PRINTER_DETAIL_KINDS[1:]:
+            printer_details.invalidate_refs(kind, event.get(kind, ()))
+
+
+event_bus.add_listener(_on_event)
+
+
+def changed_event(changes: dict[str, set[int]]) -> dict:
+    """``printer_details_changed`` event for *changes* (kind -> ids)."""
+    changes = {kind: sorted(ids) for kind, ids in changes.items() if ids}
+    if sum(len(ids) for ids in changes.values()) > MAX_EVENT_IDS:
+        return {"event": "printer_details_changed"}
+    return {"event": "printer_details_changed", **changes}
+
+
+# -- ORM listeners --------------------------------------------------------
+
+
+def _note(session: Session | None, kind: str, ids: Iterable[int | None]) -> None:
+    if session is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    pending.setdefault(kind, set()).update(i for i in ids if i is not None)
+
+
+def note_printer_detail_changes(db, **changes: Iterable[int]) -> None:
+    """Report rows changed by bulk statements of *db*, published on commit.
+
+    Keywords are the kinds of ``PRINTER_DETAIL_KINDS``, e.g.
+    ``note_printer_detail_changes(db, spools=spool_ids)``.
+    """
+    session = getattr(db, "sync_session", db)
+    for kind, ids in changes.items():
+        _note(session, kind, ids)
+
+
+def _changed(target, columns: tuple[str, ...]) -> bool:
+    state = inspect(target)
+    return any(state.attrs[column].history.has_changes() for column in columns)
+
+
+@event.listens_for(Printer, "after_update")
+@event.listens_for(Printer, "after_delete")
+def _printer_written(mapper, connection, target: Printer) -> None:
+    _note(object_session(target), "printers", [target.id])
+
+
+@event.listens_for(Spool, "after_update")
+def _spool_updated(mapper, connection, target: Spool) -> None:
+    # The detail shows a spool's filament only
+    if _changed(target, ("filament_id",)):
+        _note(object_session(target), "spools", [target.id])
+
+
+@event.listens_for(Spool, "after_delete")
+def _spool_deleted(mapper, connection, target: Spool) -> None:
+    _note(object_session(target), "spools", [target.id])
+
+
+@event.listens_for(Filament, "after_update")
+def _filament_updated(mapper, connection, target: Filament) -> None:
+    if _changed(target, ("designation", "material_type", "manufacturer_id")):
+        _note(object_session(target), "filaments", [target.id])
+
+
+@event.listens_for(Filament, "after_delete")
+def _filament_deleted(mapper, connection, target: Filament) -> None:
+    _note(object_session(target), "filaments", [target.id])
+
+
+@event.listens_for(FilamentColor, "after_insert")
+@event.listens_for(FilamentColor, "after_update")
+@event.listens_for(FilamentColor, "after_delete")
+def _filament_color_written(mapper, connection, target: FilamentColor) -> None:
+    _note(object_session(target), "filaments", [target.filament_id])
+
+
+@event.listens_for(Manufacturer, "after_update")
+def _manufacturer_updated(mapper, connection, target: Manufacturer) -> None:
+    if _changed(target, ("name",)):
+        _note(object_session(target), "manufacturers", [target.id])
+
+
+@event.listens_for(Manufacturer, "after_delete")
+def _manufacturer_deleted(mapper, connection, target: Manufacturer) -> None:
+    _note(object_session(target), "manufacturers", [target.id])
+
+
+@event.listens_for(Color, "after_update")
+def _color_updated(mapper, connection, target: Color) -> None:
+    if _changed(target, ("hex_code", "name")):
+        _note(object_session(target), "colors", [target.id])
+
+
+@event.listens_for(Color, "after_delete")
+def _color_deleted(mapper, connection, target: Color) -> None:
+    _note(object_session(target), "colors", [target.id])
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending and any(pending.values()):
+        event_bus.publish_nowait(changed_event(pending))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,164 @@
+"""Resolved printer params per (spool, printer) for the filament data enrichment.
+
+``PluginManager.enrich_filament_data`` runs for every running driver on each
+auto-assign and for every slot assignment.  The params it needs – the
+filament-level ``FilamentPrinterParam`` rows of the spool's filament merged
+with the spool-level ``SpoolPrinterParam`` overrides – are cached here per
+``(spool_id, printer_id)``.  ``resolve()`` loads all missing printers of one
+spool with one query per table, so an auto-assign across all drivers costs
+at most three queries, and none while the params are cached.
+
+Writers of printer params publish ``printer_params_changed`` with the
+``printer_id``, ``filament_id`` and/or ``spool_id`` they touched (all
+optional; without any, everything is dropped).  A spool moved to another
+filament or deleted, and backup imports, are reported by the
+``printer_details_changed`` event of app/services/printer_details.py.  The
+event bus relay delivers both to every worker; ``PARAMS_MAX_AGE`` bounds
+the staleness for writes that publish nothing.
+
+Usage:
+    from app.services.printer_param_cache import printer_param_cache
+
+    params = await printer_param_cache.resolve(spool_id, [printer_id])
+    params.get(printer_id)  # {param_key: param_value}; None if the spool is gone
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import select
+
+from app.core import database
+from app.core.event_bus import event_bus
+from app.models import Spool
+from app.models.printer_params import FilamentPrinterParam, SpoolPrinterParam
+
+logger = logging.getLogger(__name__)
+
+# Seconds resolved params are served without a change event
+PARAMS_MAX_AGE = 300
+
+
+class PrinterParamCache:
+    """Merged filament + spool printer params per (spool_id, printer_id)."""
+
+    def __init__(self, max_age: float = PARAMS_MAX_AGE) -> None:
+        self.max_age = max_age
+        # (spool_id, printer_id) -> (filament_id, params, expires_at)
+        self._entries: dict[tuple[int, int], tuple[int, dict[str, Any], float]] = {}
+        self._generation = 0
+
+    async def resolve(
+        self, spool_id: int, printer_ids: Iterable[int]
+    ) -> dict[int, dict[str, Any]]:
+        """Params of *spool_id* for each of *printer_ids*; {} if the spool is gone."""
+        now = time.monotonic()
+        resolved: dict[int, dict[str, Any]] = {}
+        missing: list[int] = []
+        for printer_id in dict.fromkeys(printer_ids):
+            entry = self._entries.get((spool_id, printer_id))
+            if entry is not None and now < entry[2]:
+                resolved[printer_id] = entry[1]
+            else:
+                missing.append(printer_id)
+        if missing:
+            loaded = await self._load(spool_id, missing)
+            resolved.update(loaded)
+        return resolved
+
+    async def _load(self, spool_id: int, printer_ids: list[int]) -> dict[int, dict[str, Any]]:
+        generation = self._generation
+        async with database.async_session_maker() as db:
+            filament_id = (
+                await db.execute(select(Spool.filament_id).where(Spool.id == spool_id))
+            ).scalar_one_or_none()
+            if filament_id is None:
+                return {}
+
+            params: dict[int, dict[str, Any]] = {pid: {} for pid in printer_ids}
+            result = await db.execute(
+                select(
+                    FilamentPrinterParam.printer_id,
+                    FilamentPrinterParam.param_key,
+                    FilamentPrinterParam.param_value,
+                ).where(
+                    FilamentPrinterParam.filament_id == filament_id,
+                    FilamentPrinterParam.printer_id.in_(printer_ids),
+                )
+            )
+            for printer_id, key, value in result.all():
+                params[printer_id][key] = value
+
+            # Spool-level params override the filament-level ones
+            result = await db.execute(
+                select(
+                    SpoolPrinterParam.printer_id,
+                    SpoolPrinterParam.param_key,
+                    SpoolPrinterParam.param_value,
+                ).where(
+                    SpoolPrinterParam.spool_id == spool_id,
+                    SpoolPrinterParam.printer_id.in_(printer_ids),
+                )
+            )
+            for printer_id, key, value in result.all():
+                params[printer_id][key] = value
+
+        # A write during the load may be missing from the result
+        if generation == self._generation:
+            expires_at = time.monotonic() + self.max_age
+            for printer_id, merged in params.items():
+                self._entries[(spool_id, printer_id)] = (filament_id, merged, expires_at)
+        return params
+
+    def invalidate(
+        self,
+        printer_id: int | None = None,
+        filament_id: int | None = None,
+        spool_id: int | None = None,
+    ) -> None:
+        """Drop the entries matching every given id (all without ids)."""
+        self._generation += 1
+        if printer_id is None and filament_id is None and spool_id is None:
+            self._entries.clear()
+            return
+        for key, (entry_filament, _, _) in list(self._entries.items()):
+            if (
+                (printer_id is None or key[1] == printer_id)
+                and (filament_id is None or entry_filament == filament_id)
+                and (spool_id is None or key[0] == spool_id)
+            ):
+                del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._generation += 1
+
+
+# Singleton – one cache per worker process
+printer_param_cache = PrinterParamCache()
+
+
+def _on_event(event: dict) -> None:
+    # Also delivered for the writes of other workers (relay)
+    name = event.get("event")
+    if name == "printer_params_changed":
+        printer_param_cache.invalidate(
+            printer_id=event.get("printer_id"),
+            filament_id=event.get("filament_id"),
+            spool_id=event.get("spool_id"),
+        )
+    elif name == "printer_details_changed":
+        # Spools moved or deleted; without ids: backup import/restore
+        if len(event) == 1:
+            printer_param_cache.clear()
+        for spool_id in event.get("spools", ()):
+            printer_param_cache.invalidate(spool_id=spool_id)
+        for filament_id in event.get("filaments", ()):
+            printer_param_cache.invalidate(filament_id=filament_id)
+
+
+event_bus.add_listener(_on_event)
@@ -0,0 +1,323 @@
+"""Denormalized spool counters on filaments and manufacturers.
+
+Filament and manufacturer lists show how many spools, how many grams and
+which materials are in stock.  Instead of grouped COUNT/SUM queries per page
+these numbers are stored on the rows themselves and refreshed in the
+transaction that changes the underlying spools or filaments:
+
+* ORM writes of spools and filaments are collected by the mapper listeners
+  below and refreshed at the end of the flush.
+* Core statements (bulk update/delete, scale weighing, weight rebuilds)
+  bypass the listeners; their callers call ``refresh_spool_counters()``
+  with the affected filament ids.
+
+Counters are recounted from the spools instead of being incremented, so a
+refresh is idempotent and ``python -m app.cli rebuild-counters`` repairs any
+drift.  The same refresh recounts the dashboard's inventory aggregate of the
+filaments (app/services/inventory_aggregates.py).  The filament and
+manufacturer rows are locked (``FOR UPDATE``, ignored on SQLite) before the
+recount, which serializes concurrent writers of the same filament on
+PostgreSQL and MySQL.
+
+Usage:
+    from app.services.spool_counters import refresh_spool_counters
+
+    await db.execute(update(Spool).where(...).values(status_id=...))
+    await refresh_spool_counters(db, filament_ids=[...])
+    await db.commit()
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import bindparam, case, event, func, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from app.models import Filament, Manufacturer, Spool, SpoolStatus
+from app.services.inventory_aggregates import refresh_inventory_sync
+
+# Columns maintained on filaments (recounted from spools)
+FILAMENT_COUNTERS = (
+    "spool_count",
+    "archived_spool_count",
+    "total_remaining_weight_g",
+    "total_price_available",
+    "total_price_all",
+)
+
+# Columns maintained on manufacturers (summed up from filaments)
+MANUFACTURER_COUNTERS = ("filament_count", *FILAMENT_COUNTERS, "materials")
+
+# Spool columns that feed the counters and the inventory aggregate
+SPOOL_COUNTER_INPUTS = (
+    "filament_id",
+    "status_id",
+    "remaining_weight_g",
+    "purchase_price",
+    "location_id",
+    "low_weight_threshold_g",
+    "initial_total_weight_g",
+)
+
+# Filament columns that feed the manufacturer counters
+FILAMENT_COUNTER_INPUTS = ("manufacturer_id", "material_type")
+
+# Ids per IN (...) list
+REFRESH_CHUNK_SIZE = 500
+
+_PENDING_KEY = "spool_counters_pending"
+
+
+def _chunks(ids: list[int]) -> Iterable[list[int]]:
+    for start in range(0, len(ids), REFRESH_CHUNK_SIZE):
+        yield ids[start : start + REFRESH_CHUNK_SIZE]
+
+
+def _sync_loaded(session: Session, model, pk: int, values: dict[str, Any]) -> None:
+    # Loaded instances keep their attributes across commits
+    # (expire_on_commit=False); give them the new counters without
+    # marking them dirty.
+    obj = session.identity_map.get(identity_key(model, pk))
+    if obj is not None:
+        for key, value in values.items():
+            set_committed_value(obj, key, value)
+
+
+def _counter_values(row: Any, columns: tuple[str, ...]) -> dict[str, Any]:
+    # Counts are integers, sums floats; SUM() over no rows is NULL and an
+    # empty row stands for "no spools/filaments at all"
+    values = list(row) or [None] * len(columns)
+    return {
+        column: (int(value or 0) if column.endswith("_count") else float(value or 0.0))
+        for column, value in zip(columns, values)
+    }
+
+
+def _filament_aggregates(session: Session, ids: list[int]) -> dict[int, dict[str, Any]]:
+    archived = SpoolStatus.key == "archived"
+    rows = session.execute(
+        select(
+            Spool.filament_id,
+            func.sum(case((archived, 0), else_=1)),
+            func.sum(case((archived, 1), else_=0)),
+            func.sum(case((archived, 0.0), else_=func.coalesce(Spool.remaining_weight_g, 0.0))),
+            func.sum(case((archived, 0.0), else_=func.coalesce(Spool.purchase_price, 0.0))),
+            func.sum(func.coalesce(Spool.purchase_price, 0.0)),
+        )
+        .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
+        .where(Spool.filament_id.in_(ids))
+        .group_by(Spool.filament_id)
+    ).all()
+    return {row[0]: _counter_values(row[1:], FILAMENT_COUNTERS) for row in rows}
+
+
+def _refresh_filaments(session: Session, filament_ids: list[int]) -> set[int]:
+    """Recount *filament_ids*; returns the manufacturers whose sums changed."""
+    table = Filament.__table__
+    changed_manufacturers: set[int] = set()
+    for ids in _chunks(sorted(filament_ids)):
+        current = session.execute(
+            select(table.c.id, table.c.manufacturer_id, *(table.c[c] for c in FILAMENT_COUNTERS))
+            .where(table.c.id.in_(ids))
+            .order_by(table.c.id)
+            .with_for_update()
+        ).all()
+        counted = _filament_aggregates(session, ids)
+        zero = _counter_values((), FILAMENT_COUNTERS)
+
+        rows = []
+        for row in current:
+            values = counted.get(row.id, zero)
+            if all(getattr(row, c) == values[c] for c in FILAMENT_COUNTERS):
+                continue
+            rows.append({"b_id": row.id, **{f"b_{c}": v for c, v in values.items()}})
+            changed_manufacturers.add(row.manufacturer_id)
+            _sync_loaded(session, Filament, row.id, values)
+
+        if rows:
+            session.execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(
+                    # Counters are not an edit of the filament
+                    updated_at=table.c.updated_at,
+                    **{c: bindparam(f"b_{c}") for c in FILAMENT_COUNTERS},
+                ),
+                rows,
+            )
+    return changed_manufacturers
+
+
+def _refresh_manufacturers(session: Session, manufacturer_ids: list[int]) -> None:
+    table = Manufacturer.__table__
+    for ids in _chunks(sorted(manufacturer_ids)):
+        current = session.execute(
+            select(table.c.id, *(table.c[c] for c in MANUFACTURER_COUNTERS))
+            .where(table.c.id.in_(ids))
+            .order_by(table.c.id)
+            .with_for_update()
+        ).all()
+        sums = {
+            row[0]: row[1:]
+            for row in session.execute(
+                select(
+                    Filament.manufacturer_id,
+                    func.count(Filament.id),
+                    *(func.sum(getattr(Filament, c)) for c in FILAMENT_COUNTERS),
+                )
+                .where(Filament.manufacturer_id.in_(ids))
+                .group_by(Filament.manufacturer_id)
+            ).all()
+        }
+        materials: dict[int, list[str]] = {}
+        for mfr_id, material in session.execute(
+            select(Filament.manufacturer_id, Filament.material_type)
+            .where(Filament.manufacturer_id.in_(ids))
+            .distinct()
+        ).all():
+            if material:
+                materials.setdefault(mfr_id, []).append(material)
+
+        rows = []
+        for row in current:
+            values = _counter_values(sums.get(row.id, ()), MANUFACTURER_COUNTERS[:-1])
+            values["materials"] = sorted(materials.get(row.id, []))
+            if all(getattr(row, c) == values[c] for c in MANUFACTURER_COUNTERS):
+                continue
+            rows.append({"b_id": row.id, **{f"b_{c}": v for c, v in values.items()}})
+            _sync_loaded(session, Manufacturer, row.id, values)
+
+        if rows:
+            session.execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(
+                    updated_at=table.c.updated_at,
+                    **{c: bindparam(f"b_{c}") for c in MANUFACTURER_COUNTERS},
+                ),
+                rows,
+            )
+
+
+def refresh_counters_sync(
+    session: Session,
+    filament_ids: Iterable[int] = (),
+    manufacturer_ids: Iterable[int] = (),
+) -> None:
+    """Recount the given filaments and the manufacturers affected by them."""
+    manufacturers = set(manufacturer_ids)
+    filaments = {fid for fid in filament_ids if fid is not None}
+    if filaments:
+        manufacturers |= _refresh_filaments(session, list(filaments))
+        refresh_inventory_sync(session, filaments)
+    manufacturers.discard(None)
+    if manufacturers:
+        _refresh_manufacturers(session, list(manufacturers))
+
+
+async def refresh_spool_counters(
+    db: AsyncSession,
+    filament_ids: Iterable[int] = (),
+    manufacturer_ids: Iterable[int] = (),
+) -> None:
+    """Refresh counters after Core statements that bypass the ORM listeners.
+
+    Runs inside the caller's transaction; the caller commits.
+    """
+    filament_ids = list(filament_ids)
+    manufacturer_ids = list(manufacturer_ids)
+    if filament_ids or manufacturer_ids:
+        await db.run_sync(refresh_counters_sync, filament_ids, manufacturer_ids)
+
+
+async def filament_ids_of_spools(db: AsyncSession, spool_ids: Iterable[int]) -> list[int]:
+    """Filaments of *spool_ids*, e.g. to refresh them after a bulk statement."""
+    spool_ids = list(spool_ids)
+    if not spool_ids:
+        return []
+    result = await db.execute(
+        select(Spool.filament_id).where(Spool.id.in_(spool_ids)).distinct()
+    )
+    return list(result.scalars().all())
+
+
+async def rebuild_spool_counters(db: AsyncSession) -> dict[str, int]:
+    """Recount every filament and manufacturer and commit."""
+    filament_ids = list((await db.execute(select(Filament.id))).scalars().all())
+    manufacturer_ids = list((await db.execute(select(Manufacturer.id))).scalars().all())
+    await refresh_spool_counters(db, filament_ids, manufacturer_ids)
+    await db.commit()
+    return {"filaments": len(filament_ids), "manufacturers": len(manufacturer_ids)}
+
+
+# -- ORM listeners --------------------------------------------------------
+
+
+def _pending(target) -> dict[str, set[int]] | None:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault(_PENDING_KEY, {"filaments": set(), "manufacturers": set()})
+
+
+def _inputs_changed(target, columns: tuple[str, ...]) -> bool:
+    state = inspect(target)
+    return any(state.attrs[column].history.has_changes() for column in columns)
+
+
+def _previous(target, column: str) -> list[Any]:
+    return list(inspect(target).attrs[column].history.deleted or ())
+
+
+@event.listens_for(Spool, "after_insert")
+@event.listens_for(Spool, "after_delete")
+def _spool_written(mapper, connection, target: Spool) -> None:
+    pending = _pending(target)
+    if pending is not None:
+        pending["filaments"].add(target.filament_id)
+
+
+@event.listens_for(Spool, "after_update")
+def _spool_updated(mapper, connection, target: Spool) -> None:
+    if not _inputs_changed(target, SPOOL_COUNTER_INPUTS):
+        return
+    pending = _pending(target)
+    if pending is not None:
+        # A spool moved to another filament changes both
+        pending["filaments"].update([target.filament_id, *_previous(target, "filament_id")])
+
+
+@event.listens_for(Filament, "after_insert")
+@event.listens_for(Filament, "after_delete")
+def _filament_written(mapper, connection, target: Filament) -> None:
+    pending = _pending(target)
+    if pending is not None:
+        pending["manufacturers"].add(target.manufacturer_id)
+
+
+@event.listens_for(Filament, "after_update")
+def _filament_updated(mapper, connection, target: Filament) -> None:
+    if not _inputs_changed(target, FILAMENT_COUNTER_INPUTS):
+        return
+    pending = _pending(target)
+    if pending is not None:
+        pending["manufacturers"].update(
+            [target.manufacturer_id, *_previous(target, "manufacturer_id")]
+        )
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _refresh_after_flush(session: Session, flush_context) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        refresh_counters_sync(session, pending["filaments"], pending["manufacturers"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
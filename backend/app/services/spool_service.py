@@ -1,17 +1,58 @@
+import math
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from sqlalchemy import select, update, func
+from sqlalchemy import and_, case, insert, or_, select, update, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import response_cache
 from app.core.security import Principal
-from app.models import Filament, Location, Spool, SpoolEvent, SpoolStatus
+from app.models import (
+    Color,
+    Filament,
+    FilamentColor,
+    Location,
+    Spool,
+    SpoolEvent,
+    SpoolStatus,
+    SpoolWeightCheckpoint,
+)
+from app.models.spool import normalize_rfid_uid
+from app.services.forecast_service import ForecastService, publish_low_stock
+from app.services.spool_counters import refresh_spool_counters
+from app.utils.db import json_extract_cast_string
 
 # Aggregation window for consumption events (in minutes)
 # Events within this window from the same source will be aggregated
 CONSUMPTION_AGGREGATION_WINDOW_MINUTES = 5
 
+# Number of rows per executemany UPDATE/INSERT in bulk rebuilds
+REBUILD_BATCH_SIZE = 500
+
+# A weight checkpoint is stored every N replayed events, so a rebuild never
+# replays more than about N events plus whatever happened since
+WEIGHT_CHECKPOINT_INTERVAL = 500
+
+# Seconds the status key -> id registry is cached (statuses are seeded rows)
+STATUS_REGISTRY_TTL = 600
+
+
+@dataclass
+class WeighTarget:
+    """The spool columns a scale weighing needs, loaded in one query."""
+
+    spool_id: int
+    status_id: int
+    status_key: str
+    remaining_weight_g: float | None
+    tara_g: float | None
+    filament_designation: str | None
+    material_type: str | None
+    color_hex: str | None
+    filament_id: int
+
 
 class SpoolService:
     def __init__(self, db: AsyncSession):
@@ -32,29 +73,84 @@ class SpoolService:
         self, rfid_uid: str | None, external_id: str | None
     ) -> Spool | None:
         if rfid_uid:
-            result = await self.db.execute(
-                select(Spool)
-                .where(func.lower(Spool.rfid_uid) == rfid_uid.lower())
-                .options(
-                    selectinload(Spool.filament).selectinload(Filament.manufacturer),
-                    selectinload(Spool.status),
-                )
+            spool = await self._get_spool_by(
+                "rfid_uid", normalize_rfid_uid(rfid_uid)
             )
-            spool = result.scalar_one_or_none()
             if spool:
                 return spool
         if external_id:
-            result = await self.db.execute(
-                select(Spool)
-                .where(Spool.external_id == external_id)
-                .options(
-                    selectinload(Spool.filament).selectinload(Filament.manufacturer),
-                    selectinload(Spool.status),
-                )
-            )
-            return result.scalar_one_or_none()
+            return await self._get_spool_by("external_id", external_id)
         return None
 
+    async def _get_spool_by(self, kind: str, identifier: str | None) -> Spool | None:
+        if not identifier:
+            return None
+        # Both columns carry a unique index; the lookup is a single index probe
+        result = await self.db.execute(
+            select(Spool)
+            .where(getattr(Spool, kind) == identifier)
+            .options(
+                selectinload(Spool.filament).selectinload(Filament.manufacturer),
+                selectinload(Spool.status),
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def get_weigh_target(
+        self, rfid_uid: str | None, spool_id: int | None
+    ) -> WeighTarget | None:
+        """Spool, tara, status and first filament color in a single query.
+
+        The tag takes priority over spool_id (backward compatible).
+        """
+        rfid_uid = normalize_rfid_uid(rfid_uid)
+        conditions = []
+        if rfid_uid:
+            conditions.append(Spool.rfid_uid == rfid_uid)
+        if spool_id:
+            conditions.append(Spool.id == spool_id)
+        if not conditions:
+            return None
+
+        first_color = (
+            select(Color.hex_code)
+            .join(FilamentColor, FilamentColor.color_id == Color.id)
+            .where(FilamentColor.filament_id == Filament.id)
+            .order_by(FilamentColor.position)
+            .limit(1)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                Spool.id,
+                Spool.status_id,
+                SpoolStatus.key,
+                Spool.remaining_weight_g,
+                func.coalesce(Spool.empty_spool_weight_g, Filament.default_spool_weight_g),
+                Filament.designation,
+                Filament.material_type,
+                first_color,
+                Spool.filament_id,
+            )
+            .join(Filament, Filament.id == Spool.filament_id)
+            .join(SpoolStatus, SpoolStatus.id == Spool.status_id)
+            .where(or_(*conditions))
+            .limit(1)
+        )
+        if len(conditions) > 1:
+            query = query.order_by(case((Spool.rfid_uid == rfid_uid, 0), else_=1))
+
+        row = (await self.db.execute(query)).first()
+        return WeighTarget(*row) if row is not None else None
+
+    async def _status_ids(self) -> dict[str, int]:
+        status_ids = response_cache.get("spool_status_ids")
+        if status_ids is None:
+            result = await self.db.execute(select(SpoolStatus.key, SpoolStatus.id))
+            status_ids = dict(result.all())
+            response_cache.set("spool_status_ids", status_ids, ttl=STATUS_REGISTRY_TTL)
+        return status_ids
+
     def _get_tara(self, spool: Spool) -> float | None:
         if spool.empty_spool_weight_g is not None:
             return spool.empty_spool_weight_g
@@ -239,7 +335,113 @@ class SpoolService:
         if remaining == 0 and not clamped:
             await self._handle_auto_empty(spool, remaining, event.id, event_at)
 
+        low_stock = await ForecastService(self.db).observe_stock(
+            spool.id, spool.filament_id
+        )
         await self.db.commit()
+        await publish_low_stock(low_stock)
+        return event, remaining
+
+    async def record_weighing(
+        self,
+        target: WeighTarget,
+        measured_weight_g: float,
+        event_at: datetime,
+        principal: Principal | None = None,
+        source: str = "device",
+        note: str | None = None,
+    ) -> tuple[SpoolEvent, float | None]:
+        """record_measurement() for a WeighTarget, without loading the Spool.
+
+        Writes the same events and status transitions; the spool row is
+        changed with a single UPDATE and everything is committed at once.
+        """
+        user_id = principal.user_id if principal else None
+        device_id = principal.device_id if principal else None
+
+        if target.tara_g is None:
+            event = SpoolEvent(
+                spool_id=target.spool_id,
+                event_type="measurement",
+                event_at=event_at,
+                user_id=user_id,
+                device_id=device_id,
+                source=source,
+                measured_weight_g=measured_weight_g,
+                note=note,
+                meta={"tara_missing": True},
+            )
+            self.db.add(event)
+            await self.db.commit()
+            return event, target.remaining_weight_g
+
+        remaining = measured_weight_g - target.tara_g
+        clamped = remaining < 0
+        if clamped:
+            remaining = 0
+
+        event = SpoolEvent(
+            spool_id=target.spool_id,
+            event_type="measurement",
+            event_at=event_at,
+            user_id=user_id,
+            device_id=device_id,
+            source=source,
+            measured_weight_g=measured_weight_g,
+            note=note,
+            meta={"clamped_to_zero": True} if clamped else None,
+        )
+        self.db.add(event)
+        values: dict[str, Any] = {"remaining_weight_g": remaining}
+
+        status_ids = await self._status_ids()
+        status_id = target.status_id
+        if target.status_key == "new" and "opened" in status_ids:
+            values["status_id"] = status_ids["opened"]
+            self.db.add(
+                SpoolEvent(
+                    spool_id=target.spool_id,
+                    event_type="opened",
+                    event_at=event_at,
+                    source="system",
+                    from_status_id=status_id,
+                    to_status_id=values["status_id"],
+                    meta={"auto": True, "reason": "weight_changed"},
+                )
+            )
+            status_id = values["status_id"]
+
+        auto_empty = (
+            remaining == 0
+            and not clamped
+            and target.status_key != "empty"
+            and "empty" in status_ids
+        )
+        if auto_empty:
+            values["status_id"] = status_ids["empty"]
+            # The empty event references the measurement, so it needs its id
+            await self.db.flush()
+            self.db.add(
+                SpoolEvent(
+                    spool_id=target.spool_id,
+                    event_type="empty",
+                    event_at=event_at,
+                    source="system",
+                    from_status_id=status_id,
+                    to_status_id=values["status_id"],
+                    meta={"auto": True, "trigger_event_id": event.id},
+                )
+            )
+
+        await self.db.execute(
+            update(Spool).where(Spool.id == target.spool_id).values(**values)
+        )
+        await refresh_spool_counters(self.db, filament_ids=[target.filament_id])
+        low_stock = await ForecastService(self.db).observe_stock(
+            target.spool_id, target.filament_id
+        )
+        await self.db.commit()
+        await publish_low_stock(low_stock)
         return event, remaining
 
     async def record_adjustment(
@@ -329,7 +531,11 @@ class SpoolService:
         if remaining == 0 and not clamped:
             await self._handle_auto_empty(spool, remaining, event.id, event_at)
 
+        low_stock = await ForecastService(self.db).observe_stock(
+            spool.id, spool.filament_id
+        )
         await self.db.commit()
+        await publish_low_stock(low_stock)
         return event, remaining
 
     async def record_consumption(
@@ -341,6 +547,27 @@ class SpoolService:
         source: str = "ui",
         note: str | None = None,
     ) -> tuple[SpoolEvent, float | None]:
+        spool_id, filament_id = spool.id, spool.filament_id
+        event, remaining = await self._record_consumption(
+            spool, delta_weight_g, event_at, principal, source, note
+        )
+        low_stock = await ForecastService(self.db).observe_consumption(
+            spool_id, filament_id, abs(delta_weight_g), event_at
+        )
+        await self.db.commit()
+        await publish_low_stock(low_stock)
+        return event, remaining
+
+    async def _record_consumption(
+        self,
+        spool: Spool,
+        delta_weight_g: float,
+        event_at: datetime,
+        principal: Principal | None,
+        source: str,
+        note: str | None,
+    ) -> tuple[SpoolEvent, float | None]:
+        """record_consumption() without the commit."""
         if delta_weight_g > 0:
             delta_weight_g = -delta_weight_g
 
@@ -386,7 +613,6 @@ class SpoolService:
                         spool, remaining, existing_event.id, event_at
                     )
 
-            await self.db.commit()
             return existing_event, spool.remaining_weight_g
 
         # No aggregation possible - create new event
@@ -404,7 +630,6 @@ class SpoolService:
                 note=note,
                 meta=meta if meta else None,
             )
-            await self.db.commit()
             return event, None
 
         remaining = spool.remaining_weight_g + delta_weight_g
@@ -435,7 +660,6 @@ class SpoolService:
         if remaining == 0 and not clamped:
             await self._handle_auto_empty(spool, remaining, event.id, event_at)
 
-        await self.db.commit()
         return event, remaining
 
     async def change_status(
@@ -546,18 +770,58 @@ class SpoolService:
         await self.db.commit()
         return event
 
+    async def _get_weight_checkpoint(
+        self, spool: Spool
+    ) -> SpoolWeightCheckpoint | None:
+        """Latest checkpoint that was taken with the spool's current weight inputs."""
+        tara = self._get_tara(spool)
+        if tara is None:
+            return None
+        result = await self.db.execute(
+            select(SpoolWeightCheckpoint)
+            .where(
+                SpoolWeightCheckpoint.spool_id == spool.id,
+                SpoolWeightCheckpoint.tara_g == tara,
+                SpoolWeightCheckpoint.initial_total_weight_g.is_not_distinct_from(
+                    spool.initial_total_weight_g
+                ),
+                SpoolWeightCheckpoint.empty_spool_weight_g.is_not_distinct_from(
+                    spool.empty_spool_weight_g
+                ),
+            )
+            .order_by(
+                SpoolWeightCheckpoint.event_at.desc(),
+                SpoolWeightCheckpoint.event_id.desc(),
+            )
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
     async def rebuild_remaining_weight(self, spool: Spool) -> float | None:
+        checkpoint = await self._get_weight_checkpoint(spool)
+
+        query = select(SpoolEvent).where(SpoolEvent.spool_id == spool.id)
+        if checkpoint is not None:
+            query = query.where(
+                or_(
+                    SpoolEvent.event_at > checkpoint.event_at,
+                    and_(
+                        SpoolEvent.event_at == checkpoint.event_at,
+                        SpoolEvent.id > checkpoint.event_id,
+                    ),
+                )
+            )
         result = await self.db.execute(
-            select(SpoolEvent)
-            .where(SpoolEvent.spool_id == spool.id)
-            .order_by(SpoolEvent.event_at.asc())
+            query.order_by(SpoolEvent.event_at.asc(), SpoolEvent.id.asc())
         )
         events = result.scalars().all()
 
         # Start with net material weight if weight data is available,
         # so spools with no events get the correct initial remaining value
         remaining: float | None = None
-        if (
+        if checkpoint is not None:
+            remaining = checkpoint.remaining_weight_g
+        elif (
             spool.initial_total_weight_g is not None
             and spool.empty_spool_weight_g is not None
         ):
@@ -567,6 +831,8 @@ class SpoolService:
 
         last_plausible_remaining: float | None = spool.remaining_weight_g
         blocked_event_id: int | None = None
+        checkpoint_tara = self._get_tara(spool)
+        since_checkpoint = 0
 
         for event in events:
             if event.event_type == "measurement":
@@ -636,6 +902,25 @@ class SpoolService:
             if remaining is not None:
                 last_plausible_remaining = remaining
 
+            since_checkpoint += 1
+            if (
+                since_checkpoint >= WEIGHT_CHECKPOINT_INTERVAL
+                and remaining is not None
+                and checkpoint_tara is not None
+            ):
+                self.db.add(
+                    SpoolWeightCheckpoint(
+                        spool_id=spool.id,
+                        event_id=event.id,
+                        event_at=event.event_at,
+                        remaining_weight_g=remaining,
+                        tara_g=checkpoint_tara,
+                        initial_total_weight_g=spool.initial_total_weight_g,
+                        empty_spool_weight_g=spool.empty_spool_weight_g,
+                    )
+                )
+                since_checkpoint = 0
+
         spool.remaining_weight_g = remaining
 
         if remaining == 0 and spool.status.key != "empty":
@@ -657,3 +942,228 @@ class SpoolService:
 
         await self.db.commit()
         return remaining
+
+    def _rebuild_aggregates_query(self):
+        """Build the set-based equivalent of the rebuild_remaining_weight loop.
+
+        Events are classified into absolute resets (measurements and absolute
+        adjustments) and relative deltas (consumptions and relative
+        adjustments).  A running count of absolute events numbers the
+        segments per spool; only the last segment determines the final
+        value.  Within it the clamp-to-zero recurrence
+        ``r = max(r + delta, 0)`` has the closed form
+        ``max(base + S_n, S_n - min(S_1..S_n))`` over the prefix sums S,
+        so one SUM and one MIN per spool replace the Python loop.
+        """
+        adjustment_type = json_extract_cast_string(
+            SpoolEvent.meta, "$.adjustment_type", self.db.bind.dialect
+        )
+        is_manual = SpoolEvent.event_type == "manual_adjust"
+        is_absolute = case(
+            (SpoolEvent.event_type == "measurement", 1),
+            (and_(is_manual, adjustment_type == "absolute"), 1),
+            else_=0,
+        )
+        delta = case(
+            (
+                SpoolEvent.event_type == "print_consumption",
+                func.coalesce(SpoolEvent.delta_weight_g, 0.0),
+            ),
+            (
+                and_(is_manual, adjustment_type == "relative"),
+                func.coalesce(SpoolEvent.delta_weight_g, 0.0),
+            ),
+            else_=0.0,
+        )
+
+        classified = select(
+            SpoolEvent.spool_id.label("spool_id"),
+            SpoolEvent.id.label("event_id"),
+            SpoolEvent.event_at.label("event_at"),
+            SpoolEvent.measured_weight_g.label("measured_weight_g"),
+            is_absolute.label("is_absolute"),
+            delta.label("delta"),
+            func.sum(is_absolute)
+            .over(
+                partition_by=SpoolEvent.spool_id,
+                order_by=(SpoolEvent.event_at, SpoolEvent.id),
+                rows=(None, 0),
+            )
+            .label("segment"),
+        ).subquery("classified")
+
+        segmented = select(
+            classified,
+            func.max(classified.c.segment)
+            .over(partition_by=classified.c.spool_id)
+            .label("last_segment"),
+        ).subquery("segmented")
+
+        tail = (
+            select(
+                segmented.c.spool_id,
+                segmented.c.segment,
+                segmented.c.is_absolute,
+                segmented.c.measured_weight_g,
+                segmented.c.delta,
+                func.sum(segmented.c.delta)
+                .over(
+                    partition_by=segmented.c.spool_id,
+                    order_by=(segmented.c.event_at, segmented.c.event_id),
+                    rows=(None, 0),
+                )
+                .label("prefix"),
+            )
+            .where(segmented.c.segment == segmented.c.last_segment)
+            .subquery("tail")
+        )
+
+        aggregates = (
+            select(
+                tail.c.spool_id,
+                func.max(tail.c.segment).label("absolute_count"),
+                func.max(
+                    case((tail.c.is_absolute == 1, tail.c.measured_weight_g))
+                ).label("anchor_weight_g"),
+                func.sum(tail.c.delta).label("total_delta"),
+                func.min(tail.c.prefix).label("min_prefix"),
+            )
+            .group_by(tail.c.spool_id)
+            .subquery("aggregates")
+        )
+
+        return (
+            select(
+                Spool.id,
+                Spool.remaining_weight_g,
+                Spool.initial_total_weight_g,
+                Spool.empty_spool_weight_g,
+                func.coalesce(
+                    Spool.empty_spool_weight_g, Filament.default_spool_weight_g
+                ).label("tara"),
+                SpoolStatus.key.label("status_key"),
+                aggregates.c.absolute_count,
+                aggregates.c.anchor_weight_g,
+                aggregates.c.total_delta,
+                aggregates.c.min_prefix,
+                Spool.filament_id,
+            )
+            .join(Filament, Spool.filament_id == Filament.id)
+            .join(SpoolStatus, Spool.status_id == SpoolStatus.id)
+            .outerjoin(aggregates, aggregates.c.spool_id == Spool.id)
+            .order_by(Spool.id)
+        )
+
+    @staticmethod
+    def _replay_aggregates(row: Any) -> float | None:
+        """Compute the final remaining weight from one aggregate row."""
+        if row.absolute_count:
+            base = row.anchor_weight_g - row.tara
+            if base < 0:
+                base = 0
+        elif (
+            row.initial_total_weight_g is not None
+            and row.empty_spool_weight_g is not None
+        ):
+            base = max(row.initial_total_weight_g - row.empty_spool_weight_g, 0)
+        else:
+            return None
+
+        if row.total_delta is None:
+            return base
+        return max(base + row.total_delta, row.total_delta - row.min_prefix)
+
+    async def rebuild_all_remaining_weights(
+        self,
+        spool_ids: list[int] | None = None,
+        batch_size: int = REBUILD_BATCH_SIZE,
+    ) -> dict[str, int]:
+        """Rebuild remaining weights for many spools with set-based queries.
+
+        Produces the same values and side effects as calling
+        rebuild_remaining_weight() for every spool: spools whose history
+        contains an absolute event but no tara are delegated to the per-spool
+        path (which records the tara_missing warning), and spools rebuilt to
+        zero are moved to the 'empty' status.
+        """
+        query = self._rebuild_aggregates_query()
+        if spool_ids is not None:
+            query = query.where(Spool.id.in_(spool_ids))
+        rows = (await self.db.execute(query)).all()
+
+        weight_updates: list[dict[str, Any]] = []
+        emptied_ids: list[int] = []
+        blocked_ids: list[int] = []
+        changed_filament_ids: set[int] = set()
+
+        for row in rows:
+            if row.absolute_count and row.tara is None:
+                blocked_ids.append(row.id)
+                continue
+
+            remaining = self._replay_aggregates(row)
+            current = row.remaining_weight_g
+            unchanged = (remaining is None and current is None) or (
+                remaining is not None
+                and current is not None
+                and math.isclose(remaining, current, rel_tol=1e-12, abs_tol=1e-9)
+            )
+            if not unchanged:
+                weight_updates.append({"id": row.id, "remaining_weight_g": remaining})
+                changed_filament_ids.add(row.filament_id)
+            if remaining == 0 and row.status_key != "empty":
+                emptied_ids.append(row.id)
+
+        for start in range(0, len(weight_updates), batch_size):
+            await self.db.execute(
+                update(Spool), weight_updates[start : start + batch_size]
+            )
+
+        if emptied_ids:
+            empty_status = await self._get_status_by_key("empty")
+            if empty_status is None:
+                emptied_ids = []
+            now = datetime.now(timezone.utc)
+            for start in range(0, len(emptied_ids), batch_size):
+                batch = emptied_ids[start : start + batch_size]
+                await self.db.execute(
+                    update(Spool),
+                    [{"id": sid, "status_id": empty_status.id} for sid in batch],
+                )
+                await self.db.execute(
+                    insert(SpoolEvent),
+                    [
+                        {
+                            "spool_id": sid,
+                            "event_type": "empty",
+                            "event_at": now,
+                            "source": "system",
+                            "to_status_id": empty_status.id,
+                            "meta": {
+                                "auto": True,
+                                "source": "rebuild",
+                                "reason": "remaining_rebuilt_to_zero",
+                            },
+                        }
+                        for sid in batch
+                    ],
+                )
+
+        await refresh_spool_counters(self.db, filament_ids=changed_filament_ids)
+        await self.db.commit()
+        # Bulk UPDATEs bypass the identity map; drop stale loaded spools
+        self.db.expire_all()
+
+        # Blocked spools need the warning event with their last plausible
+        # value, which only the sequential replay can reconstruct.
+        for spool_id in blocked_ids:
+            spool = await self.get_spool(spool_id)
+            if spool is not None:
+                await self.rebuild_remaining_weight(spool)
+
+        return {
+            "spools": len(rows),
+            "updated": len(weight_updates),
+            "emptied": len(emptied_ids),
+            "blocked": len(blocked_ids),
+        }
@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.filament import Color, Filament, FilamentColor, Manufacturer
 from app.models.location import Location
-from app.models.spool import Spool, SpoolStatus
+from app.models.spool import Spool, SpoolStatus, normalize_rfid_uid
 from app.utils.db import json_extract_cast_string
 
 logger = logging.getLogger(__name__)
@@ -841,8 +841,11 @@ class SpoolmanImportService:
                 ])
 
                 # Normalize: pad each hex segment to 2 chars (legacy leading-zero bug)
+                # and lowercase like all stored UIDs
                 if rfid_uid:
-                    rfid_uid = ":".join(s.zfill(2) for s in rfid_uid.split(":"))
+                    rfid_uid = normalize_rfid_uid(
+                        ":".join(s.zfill(2) for s in rfid_uid.split(":"))
+                    )
 
             # external_id: Spoolman-ID als Referenz
             external_id = f"spoolman:{spoolman_id}" if spoolman_id else None
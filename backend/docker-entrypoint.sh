@@ -41,6 +41,13 @@ chmod 0644 /etc/cron.d/filaman-backup
 # Start cron
 cron
 
+# Optional driver host: runs the printer drivers outside the Gunicorn workers
+# (restarted if it exits; it restarts its shard processes itself)
+if [ -n "$DRIVER_HOST_SOCKET" ]; then
+  echo "Starting driver host on $DRIVER_HOST_SOCKET..."
+  (while true; do python -m app.plugins.driver_host; sleep 5; done) &
+fi
+
 # Start nginx (serves static files, proxies API to Gunicorn)
 echo "Starting nginx..."
 nginx
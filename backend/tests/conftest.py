@@ -97,6 +97,27 @@ async def client(db_session, db_engine):
     from app.core.cache import response_cache
 
     response_cache.clear()
+    # Presence collected by heartbeats of earlier tests
+    from app.core.device_presence import device_presence
+
+    device_presence.clear()
+    # Color index loaded from the database of an earlier test
+    from app.services.color_index import color_index
+
+    color_index.clear()
+    # Dashboard statistics cached by an earlier test; no background
+    # recomputes on the shared test session
+    from app.services.dashboard_stats import dashboard_stats
+
+    dashboard_stats.clear()
+    dashboard_stats.background_refresh = False
+    # Printer details cached by an earlier test
+    from app.services.printer_details import printer_details
+
+    printer_details.clear()
+    from app.services.printer_param_cache import printer_param_cache
+
+    printer_param_cache.clear()
 
     # Note: Rate limiting is now handled by nginx, not slowapi
 
@@ -108,6 +129,12 @@ async def client(db_session, db_engine):
     mw_module.async_session_maker = original_mw_session_maker
     app.dependency_overrides.clear()
 
+    # Device commands of this test (dispatcher workers, pooled client, status)
+    from app.core.device_commands import device_commands
+
+    await device_commands.close()
+    device_commands.write_status.clear()
+
 
 @pytest_asyncio.fixture
 async def admin_user(db_session):
@@ -149,6 +149,29 @@ class TestAppSettingsAdmin:
         data = response.json()
         assert data["currency"] == "USD"
 
+    @pytest.mark.asyncio
+    async def test_put_app_settings_updates_event_retention(self, auth_client):
+        """PUT /admin/app-settings should persist the event retention policy."""
+        client, csrf_token = auth_client
+
+        response = await client.put(
+            "/api/v1/admin/app-settings/",
+            json={"event_rollup_after_days": 30, "event_archive_after_months": 12},
+            headers={"X-CSRF-Token": csrf_token},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["event_rollup_after_days"] == 30
+        assert data["event_archive_after_months"] == 12
+
+        response = await client.put(
+            "/api/v1/admin/app-settings/",
+            json={"event_rollup_after_days": -1},
+            headers={"X-CSRF-Token": csrf_token},
+        )
+        assert response.status_code == 422
+
     @pytest.mark.asyncio
     async def test_public_info_includes_currency(self, client, auth_client):
         """GET /app-settings/public-info should include currency field."""
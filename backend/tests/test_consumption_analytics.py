@@ -0,0 +1,242 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import selectinload
+
+from app.models import (
+    ConsumptionDaily,
+    Filament,
+    Manufacturer,
+    Printer,
+    PrinterSlot,
+    PrinterSlotAssignment,
+    Spool,
+    SpoolEvent,
+    SpoolStatus,
+)
+from app.services.consumption_analytics_service import (
+    ConsumptionAnalyticsService,
+    bucket_start,
+)
+from app.services.spool_service import SpoolService
+
+DAY = datetime(2026, 3, 2, 10, tzinfo=timezone.utc)  # a Monday
+
+
+async def _create_spool(db_session, material_type: str = "PLA") -> Spool:
+    mfr = Manufacturer(name=f"AnalyticsMfr-{material_type}-{datetime.now(timezone.utc).timestamp()}")
+    db_session.add(mfr)
+    await db_session.flush()
+
+    filament = Filament(
+        manufacturer_id=mfr.id,
+        designation=f"Analytics {material_type}",
+        material_type=material_type,
+        diameter_mm=1.75,
+        default_spool_weight_g=250.0,
+    )
+    db_session.add(filament)
+    await db_session.flush()
+
+    status = (
+        await db_session.execute(select(SpoolStatus).where(SpoolStatus.key == "opened"))
+    ).scalar_one()
+    spool = Spool(filament_id=filament.id, status_id=status.id, remaining_weight_g=1000.0)
+    db_session.add(spool)
+    await db_session.commit()
+
+    result = await db_session.execute(
+        select(Spool)
+        .where(Spool.id == spool.id)
+        .options(selectinload(Spool.filament), selectinload(Spool.status))
+    )
+    return result.scalar_one()
+
+
+async def _rollup(db_session) -> list[tuple]:
+    result = await db_session.execute(
+        select(
+            ConsumptionDaily.day,
+            ConsumptionDaily.spool_id,
+            ConsumptionDaily.consumed_g,
+            ConsumptionDaily.event_count,
+        ).order_by(ConsumptionDaily.day, ConsumptionDaily.spool_id)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+def test_bucket_start():
+    assert bucket_start(date(2026, 3, 5), "day") == date(2026, 3, 5)
+    assert bucket_start(date(2026, 3, 5), "week") == date(2026, 3, 2)
+    assert bucket_start(date(2026, 3, 5), "month") == date(2026, 3, 1)
+
+
+class TestConsumptionRollupMaintenance:
+    @pytest.mark.asyncio
+    async def test_recorded_consumption_is_rolled_up_per_day(self, db_session):
+        spool = await _create_spool(db_session)
+        service = SpoolService(db_session)
+
+        await service.record_consumption(spool, 10.0, DAY, source="device")
+        # Aggregated into the same event within the aggregation window
+        await service.record_consumption(spool, 5.0, DAY + timedelta(minutes=1), source="device")
+        await service.record_consumption(spool, 20.0, DAY + timedelta(days=1), source="device")
+
+        assert await _rollup(db_session) == [
+            (date(2026, 3, 2), spool.id, 15.0, 1),
+            (date(2026, 3, 3), spool.id, 20.0, 1),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_edited_and_deleted_events_update_rollup(self, db_session):
+        spool = await _create_spool(db_session)
+        event, _ = await SpoolService(db_session).record_consumption(spool, 10.0, DAY)
+
+        event.delta_weight_g = -30.0
+        event.event_at = DAY + timedelta(days=2)
+        await db_session.commit()
+        assert await _rollup(db_session) == [
+            (date(2026, 3, 2), spool.id, 0.0, 0),
+            (date(2026, 3, 4), spool.id, 30.0, 1),
+        ]
+
+        await db_session.delete(event)
+        await db_session.commit()
+        assert [row[2:] for row in await _rollup(db_session)] == [(0.0, 0), (0.0, 0)]
+
+    @pytest.mark.asyncio
+    async def test_deleted_spool_keeps_its_usage(self, auth_client, db_session):
+        client, csrf_token = auth_client
+        spool = await _create_spool(db_session)
+        spool_id = spool.id
+        await SpoolService(db_session).record_consumption(spool, 10.0, DAY)
+
+        response = await client.delete(
+            f"/api/v1/spools/{spool_id}/permanent", headers={"X-CSRF-Token": csrf_token}
+        )
+        assert response.status_code == 204
+        await ConsumptionAnalyticsService(db_session).backfill()
+
+        assert await _rollup(db_session) == [(date(2026, 3, 2), spool_id, 10.0, 1)]
+
+    @pytest.mark.asyncio
+    async def test_new_spool_does_not_take_over_deleted_spools_history(
+        self, auth_client, db_session
+    ):
+        client, csrf_token = auth_client
+        spool = await _create_spool(db_session)
+        old_id, filament_id = spool.id, spool.filament_id
+        await SpoolService(db_session).record_consumption(spool, 10.0, DAY)
+        response = await client.delete(
+            f"/api/v1/spools/{old_id}/permanent", headers={"X-CSRF-Token": csrf_token}
+        )
+        assert response.status_code == 204
+
+        response = await client.post(
+            "/api/v1/spools",
+            json={"filament_id": filament_id, "remaining_weight_g": 500.0},
+            headers={"X-CSRF-Token": csrf_token},
+        )
+        assert response.status_code == 201
+        new_id = response.json()["id"]
+        assert new_id != old_id
+        new_spool = (
+            await db_session.execute(
+                select(Spool)
+                .where(Spool.id == new_id)
+                .options(selectinload(Spool.filament), selectinload(Spool.status))
+            )
+        ).scalar_one()
+        await SpoolService(db_session).record_consumption(new_spool, 4.0, DAY)
+        await ConsumptionAnalyticsService(db_session).backfill()
+
+        assert await _rollup(db_session) == sorted(
+            [(date(2026, 3, 2), old_id, 10.0, 1), (date(2026, 3, 2), new_id, 4.0, 1)]
+        )
+
+    @pytest.mark.asyncio
+    async def test_rollup_records_printer_holding_the_spool(self, db_session):
+        spool = await _create_spool(db_session)
+        printer = Printer(name="Analytics Printer", driver_key="dummy")
+        db_session.add(printer)
+        await db_session.flush()
+        slot = PrinterSlot(printer_id=printer.id, slot_no=1)
+        db_session.add(slot)
+        await db_session.flush()
+        db_session.add(PrinterSlotAssignment(slot_id=slot.id, spool_id=spool.id, present=True))
+        await db_session.commit()
+
+        await SpoolService(db_session).record_consumption(spool, 12.5, DAY)
+
+        row = (await db_session.execute(select(ConsumptionDaily))).scalar_one()
+        assert row.printer_id == printer.id
+        assert row.material_type == "PLA"
+        assert row.filament_id == spool.filament_id
+
+
+class TestConsumptionBackfill:
+    @pytest.mark.asyncio
+    async def test_backfill_matches_incremental_rollup(self, db_session):
+        pla = await _create_spool(db_session, "PLA")
+        petg = await _create_spool(db_session, "PETG")
+        for i in range(5):
+            db_session.add(
+                SpoolEvent(
+                    spool_id=(pla if i % 2 else petg).id,
+                    event_type="print_consumption",
+                    event_at=DAY + timedelta(hours=9 * i),
+                    delta_weight_g=-(i + 1) * 3.0,
+                )
+            )
+        await db_session.commit()
+        incremental = await _rollup(db_session)
+
+        await db_session.execute(delete(ConsumptionDaily))
+        await db_session.commit()
+        stats = await ConsumptionAnalyticsService(db_session).backfill()
+
+        assert stats == {"events": 5, "rows": len(incremental)}
+        assert await _rollup(db_session) == incremental
+
+
+class TestConsumptionAnalyticsApi:
+    @pytest.mark.asyncio
+    async def test_grouped_weekly_series(self, auth_client, db_session):
+        client, _ = auth_client
+        pla = await _create_spool(db_session, "PLA")
+        petg = await _create_spool(db_session, "PETG")
+        service = SpoolService(db_session)
+        await service.record_consumption(pla, 10.0, DAY)
+        await service.record_consumption(pla, 15.0, DAY + timedelta(days=3))
+        await service.record_consumption(petg, 7.0, DAY + timedelta(days=8))
+
+        response = await client.get(
+            "/api/v1/analytics/consumption",
+            params={
+                "start": "2026-03-01",
+                "end": "2026-03-31",
+                "bucket": "week",
+                "group_by": "material_type",
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_consumed_g"] == 32.0
+        assert [
+            (item["period"], item["key"], item["consumed_g"], item["event_count"])
+            for item in data["items"]
+        ] == [
+            ("2026-03-02", "PLA", 25.0, 2),
+            ("2026-03-09", "PETG", 7.0, 1),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_invalid_range_is_rejected(self, auth_client):
+        client, _ = auth_client
+        response = await client.get(
+            "/api/v1/analytics/consumption",
+            params={"start": "2026-03-10", "end": "2026-03-01"},
+        )
+        assert response.status_code == 400
@@ -1,13 +1,19 @@
+import asyncio
 import logging
 import uuid
+from datetime import date
 from unittest.mock import patch
 
 import pytest
 
+from app.core import db_utils
 from app.core.config import PROJECT_ROOT, Settings, settings
+from app.core.db_utils import get_next_available_id, get_next_available_ids
+from app.core.event_bus import EventBus
+from app.core.shared_events import SLOT_COUNT, SharedEventRing
 from app.core.logging_config import get_request_id, set_request_id, setup_logging
 from app.core.security import generate_token_secret, hash_token
-from app.models import Device, UserApiKey
+from app.models import Device, InventorySnapshot, Manufacturer, UserApiKey
 
 
 class TestConfigSettings:
@@ -167,3 +173,105 @@ class TestCsrfMiddlewareEdges:
 
         assert response.status_code == 403
         assert response.json()["code"] == "csrf_failed"
+
+
+@pytest.fixture
+def event_rings():
+    name = f"filaman_test_{uuid.uuid4().hex[:8]}"
+    first, second = SharedEventRing(name, origin=1), SharedEventRing(name, origin=2)
+    first.attach()
+    second.attach()
+    yield first, second
+    first.close()
+    second.close()
+    first.unlink()
+
+
+class TestSharedEventRing:
+    def test_events_are_read_by_other_workers_only(self, event_rings):
+        first, second = event_rings
+
+        first.append('{"event": "a"}')
+        second.append('{"event": "b"}')
+
+        assert first.read_new() == ['{"event": "b"}']
+        assert second.read_new() == ['{"event": "a"}']
+        assert first.read_new() == []
+
+    def test_lapped_reader_skips_overwritten_events(self, event_rings):
+        first, second = event_rings
+
+        for i in range(SLOT_COUNT + 10):
+            first.append(f'{{"n": {i}}}')
+
+        events = second.read_new()
+        assert len(events) == SLOT_COUNT
+        assert events[0] == '{"n": 10}'
+
+    @pytest.mark.asyncio
+    async def test_event_bus_relays_foreign_events_to_listeners(self, event_rings, monkeypatch):
+        first, second = event_rings
+        monkeypatch.setattr("app.core.event_bus.RELAY_POLL_INTERVAL", 0.01)
+        bus = EventBus()
+        received: list[dict] = []
+        bus.add_listener(received.append)
+        bus.start_relay(second)
+        try:
+            first.append('{"event": "device_write_status", "device_id": 3}')
+            for _ in range(100):
+                if received:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await bus.stop_relay()
+
+        assert received == [{"event": "device_write_status", "device_id": 3}]
+
+
+class TestGapFillingIdAllocator:
+    async def _manufacturers(self, db_session, ids: list[int]) -> None:
+        for i in ids:
+            db_session.add(Manufacturer(id=i, name=f"Gap-{i}"))
+        await db_session.commit()
+
+    @pytest.mark.asyncio
+    async def test_next_id_fills_first_gap(self, db_session):
+        assert await get_next_available_id(db_session, Manufacturer) == 1
+        await self._manufacturers(db_session, [2, 3])
+        assert await get_next_available_id(db_session, Manufacturer) == 1
+        await self._manufacturers(db_session, [1, 5])
+        assert await get_next_available_id(db_session, Manufacturer) == 4
+
+    @pytest.mark.asyncio
+    async def test_next_ids_span_gaps_and_tail(self, db_session):
+        assert await get_next_available_ids(db_session, Manufacturer, 3) == [1, 2, 3]
+        await self._manufacturers(db_session, [3, 4, 7, 9])
+        assert await get_next_available_ids(db_session, Manufacturer, 6) == [1, 2, 5, 6, 8, 10]
+        assert await get_next_available_ids(db_session, Manufacturer, 1) == [1]
+
+    @pytest.mark.asyncio
+    async def test_add_with_next_ids_retries_when_id_was_taken(self, db_session, monkeypatch):
+        await self._manufacturers(db_session, [1])
+        stale = iter([1])
+        real = db_utils.get_next_available_id
+
+        async def first_stale(db, model):
+            # Simulate a concurrent worker that already used the returned id
+            return next(stale, None) or await real(db, model)
+
+        monkeypatch.setattr(db_utils, "get_next_available_id", first_stale)
+        manufacturer = Manufacturer(name="Gap-new")
+        await db_utils.add_with_next_ids(db_session, [manufacturer])
+        await db_session.commit()
+
+        assert manufacturer.id == 2
+
+    @pytest.mark.asyncio
+    async def test_ids_with_history_are_not_reused(self, db_session):
+        await self._manufacturers(db_session, [1, 3])
+        db_session.add(
+            InventorySnapshot(day=date(2026, 3, 1), manufacturer_id=2, spool_count=1)
+        )
+        await db_session.commit()
+        assert await get_next_available_id(db_session, Manufacturer) == 4
+        assert await get_next_available_ids(db_session, Manufacturer, 2) == [4, 5]
@@ -0,0 +1,243 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.seeds import run_all_seeds
+from app.models import (
+    Base,
+    Filament,
+    InventoryAggregate,
+    Location,
+    Manufacturer,
+    Spool,
+    SpoolStatus,
+)
+from app.services.dashboard_stats import DashboardStatsCache, run_dashboard_queries
+from app.services.inventory_aggregates import check_inventory, rebuild_inventory
+
+
+async def _create_spools(db_session, weights: list[float]) -> list[Spool]:
+    manufacturer = Manufacturer(name="Dash Maker")
+    db_session.add(manufacturer)
+    await db_session.flush()
+    filament = Filament(
+        manufacturer_id=manufacturer.id, designation="Dash PLA", material_type="PLA", diameter_mm=1.75
+    )
+    db_session.add(filament)
+    await db_session.flush()
+    status = (await db_session.execute(select(SpoolStatus).where(SpoolStatus.key == "new"))).scalar_one()
+    spools = [
+        Spool(
+            filament_id=filament.id,
+            status_id=status.id,
+            initial_total_weight_g=1000.0,
+            empty_spool_weight_g=250.0,
+            remaining_weight_g=weight,
+            purchase_price=20.0,
+        )
+        for weight in weights
+    ]
+    db_session.add_all(spools)
+    await db_session.commit()
+    return spools
+
+
+class TestDashboardStats:
+    @pytest.mark.asyncio
+    async def test_stats_cached_until_change_event(self, auth_client, db_session):
+        client, csrf_token = auth_client
+        spools = await _create_spools(db_session, [900.0, 500.0, 0.0])
+
+        response = await client.get("/api/v1/dashboard/stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["spool_distribution"]["empty"] == 1
+        assert data["total_value_available"] == 60.0
+        assert data["filament_stats"] == [
+            {"filament_type": "PLA", "spool_count": 2, "total_weight_g": 1400.0}
+        ]
+
+        # A write without change event is not seen before the TTL
+        spools[1].remaining_weight_g = 0.0
+        await db_session.commit()
+        response = await client.get("/api/v1/dashboard/stats")
+        assert response.json()["spool_distribution"]["empty"] == 1
+
+        # A write path publishing spools_changed invalidates the cache
+        response = await client.patch(
+            f"/api/v1/spools/{spools[0].id}",
+            json={"purchase_price": 30.0},
+            headers={"X-CSRF-Token": csrf_token},
+        )
+        assert response.status_code == 200
+        data = (await client.get("/api/v1/dashboard/stats")).json()
+        assert data["spool_distribution"]["empty"] == 2
+        assert data["total_value_available"] == 70.0
+
+    @pytest.mark.asyncio
+    async def test_single_flight_per_limit(self):
+        cache = DashboardStatsCache()
+        cache.background_refresh = False
+        calls: list[int] = []
+        release = asyncio.Event()
+
+        async def compute(limit: int) -> tuple[int, int]:
+            calls.append(limit)
+            await release.wait()
+            return limit, len(calls)
+
+        cache.register(compute)
+        waiters = [asyncio.ensure_future(cache.get(20)) for _ in range(5)]
+        other = asyncio.ensure_future(cache.get(10))
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*waiters) == [(20, 1)] * 5
+        assert await other == (10, 2)
+        assert calls == [20, 10]
+        assert await cache.get(20) == (20, 1)
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_computation(self):
+        cache = DashboardStatsCache()
+        cache.background_refresh = False
+        started = asyncio.Event()
+        release = asyncio.Event()
+        results = iter(["stale", "fresh"])
+
+        async def compute(limit: int) -> str:
+            value = next(results)
+            started.set()
+            await release.wait()
+            return value
+
+        cache.register(compute)
+        first = asyncio.ensure_future(cache.get(20))
+        await started.wait()
+        cache.invalidate()
+        second = asyncio.ensure_future(cache.get(20))
+        await asyncio.sleep(0)
+        release.set()
+
+        # Requests after the invalidation do not join the older computation,
+        # and its result is not cached
+        assert await first == "stale"
+        assert await second == "fresh"
+        assert await cache.get(20) == "fresh"
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_after_invalidation(self, monkeypatch):
+        from app.services import dashboard_stats as module
+
+        monkeypatch.setattr(module, "REFRESH_DELAY", 0)
+        cache = DashboardStatsCache()
+        cache.background_refresh = True
+        calls: list[int] = []
+
+        async def compute(limit: int) -> int:
+            calls.append(limit)
+            return len(calls)
+
+        cache.register(compute)
+        assert await cache.get(20) == 1
+        cache.invalidate()
+        cache.invalidate()
+        await asyncio.sleep(0.05)
+
+        assert calls == [20, 20]
+        assert await cache.get(20) == 2
+
+    @pytest.mark.asyncio
+    async def test_queries_run_on_separate_connections(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'dash.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_maker() as session:
+            await run_all_seeds(session)
+            await _create_spools(session, [900.0, 100.0])
+
+        opened = 0
+
+        def factory():
+            nonlocal opened
+            opened += 1
+            return session_maker()
+
+        try:
+            rows = await run_dashboard_queries(factory, 20)
+        finally:
+            await engine.dispose()
+
+        assert opened > 1
+        assert rows["total_value"][0][0] == 40.0
+        assert [tuple(r) for r in rows["filament_stats"]] == [("PLA", 2, 1000.0)]
+
+
+class TestInventoryAggregate:
+    @pytest.mark.asyncio
+    async def test_maintained_by_orm_and_bulk_writes(self, auth_client, db_session):
+        client, csrf_token = auth_client
+        spools = await _create_spools(db_session, [900.0, 500.0, 50.0, 0.0])
+        location = Location(name="Shelf A")
+        db_session.add(location)
+        await db_session.commit()
+        assert await check_inventory(db_session) == []
+
+        buckets = {
+            row.fill_bucket: row.spool_count
+            for row in (await db_session.execute(select(InventoryAggregate))).scalars()
+        }
+        assert buckets == {"full": 1, "normal": 1, "critical": 1, "empty": 1}
+
+        # ORM update of the weight
+        spools[1].remaining_weight_g = 80.0
+        await db_session.commit()
+        # Core bulk update of location and threshold
+        response = await client.patch(
+            "/api/v1/spools/bulk",
+            json={
+                "spool_ids": [spools[0].id, spools[1].id],
+                "location_id": location.id,
+                "low_weight_threshold_g": 200,
+            },
+            headers={"X-CSRF-Token": csrf_token},
+        )
+        assert response.status_code == 200
+        assert await check_inventory(db_session) == []
+
+        data = (await client.get("/api/v1/dashboard/stats")).json()
+        assert data["spool_distribution"] == {
+            "empty": 1, "full": 1, "normal": 0, "low": 0, "critical": 2
+        }
+        assert data["location_stats"] == [
+            {
+                "location_id": location.id,
+                "location_name": "Shelf A",
+                "spool_count": 2,
+                "total_weight_g": 980.0,
+            }
+        ]
+        assert data["manufacturers_with_spools"][0]["spool_count"] == 3
+        assert data["filament_types"] == [{"material_type": "PLA", "count": 4}]
+        assert data["total_value_available"] == 80.0
+
+    @pytest.mark.asyncio
+    async def test_check_reports_and_rebuild_repairs_drift(self, db_session):
+        spools = await _create_spools(db_session, [900.0, 500.0])
+        row = (
+            await db_session.execute(
+                select(InventoryAggregate).where(InventoryAggregate.fill_bucket == "full")
+            )
+        ).scalar_one()
+        row.spool_count = 5
+        await db_session.commit()
+
+        differences = await check_inventory(db_session)
+        assert [(d["filament_id"], d["fill_bucket"]) for d in differences] == [
+            (spools[0].filament_id, "full")
+        ]
+        assert await rebuild_inventory(db_session) == 2
+        assert await check_inventory(db_session) == []
@@ -1,9 +1,15 @@
+import httpx
 import pytest
+from datetime import datetime, timedelta, timezone
 from sqlalchemy import select
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from app.core import device_commands as device_commands_module
+from app.core.device_commands import device_commands
+from app.core.event_bus import event_bus
+from app.core.device_presence import device_presence
 from app.core.security import hash_token
-from app.models import Device, Filament, Location, Manufacturer, Spool, SpoolStatus
+from app.models import Device, Filament, Location, Manufacturer, Spool, SpoolEvent, SpoolStatus
 
 
 async def _create_device(
@@ -41,6 +47,14 @@ async def _register_device(client, device_code: str, csrf_token: str | None = No
     return token, device_id
 
 
+@pytest.fixture
+def published_events():
+    events: list[dict] = []
+    event_bus.add_listener(events.append)
+    yield events
+    event_bus.remove_listener(events.append)
+
+
 def _device_headers(token: str) -> dict:
     return {"Authorization": f"Device {token}"}
 
@@ -168,10 +182,33 @@ class TestDeviceHeartbeat:
         assert response.status_code == 200
         assert response.json()["status"] == "ok"
 
+        # Heartbeats are collected in memory and written by the batched flush
         result = await db_session.execute(select(Device).where(Device.id == device_id))
         device = result.scalar_one()
+        assert device.last_seen_at is None
+        assert device_presence.is_online(device)
+
+        assert await device_presence.flush(db_session) == 1
+        await db_session.refresh(device)
         assert device.ip_address == "10.0.0.5"
         assert device.last_seen_at is not None
+        assert await device_presence.flush(db_session) == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_never_moves_last_seen_backwards(self, db_session):
+        device = await _create_device(db_session, device_code="ABC123")
+        newer = datetime.now(timezone.utc)
+        device.last_seen_at = newer
+        device.ip_address = "10.0.0.9"
+        await db_session.commit()
+
+        device_presence.touch(device.id, "10.0.0.5", at=newer - timedelta(seconds=30))
+        await device_presence.flush(db_session)
+
+        await db_session.refresh(device)
+        assert device.last_seen_at == newer
+        assert device.ip_address == "10.0.0.9"
+        assert device_presence.ip_address(device) == "10.0.0.9"
 
     @pytest.mark.asyncio
     async def test_heartbeat_unauthenticated(self, client):
@@ -207,6 +244,25 @@ class TestActiveDevices:
         data = response.json()
         assert any(item["id"] == device_id for item in data)
 
+    @pytest.mark.asyncio
+    async def test_admin_device_list_reads_presence(self, auth_client, db_session):
+        client, csrf_token = auth_client
+        await _create_device(db_session, device_code="ABC123")
+        token, device_id = await _register_device(client, "ABC123", csrf_token)
+
+        await client.post(
+            "/api/v1/devices/heartbeat",
+            json={"ip_address": "10.0.0.7"},
+            headers={**_device_headers(token), "X-CSRF-Token": csrf_token},
+        )
+
+        response = await client.get("/api/v1/admin/devices")
+        assert response.status_code == 200
+        item = next(d for d in response.json()["items"] if d["id"] == device_id)
+        assert item["is_online"] is True
+        assert item["ip_address"] == "10.0.0.7"
+        assert item["last_seen_at"] is not None
+
     @pytest.mark.asyncio
     async def test_list_active_devices_empty(self, client):
         response = await client.get("/api/v1/devices/active")
@@ -216,18 +272,17 @@ class TestActiveDevices:
 
 class TestWriteTag:
     @pytest.mark.asyncio
-    async def test_write_tag_success(self, auth_client, db_session):
+    async def test_write_tag_success(self, auth_client, db_session, published_events):
         client, csrf_token = auth_client
         device = await _create_device(db_session, ip_address="192.168.1.10")
 
         mock_response = MagicMock()
         mock_response.status_code = 200
 
-        with patch("app.api.v1.devices.httpx.AsyncClient") as mock_httpx:
+        with patch("app.core.device_commands.httpx.AsyncClient") as mock_httpx:
             mock_client_instance = AsyncMock()
+            mock_client_instance.is_closed = False
             mock_client_instance.post = AsyncMock(return_value=mock_response)
-            mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-            mock_client_instance.__aexit__ = AsyncMock(return_value=False)
             mock_httpx.return_value = mock_client_instance
 
             response = await client.post(
@@ -235,12 +290,43 @@ class TestWriteTag:
                 json={"spool_id": 123},
                 headers={"X-CSRF-Token": csrf_token},
             )
+            await device_commands.join()
 
         assert response.status_code == 200
+        mock_client_instance.post.assert_awaited_once_with(
+            "http://192.168.1.10/api/v1/rfid/write", json={"spool_id": 123}
+        )
+        assert device_commands.write_status[device.id]["status"] == "pending"
+        assert [(e["event"], e["device_id"], e["status"]) for e in published_events] == [
+            ("device_write_status", device.id, "pending")
+        ]
 
-        await db_session.refresh(device)
-        assert device.custom_fields is not None
-        assert device.custom_fields["last_write_result"]["status"] == "pending"
+    @pytest.mark.asyncio
+    async def test_write_tag_unreachable_device_reports_error(
+        self, auth_client, db_session, monkeypatch
+    ):
+        client, csrf_token = auth_client
+        device = await _create_device(db_session, ip_address="192.168.1.10")
+        monkeypatch.setattr(device_commands_module, "DISPATCH_RETRY_DELAY", 0)
+
+        with patch("app.core.device_commands.httpx.AsyncClient") as mock_httpx:
+            mock_client_instance = AsyncMock()
+            mock_client_instance.is_closed = False
+            mock_client_instance.post = AsyncMock(side_effect=httpx.ConnectError("refused"))
+            mock_httpx.return_value = mock_client_instance
+
+            response = await client.post(
+                f"/api/v1/devices/{device.id}/write-tag",
+                json={"location_id": 5},
+                headers={"X-CSRF-Token": csrf_token},
+            )
+            await device_commands.join()
+
+        assert response.status_code == 200
+        assert mock_client_instance.post.await_count == device_commands_module.DISPATCH_ATTEMPTS
+        status_response = await client.get(f"/api/v1/devices/{device.id}/write-status")
+        assert status_response.json()["status"] == "error"
+        assert status_response.json()["error_message"] == "Device not reachable"
 
     @pytest.mark.asyncio
     async def test_write_tag_missing_ids(self, auth_client, db_session):
@@ -289,11 +375,10 @@ class TestWriteStatus:
         mock_response = MagicMock()
         mock_response.status_code = 200
 
-        with patch("app.api.v1.devices.httpx.AsyncClient") as mock_httpx:
+        with patch("app.core.device_commands.httpx.AsyncClient") as mock_httpx:
             mock_client_instance = AsyncMock()
+            mock_client_instance.is_closed = False
             mock_client_instance.post = AsyncMock(return_value=mock_response)
-            mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-            mock_client_instance.__aexit__ = AsyncMock(return_value=False)
             mock_httpx.return_value = mock_client_instance
 
             write_response = await client.post(
@@ -301,6 +386,7 @@ class TestWriteStatus:
                 json={"spool_id": 123},
                 headers={"X-CSRF-Token": csrf_token},
             )
+            await device_commands.join()
 
         assert write_response.status_code == 200
 
@@ -315,7 +401,7 @@ class TestRfidResult:
     async def test_rfid_result_success(self, auth_client, db_session):
         client, csrf_token = auth_client
         await _create_device(db_session, device_code="ABC123")
-        token, _ = await _register_device(client, "ABC123", csrf_token)
+        token, device_id = await _register_device(client, "ABC123", csrf_token)
 
         manufacturer = await _create_manufacturer(db_session)
         filament = await _create_filament(db_session, manufacturer.id)
@@ -335,7 +421,9 @@ class TestRfidResult:
         assert response.json()["status"] == "ok"
 
         await db_session.refresh(spool)
-        assert spool.rfid_uid == "RFID-123"
+        assert spool.rfid_uid == "rfid-123"
+        assert device_commands.write_status[device_id]["status"] == "success"
+        assert device_commands.write_status[device_id]["tag_uuid"] == "RFID-123"
 
     @pytest.mark.asyncio
     async def test_rfid_result_failure(self, auth_client, db_session):
@@ -355,11 +443,9 @@ class TestRfidResult:
         assert response.status_code == 200
         assert response.json()["message"] == "Failure noted"
 
-        result = await db_session.execute(select(Device).where(Device.id == device_id))
-        device = result.scalar_one()
-        assert device.custom_fields is not None
-        assert device.custom_fields["last_write_result"]["status"] == "error"
-        assert device.custom_fields["last_write_result"]["error_message"] == "Write failed"
+        status_response = await client.get(f"/api/v1/devices/{device_id}/write-status")
+        assert status_response.json()["status"] == "error"
+        assert status_response.json()["error_message"] == "Write failed"
 
 
 class TestWeighSpool:
@@ -392,6 +478,90 @@ class TestWeighSpool:
         assert spool.remaining_weight_g == 250.0
 
 
+    @pytest.mark.asyncio
+    async def test_weigh_by_tag_opens_new_spool(self, auth_client, db_session):
+        client, csrf_token = auth_client
+        await _create_device(db_session, device_code="ABC123")
+        token, _ = await _register_device(client, "ABC123", csrf_token)
+
+        manufacturer = await _create_manufacturer(db_session)
+        filament = await _create_filament(db_session, manufacturer.id, default_spool_weight_g=250.0)
+        new_status = await _get_status(db_session, "new")
+        opened_status = await _get_status(db_session, "opened")
+        other = await _create_spool(db_session, filament.id, new_status.id)
+        spool = await _create_spool(
+            db_session, filament.id, new_status.id, empty_spool_weight_g=200.0, rfid_uid="04:AB:CD"
+        )
+
+        # The tag wins over a spool_id pointing at another spool
+        response = await client.post(
+            "/api/v1/devices/scale/weight",
+            json={"tag_uuid": "04:ab:CD", "spool_id": other.id, "measured_weight_g": 800.0},
+            headers={**_device_headers(token), "X-CSRF-Token": csrf_token},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "remaining_weight_g": 600.0,
+            "spool_id": spool.id,
+            "filament_name": "Test PLA",
+        }
+        await db_session.refresh(spool)
+        assert spool.remaining_weight_g == 600.0
+        assert spool.status_id == opened_status.id
+        events = (
+            await db_session.execute(
+                select(SpoolEvent.event_type).where(SpoolEvent.spool_id == spool.id)
+            )
+        ).scalars().all()
+        assert sorted(events) == ["measurement", "opened"]
+
+    @pytest.mark.asyncio
+    async def test_weigh_empty_spool_sets_empty_status(self, auth_client, db_session):
+        client, csrf_token = auth_client
+        await _create_device(db_session, device_code="ABC123")
+        token, _ = await _register_device(client, "ABC123", csrf_token)
+
+        manufacturer = await _create_manufacturer(db_session)
+        filament = await _create_filament(db_session, manufacturer.id, default_spool_weight_g=250.0)
+        opened_status = await _get_status(db_session, "opened")
+        empty_status = await _get_status(db_session, "empty")
+        spool = await _create_spool(db_session, filament.id, opened_status.id)
+
+        response = await client.post(
+            "/api/v1/devices/scale/weight",
+            json={"spool_id": spool.id, "measured_weight_g": 250.0},
+            headers={**_device_headers(token), "X-CSRF-Token": csrf_token},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["remaining_weight_g"] == 0.0
+        await db_session.refresh(spool)
+        assert spool.status_id == empty_status.id
+        result = await db_session.execute(
+            select(SpoolEvent).where(SpoolEvent.spool_id == spool.id).order_by(SpoolEvent.id)
+        )
+        measurement, empty = result.scalars().all()
+        assert empty.event_type == "empty"
+        assert empty.from_status_id == opened_status.id
+        assert empty.meta["trigger_event_id"] == measurement.id
+
+    @pytest.mark.asyncio
+    async def test_weigh_unknown_spool_returns_404(self, auth_client, db_session):
+        client, csrf_token = auth_client
+        await _create_device(db_session, device_code="ABC123")
+        token, _ = await _register_device(client, "ABC123", csrf_token)
+
+        response = await client.post(
+            "/api/v1/devices/scale/weight",
+            json={"tag_uuid": "ff:ff", "measured_weight_g": 500.0},
+            headers={**_device_headers(token), "X-CSRF-Token": csrf_token},
+        )
+
+        assert response.status_code == 404
+        assert response.json()["detail"]["code"] == "not_found"
+
+
 class TestLocateSpool:
     @pytest.mark.asyncio
     async def test_locate_spool_success(self, auth_client, db_session):
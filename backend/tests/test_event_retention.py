@@ -0,0 +1,294 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.models import (
+    AppSettings,
+    ConsumptionDaily,
+    Filament,
+    Manufacturer,
+    Spool,
+    SpoolEvent,
+    SpoolEventArchive,
+    SpoolStatus,
+    SpoolWeightCheckpoint,
+)
+from app.services import spool_service
+from app.services.consumption_analytics_service import ConsumptionAnalyticsService
+from app.services.event_retention_service import EventRetentionService, months_before
+from app.services.spool_service import SpoolService
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+async def _create_spool(db_session) -> Spool:
+    mfr = Manufacturer(name=f"RetentionMfr-{datetime.now(timezone.utc).timestamp()}")
+    db_session.add(mfr)
+    await db_session.flush()
+
+    filament = Filament(
+        manufacturer_id=mfr.id,
+        designation="Retention PLA",
+        material_type="PLA",
+        diameter_mm=1.75,
+        default_spool_weight_g=250.0,
+    )
+    db_session.add(filament)
+    await db_session.flush()
+
+    status = (
+        await db_session.execute(select(SpoolStatus).where(SpoolStatus.key == "opened"))
+    ).scalar_one()
+    spool = Spool(
+        filament_id=filament.id,
+        status_id=status.id,
+        initial_total_weight_g=1250.0,
+        remaining_weight_g=1000.0,
+    )
+    db_session.add(spool)
+    await db_session.commit()
+
+    result = await db_session.execute(
+        select(Spool).where(Spool.id == spool.id).options(selectinload(Spool.filament))
+    )
+    return result.scalar_one()
+
+
+async def _add_events(db_session, spool: Spool, start: datetime, events: list[dict]):
+    for i, data in enumerate(events):
+        db_session.add(
+            SpoolEvent(spool_id=spool.id, event_at=start + timedelta(hours=i), **data)
+        )
+    await db_session.commit()
+
+
+async def _events(db_session, spool: Spool) -> list[SpoolEvent]:
+    result = await db_session.execute(
+        select(SpoolEvent)
+        .where(SpoolEvent.spool_id == spool.id)
+        .order_by(SpoolEvent.event_at, SpoolEvent.id)
+    )
+    return list(result.scalars().all())
+
+
+def _consumption(delta: float, **extra) -> dict:
+    return {"event_type": "print_consumption", "delta_weight_g": delta, **extra}
+
+
+class TestMonthsBefore:
+    def test_clamps_day_to_target_month(self):
+        moment = datetime(2026, 3, 31, 12, tzinfo=timezone.utc)
+        assert months_before(moment, 1) == datetime(2026, 2, 28, 12, tzinfo=timezone.utc)
+        assert months_before(moment, 15) == datetime(2024, 12, 31, 12, tzinfo=timezone.utc)
+
+
+class TestConsumptionRollup:
+    @pytest.mark.asyncio
+    async def test_rollup_merges_same_day_runs_and_keeps_rebuild_result(self, db_session):
+        spool = await _create_spool(db_session)
+        day = datetime(2026, 1, 10, 8, tzinfo=timezone.utc)
+        await _add_events(
+            db_session,
+            spool,
+            day,
+            [
+                {"event_type": "measurement", "measured_weight_g": 1200.0},
+                _consumption(-300.0, source="device"),
+                _consumption(-500.0, source="device"),
+                # Clamps to zero, merged delta must replay identically
+                _consumption(-400.0, source="device", meta={"clamped_to_zero": True}),
+                {"event_type": "measurement", "measured_weight_g": 1100.0},
+                _consumption(-10.0),
+                _consumption(-20.0),
+            ],
+        )
+        service = SpoolService(db_session)
+        expected = await service.rebuild_remaining_weight(spool)
+
+        removed = await EventRetentionService(db_session).rollup_consumption(NOW)
+        await db_session.commit()
+
+        assert removed == 3
+        events = await _events(db_session, spool)
+        assert [e.event_type for e in events] == [
+            "measurement",
+            "print_consumption",
+            "measurement",
+            "print_consumption",
+        ]
+        first_run = events[1]
+        assert first_run.delta_weight_g == -1200.0
+        assert first_run.source == "device"
+        assert first_run.meta["rollup"] is True
+        assert first_run.meta["aggregation_count"] == 3
+        assert first_run.meta["clamped_to_zero"] is True
+        assert events[3].delta_weight_g == -30.0
+
+        assert await service.rebuild_remaining_weight(spool) == expected
+
+    @pytest.mark.asyncio
+    async def test_rollup_keeps_consumption_rollup_counts_in_sync(self, db_session):
+        spool = await _create_spool(db_session)
+        await _add_events(
+            db_session,
+            spool,
+            datetime(2026, 1, 10, 8, tzinfo=timezone.utc),
+            [
+                _consumption(-300.0),
+                _consumption(-500.0),
+                {"event_type": "measurement", "measured_weight_g": 100.0},
+                _consumption(-10.0),
+                _consumption(-20.0),
+                _consumption(-5.0),
+            ],
+        )
+
+        async def rollup_rows():
+            result = await db_session.execute(
+                select(ConsumptionDaily.consumed_g, ConsumptionDaily.event_count).where(
+                    ConsumptionDaily.spool_id == spool.id
+                )
+            )
+            return result.all()
+
+        assert await rollup_rows() == [(835.0, 5)]
+        await EventRetentionService(db_session).rollup_consumption(NOW)
+        await db_session.commit()
+        assert await rollup_rows() == [(835.0, 2)]
+
+        await ConsumptionAnalyticsService(db_session).backfill()
+        assert await rollup_rows() == [(835.0, 2)]
+
+    @pytest.mark.asyncio
+    async def test_rollup_drops_checkpoints_inside_merged_runs(
+        self, db_session, monkeypatch
+    ):
+        monkeypatch.setattr(spool_service, "WEIGHT_CHECKPOINT_INTERVAL", 3)
+        spool = await _create_spool(db_session)
+        await _add_events(
+            db_session,
+            spool,
+            datetime(2026, 1, 10, 8, tzinfo=timezone.utc),
+            [
+                {"event_type": "measurement", "measured_weight_g": 1200.0},
+                _consumption(-100.0),
+                # Checkpointed, invisible to the rollup
+                {"event_type": "move_location"},
+                _consumption(-50.0),
+            ],
+        )
+        service = SpoolService(db_session)
+        assert await service.rebuild_remaining_weight(spool) == 800.0
+        await db_session.commit()
+        checkpoints = (await db_session.execute(select(SpoolWeightCheckpoint))).scalars()
+        assert [c.remaining_weight_g for c in checkpoints] == [850.0]
+
+        removed = await EventRetentionService(db_session).rollup_consumption(NOW)
+        await db_session.commit()
+
+        assert removed == 1
+        assert (await db_session.execute(select(SpoolWeightCheckpoint))).first() is None
+        assert await service.rebuild_remaining_weight(spool) == 800.0
+
+    @pytest.mark.asyncio
+    async def test_rollup_respects_cutoff_and_day_boundaries(self, db_session):
+        spool = await _create_spool(db_session)
+        await _add_events(
+            db_session,
+            spool,
+            datetime(2026, 1, 10, 22, tzinfo=timezone.utc),
+            [_consumption(-1.0)] * 4,
+        )
+
+        # Only the two events on Jan 10 are older than the cutoff
+        cutoff = datetime(2026, 1, 11, 0, 30, tzinfo=timezone.utc)
+        removed = await EventRetentionService(db_session).rollup_consumption(cutoff)
+        await db_session.commit()
+
+        assert removed == 1
+        assert len(await _events(db_session, spool)) == 3
+
+
+class TestEventArchival:
+    @pytest.mark.asyncio
+    async def test_archive_keeps_latest_anchor_and_rebuild_result(self, db_session):
+        spool = await _create_spool(db_session)
+        old = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        await _add_events(
+            db_session,
+            spool,
+            old,
+            [
+                {"event_type": "measurement", "measured_weight_g": 1200.0},
+                _consumption(-100.0),
+                {"event_type": "measurement", "measured_weight_g": 1000.0},
+                _consumption(-50.0),
+            ],
+        )
+        await _add_events(db_session, spool, NOW - timedelta(days=1), [_consumption(-25.0)])
+        service = SpoolService(db_session)
+        expected = await service.rebuild_remaining_weight(spool)
+
+        db_session.add(AppSettings(id=1, event_archive_after_months=6))
+        await db_session.commit()
+        stats = await EventRetentionService(db_session).run(now=NOW)
+
+        assert stats["spool_events_archived"] == 2
+        events = await _events(db_session, spool)
+        assert [e.event_type for e in events] == [
+            "measurement",
+            "print_consumption",
+            "print_consumption",
+        ]
+        archived = (
+            await db_session.execute(
+                select(SpoolEventArchive).where(SpoolEventArchive.spool_id == spool.id)
+            )
+        ).scalars().all()
+        assert sorted(a.event_type for a in archived) == ["measurement", "print_consumption"]
+
+        assert await service.rebuild_remaining_weight(spool) == expected
+
+    @pytest.mark.asyncio
+    async def test_spool_without_anchor_is_not_archived(self, db_session):
+        spool = await _create_spool(db_session)
+        await _add_events(
+            db_session, spool, datetime(2025, 1, 1, tzinfo=timezone.utc), [_consumption(-5.0)] * 3
+        )
+
+        stats = await EventRetentionService(db_session).archive_events(NOW)
+        await db_session.commit()
+
+        assert stats["spool_events_archived"] == 0
+        assert len(await _events(db_session, spool)) == 3
+
+    @pytest.mark.asyncio
+    async def test_events_endpoint_can_include_archive(self, auth_client, db_session):
+        client, _ = auth_client
+        spool = await _create_spool(db_session)
+        await _add_events(
+            db_session,
+            spool,
+            datetime(2025, 1, 1, tzinfo=timezone.utc),
+            [
+                _consumption(-5.0),
+                {"event_type": "measurement", "measured_weight_g": 1000.0},
+            ],
+        )
+        archived_id = (await _events(db_session, spool))[0].id
+        await EventRetentionService(db_session).archive_events(NOW)
+        await db_session.commit()
+
+        url = f"/api/v1/spools/{spool.id}/events"
+        live = (await client.get(url)).json()
+        assert live["total"] == 1
+
+        combined = (await client.get(url, params={"include_archive": True})).json()
+        assert combined["total"] == 2
+        assert [e["event_type"] for e in combined["items"]] == [
+            "measurement",
+            "print_consumption",
+        ]
+        assert combined["items"][1]["id"] == archived_id
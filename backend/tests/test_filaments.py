@@ -223,6 +223,76 @@ class TestManufacturerCRUD:
         spool_result = await db_session.execute(select(Spool).where(Spool.id == spool.id))
         assert spool_result.scalar_one_or_none() is None
 
+    @pytest.mark.asyncio
+    async def test_delete_manufacturer_force_removes_dependent_rows(self, auth_client, db_session):
+        from datetime import datetime, timezone
+
+        from app.models import Printer, PrinterSlot, PrinterSlotAssignment, SpoolEvent
+
+        client, csrf_token = auth_client
+
+        manufacturer = await _create_manufacturer(db_session, name="Cascade Maker")
+        other = await _create_manufacturer(db_session, name="Survivor")
+        red = await _create_color(db_session)
+        status = await _get_status(db_session, "new")
+        filaments = [
+            await _create_filament(db_session, manufacturer.id, designation=f"PLA {i}") for i in range(3)
+        ]
+        kept_filament = await _create_filament(db_session, other.id)
+        spools = [await _create_spool(db_session, f.id, status.id) for f in filaments for _ in range(2)]
+        kept_spool = await _create_spool(db_session, kept_filament.id, status.id)
+
+        printer = Printer(name="Cascade Printer", driver_key="dummy")
+        db_session.add(printer)
+        await db_session.flush()
+        slot = PrinterSlot(printer_id=printer.id, slot_no=1)
+        db_session.add(slot)
+        await db_session.flush()
+        db_session.add(PrinterSlotAssignment(slot_id=slot.id, spool_id=spools[0].id, present=True))
+        db_session.add_all(
+            [FilamentColor(filament_id=f.id, color_id=red.id, position=1) for f in filaments]
+        )
+        db_session.add_all(
+            [
+                SpoolEvent(spool_id=s.id, event_type="measurement", event_at=datetime.now(timezone.utc))
+                for s in [*spools, kept_spool]
+            ]
+        )
+        await db_session.commit()
+
+        response = await client.delete(
+            f"/api/v1/manufacturers/{manufacturer.id}?force=true",
+            headers={"X-CSRF-Token": csrf_token},
+        )
+
+        assert response.status_code == 204
+        remaining = await db_session.execute(select(Spool.id))
+        assert list(remaining.scalars().all()) == [kept_spool.id]
+        events = await db_session.execute(select(SpoolEvent.spool_id))
+        assert list(events.scalars().all()) == [kept_spool.id]
+        colors = await db_session.execute(select(FilamentColor.filament_id))
+        assert colors.scalars().all() == []
+        assignment = await db_session.execute(
+            select(PrinterSlotAssignment.spool_id, PrinterSlotAssignment.present)
+        )
+        assert assignment.one() == (None, True)
+        other_row = await db_session.execute(select(Manufacturer.spool_count).where(Manufacturer.id == other.id))
+        assert other_row.scalar_one() == 1
+
+    def test_cascade_covers_all_references(self):
+        from app.models import Base
+        from app.services.cascade_delete import FILAMENT_CHILDREN, SPOOL_CHILDREN, SPOOL_REFERENCES
+
+        handled = {m.__tablename__ for m in (*SPOOL_CHILDREN, *SPOOL_REFERENCES, *FILAMENT_CHILDREN)}
+        handled |= {"spools", "filaments"}
+        referencing = {
+            table.name
+            for table in Base.metadata.sorted_tables
+            for fk in table.foreign_keys
+            if fk.column.table.name in ("spools", "filaments", "spool_events")
+        }
+        assert referencing <= handled
+
 
 class TestColorCRUD:
     @pytest.mark.asyncio
@@ -714,3 +784,352 @@ class TestFilamentColors:
 
         assert response.status_code == 404
         assert response.json()["detail"]["code"] == "not_found"
+
+
+class TestSpoolCounters:
+    @pytest.mark.asyncio
+    async def test_counters_follow_spool_writes(self, auth_client, db_session):
+        client, _ = auth_client
+
+        manufacturer = await _create_manufacturer(db_session, name="Counter Maker")
+        pla = await _create_filament(db_session, manufacturer.id, designation="Counter PLA")
+        petg = await _create_filament(
+            db_session, manufacturer.id, designation="Counter PETG", material_type="PETG"
+        )
+        new_status = await _get_status(db_session, "new")
+        archived_status = await _get_status(db_session, "archived")
+
+        spool = await _create_spool(
+            db_session, pla.id, new_status.id, remaining_weight_g=600.0, purchase_price=20.0
+        )
+        await _create_spool(
+            db_session, petg.id, new_status.id, remaining_weight_g=400.0, purchase_price=25.0
+        )
+
+        response = await client.get(f"/api/v1/filaments/{pla.id}")
+        assert response.json()["spool_count"] == 1
+        assert response.json()["total_remaining_weight_g"] == 600.0
+
+        response = await client.get(f"/api/v1/manufacturers/{manufacturer.id}")
+        data = response.json()
+        assert data["filament_count"] == 2
+        assert data["spool_count"] == 2
+        assert data["total_remaining_weight_g"] == 1000.0
+        assert data["total_price_available"] == 45.0
+        assert data["materials"] == ["PETG", "PLA"]
+
+        spool.remaining_weight_g = 100.0
+        await db_session.commit()
+        await db_session.refresh(pla)
+        assert pla.total_remaining_weight_g == 100.0
+
+        spool.status_id = archived_status.id
+        await db_session.commit()
+        response = await client.get("/api/v1/manufacturers?page=1&page_size=50")
+        item = next(i for i in response.json()["items"] if i["id"] == manufacturer.id)
+        assert item["spool_count"] == 1
+        assert item["archived_spool_count"] == 1
+        assert item["total_remaining_weight_g"] == 400.0
+        assert item["total_price_available"] == 25.0
+        assert item["total_price_all"] == 45.0
+
+        await db_session.delete(spool)
+        await db_session.commit()
+        await db_session.refresh(manufacturer)
+        assert manufacturer.archived_spool_count == 0
+        assert manufacturer.total_price_all == 25.0
+
+    @pytest.mark.asyncio
+    async def test_bulk_archive_updates_counters(self, auth_client, db_session):
+        client, csrf_token = auth_client
+
+        manufacturer = await _create_manufacturer(db_session, name="Bulk Counter Maker")
+        filament = await _create_filament(db_session, manufacturer.id)
+        status = await _get_status(db_session, "new")
+        spools = [await _create_spool(db_session, filament.id, status.id) for _ in range(3)]
+
+        response = await client.request(
+            "DELETE",
+            "/api/v1/spools/bulk",
+            json={"spool_ids": [spools[0].id, spools[1].id], "permanent": False},
+            headers={"X-CSRF-Token": csrf_token},
+        )
+
+        assert response.status_code == 200
+        response = await client.get(f"/api/v1/filaments/{filament.id}")
+        assert response.json()["spool_count"] == 1
+        await db_session.refresh(manufacturer)
+        assert manufacturer.spool_count == 1
+        assert manufacturer.archived_spool_count == 2
+
+    @pytest.mark.asyncio
+    async def test_rebuild_repairs_drift(self, db_session):
+        from sqlalchemy import update
+
+        from app.services.spool_counters import rebuild_spool_counters
+
+        manufacturer = await _create_manufacturer(db_session, name="Drift Maker")
+        filament = await _create_filament(db_session, manufacturer.id)
+        status = await _get_status(db_session, "new")
+        await _create_spool(db_session, filament.id, status.id)
+
+        # Core statements bypass the listeners
+        await db_session.execute(
+            update(Filament).where(Filament.id == filament.id).values(spool_count=7)
+        )
+        await db_session.execute(
+            update(Manufacturer)
+            .where(Manufacturer.id == manufacturer.id)
+            .values(spool_count=7, materials=[])
+        )
+        await db_session.commit()
+
+        counts = await rebuild_spool_counters(db_session)
+
+        assert counts["filaments"] >= 1
+        await db_session.refresh(filament)
+        await db_session.refresh(manufacturer)
+        assert filament.spool_count == 1
+        assert manufacturer.spool_count == 1
+        assert manufacturer.materials == ["PLA"]
+
+
+class TestColorSimilarity:
+    @pytest.mark.asyncio
+    async def test_similar_colors_ordered_by_delta_e(self, auth_client, db_session):
+        client, _ = auth_client
+
+        red = await _create_color(db_session, name="Red", hex_code="#FF0000")
+        dark_red = await _create_color(db_session, name="Dark Red", hex_code="#B00000")
+        blue = await _create_color(db_session, name="Blue", hex_code="#0000FF")
+
+        response = await client.get("/api/v1/colors/similar", params={"hex": "#F80404", "limit": 3})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [m["color"]["id"] for m in data] == [red.id, dark_red.id, blue.id]
+        assert data[0]["delta_e"] < 5
+        assert data[0]["delta_e"] <= data[1]["delta_e"] <= data[2]["delta_e"]
+
+    @pytest.mark.asyncio
+    async def test_similar_colors_invalid_hex(self, auth_client):
+        client, _ = auth_client
+
+        response = await client.get("/api/v1/colors/similar", params={"hex": "red"})
+
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_filaments_by_color_match_any_position(self, auth_client, db_session):
+        client, _ = auth_client
+
+        manufacturer = await _create_manufacturer(db_session, name="Color Maker")
+        red = await _create_color(db_session, name="Red", hex_code="#FF0000")
+        green = await _create_color(db_session, name="Green", hex_code="#00FF00")
+        blue = await _create_color(db_session, name="Blue", hex_code="#0000FF")
+
+        blue_pla = await _create_filament(db_session, manufacturer.id, designation="Blue PLA")
+        dual = await _create_filament(db_session, manufacturer.id, designation="Green/Red", color_mode="multi")
+        red_no_stock = await _create_filament(db_session, manufacturer.id, designation="Red PLA")
+        db_session.add_all(
+            [
+                FilamentColor(filament_id=blue_pla.id, color_id=blue.id, position=1),
+                FilamentColor(filament_id=dual.id, color_id=green.id, position=1),
+                FilamentColor(filament_id=dual.id, color_id=red.id, position=2),
+                FilamentColor(filament_id=red_no_stock.id, color_id=red.id, position=1),
+            ]
+        )
+        await db_session.commit()
+        status = await _get_status(db_session, "new")
+        await _create_spool(db_session, dual.id, status.id)
+        await _create_spool(db_session, blue_pla.id, status.id)
+
+        response = await client.get(
+            "/api/v1/filaments/similar-color", params={"hex": "#FF1010", "limit": 2}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [m["filament"]["id"] for m in data] == [dual.id, red_no_stock.id]
+        assert data[0]["position"] == 2
+        assert data[0]["color_id"] == red.id
+
+        response = await client.get(
+            "/api/v1/filaments/similar-color",
+            params={"hex": "#FF1010", "limit": 5, "in_stock": True},
+        )
+        data = response.json()
+        assert [m["filament"]["id"] for m in data] == [dual.id, blue_pla.id]
+        assert data[0]["filament"]["spool_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_filaments_by_color_in_stock_skips_empty_spools(
+        self, auth_client, db_session
+    ):
+        client, _ = auth_client
+
+        manufacturer = await _create_manufacturer(db_session, name="Empty Maker")
+        red = await _create_color(db_session, name="Red", hex_code="#FF0000")
+        used_up = await _create_filament(db_session, manufacturer.id, designation="Used PLA")
+        stocked = await _create_filament(db_session, manufacturer.id, designation="Full PLA")
+        db_session.add_all(
+            [
+                FilamentColor(filament_id=used_up.id, color_id=red.id, position=1),
+                FilamentColor(filament_id=stocked.id, color_id=red.id, position=1),
+            ]
+        )
+        await db_session.commit()
+        empty = await _get_status(db_session, "empty")
+        await _create_spool(db_session, used_up.id, empty.id, remaining_weight_g=0.0)
+        await _create_spool(db_session, stocked.id, (await _get_status(db_session, "new")).id)
+
+        response = await client.get(
+            "/api/v1/filaments/similar-color",
+            params={"hex": "#FF0000", "in_stock": True},
+        )
+
+        assert response.status_code == 200
+        assert [m["filament"]["id"] for m in response.json()] == [stocked.id]
+
+    @pytest.mark.asyncio
+    async def test_index_follows_color_updates(self, auth_client, db_session):
+        client, csrf_token = auth_client
+
+        color = await _create_color(db_session, name="Shifting", hex_code="#000000")
+        await _create_color(db_session, name="White", hex_code="#FFFFFF")
+
+        response = await client.get("/api/v1/colors/similar", params={"hex": "#FFFFFF", "limit": 1})
+        assert response.json()[0]["color"]["name"] == "White"
+
+        response = await client.patch(
+            f"/api/v1/colors/{color.id}",
+            json={"hex_code": "#FEFEFE"},
+            headers={"X-CSRF-Token": csrf_token},
+        )
+        assert response.status_code == 200
+        response = await client.post(
+            "/api/v1/colors",
+            json={"name": "Snow", "hex_code": "#FFFFFE"},
+            headers={"X-CSRF-Token": csrf_token},
+        )
+        assert response.status_code == 201
+
+        response = await client.get("/api/v1/colors/similar", params={"hex": "#FEFEFE", "limit": 3})
+        data = response.json()
+        assert data[0]["color"]["name"] == "Shifting"
+        assert data[0]["delta_e"] == 0
+        assert {m["color"]["name"] for m in data} == {"Shifting", "Snow", "White"}
+
+    def test_index_matches_exhaustive_search(self):
+        import math
+        import random
+
+        from app.services.color_index import ColorIndex, hex_to_lab
+
+        rng = random.Random(7)
+        index = ColorIndex()
+        labs = {}
+        for color_id in range(2000):
+            hex_code = f"#{rng.randrange(1 << 24):06x}"
+            index.set(color_id, hex_code)
+            labs[color_id] = hex_to_lab(hex_code)
+        for color_id in range(0, 2000, 3):
+            index.discard(color_id)
+            del labs[color_id]
+
+        for hex_code in ("#000000", "#FFFFFF", "#7F3FA0", "#00FF00", "#123456"):
+            query = hex_to_lab(hex_code)
+            expected = sorted(math.dist(query, lab) for lab in labs.values())[:8]
+            found = [delta_e for _, delta_e in index.nearest(query, 8)]
+            assert found == pytest.approx(expected)
+
+
+class TestManufacturerLogos:
+    @pytest.fixture
+    def logo_dir(self, tmp_path, monkeypatch):
+        from app.services import logo_assets
+
+        monkeypatch.setattr(logo_assets, "MANUFACTURER_LOGO_DIR", tmp_path)
+        return tmp_path
+
+    @pytest.mark.asyncio
+    async def test_versioned_logo_is_immutable(self, auth_client, db_session, logo_dir):
+        from app.services.logo_assets import store_logo
+
+        client, _ = auth_client
+        manufacturer = await _create_manufacturer(db_session, name="Logo Maker")
+        manufacturer.logo_file = store_logo(manufacturer.id, "web", b"\x89PNG first")
+        await db_session.commit()
+
+        response = await client.get(f"/api/v1/manufacturers/{manufacturer.id}")
+        logo_url = response.json()["logo_url"]
+        assert "?v=" in logo_url and "size=thumb" in logo_url
+
+        response = await client.get(logo_url)
+        assert response.status_code == 200
+        assert response.content == b"\x89PNG first"
+        assert "immutable" in response.headers["cache-control"]
+        etag = response.headers["etag"]
+
+        response = await client.get(logo_url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        # Replacing the logo changes the URL; the old version falls back to
+        # the current file without immutable caching
+        manufacturer.logo_file = store_logo(manufacturer.id, "web", b"\x89PNG second")
+        await db_session.commit()
+        response = await client.get(f"/api/v1/manufacturers/{manufacturer.id}")
+        assert response.json()["logo_url"] != logo_url
+
+        response = await client.get(logo_url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.content == b"\x89PNG second"
+        assert "immutable" not in response.headers["cache-control"]
+
+    @pytest.mark.asyncio
+    async def test_legacy_logo_and_accel_redirect(self, auth_client, db_session, logo_dir, monkeypatch):
+        from app.core.config import settings
+
+        client, _ = auth_client
+        manufacturer = await _create_manufacturer(
+            db_session, name="Old Logo", label_logo_file="7_label.png"
+        )
+        (logo_dir / f"{manufacturer.id}_label.png").write_bytes(b"\x89PNG label")
+
+        response = await client.get(f"/api/v1/manufacturers/{manufacturer.id}")
+        assert response.json()["label_logo_url"] == f"/api/v1/manufacturers/{manufacturer.id}/label-logo"
+
+        response = await client.get(f"/api/v1/manufacturers/{manufacturer.id}/label-logo")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "public, max-age=86400"
+        etag = response.headers["etag"]
+        response = await client.get(
+            f"/api/v1/manufacturers/{manufacturer.id}/label-logo", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+        monkeypatch.setattr(settings, "logo_accel_redirect", "/_logos/")
+        response = await client.get(f"/api/v1/manufacturers/{manufacturer.id}/label-logo")
+        assert response.status_code == 200
+        assert response.headers["x-accel-redirect"] == f"/_logos/{manufacturer.id}_label.png"
+        assert response.content == b""
+
+        response = await client.get(f"/api/v1/manufacturers/{manufacturer.id}/logo")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_delete_manufacturer_removes_assets(self, auth_client, db_session, logo_dir):
+        from app.services.logo_assets import store_logo
+
+        client, csrf_token = auth_client
+        manufacturer = await _create_manufacturer(db_session, name="Gone")
+        manufacturer.logo_file = store_logo(manufacturer.id, "web", b"\x89PNG gone")
+        await db_session.commit()
+
+        response = await client.delete(
+            f"/api/v1/manufacturers/{manufacturer.id}",
+            headers={"X-CSRF-Token": csrf_token},
+        )
+
+        assert response.status_code == 204
+        assert not any(logo_dir.rglob("*.png"))
@@ -0,0 +1,190 @@
+import math
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.models import (
+    Filament,
+    FilamentForecast,
+    Manufacturer,
+    Spool,
+    SpoolForecast,
+    SpoolStatus,
+)
+from app.services import forecast_service
+from app.services.forecast_service import FORECAST_TAU_DAYS, ForecastService, decay_add
+from app.services.spool_service import SpoolService
+
+
+@pytest.fixture
+def published(monkeypatch) -> list[dict]:
+    events: list[dict] = []
+
+    async def publish(event):
+        events.append(event)
+
+    monkeypatch.setattr(forecast_service.event_bus, "publish", publish)
+    return events
+
+
+async def _create_spool(db_session, remaining: float, filament: Filament | None = None) -> Spool:
+    if filament is None:
+        mfr = Manufacturer(name=f"ForecastMfr-{datetime.now(timezone.utc).timestamp()}")
+        db_session.add(mfr)
+        await db_session.flush()
+        filament = Filament(
+            manufacturer_id=mfr.id,
+            designation="Forecast PLA",
+            material_type="PLA",
+            diameter_mm=1.75,
+            default_spool_weight_g=250.0,
+        )
+        db_session.add(filament)
+        await db_session.flush()
+
+    status = (
+        await db_session.execute(select(SpoolStatus).where(SpoolStatus.key == "opened"))
+    ).scalar_one()
+    spool = Spool(filament_id=filament.id, status_id=status.id, remaining_weight_g=remaining)
+    db_session.add(spool)
+    await db_session.commit()
+
+    result = await db_session.execute(
+        select(Spool)
+        .where(Spool.id == spool.id)
+        .options(selectinload(Spool.filament), selectinload(Spool.status))
+    )
+    return result.scalar_one()
+
+
+async def _consume_daily(db_session, spool: Spool, grams: float, days: int) -> None:
+    service = SpoolService(db_session)
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    for day in range(days):
+        await service.record_consumption(spool, grams, start + timedelta(days=day))
+
+
+def test_decay_add_weights_by_elapsed_time():
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    decayed, at = decay_add(100.0, t0, 10.0, t0 + timedelta(days=FORECAST_TAU_DAYS))
+    assert at == t0 + timedelta(days=FORECAST_TAU_DAYS)
+    assert decayed == pytest.approx(100.0 / math.e + 10.0)
+
+    # Back-dated consumption keeps the reference time and is discounted
+    decayed, at = decay_add(100.0, t0, 10.0, t0 - timedelta(days=FORECAST_TAU_DAYS))
+    assert at == t0
+    assert decayed == pytest.approx(100.0 + 10.0 / math.e)
+
+
+class TestForecastMaintenance:
+    @pytest.mark.asyncio
+    async def test_consumption_updates_spool_and_filament_rates(self, db_session, published):
+        spool = await _create_spool(db_session, remaining=5000.0)
+        await _consume_daily(db_session, spool, 50.0, days=30)
+
+        spool_forecast = await db_session.get(SpoolForecast, spool.id)
+        filament_forecast = await db_session.get(FilamentForecast, spool.filament_id)
+        # Geometric sum of 30 daily 50 g events decayed by exp(-1/tau) each day
+        expected = 50.0 * (1 - math.exp(-30 / FORECAST_TAU_DAYS)) / (
+            1 - math.exp(-1 / FORECAST_TAU_DAYS)
+        ) / FORECAST_TAU_DAYS
+        assert spool_forecast.rate_g_per_day == pytest.approx(expected)
+        assert filament_forecast.rate_g_per_day == pytest.approx(
+            spool_forecast.rate_g_per_day
+        )
+        assert published == []
+
+    @pytest.mark.asyncio
+    async def test_low_stock_event_is_published_once_on_crossing(self, db_session, published):
+        spool = await _create_spool(db_session, remaining=1200.0)
+        await _consume_daily(db_session, spool, 50.0, days=20)
+
+        spool_events = [e for e in published if e["event"] == "spool_low_stock"]
+        assert len(spool_events) == 1
+        assert spool_events[0]["spool_id"] == spool.id
+        assert spool_events[0]["days_until_empty"] <= forecast_service.LOW_STOCK_DAYS
+        assert [e["event"] for e in published].count("filament_low_stock") == 1
+
+        forecast = await db_session.get(SpoolForecast, spool.id)
+        assert forecast.low_stock is True
+
+    @pytest.mark.asyncio
+    async def test_rebuild_matches_incremental_rates(self, db_session, published):
+        spool = await _create_spool(db_session, remaining=5000.0)
+        await _consume_daily(db_session, spool, 20.0, days=10)
+        spool_id = spool.id
+        incremental = (await db_session.get(SpoolForecast, spool_id)).rate_g_per_day
+
+        stats = await ForecastService(db_session).rebuild()
+        db_session.expire_all()
+
+        assert stats == {"spools": 1, "filaments": 1}
+        rebuilt = await db_session.get(SpoolForecast, spool_id)
+        assert rebuilt.rate_g_per_day == pytest.approx(incremental)
+
+
+class TestForecastQueries:
+    @pytest.mark.asyncio
+    async def test_spool_and_filament_forecasts(self, auth_client, db_session, published):
+        client, _ = auth_client
+        fast = await _create_spool(db_session, remaining=3000.0)
+        slow = await _create_spool(db_session, remaining=3000.0)
+        second = await _create_spool(db_session, remaining=1000.0, filament=fast.filament)
+        await _consume_daily(db_session, fast, 100.0, days=5)
+        await _consume_daily(db_session, slow, 10.0, days=5)
+
+        response = await client.get("/api/v1/analytics/forecasts/spools")
+        assert response.status_code == 200
+        items = response.json()
+        assert [item["spool_id"] for item in items] == [fast.id, slow.id]
+        assert items[0]["days_until_empty"] < items[1]["days_until_empty"]
+        assert items[0]["reorder_by"] <= items[0]["empty_on"]
+
+        response = await client.get(
+            "/api/v1/analytics/forecasts/spools", params={"within_days": 100}
+        )
+        assert [item["spool_id"] for item in response.json()] == [fast.id]
+
+        response = await client.get("/api/v1/analytics/forecasts/filaments")
+        assert response.status_code == 200
+        by_filament = {item["filament_id"]: item for item in response.json()}
+        assert by_filament[fast.filament_id]["spool_count"] == 2
+        assert by_filament[fast.filament_id]["stock_g"] == pytest.approx(
+            2500.0 + second.remaining_weight_g
+        )
+
+    @pytest.mark.asyncio
+    async def test_idle_rates_decay_until_read(self, db_session, published):
+        idle = await _create_spool(db_session, remaining=3000.0)
+        active = await _create_spool(db_session, remaining=3000.0)
+        service = SpoolService(db_session)
+        await service.record_consumption(
+            idle, 100.0, datetime.now(timezone.utc) - timedelta(days=40)
+        )
+        await service.record_consumption(active, 100.0, datetime.now(timezone.utc))
+
+        items = await ForecastService(db_session).spool_forecasts()
+
+        assert [item["spool_id"] for item in items] == [active.id, idle.id]
+        stored = 100.0 / FORECAST_TAU_DAYS
+        assert items[0]["rate_g_per_day"] == pytest.approx(stored, abs=0.01)
+        assert items[1]["rate_g_per_day"] == pytest.approx(
+            stored * math.exp(-40 / FORECAST_TAU_DAYS), abs=0.01
+        )
+
+
+class TestLowStockOnStockChanges:
+    @pytest.mark.asyncio
+    async def test_measurement_dropping_stock_raises_low_stock(self, db_session, published):
+        spool = await _create_spool(db_session, remaining=5000.0)
+        await _consume_daily(db_session, spool, 50.0, days=5)
+        assert published == []
+
+        await SpoolService(db_session).record_measurement(
+            spool, 400.0, datetime.now(timezone.utc)
+        )
+
+        assert [e["event"] for e in published] == ["spool_low_stock", "filament_low_stock"]
+        assert published[0]["spool_id"] == spool.id
@@ -0,0 +1,118 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app.models import Filament, InventorySnapshot, Manufacturer, Spool, SpoolStatus
+from app.services.inventory_snapshot_service import (
+    DAILY_SNAPSHOT_DAYS,
+    InventorySnapshotService,
+)
+
+TODAY = date(2026, 6, 30)
+
+
+async def _create_spool(db_session, material_type: str, weight: float, price: float) -> Spool:
+    mfr = Manufacturer(name=f"SnapshotMfr-{material_type}")
+    db_session.add(mfr)
+    await db_session.flush()
+    filament = Filament(
+        manufacturer_id=mfr.id,
+        designation=f"Snapshot {material_type}",
+        material_type=material_type,
+        diameter_mm=1.75,
+    )
+    db_session.add(filament)
+    await db_session.flush()
+    status = (
+        await db_session.execute(select(SpoolStatus).where(SpoolStatus.key == "opened"))
+    ).scalar_one()
+    spool = Spool(
+        filament_id=filament.id,
+        status_id=status.id,
+        remaining_weight_g=weight,
+        purchase_price=price,
+    )
+    db_session.add(spool)
+    await db_session.commit()
+    return spool
+
+
+async def _snapshot_days(db_session) -> list[date]:
+    result = await db_session.execute(
+        select(InventorySnapshot.day).distinct().order_by(InventorySnapshot.day)
+    )
+    return list(result.scalars().all())
+
+
+class TestInventorySnapshots:
+    @pytest.mark.asyncio
+    async def test_snapshot_replaces_same_day(self, db_session):
+        spool = await _create_spool(db_session, "PLA", 800.0, 20.0)
+        service = InventorySnapshotService(db_session)
+        now = datetime(2026, 6, 30, 8, tzinfo=timezone.utc)
+        await service.run(now)
+
+        spool.remaining_weight_g = 600.0
+        await db_session.commit()
+        await service.run(now + timedelta(hours=1))
+
+        rows = (await db_session.execute(select(InventorySnapshot))).scalars().all()
+        assert [(r.day, r.material_type, r.spool_count, r.remaining_weight_g) for r in rows] == [
+            (TODAY, "PLA", 1, 600.0)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_old_snapshots_are_downsampled(self, db_session):
+        await _create_spool(db_session, "PLA", 800.0, 20.0)
+        service = InventorySnapshotService(db_session)
+        first = TODAY - timedelta(days=DAILY_SNAPSHOT_DAYS + 20)
+        for offset in range(21):
+            await service.take_snapshot(first + timedelta(days=offset))
+        await db_session.commit()
+
+        removed = await service.downsample(TODAY)
+        await db_session.commit()
+
+        days = await _snapshot_days(db_session)
+        cutoff = TODAY - timedelta(days=DAILY_SNAPSHOT_DAYS)
+        last_per_week: dict[tuple, date] = {}
+        for offset in range(20):
+            day = first + timedelta(days=offset)
+            last_per_week[day.isocalendar()[:2]] = day
+        # Old days: the last snapshot of each ISO week; recent ones stay daily
+        assert days == sorted(last_per_week.values()) + [cutoff]
+        assert removed == 21 - len(days)
+
+    @pytest.mark.asyncio
+    async def test_weekly_series_uses_last_snapshot(self, auth_client, db_session):
+        client, _ = auth_client
+        pla = await _create_spool(db_session, "PLA", 800.0, 20.0)
+        await _create_spool(db_session, "PETG", 500.0, 25.0)
+        service = InventorySnapshotService(db_session)
+        await service.take_snapshot(date(2026, 3, 2))
+        pla.remaining_weight_g = 300.0
+        await db_session.commit()
+        await service.take_snapshot(date(2026, 3, 4))
+        await db_session.commit()
+
+        response = await client.get(
+            "/api/v1/analytics/inventory",
+            params={
+                "start": "2026-03-01",
+                "end": "2026-03-31",
+                "bucket": "week",
+                "group_by": "material_type",
+            },
+        )
+
+        assert response.status_code == 200
+        assert [
+            (i["period"], i["day"], i["key"], i["remaining_weight_g"], i["value"])
+            for i in response.json()["items"]
+        ] == [
+            ("2026-03-02", "2026-03-04", "PETG", 500.0, 25.0),
+            ("2026-03-02", "2026-03-04", "PLA", 300.0, 20.0),
+        ]
+        count = await db_session.execute(select(func.count()).select_from(InventorySnapshot))
+        assert count.scalar() == 4
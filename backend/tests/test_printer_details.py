@@ -0,0 +1,125 @@
+import pytest
+from sqlalchemy import select
+
+from app.core.event_bus import event_bus
+from app.models import (
+    Color,
+    Filament,
+    FilamentColor,
+    Manufacturer,
+    Printer,
+    PrinterSlot,
+    PrinterSlotAssignment,
+    Spool,
+    SpoolStatus,
+)
+from app.services.printer_details import changed_event, printer_details
+
+
+async def _create_assigned_printer(db_session) -> tuple[Printer, Filament]:
+    mfr = Manufacturer(name="DetailMfr")
+    color = Color(name="Detail Red", hex_code="#FF0000")
+    db_session.add_all([mfr, color])
+    await db_session.flush()
+    filament = Filament(
+        manufacturer_id=mfr.id,
+        designation="Detail PLA",
+        material_type="PLA",
+        diameter_mm=1.75,
+    )
+    db_session.add(filament)
+    await db_session.flush()
+    db_session.add(FilamentColor(filament_id=filament.id, color_id=color.id))
+    status = (
+        await db_session.execute(select(SpoolStatus).where(SpoolStatus.key == "opened"))
+    ).scalar_one()
+    spool = Spool(filament_id=filament.id, status_id=status.id, remaining_weight_g=500.0)
+    printer = Printer(name="Detail Printer", driver_key="bambu_mqtt")
+    db_session.add_all([spool, printer])
+    await db_session.flush()
+    slot = PrinterSlot(printer_id=printer.id, slot_no=0, name="Tray 1")
+    db_session.add(slot)
+    await db_session.flush()
+    db_session.add(PrinterSlotAssignment(slot_id=slot.id, spool_id=spool.id, present=True))
+    await db_session.commit()
+    return printer, filament
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    calls: list[int] = []
+    load = printer_details._load
+
+    async def counting(printer_id: int):
+        calls.append(printer_id)
+        return await load(printer_id)
+
+    monkeypatch.setattr(printer_details, "_load", counting)
+    return calls
+
+
+class TestPrinterDetailCache:
+    @pytest.mark.asyncio
+    async def test_repeated_fetches_are_served_from_cache(
+        self, auth_client, db_session, loads
+    ):
+        client, _ = auth_client
+        printer, _ = await _create_assigned_printer(db_session)
+        url = f"/api/v1/printers/{printer.id}"
+
+        first = await client.get(url)
+        second = await client.get(url)
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assignment = first.json()["slots"][0]["assignment"]
+        assert assignment["spool_name"] == "DetailMfr Detail PLA"
+        assert assignment["color_hex"] == "#FF0000"
+        assert loads == [printer.id]
+
+        # The driver wrote new slot data
+        await event_bus.publish({"event": "slots_update", "printer_id": printer.id})
+        await client.get(url)
+        assert loads == [printer.id, printer.id]
+
+    @pytest.mark.asyncio
+    async def test_invalidated_by_edits_of_shown_rows_only(
+        self, auth_client, db_session, loads
+    ):
+        client, csrf_token = auth_client
+        printer, filament = await _create_assigned_printer(db_session)
+        url = f"/api/v1/printers/{printer.id}"
+        await client.get(url)
+
+        other = Filament(
+            manufacturer_id=filament.manufacturer_id,
+            designation="Unassigned PETG",
+            material_type="PETG",
+            diameter_mm=1.75,
+        )
+        db_session.add(other)
+        await db_session.commit()
+        other.designation = "Still unassigned"
+        await db_session.commit()
+        await client.get(url)
+        assert len(loads) == 1
+
+        response = await client.patch(
+            f"/api/v1/filaments/{filament.id}",
+            json={"designation": "Renamed PLA"},
+            headers={"X-CSRF-Token": csrf_token},
+        )
+        assert response.status_code == 200
+
+        detail = (await client.get(url)).json()
+        assert detail["slots"][0]["assignment"]["filament_name"] == "Renamed PLA"
+        assert len(loads) == 2
+
+    def test_large_changes_invalidate_everything(self):
+        assert changed_event({"spools": {1, 2}, "colors": set()}) == {
+            "event": "printer_details_changed",
+            "spools": [1, 2],
+        }
+        assert changed_event({"spools": set(range(1000))}) == {
+            "event": "printer_details_changed"
+        }
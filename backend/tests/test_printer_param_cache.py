@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import select
+
+from app.models import Filament, Manufacturer, Printer, Spool, SpoolStatus
+from app.models.printer_params import FilamentPrinterParam, SpoolPrinterParam
+from app.plugins.manager import PluginManager
+from app.services.printer_param_cache import printer_param_cache
+
+
+async def _create_spool_with_params(db_session) -> tuple[Spool, Printer, Printer]:
+    mfr = Manufacturer(name="ParamMfr")
+    db_session.add(mfr)
+    await db_session.flush()
+    filament = Filament(
+        manufacturer_id=mfr.id,
+        designation="Param PLA",
+        material_type="PLA",
+        diameter_mm=1.75,
+    )
+    db_session.add(filament)
+    await db_session.flush()
+    status = (
+        await db_session.execute(select(SpoolStatus).where(SpoolStatus.key == "opened"))
+    ).scalar_one()
+    spool = Spool(filament_id=filament.id, status_id=status.id, remaining_weight_g=500.0)
+    first = Printer(name="Param Printer 1", driver_key="bambu_mqtt")
+    second = Printer(name="Param Printer 2", driver_key="bambu_mqtt")
+    db_session.add_all([spool, first, second])
+    await db_session.flush()
+    db_session.add_all(
+        [
+            FilamentPrinterParam(
+                filament_id=filament.id, printer_id=pid, param_key=key, param_value=value
+            )
+            for pid in (first.id, second.id)
+            for key, value in (("tray_info_idx", "GFA00"), ("k_value", "0.02"))
+        ]
+    )
+    db_session.add(
+        SpoolPrinterParam(
+            spool_id=spool.id, printer_id=first.id, param_key="k_value", param_value="0.03"
+        )
+    )
+    await db_session.commit()
+    return spool, first, second
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    calls: list[tuple[int, list[int]]] = []
+    load = printer_param_cache._load
+
+    async def counting(spool_id: int, printer_ids: list[int]):
+        calls.append((spool_id, printer_ids))
+        return await load(spool_id, printer_ids)
+
+    monkeypatch.setattr(printer_param_cache, "_load", counting)
+    return calls
+
+
+class TestPrinterParamCache:
+    @pytest.mark.asyncio
+    async def test_prefetch_resolves_all_printers_at_once(self, client, db_session, loads):
+        spool, first, second = await _create_spool_with_params(db_session)
+        manager = PluginManager()
+
+        await manager.prefetch_filament_params(spool.id, [first.id, second.id])
+        enriched = [
+            await manager.enrich_filament_data(spool.id, pid, {"color": "FF0000"})
+            for pid in (first.id, second.id)
+        ]
+
+        # Spool-level params override the filament-level ones
+        assert enriched == [
+            {"color": "FF0000", "tray_info_idx": "GFA00", "k_value": "0.03", "id": spool.id},
+            {"color": "FF0000", "tray_info_idx": "GFA00", "k_value": "0.02", "id": spool.id},
+        ]
+        assert loads == [(spool.id, [first.id, second.id])]
+
+        # Unknown spool: data unchanged
+        assert await manager.enrich_filament_data(999999, first.id, {"a": 1}) == {"a": 1}
+
+    @pytest.mark.asyncio
+    async def test_param_endpoints_invalidate(self, auth_client, db_session, loads):
+        client, csrf_token = auth_client
+        spool, first, second = await _create_spool_with_params(db_session)
+        manager = PluginManager()
+        await manager.prefetch_filament_params(spool.id, [first.id, second.id])
+
+        response = await client.put(
+            f"/api/v1/spools/{spool.id}/printer-params/{second.id}",
+            json={"params": [{"param_key": "k_value", "param_value": "0.05"}]},
+            headers={"X-CSRF-Token": csrf_token},
+        )
+        assert response.status_code == 200
+
+        first_data = await manager.enrich_filament_data(spool.id, first.id, {})
+        second_data = await manager.enrich_filament_data(spool.id, second.id, {})
+        assert first_data["k_value"] == "0.03"
+        assert second_data["k_value"] == "0.05"
+        # Only the entry of the changed printer was reloaded
+        assert loads == [(spool.id, [first.id, second.id]), (spool.id, [second.id])]
@@ -1,4 +1,5 @@
 import pytest
+import pytest_asyncio
 from sqlalchemy import event
 from sqlalchemy.orm.attributes import set_committed_value
 from unittest.mock import AsyncMock, patch
@@ -71,15 +72,22 @@ class TestPrinterCRUD:
         assert {"Printer A", "Printer B"}.issubset(names)
 
     @pytest.mark.asyncio
-    async def test_create_printer(self, auth_client, db_session):
+    async def test_create_printer(self, auth_client, db_session, mock_plugin_manager):
+        from app.core.event_bus import event_bus
+
         client, csrf_token = auth_client
         location = await _create_location(db_session)
-
-        response = await client.post(
-            "/api/v1/printers",
-            json={"name": "My Printer", "driver_key": "bambu_mqtt", "location_id": location.id},
-            headers={"X-CSRF-Token": csrf_token},
-        )
+        published: list[dict] = []
+        event_bus.add_listener(published.append)
+
+        try:
+            response = await client.post(
+                "/api/v1/printers",
+                json={"name": "My Printer", "driver_key": "bambu_mqtt", "location_id": location.id},
+                headers={"X-CSRF-Token": csrf_token},
+            )
+        finally:
+            event_bus.remove_listener(published.append)
 
         assert response.status_code == 201
         data = response.json()
@@ -87,6 +95,9 @@ class TestPrinterCRUD:
         assert data["driver_key"] == "bambu_mqtt"
         assert data["is_active"] is True
         assert data["location_id"] == location.id
+        # Only the process owning the drivers starts them, on printer_changed
+        mock_plugin_manager.start_printer.assert_not_called()
+        assert {"event": "printer_changed", "printer_id": data["id"]} in published
 
     @pytest.mark.asyncio
     async def test_create_printer_with_invalid_location(self, auth_client):
@@ -226,3 +237,421 @@ class TestPrinterSlots:
 
         assert response.status_code == 200
         assert response.json() == []
+
+
+class TestSlotsUpdateHandler:
+    @pytest.fixture
+    def manager(self, db_session, monkeypatch):
+        from app.plugins import manager as manager_module
+
+        class _SessionContext:
+            async def __aenter__(self):
+                return db_session
+
+            async def __aexit__(self, *args):
+                pass
+
+        monkeypatch.setattr(manager_module, "async_session_maker", lambda: _SessionContext())
+        publish = AsyncMock()
+        monkeypatch.setattr(manager_module.event_bus, "publish", publish)
+        return manager_module.PluginManager(), publish
+
+    @staticmethod
+    def _report(present: bool = True) -> list[dict]:
+        return [
+            {
+                "slot_index": "0-0",
+                "slot_name": "AMS 1 Tray 1",
+                "present": present,
+                "tray_type": "PLA",
+            },
+            {"slot_index": "0-1", "slot_name": "AMS 1 Tray 2", "present": False},
+        ]
+
+    @staticmethod
+    async def _assignments(db_session, printer_id: int) -> list[tuple]:
+        from sqlalchemy import select
+
+        from app.models import PrinterSlotAssignment
+
+        result = await db_session.execute(
+            select(PrinterSlot.slot_no, PrinterSlotAssignment.present, PrinterSlotAssignment.meta)
+            .join(PrinterSlotAssignment, PrinterSlotAssignment.slot_id == PrinterSlot.id)
+            .where(PrinterSlot.printer_id == printer_id)
+            .order_by(PrinterSlot.slot_no)
+        )
+        return [tuple(row) for row in result.all()]
+
+    @pytest.mark.asyncio
+    async def test_unchanged_reports_are_not_written(self, db_session, manager):
+        plugin_manager, publish = manager
+        printer = await _create_printer(db_session)
+
+        await plugin_manager._handle_slots_update(printer.id, self._report())
+        assert await self._assignments(db_session, printer.id) == [
+            (0, True, {"tray_type": "PLA"}),
+            (1, False, {}),
+        ]
+        assert publish.await_count == 1
+
+        # Same report: remembered state, no publish
+        await plugin_manager._handle_slots_update(printer.id, self._report())
+        # Same report after a restart: diffed against the DB, nothing written
+        plugin_manager.forget_slot_state(printer.id)
+        await plugin_manager._handle_slots_update(printer.id, self._report())
+        assert publish.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_changed_slot_is_updated_and_published(self, db_session, manager):
+        plugin_manager, publish = manager
+        printer = await _create_printer(db_session)
+        await plugin_manager._handle_slots_update(printer.id, self._report())
+
+        await plugin_manager._handle_slots_update(
+            printer.id, self._report(present=False), {"units": 1}
+        )
+
+        assert await self._assignments(db_session, printer.id) == [
+            (0, False, {"tray_type": "PLA"}),
+            (1, False, {}),
+        ]
+        await db_session.refresh(printer)
+        assert printer.custom_fields["slot_summary"] == {"units": 1}
+        assert [call.args[0]["event"] for call in publish.await_args_list] == [
+            "slots_update",
+            "slots_update",
+            "printer_update",
+        ]
+
+
+class TestPrinterEventQueue:
+    @staticmethod
+    def _recording_handler(handled: list, gate: "asyncio.Event | None" = None):
+        async def handler(event: dict) -> None:
+            handled.append(event["n"])
+            if gate is not None:
+                await gate.wait()
+
+        return handler
+
+    @pytest.mark.asyncio
+    async def test_ordered_with_latest_wins_snapshots(self):
+        import asyncio
+
+        from app.plugins.event_queue import PrinterEventQueue
+
+        handled: list[int] = []
+        gate = asyncio.Event()
+        queue = PrinterEventQueue(1, self._recording_handler(handled, gate))
+        queue.put({"event_type": "slots_update", "n": 1})
+        await asyncio.sleep(0)
+        for n in (2, 3):
+            queue.put({"event_type": "slots_update", "n": n})
+        queue.put({"event_type": "print_started", "n": 4})
+        queue.put({"event_type": "slots_update", "n": 5})
+        gate.set()
+        await queue.close()
+
+        assert handled == [1, 5, 4]
+        stats = queue.stats()
+        assert (stats["received"], stats["handled"], stats["coalesced"]) == (5, 3, 2)
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_and_close_drains(self):
+        import asyncio
+        import threading
+
+        from app.plugins.event_queue import PrinterEventQueue
+
+        handled: list[int] = []
+        gate = asyncio.Event()
+        queue = PrinterEventQueue(1, self._recording_handler(handled, gate), max_size=2)
+        queue.put({"event_type": "a", "n": 1})
+        await asyncio.sleep(0)
+        for n in (2, 3, 4):
+            queue.put({"event_type": "a", "n": n})
+        # Events from driver threads are handed over to the loop
+        thread = threading.Thread(target=queue.put, args=({"event_type": "a", "n": 5},))
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0)
+        gate.set()
+        await queue.close()
+        queue.put({"event_type": "a", "n": 6})
+        await asyncio.sleep(0)
+
+        assert handled == [1, 2, 3]
+        assert queue.stats()["dropped"] == 2
+        assert queue.stats()["max_depth"] == 2
+
+
+def _fake_driver_manager(db_session, monkeypatch):
+    """PluginManager on the test session whose drivers are all FakeDriver."""
+    from app.plugins import manager as manager_module
+    from app.plugins.base import BaseDriver
+
+    class FakeDriver(BaseDriver):
+        driver_key = "fake"
+        fail_start = False
+
+        async def start(self) -> None:
+            if self.fail_start:
+                raise ConnectionError("printer offline")
+            self._running = True
+
+        async def stop(self) -> None:
+            self._running = False
+
+        async def set_light(self, on: bool) -> dict:
+            return {"light": on}
+
+    class _SessionContext:
+        async def __aenter__(self):
+            return db_session
+
+        async def __aexit__(self, *args):
+            pass
+
+    monkeypatch.setattr(manager_module, "async_session_maker", lambda: _SessionContext())
+    monkeypatch.setattr(manager_module.event_bus, "publish", AsyncMock())
+    manager = manager_module.PluginManager()
+    monkeypatch.setattr(manager, "load_driver", lambda driver_key: FakeDriver)
+    manager.driver_class = FakeDriver
+    return manager
+
+
+class TestDriverHost:
+    @pytest.fixture
+    def host(self, db_session, monkeypatch):
+        import os
+        import tempfile
+
+        from app.plugins.driver_host import DriverHostServer
+
+        manager = _fake_driver_manager(db_session, monkeypatch)
+        # Unix socket paths are limited to ~100 characters
+        path = os.path.join(tempfile.mkdtemp(), "host.sock")
+        return DriverHostServer(manager, path)
+
+    @pytest.fixture
+    def worker(self, host):
+        from app.core.event_bus import event_bus
+        from app.plugins.host_client import DriverHostClient
+        from app.plugins.manager import PluginManager
+
+        manager = PluginManager()
+        manager.use_host(DriverHostClient(host.path))
+        yield manager
+        event_bus.remove_listener(manager._on_host_event)
+
+    @pytest.mark.asyncio
+    async def test_worker_runs_driver_through_host(self, host, worker):
+        await host.start()
+        try:
+            printer = Printer(id=7, name="Remote", driver_key="fake", driver_config={})
+            assert await worker.start_printer(printer) is True
+            assert list(host.manager.drivers) == [7]
+
+            driver = worker.drivers[7]
+            assert driver.driver_key == "fake"
+            assert driver.health()["running"] is True
+            assert await driver.set_light(on=True) == {"light": True}
+            with pytest.raises(TypeError):
+                await driver.set_light(colour="red")
+            assert not hasattr(driver, "_running")
+            assert not hasattr(driver, "assign_pending_spool")
+            health = await worker.printer_health(7)
+            assert health["event_queue"]["depth"] == 0
+
+            await worker.stop_printer(7)
+            assert host.manager.drivers == {}
+            assert worker.drivers == {}
+            assert await worker.printer_health(7) is None
+        finally:
+            await host.close()
+
+    @pytest.mark.asyncio
+    async def test_unreachable_host(self, worker):
+        printer = Printer(id=8, name="Offline", driver_key="fake", driver_config={})
+
+        assert await worker.start_printer(printer) is False
+        assert worker.health_status[8]["status"] == "error"
+        assert await worker.printer_health(8) is None
+        assert await worker.get_health() == {}
+
+
+class TestDriverSupervision:
+    @pytest_asyncio.fixture
+    async def manager(self, db_session, monkeypatch):
+        manager = _fake_driver_manager(db_session, monkeypatch)
+        manager.enable_supervision()
+        yield manager
+        manager.disable_supervision()
+
+    @staticmethod
+    async def _settle(manager) -> None:
+        """Let the liveness callback run and wait for the restart it scheduled."""
+        import asyncio
+
+        await asyncio.sleep(0)
+        tasks = list(manager._restarts.values())
+        if tasks:
+            await asyncio.wait(tasks, timeout=5)
+
+    @pytest.mark.asyncio
+    async def test_dead_driver_restarts_with_backoff(self, db_session, manager):
+        printer = await _create_printer(db_session, driver_key="fake")
+        assert await manager.start_printer(printer) is True
+        first = manager.drivers[printer.id]
+
+        first._running = False  # driver died on its own
+        await self._settle(manager)
+        second = manager.drivers[printer.id]
+        assert second is not first and second._running
+        assert manager._backoff[printer.id] == 1.0
+
+        manager.driver_class.fail_start = True
+        second._running = False
+        await self._settle(manager)
+        # Restart failed: the next attempt waits longer
+        assert printer.id not in manager.drivers
+        assert manager._backoff[printer.id] == 4.0
+        assert printer.id in manager._restarts
+
+        # An explicit stop cancels the pending restart
+        await manager.stop_printer(printer.id)
+        assert manager._restarts == {}
+
+    @pytest.mark.asyncio
+    async def test_stop_is_not_a_crash(self, db_session, manager):
+        printer = await _create_printer(db_session, driver_key="fake")
+        await manager.start_printer(printer)
+
+        await manager.stop_printer(printer.id)
+        await self._settle(manager)
+
+        assert manager.drivers == {}
+        assert manager._restarts == {}
+
+    @pytest.mark.asyncio
+    async def test_reconcile_applies_printer_changes(self, db_session, manager):
+        printer = await _create_printer(db_session, driver_key="fake", driver_config={"ip": "a"})
+
+        await manager.reconcile_printer(printer.id)
+        first = manager.drivers[printer.id]
+        await manager.reconcile_printer(printer.id)
+        assert manager.drivers[printer.id] is first
+
+        printer.driver_config = {"ip": "b"}
+        await db_session.commit()
+        await manager.reconcile_printer(printer.id)
+        assert manager.drivers[printer.id].config == {"ip": "b"}
+
+        printer.is_active = False
+        await db_session.commit()
+        await manager.reconcile_printer(printer.id)
+        assert manager.drivers == {}
+
+
+class TestDriverDebugConsole:
+    @pytest_asyncio.fixture
+    async def manager(self, db_session, monkeypatch):
+        from app.plugins import manager as manager_module
+
+        monkeypatch.setattr(manager_module.settings, "driver_debug_max_payload", 20)
+        manager = _fake_driver_manager(db_session, monkeypatch)
+        manager.enable_supervision()
+        yield manager
+        manager.disable_supervision()
+
+    @pytest.mark.asyncio
+    async def test_lease_streams_sequenced_entries(self, db_session, manager):
+        import asyncio
+
+        from app.core.event_bus import event_bus
+
+        printer = await _create_printer(db_session, driver_key="fake")
+        await manager.start_printer(printer)
+        driver = manager.drivers[printer.id]
+        streamed: list[dict] = []
+
+        def on_event(event: dict) -> None:
+            if event.get("event") == "driver_debug":
+                streamed.append(event)
+
+        def lease(active: bool) -> None:
+            event_bus.publish_nowait(
+                {
+                    "event": "driver_debug_lease",
+                    "printer_id": printer.id,
+                    "subscriber": "console-1",
+                    "active": active,
+                }
+            )
+
+        event_bus.add_listener(on_event)
+        try:
+            lease(True)
+            driver.log_debug("in", "report", {"temp": 215})
+            driver.log_debug("out", "command", "x" * 50)
+            await asyncio.sleep(0)
+        finally:
+            event_bus.remove_listener(on_event)
+
+        first, second = driver.get_debug_log()
+        assert second["seq"] > first["seq"]
+        assert first["payload"] == {"temp": 215} and "truncated" not in first
+        assert second["payload"] == "x" * 20 and second["truncated"] == 50
+        assert driver.get_debug_log(since_seq=first["seq"]) == [second]
+        assert [e["entry"] for e in streamed] == [first, second]
+        assert all(e["printer_id"] == printer.id for e in streamed)
+
+        # Last console gone: logging stops and the buffer is cleared
+        lease(False)
+        driver.log_debug("in", "report", {})
+        assert driver.get_debug_log() == []
+
+    @pytest.mark.asyncio
+    async def test_streamed_entries_fit_a_relay_slot(self, db_session, manager):
+        import asyncio
+        import json
+
+        from app.core.event_bus import event_bus
+        from app.core.shared_events import MAX_PAYLOAD
+
+        printer = await _create_printer(db_session, driver_key="fake")
+        await manager.start_printer(printer)
+        driver = manager.drivers[printer.id]
+        driver.debug_max_payload = 2000
+        streamed: list[dict] = []
+
+        def on_event(event: dict) -> None:
+            if event.get("event") == "driver_debug":
+                streamed.append(event)
+
+        event_bus.add_listener(on_event)
+        try:
+            event_bus.publish_nowait(
+                {
+                    "event": "driver_debug_lease",
+                    "printer_id": printer.id,
+                    "subscriber": "console-1",
+                    "active": True,
+                }
+            )
+            # Each character encodes to 2 resp. 6 bytes
+            driver.log_debug("in", "report", '"' * 2000)
+            driver.log_debug("in", "report", "\u00fc" * 1000)
+            await asyncio.sleep(0)
+        finally:
+            event_bus.remove_listener(on_event)
+
+        assert len(streamed) == 2
+        for event, char in zip(streamed, '"\u00fc'):
+            assert len(json.dumps(event).encode()) <= MAX_PAYLOAD
+            entry = event["entry"]
+            assert entry["payload"] and set(entry["payload"]) == {char}
+        assert streamed[0]["entry"]["truncated"] == 2000
+        assert streamed[1]["entry"]["truncated"] == 1000
+        # The local buffer keeps the entries as logged
+        assert driver.get_debug_log()[0]["payload"] == '"' * 2000
@@ -5,7 +5,15 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.core.security import Principal
-from app.models import Filament, Location, Manufacturer, Spool, SpoolEvent, SpoolStatus
+from app.models import (
+    Filament,
+    Location,
+    Manufacturer,
+    Spool,
+    SpoolEvent,
+    SpoolStatus,
+    SpoolWeightCheckpoint,
+)
 from app.services.spool_service import (
     SpoolService,
     CONSUMPTION_AGGREGATION_WINDOW_MINUTES,
@@ -117,6 +125,24 @@ class TestSpoolServiceGetByIdentifier:
         assert result is not None
         assert result.id == spool.id
 
+    @pytest.mark.asyncio
+    async def test_rfid_uid_is_stored_lowercase(self, db_session):
+        spool = await _create_test_spool(db_session, rfid_uid=" ABC:12 ")
+
+        assert spool.rfid_uid == "abc:12"
+
+    @pytest.mark.asyncio
+    async def test_lookup_follows_retagging(self, db_session):
+        service = SpoolService(db_session)
+        spool = await _create_test_spool(db_session, rfid_uid="OLD-TAG")
+
+        spool.rfid_uid = "NEW-TAG"
+        await db_session.commit()
+
+        assert await service.get_spool_by_identifier("old-tag", None) is None
+        result = await service.get_spool_by_identifier("new-tag", None)
+        assert result is not None and result.id == spool.id
+
     @pytest.mark.asyncio
     async def test_get_by_external_id(self, db_session):
         service = SpoolService(db_session)
@@ -681,3 +707,250 @@ class TestSpoolServiceRebuildRemainingWeight:
         refreshed = await service.get_spool(spool.id)
         assert refreshed is not None
         assert refreshed.remaining_weight_g is None
+
+
+async def _add_events(db_session, spool: Spool, events: list[dict]) -> None:
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i, data in enumerate(events):
+        db_session.add(
+            SpoolEvent(spool_id=spool.id, event_at=base + timedelta(hours=i), **data)
+        )
+    await db_session.commit()
+
+
+class TestSpoolServiceRebuildAllRemainingWeights:
+    @pytest.mark.asyncio
+    async def test_bulk_matches_per_spool_rebuild(self, db_session):
+        service = SpoolService(db_session)
+        histories = [
+            # Measurement, consumption, relative adjustment
+            [
+                {"event_type": "measurement", "measured_weight_g": 900.0},
+                {"event_type": "print_consumption", "delta_weight_g": -120.5},
+                {
+                    "event_type": "manual_adjust",
+                    "delta_weight_g": 20.0,
+                    "meta": {"adjustment_type": "relative"},
+                },
+            ],
+            # Clamp to zero in the middle, then consumption continues from zero
+            [
+                {"event_type": "measurement", "measured_weight_g": 300.0},
+                {"event_type": "print_consumption", "delta_weight_g": -200.0},
+                {
+                    "event_type": "manual_adjust",
+                    "delta_weight_g": 75.0,
+                    "meta": {"adjustment_type": "relative"},
+                },
+                {"event_type": "print_consumption", "delta_weight_g": -25.0},
+            ],
+            # Absolute adjustment resets the running total
+            [
+                {"event_type": "print_consumption", "delta_weight_g": -400.0},
+                {
+                    "event_type": "manual_adjust",
+                    "measured_weight_g": 700.0,
+                    "meta": {"adjustment_type": "absolute"},
+                },
+                {"event_type": "print_consumption", "delta_weight_g": -100.0},
+                {"event_type": "opened"},
+            ],
+            # Consumption only, starting from initial weight
+            [
+                {"event_type": "print_consumption", "delta_weight_g": -30.0},
+                {
+                    "event_type": "manual_adjust",
+                    "delta_weight_g": 10.0,
+                    "meta": {"adjustment_type": "tara_change"},
+                },
+            ],
+        ]
+
+        spools = []
+        for history in histories:
+            spool = await _create_test_spool(
+                db_session,
+                remaining_weight_g=1.0,
+                initial_total_weight_g=1250.0,
+                empty_spool_weight_g=250.0,
+                status_key="opened",
+            )
+            await _add_events(db_session, spool, history)
+            spools.append(spool)
+
+        counts = await service.rebuild_all_remaining_weights()
+
+        assert counts["spools"] == len(histories)
+        assert counts["blocked"] == 0
+        bulk = {}
+        for spool in spools:
+            await db_session.refresh(spool)
+            bulk[spool.id] = spool.remaining_weight_g
+
+        assert bulk[spools[0].id] == 549.5
+        assert bulk[spools[1].id] == 50.0
+        assert bulk[spools[2].id] == 350.0
+        assert bulk[spools[3].id] == 970.0
+
+        for spool in spools:
+            reloaded = await service.get_spool(spool.id)
+            assert await service.rebuild_remaining_weight(reloaded) == bulk[spool.id]
+
+    @pytest.mark.asyncio
+    async def test_bulk_marks_zero_spools_empty(self, db_session):
+        service = SpoolService(db_session)
+        spool = await _create_test_spool(
+            db_session, empty_spool_weight_g=250.0, status_key="opened"
+        )
+        await _add_events(
+            db_session,
+            spool,
+            [
+                {"event_type": "measurement", "measured_weight_g": 300.0},
+                {"event_type": "print_consumption", "delta_weight_g": -80.0},
+            ],
+        )
+
+        counts = await service.rebuild_all_remaining_weights(spool_ids=[spool.id])
+
+        assert counts == {"spools": 1, "updated": 1, "emptied": 1, "blocked": 0}
+        await db_session.refresh(spool)
+        empty_status = await _get_status(db_session, "empty")
+        assert spool.remaining_weight_g == 0
+        assert spool.status_id == empty_status.id
+        result = await db_session.execute(
+            select(SpoolEvent).where(
+                SpoolEvent.spool_id == spool.id, SpoolEvent.event_type == "empty"
+            )
+        )
+        assert result.scalar_one().meta["source"] == "rebuild"
+
+    @pytest.mark.asyncio
+    async def test_bulk_tara_missing_delegates_to_per_spool(self, db_session):
+        service = SpoolService(db_session)
+        spool = await _create_test_spool(
+            db_session,
+            remaining_weight_g=500.0,
+            empty_spool_weight_g=None,
+            filament_default_spool_weight_g=None,
+            status_key="opened",
+        )
+        await _add_events(
+            db_session,
+            spool,
+            [{"event_type": "measurement", "measured_weight_g": 800.0}],
+        )
+
+        counts = await service.rebuild_all_remaining_weights(spool_ids=[spool.id])
+
+        assert counts["blocked"] == 1
+        await db_session.refresh(spool)
+        assert spool.remaining_weight_g is None
+        result = await db_session.execute(
+            select(SpoolEvent).where(
+                SpoolEvent.spool_id == spool.id,
+                SpoolEvent.event_type == "manual_adjust",
+            )
+        )
+        warning = result.scalar_one()
+        assert warning.meta["warning"] == "tara_missing"
+        assert warning.meta["last_plausible_remaining_g"] == 500.0
+
+
+class TestSpoolServiceWeightCheckpoints:
+    @pytest.fixture(autouse=True)
+    def _small_interval(self, monkeypatch):
+        monkeypatch.setattr(
+            "app.services.spool_service.WEIGHT_CHECKPOINT_INTERVAL", 3
+        )
+
+    async def _spool_with_history(self, db_session) -> Spool:
+        spool = await _create_test_spool(
+            db_session,
+            initial_total_weight_g=1250.0,
+            empty_spool_weight_g=250.0,
+            status_key="opened",
+        )
+        await _add_events(
+            db_session,
+            spool,
+            [{"event_type": "print_consumption", "delta_weight_g": -10.0}] * 7,
+        )
+        return spool
+
+    async def _checkpoints(self, db_session, spool: Spool) -> list[SpoolWeightCheckpoint]:
+        result = await db_session.execute(
+            select(SpoolWeightCheckpoint)
+            .where(SpoolWeightCheckpoint.spool_id == spool.id)
+            .order_by(SpoolWeightCheckpoint.event_at)
+        )
+        return list(result.scalars().all())
+
+    @pytest.mark.asyncio
+    async def test_rebuild_creates_and_resumes_from_checkpoint(self, db_session):
+        service = SpoolService(db_session)
+        spool = await self._spool_with_history(db_session)
+
+        assert await service.rebuild_remaining_weight(spool) == 930.0
+        checkpoints = await self._checkpoints(db_session, spool)
+        assert [c.remaining_weight_g for c in checkpoints] == [970.0, 940.0]
+
+        # A corrupted checkpoint proves the second rebuild starts from it
+        checkpoints[-1].remaining_weight_g = 500.0
+        await db_session.commit()
+        assert await service.rebuild_remaining_weight(spool) == 490.0
+
+    @pytest.mark.asyncio
+    async def test_backdated_event_invalidates_later_checkpoints(self, db_session):
+        service = SpoolService(db_session)
+        spool = await self._spool_with_history(db_session)
+        await service.rebuild_remaining_weight(spool)
+
+        db_session.add(
+            SpoolEvent(
+                spool_id=spool.id,
+                event_type="print_consumption",
+                event_at=datetime(2026, 1, 1, 4, 30, tzinfo=timezone.utc),
+                delta_weight_g=-100.0,
+            )
+        )
+        await db_session.commit()
+
+        checkpoints = await self._checkpoints(db_session, spool)
+        assert [c.remaining_weight_g for c in checkpoints] == [970.0]
+        assert await service.rebuild_remaining_weight(spool) == 830.0
+
+    @pytest.mark.asyncio
+    async def test_edited_event_invalidates_checkpoints(self, db_session):
+        service = SpoolService(db_session)
+        spool = await self._spool_with_history(db_session)
+        await service.rebuild_remaining_weight(spool)
+
+        result = await db_session.execute(
+            select(SpoolEvent)
+            .where(SpoolEvent.spool_id == spool.id)
+            .order_by(SpoolEvent.event_at)
+        )
+        first_event = result.scalars().first()
+        first_event.delta_weight_g = -60.0
+        await db_session.commit()
+
+        assert await self._checkpoints(db_session, spool) == []
+        assert await service.rebuild_remaining_weight(spool) == 880.0
+
+    @pytest.mark.asyncio
+    async def test_tara_change_ignores_stale_checkpoints(self, db_session):
+        service = SpoolService(db_session)
+        spool = await self._spool_with_history(db_session)
+        await _add_events(
+            db_session,
+            spool,
+            [{"event_type": "measurement", "measured_weight_g": 1000.0}],
+        )
+        await service.rebuild_remaining_weight(spool)
+
+        spool.empty_spool_weight_g = 200.0
+        await db_session.commit()
+
+        # Full replay: the measurement now nets 800 g before six consumptions
+        assert await service.rebuild_remaining_weight(spool) == 740.0
@@ -694,6 +694,40 @@ class TestSpoolBulkOperations:
         assert all(item["rfid_uid"] is None for item in data)
         assert all(item["external_id"] is None for item in data)
 
+    @pytest.mark.asyncio
+    async def test_bulk_create_response_matches_stored_spools(self, auth_client, db_session):
+        client, csrf_token = auth_client
+
+        manufacturer = await _create_manufacturer(db_session)
+        filament = await _create_filament(db_session, manufacturer.id)
+        existing = await _create_spool(
+            db_session, filament.id, (await _get_status(db_session, "new")).id
+        )
+
+        response = await client.post(
+            "/api/v1/spools/bulk",
+            json={
+                "filament_id": filament.id,
+                "quantity": 2,
+                "initial_total_weight_g": 1250.0,
+                "lot_number": "LOT-42",
+            },
+            headers={"X-CSRF-Token": csrf_token},
+        )
+
+        assert response.status_code == 201
+        created = response.json()
+        assert existing.id not in [item["id"] for item in created]
+        for item in created:
+            stored = (await client.get(f"/api/v1/spools/{item['id']}")).json()
+            assert stored["remaining_weight_g"] == item["remaining_weight_g"] == 1000.0
+            assert stored["lot_number"] == item["lot_number"] == "LOT-42"
+            assert stored["filament"]["id"] == item["filament"]["id"] == filament.id
+            assert (
+                stored["filament"]["manufacturer"]["name"]
+                == item["filament"]["manufacturer"]["name"]
+            )
+
     @pytest.mark.asyncio
     async def test_bulk_update_spools(self, auth_client, db_session):
         client, csrf_token = auth_client
@@ -776,6 +810,29 @@ class TestSpoolBulkOperations:
         result = await db_session.execute(select(Spool).where(Spool.id.in_([spool_one.id, spool_two.id])))
         assert result.scalars().all() == []
 
+    @pytest.mark.asyncio
+    async def test_rebuild_remaining_weights(self, auth_client, db_session):
+        client, csrf_token = auth_client
+
+        manufacturer = await _create_manufacturer(db_session)
+        filament = await _create_filament(db_session, manufacturer.id)
+        status = await _get_status(db_session, "opened")
+        spool = await _create_spool(db_session, filament.id, status.id, remaining_weight_g=1.0)
+
+        response = await client.post(
+            "/api/v1/spools/rebuild-remaining",
+            json={"spool_ids": [spool.id]},
+            headers={"X-CSRF-Token": csrf_token},
+        )
+
+        assert response.status_code == 200
+        payload = response.json()
+        assert payload["success"] is True
+        assert payload["spools"] == 1
+        assert payload["updated"] == 1
+        await db_session.refresh(spool)
+        assert spool.remaining_weight_g == 750.0
+
 
 class TestSpoolEvents:
     @pytest.mark.asyncio